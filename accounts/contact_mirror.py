@@ -0,0 +1,194 @@
+"""
+Local GHL contact mirror (accounts.Contact) used for identity lookups.
+
+Rows are refreshed whenever we read a contact from GHL (contact/tag/note webhooks and
+syncs), by native ContactCreate/ContactUpdate/ContactDelete webhooks, and by the periodic
+paginated import (jobber_app.tasks.import_ghl_contacts_to_mirror). Callers resolve a contact id here by
+normalized email / E.164 phone first and fall back to a live GHL search only on a miss.
+"""
+import logging
+import re
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import Contact
+
+logger = logging.getLogger(__name__)
+
+MIRROR_UPDATE_FIELDS = [
+    "first_name",
+    "last_name",
+    "phone",
+    "email",
+    "email_normalized",
+    "phone_e164",
+    "dnd",
+    "country",
+    "date_added",
+    "tags",
+    "custom_fields",
+    "location_id",
+    "synced_at",
+]
+
+# GHL payload keys -> mirror columns they feed. Webhooks often carry only part of a contact,
+# so an existing row is only updated for the keys present in the payload.
+PAYLOAD_FIELDS = [
+    (("firstName",), ("first_name",)),
+    (("lastName",), ("last_name",)),
+    (("phone", "phoneNumber"), ("phone", "phone_e164")),
+    (("email", "emailLowerCase"), ("email", "email_normalized")),
+    (("dnd",), ("dnd",)),
+    (("country",), ("country",)),
+    (("dateAdded",), ("date_added",)),
+    (("tags",), ("tags",)),
+    (("customFields", "customField"), ("custom_fields",)),
+    (("locationId",), ("location_id",)),
+]
+
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+
+def normalize_phone_e164(phone, default_country_code="1"):
+    """
+    Best-effort E.164 for North American numbers ('(514) 555-0100' → '+15145550100').
+    Numbers already written with a leading '+' keep their country code.
+    Returns '' when the input has too few digits to be a phone number.
+    """
+    raw = str(phone or "").strip()
+    digits = re.sub(r"\D", "", raw)
+    if len(digits) < 7:
+        return ""
+    if len(digits) == 10 and not raw.startswith("+"):
+        return f"+{default_country_code}{digits}"
+    return f"+{digits}"
+
+
+def _contact_email(contact):
+    return str(contact.get("email") or contact.get("emailLowerCase") or "").strip()
+
+
+def _contact_phone(contact):
+    return str(contact.get("phone") or contact.get("phoneNumber") or "").strip()
+
+
+def _tag_list(contact):
+    tags = contact.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return [str(t).strip() for t in tags if isinstance(t, str) and str(t).strip()]
+
+
+def _contact_row(contact, location_id=""):
+    """Build an unsaved Contact from a GHL contact dict, or None when it has no id."""
+    if not isinstance(contact, dict):
+        return None
+    contact_id = str(contact.get("id") or "").strip()
+    if not contact_id:
+        return None
+    email = _contact_email(contact)
+    phone = _contact_phone(contact)
+    date_added = contact.get("dateAdded")
+    custom_fields = contact.get("customFields") or contact.get("customField") or []
+    return Contact(
+        contact_id=contact_id,
+        first_name=(contact.get("firstName") or "")[:100] or None,
+        last_name=(contact.get("lastName") or "")[:100] or None,
+        phone=phone[:32] or None,
+        email=email[:254] or None,
+        email_normalized=normalize_email(email)[:254],
+        phone_e164=normalize_phone_e164(phone)[:20],
+        dnd=bool(contact.get("dnd")),
+        country=(contact.get("country") or "")[:50] or None,
+        date_added=parse_datetime(date_added) if isinstance(date_added, str) else None,
+        tags=_tag_list(contact),
+        custom_fields=custom_fields if isinstance(custom_fields, list) else [],
+        location_id=str(contact.get("locationId") or location_id or "")[:100],
+        synced_at=timezone.now(),
+    )
+
+
+def _update_fields(contact, location_id=""):
+    """Mirror columns a payload carries (plus synced_at), in MIRROR_UPDATE_FIELDS order."""
+    present = {"synced_at"}
+    for keys, fields in PAYLOAD_FIELDS:
+        if any(key in contact for key in keys):
+            present.update(fields)
+    if location_id:
+        present.add("location_id")
+    return tuple(field for field in MIRROR_UPDATE_FIELDS if field in present)
+
+
+def upsert_contacts_from_ghl(contacts, location_id=""):
+    """
+    Insert or refresh many GHL contact dicts; one statement per distinct payload shape, so partial
+    payloads leave the columns they do not carry untouched. Returns number of rows written.
+    """
+    rows = {}
+    for contact in contacts or []:
+        row = _contact_row(contact, location_id)
+        if row:
+            rows[row.contact_id] = (row, _update_fields(contact, location_id))
+    if not rows:
+        return 0
+    by_shape = {}
+    for row, fields in rows.values():
+        by_shape.setdefault(fields, []).append(row)
+    for fields, shape_rows in by_shape.items():
+        Contact.objects.bulk_create(
+            shape_rows,
+            update_conflicts=True,
+            unique_fields=["contact_id"],
+            update_fields=list(fields),
+        )
+    return len(rows)
+
+
+def mirror_ghl_contacts(contacts, location_id=""):
+    """Best-effort mirror refresh after a GHL read; never raises. Returns rows written."""
+    try:
+        with transaction.atomic():
+            return upsert_contacts_from_ghl(contacts, location_id)
+    except Exception as e:
+        logger.warning("GHL contact mirror upsert failed (%s contacts): %s", len(contacts or []), e)
+        return 0
+
+
+def upsert_contact_from_ghl(contact, location_id=""):
+    """Refresh the mirror row for one GHL contact dict; never raises."""
+    return mirror_ghl_contacts([contact], location_id) == 1
+
+
+def delete_mirrored_contact(contact_id):
+    if contact_id:
+        Contact.objects.filter(contact_id=str(contact_id)).delete()
+
+
+def find_mirrored_contact(location_id="", *, email="", phone=""):
+    """
+    Mirror lookup by normalized email, then E.164 phone.
+    Returns the matching Contact row or None.
+    """
+    qs = Contact.objects.all()
+    if location_id:
+        qs = qs.filter(location_id=location_id)
+    qs = qs.order_by(F("date_added").desc(nulls_last=True), "-id")
+    email_n = normalize_email(email)
+    if email_n:
+        row = qs.filter(email_normalized=email_n).first()
+        if row:
+            return row
+    phone_n = normalize_phone_e164(phone)
+    if phone_n:
+        return qs.filter(phone_e164=phone_n).first()
+    return None
+
+
+def find_mirrored_contact_id(location_id="", *, email="", phone=""):
+    row = find_mirrored_contact(location_id, email=email, phone=phone)
+    return row.contact_id if row else None
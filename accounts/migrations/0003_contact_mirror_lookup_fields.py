@@ -0,0 +1,62 @@
+import re
+
+from django.db import migrations, models
+
+
+def backfill_lookup_fields(apps, schema_editor):
+    Contact = apps.get_model("accounts", "Contact")
+    batch = []
+    for row in Contact.objects.only("id", "email", "phone").iterator(chunk_size=1000):
+        row.email_normalized = (row.email or "").strip().lower()
+        digits = re.sub(r"\D", "", row.phone or "")
+        if len(digits) < 7:
+            row.phone_e164 = ""
+        elif len(digits) == 10 and not (row.phone or "").strip().startswith("+"):
+            row.phone_e164 = f"+1{digits}"
+        else:
+            row.phone_e164 = f"+{digits}"
+        batch.append(row)
+        if len(batch) >= 1000:
+            Contact.objects.bulk_update(batch, ["email_normalized", "phone_e164"])
+            batch = []
+    if batch:
+        Contact.objects.bulk_update(batch, ["email_normalized", "phone_e164"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_jobber_auth_credentials"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contact",
+            name="phone",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="email_normalized",
+            field=models.CharField(blank=True, default="", max_length=254),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="phone_e164",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="contact",
+            name="synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["location_id", "email_normalized"], name="contact_loc_email_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contact",
+            index=models.Index(fields=["location_id", "phone_e164"], name="contact_loc_phone_idx"),
+        ),
+        migrations.RunPython(backfill_lookup_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Explicit access-token expiry for OAuth credentials (previously derived from updated_at).
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_ghl_expires_at(apps, schema_editor):
+    GHLAuthCredentials = apps.get_model("accounts", "GHLAuthCredentials")
+    for creds in GHLAuthCredentials.objects.filter(expires_at__isnull=True).only("id", "updated_at", "expires_in"):
+        if creds.updated_at:
+            creds.expires_at = creds.updated_at + timedelta(seconds=int(creds.expires_in or 0))
+            creds.save(update_fields=["expires_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_contact_mirror_lookup_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ghlauthcredentials",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="jobberauthcredentials",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_ghl_expires_at, migrations.RunPython.noop),
+    ]
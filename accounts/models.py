@@ -10,6 +10,8 @@ class GHLAuthCredentials(models.Model):
     access_token = models.TextField()
     refresh_token = models.TextField()
     expires_in = models.IntegerField()
+    # Set whenever a token is issued; updated_at moves on any save of the row.
+    expires_at = models.DateTimeField(null=True, blank=True)
     scope = models.CharField(max_length=500, null=True, blank=True)
     user_type = models.CharField(max_length=50, null=True, blank=True)
     company_id = models.CharField(max_length=255, null=True, blank=True)
@@ -23,11 +25,15 @@ class GHLAuthCredentials(models.Model):
 
 
 class Contact(models.Model):
+    """Local mirror of a GHL contact (see accounts.contact_mirror)."""
     contact_id = models.CharField(max_length=100, unique=True)
     first_name = models.CharField(max_length=100, blank=True, null=True)
     last_name = models.CharField(max_length=100, blank=True, null=True)
-    phone = models.CharField(max_length=15, blank=True, null=True)
+    phone = models.CharField(max_length=32, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
+    # Lookup keys: lowercased email and E.164 phone
+    email_normalized = models.CharField(max_length=254, blank=True, default="")
+    phone_e164 = models.CharField(max_length=20, blank=True, default="")
     dnd = models.BooleanField(default=False)
     country = models.CharField(max_length=50, blank=True, null=True)
     date_added = models.DateTimeField(blank=True, null=True)
@@ -35,6 +41,13 @@ class Contact(models.Model):
     custom_fields = models.JSONField(default=list, blank=True)
     location_id = models.CharField(max_length=100)
     timestamp = models.DateTimeField(blank=True, null=True)
+    synced_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["location_id", "email_normalized"], name="contact_loc_email_idx"),
+            models.Index(fields=["location_id", "phone_e164"], name="contact_loc_phone_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})"
@@ -44,6 +57,8 @@ class JobberAuthCredentials(models.Model):
     """Single record per environment: one Jobber account connection."""
     access_token = models.TextField()
     refresh_token = models.TextField()
+    # Set whenever a token is issued (see accounts.token_manager)
+    expires_at = models.DateTimeField(null=True, blank=True)
     # Optional: from Jobber account query for tracking
     account_id = models.CharField(max_length=255, null=True, blank=True)
     account_name = models.CharField(max_length=255, null=True, blank=True)
@@ -1,38 +1,21 @@
 
-import requests
+import logging
+
 from celery import shared_task
-from accounts.models import GHLAuthCredentials
-from decouple import config
+from accounts.token_manager import ghl_tokens, jobber_tokens
+
+logger = logging.getLogger(__name__)
 
 @shared_task
 def make_api_call():
-    credentials = GHLAuthCredentials.objects.first()
-    
-    print("credentials tokenL", credentials)
-    refresh_token = credentials.refresh_token
-
-    
-    response = requests.post('https://services.leadconnectorhq.com/oauth/token', data={
-        'grant_type': 'refresh_token',
-        'client_id': config("GHL_CLIENT_ID"),
-        'client_secret': config("GHL_CLIENT_SECRET"),
-        'refresh_token': refresh_token
-    })
-    
-    new_tokens = response.json()
+    """Keep the GHL refresh token warm; refreshes go through the single-flight token manager."""
+    _, err = ghl_tokens.refresh(force=True)
+    if err:
+        logger.warning("GHL token refresh failed: %s", err)
 
-    print("new tokens: ", new_tokens)
 
-    obj, created = GHLAuthCredentials.objects.update_or_create(
-            location_id= new_tokens.get("locationId"),
-            defaults={
-                "access_token": new_tokens.get("access_token"),
-                "refresh_token": new_tokens.get("refresh_token"),
-                "expires_in": new_tokens.get("expires_in"),
-                "scope": new_tokens.get("scope"),
-                "user_type": new_tokens.get("userType"),
-                "company_id": new_tokens.get("companyId"),
-                "user_id":new_tokens.get("userId"),
-
-            }
-        )
\ No newline at end of file
+@shared_task
+def refresh_expiring_oauth_tokens():
+    """Proactively refresh GHL / Jobber access tokens that expire within the refresh skew."""
+    for manager in (ghl_tokens, jobber_tokens):
+        manager.get_credentials()
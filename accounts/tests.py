@@ -1,3 +1,98 @@
+import base64
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import GHLAuthCredentials, JobberAuthCredentials
+from accounts.token_manager import GHLTokenManager, JobberTokenManager
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.sig"
+
+
+class JobberTokenManagerTests(TestCase):
+    def setUp(self):
+        self.manager = JobberTokenManager()
+
+    def test_fresh_token_is_cached_in_process(self):
+        token = _jwt(time.time() + 3600)
+        JobberAuthCredentials.objects.create(access_token=token, refresh_token="r1")
+        self.assertEqual(self.manager.get_access_token(), (token, None))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.manager.get_access_token(), (token, None))
+
+    def test_expiring_token_refreshed_proactively(self):
+        JobberAuthCredentials.objects.create(access_token=_jwt(time.time() + 30), refresh_token="r1")
+        new_token = _jwt(time.time() + 3600)
+        with patch.object(
+            self.manager, "_exchange", return_value=({"access_token": new_token, "refresh_token": "r2"}, None)
+        ) as exchange:
+            self.assertEqual(self.manager.get_access_token(), (new_token, None))
+            self.assertEqual(self.manager.get_access_token(), (new_token, None))
+        exchange.assert_called_once_with("r1")
+        self.assertEqual(JobberAuthCredentials.objects.get().refresh_token, "r2")
+
+    def test_stale_token_reuses_rotated_token(self):
+        rotated = _jwt(time.time() + 3600)
+        JobberAuthCredentials.objects.create(access_token=rotated, refresh_token="r2")
+        with patch.object(self.manager, "_exchange") as exchange:
+            self.assertEqual(self.manager.refresh(stale_access_token="old-token"), (rotated, None))
+        exchange.assert_not_called()
+
+    def test_failed_proactive_refresh_is_backed_off(self):
+        token = _jwt(time.time() + 30)
+        JobberAuthCredentials.objects.create(access_token=token, refresh_token="r1")
+        with patch.object(self.manager, "_exchange", return_value=(None, "jobber down")) as exchange:
+            self.assertEqual(self.manager.get_access_token(), (token, None))
+            with self.assertNumQueries(0):
+                self.assertEqual(self.manager.get_access_token(), (token, None))
+                self.assertEqual(self.manager.refresh(), (None, "jobber down"))
+        exchange.assert_called_once_with("r1")
+
+
+class GHLTokenManagerTests(TestCase):
+    def test_unrelated_save_does_not_extend_expiry(self):
+        expires_at = timezone.now() + timedelta(seconds=30)
+        creds = GHLAuthCredentials.objects.create(
+            user_id="u1", access_token="a1", refresh_token="r1", expires_in=86399, expires_at=expires_at, location_id="loc"
+        )
+        creds.scope = "contacts.readonly"
+        creds.save()
+        self.assertEqual(GHLTokenManager().expires_at(creds), expires_at.timestamp())
+
+
+class ContactMirrorUpsertTests(TestCase):
+    def test_partial_payload_keeps_columns_it_does_not_carry(self):
+        from accounts.contact_mirror import upsert_contacts_from_ghl
+        from accounts.models import Contact
+
+        upsert_contacts_from_ghl([{
+            "id": "c1",
+            "email": "Ann@Example.com",
+            "tags": ["vip"],
+            "customFields": [{"id": "f1", "value": "x"}],
+            "locationId": "loc",
+        }])
+        upsert_contacts_from_ghl([{"id": "c1", "firstName": "Ann"}])
+
+        row = Contact.objects.get(contact_id="c1")
+        self.assertEqual(row.first_name, "Ann")
+        self.assertEqual(row.email_normalized, "ann@example.com")
+        self.assertEqual(row.tags, ["vip"])
+        self.assertEqual(row.custom_fields, [{"id": "f1", "value": "x"}])
+        self.assertEqual(row.location_id, "loc")
+
+    def test_lookup_prefers_dated_rows_over_null_date_added(self):
+        from accounts.contact_mirror import find_mirrored_contact_id, upsert_contacts_from_ghl
 
-# Create your tests here.
+        upsert_contacts_from_ghl([
+            {"id": "dated", "email": "a@example.com", "dateAdded": "2024-01-01T00:00:00Z", "locationId": "loc"},
+            {"id": "undated", "email": "a@example.com", "locationId": "loc"},
+        ])
+        self.assertEqual(find_mirrored_contact_id("loc", email="a@example.com"), "dated")
@@ -0,0 +1,285 @@
+"""
+Single-flight OAuth token manager for GHL (GHLAuthCredentials) and Jobber (JobberAuthCredentials).
+
+Each process keeps the credentials row in memory until shortly before the access token
+expires (or OAUTH_TOKEN_CACHE_MAX_AGE_SECONDS, so reconnects are picked up), instead of
+reading the database on every API call. Tokens are refreshed proactively
+OAUTH_TOKEN_REFRESH_SKEW_SECONDS before expiry, and reactively after a 401.
+
+Refreshes are single-flight: a thread lock collapses concurrent refreshes inside a process,
+and a ``select_for_update`` row lock does the same across gunicorn / Celery workers. A worker
+that waited on the lock re-reads the row and reuses the token another worker just rotated,
+so the (rotating) refresh token is only ever spent once.
+
+When a refresh fails, the manager keeps handing out the current token and does not call the
+vendor again for OAUTH_TOKEN_REFRESH_BACKOFF_SECONDS, so an outage does not turn every API
+call into a database read plus a refresh attempt.
+
+Usage:
+    creds = ghl_tokens.get_credentials()            # cached row, refreshed when expiring
+    token, err = jobber_tokens.get_access_token()
+    token, err = jobber_tokens.refresh(stale_access_token=token)   # after a 401
+"""
+import base64
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import requests
+from decouple import config
+from django.db import transaction
+from django.utils import timezone
+
+from service_backend.metrics import TOKEN_REFRESHES
+
+from .models import GHLAuthCredentials, JobberAuthCredentials
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SKEW_SECONDS = config("OAUTH_TOKEN_REFRESH_SKEW_SECONDS", default=300, cast=int)
+CACHE_MAX_AGE_SECONDS = config("OAUTH_TOKEN_CACHE_MAX_AGE_SECONDS", default=300, cast=int)
+REFRESH_BACKOFF_SECONDS = config("OAUTH_TOKEN_REFRESH_BACKOFF_SECONDS", default=30, cast=int)
+
+
+class OAuthTokenManager:
+    """Shared cache + single-flight refresh; subclasses supply the vendor specifics."""
+
+    name = ""
+    model = None
+    token_url = ""
+    client_id_env = ""
+    client_secret_env = ""
+    not_connected_message = ""
+    update_fields = ["access_token", "refresh_token", "expires_at", "updated_at"]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._creds = None
+        self._fresh_until = 0.0
+        self._backoff_until = 0.0
+        self._backoff_error = None
+
+    # -- vendor hooks -------------------------------------------------------
+
+    def _queryset(self):
+        return self.model.objects.order_by("id")
+
+    def expires_at(self, creds):
+        """Access token expiry as a unix timestamp."""
+        raise NotImplementedError
+
+    def issued_expiry(self, body):
+        """Expiry (aware datetime) for a token response body, or None when it has no expires_in."""
+        if body.get("expires_in") is None:
+            return None
+        return timezone.now() + timedelta(seconds=int(body["expires_in"]))
+
+    def _apply_refresh(self, creds, body):
+        creds.access_token = body["access_token"]
+        creds.refresh_token = body.get("refresh_token") or creds.refresh_token
+        creds.expires_at = self.issued_expiry(body)
+        if not body.get("refresh_token"):
+            logger.warning("%s refresh response omitted refresh_token; keeping previous refresh_token", self.name)
+
+    def _refresh_error(self, status_code, body, text):
+        return body.get("error_description") or body.get("error") or text[:300].strip() or "Unknown error"
+
+    # -- cache --------------------------------------------------------------
+
+    def _expiring(self, creds):
+        return time.time() >= self.expires_at(creds) - REFRESH_SKEW_SECONDS
+
+    def _store(self, creds):
+        self._creds = creds
+        self._fresh_until = min(
+            self.expires_at(creds) - REFRESH_SKEW_SECONDS,
+            time.time() + CACHE_MAX_AGE_SECONDS,
+        )
+
+    def invalidate(self):
+        """Drop the in-process copy (e.g. after an OAuth reconnect in this process)."""
+        self._creds = None
+        self._fresh_until = 0.0
+        self._backoff_until = 0.0
+
+    def get_credentials(self):
+        """
+        Current credentials row (possibly the cached copy), proactively refreshed when the
+        access token is about to expire. Returns None when the vendor is not connected.
+        """
+        creds = self._creds
+        if creds is not None and time.time() < self._fresh_until:
+            return creds
+        creds = self._queryset().first()
+        if not creds:
+            self.invalidate()
+            return None
+        if not self._expiring(creds):
+            self._store(creds)
+            return creds
+        _, err = self.refresh()
+        if err:
+            # Still hand back the row: the token may work until it actually expires. Keep it
+            # cached for the backoff so callers do not re-read and re-refresh on every call.
+            logger.warning("%s proactive token refresh failed: %s", self.name, err)
+            self._creds = creds
+            self._fresh_until = max(self._backoff_until, time.time())
+            return creds
+        return self._creds or creds
+
+    def get_access_token(self):
+        """Returns (access_token, None) or (None, error_message)."""
+        creds = self.get_credentials()
+        if not creds or not creds.access_token:
+            return None, self.not_connected_message
+        return creds.access_token, None
+
+    # -- refresh ------------------------------------------------------------
+
+    def _exchange(self, refresh_token):
+        try:
+            client_id = config(self.client_id_env)
+            client_secret = config(self.client_secret_env)
+        except Exception as e:
+            return None, f"{self.name} env not configured: {e}"
+        resp = requests.post(
+            self.token_url,
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=30,
+        )
+        try:
+            body = resp.json()
+        except requests.exceptions.JSONDecodeError:
+            body = {}
+        if resp.status_code != 200:
+            err = self._refresh_error(resp.status_code, body, resp.text)
+            logger.warning("%s token refresh failed: %s", self.name, err)
+            return None, err
+        if not body.get("access_token"):
+            return None, f"Missing access_token in {self.name} refresh response"
+        return body, None
+
+    def refresh(self, stale_access_token=None, force=False):
+        """
+        Single-flight refresh. Pass the token that just failed as ``stale_access_token``;
+        if someone else already replaced it, their token is reused without calling the vendor.
+        Without a stale token the refresh is skipped unless the token is expiring (or ``force``).
+        Returns (access_token, None) or (None, error_message).
+        """
+        with self._lock:
+            cached = self._creds
+            if cached is not None and not force and not self._expiring(cached):
+                if stale_access_token is None or cached.access_token != stale_access_token:
+                    return cached.access_token, None
+            if not force and time.time() < self._backoff_until:
+                return None, self._backoff_error
+
+            with transaction.atomic():
+                creds = self._queryset().select_for_update().first()
+                if not creds or not creds.refresh_token:
+                    self.invalidate()
+                    return None, self.not_connected_message
+
+                if stale_access_token and creds.access_token and creds.access_token != stale_access_token:
+                    logger.info("%s tokens already refreshed by another worker; reusing stored access token", self.name)
+                    self._store(creds)
+                    return creds.access_token, None
+                if not force and not stale_access_token and not self._expiring(creds):
+                    self._store(creds)
+                    return creds.access_token, None
+
+                body, err = self._exchange(creds.refresh_token)
+                TOKEN_REFRESHES.inc(provider=self.name, outcome="error" if err else "ok")
+                if err:
+                    self.invalidate()
+                    self._backoff_until = time.time() + REFRESH_BACKOFF_SECONDS
+                    self._backoff_error = err
+                    return None, err
+                self._backoff_until = 0.0
+                self._apply_refresh(creds, body)
+                creds.save(update_fields=self.update_fields)
+                self._store(creds)
+                logger.info("%s access token refreshed", self.name)
+                return creds.access_token, None
+
+
+class GHLTokenManager(OAuthTokenManager):
+    name = "GHL"
+    model = GHLAuthCredentials
+    token_url = "https://services.leadconnectorhq.com/oauth/token"
+    client_id_env = "GHL_CLIENT_ID"
+    client_secret_env = "GHL_CLIENT_SECRET"
+    not_connected_message = "GHL not connected (GHLAuthCredentials missing)."
+    update_fields = ["access_token", "refresh_token", "expires_in", "expires_at", "updated_at"]
+
+    def _queryset(self):
+        return self.model.objects.order_by("-updated_at")
+
+    def expires_at(self, creds):
+        if creds.expires_at:
+            return creds.expires_at.timestamp()
+        # Rows written before expires_at existed.
+        issued = creds.updated_at.timestamp() if creds.updated_at else 0
+        return issued + int(creds.expires_in or 0)
+
+    def _apply_refresh(self, creds, body):
+        super()._apply_refresh(creds, body)
+        if body.get("expires_in") is not None:
+            creds.expires_in = int(body["expires_in"])
+
+
+def _jwt_exp(token):
+    """`exp` claim of a JWT access token (unverified), or None."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+class JobberTokenManager(OAuthTokenManager):
+    name = "Jobber"
+    model = JobberAuthCredentials
+    token_url = "https://api.getjobber.com/api/oauth/token"
+    client_id_env = "JOBBER_CLIENT_ID"
+    client_secret_env = "JOBBER_CLIENT_SECRET"
+    not_connected_message = "Jobber not connected. Complete OAuth at /api/accounts/jobber/connect/"
+    # Jobber access tokens are JWTs (exp claim); fall back to the documented 60 minutes.
+    default_lifetime = timedelta(minutes=60)
+
+    def expires_at(self, creds):
+        exp = _jwt_exp(creds.access_token)
+        if exp:
+            return exp
+        if creds.expires_at:
+            return creds.expires_at.timestamp()
+        issued = creds.updated_at.timestamp() if creds.updated_at else 0
+        return issued + self.default_lifetime.total_seconds()
+
+    def issued_expiry(self, body):
+        exp = _jwt_exp(body.get("access_token"))
+        if exp:
+            return datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+        return super().issued_expiry(body) or timezone.now() + self.default_lifetime
+
+    def _refresh_error(self, status_code, body, text):
+        err = super()._refresh_error(status_code, body, text)
+        msg = f"Token refresh failed: {err}"
+        lowered = err.lower()
+        if "refresh token" in lowered and ("not valid" in lowered or "invalid" in lowered or "expired" in lowered):
+            msg += " Reconnect Jobber at /api/accounts/jobber/connect/"
+        return msg
+
+
+ghl_tokens = GHLTokenManager()
+jobber_tokens = JobberTokenManager()
@@ -7,6 +7,7 @@ import json
 from django.shortcuts import redirect
 from django.utils import timezone
 from accounts.models import GHLAuthCredentials, Webhook, JobberAuthCredentials
+from accounts.token_manager import ghl_tokens, jobber_tokens
 from django.views.decorators.csrf import csrf_exempt
 import logging
 from django.views import View
@@ -95,6 +96,7 @@ def tokens(request):
                 "access_token": response_data.get("access_token"),
                 "refresh_token": response_data.get("refresh_token"),
                 "expires_in": response_data.get("expires_in"),
+                "expires_at": ghl_tokens.issued_expiry(response_data),
                 "scope": response_data.get("scope"),
                 "user_type": response_data.get("userType"),
                 "company_id": response_data.get("companyId"),
@@ -102,6 +104,7 @@ def tokens(request):
 
             }
         )
+        ghl_tokens.invalidate()
         return JsonResponse({
             "message": "Authentication successful",
             "access_token": response_data.get("access_token"),
@@ -186,12 +189,15 @@ def jobber_callback(request):
     if creds:
         creds.access_token = access_token
         creds.refresh_token = refresh_token
-        creds.save(update_fields=["access_token", "refresh_token", "updated_at"])
+        creds.expires_at = jobber_tokens.issued_expiry(response_data)
+        creds.save(update_fields=["access_token", "refresh_token", "expires_at", "updated_at"])
     else:
         JobberAuthCredentials.objects.create(
             access_token=access_token,
             refresh_token=refresh_token,
+            expires_at=jobber_tokens.issued_expiry(response_data),
         )
+    jobber_tokens.invalidate()
     return JsonResponse({
         "message": "Jobber connected successfully",
         "token_stored": True,
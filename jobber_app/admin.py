@@ -1,11 +1,17 @@
 from django.contrib import admin
 from .models import (
     GhlAppointmentJobberJobMap,
+    HubOutboxMessage,
+    JobberClientDirectory,
+    JobberClientDirectoryKey,
     JobberClientGhlTagSyncState,
+    JobberGhlTagReconcileRun,
     JobberGhlNoteForward,
     JobberTaskIdempotency,
     JobberVisitCompletedGhlTrigger,
     JobberVisitGhlBlockMap,
+    JobberWebhookCoalesce,
+    OutboundCallLog,
 )
 
 
@@ -74,4 +80,50 @@ class JobberTaskIdempotencyAdmin(admin.ModelAdmin):
     list_display = ("idempotency_key", "jobber_task_id", "created_at")
     search_fields = ("idempotency_key", "jobber_task_id")
     ordering = ("-created_at",)
-    readonly_fields = ("created_at",)
\ No newline at end of file
+    readonly_fields = ("created_at",)
+
+class JobberClientDirectoryKeyInline(admin.TabularInline):
+    model = JobberClientDirectoryKey
+    extra = 0
+    fields = ("kind", "value", "property_id")
+
+
+@admin.register(JobberClientDirectory)
+class JobberClientDirectoryAdmin(admin.ModelAdmin):
+    list_display = ("jobber_client_id", "first_name", "last_name", "primary_property_id", "synced_at")
+    search_fields = ("jobber_client_id", "first_name", "last_name", "keys__value")
+    ordering = ("-synced_at",)
+    inlines = [JobberClientDirectoryKeyInline]
+
+
+@admin.register(HubOutboxMessage)
+class HubOutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("operation", "dedupe_key", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("operation", "status")
+    search_fields = ("dedupe_key", "last_error")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "updated_at", "sent_at")
+
+
+@admin.register(JobberWebhookCoalesce)
+class JobberWebhookCoalesceAdmin(admin.ModelAdmin):
+    list_display = ("family", "item_id", "pending", "pending_events", "events_total", "syncs_total", "last_synced_at")
+    list_filter = ("family", "pending")
+    search_fields = ("item_id",)
+    ordering = ("-updated_at",)
+
+
+@admin.register(JobberGhlTagReconcileRun)
+class JobberGhlTagReconcileRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "pages", "clients_seen", "drifted", "repaired", "repair_skipped", "repair_failed", "started_at", "finished_at")
+    list_filter = ("status",)
+    ordering = ("-started_at",)
+    readonly_fields = ("started_at", "updated_at", "finished_at")
+
+
+@admin.register(OutboundCallLog)
+class OutboundCallLogAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "vendor", "operation", "method", "status_code", "duration_ms", "attempt", "correlation_id")
+    list_filter = ("vendor", "method", "status_code")
+    search_fields = ("operation", "endpoint", "correlation_id", "error")
+    ordering = ("-created_at",)
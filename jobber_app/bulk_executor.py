@@ -0,0 +1,166 @@
+"""
+Resumable, concurrent executor for GHL / Jobber backfills.
+
+    summary = run_bulk("backfill_ghl_visit_count:<field>", rows, apply_row,
+                       key=lambda row: row["ghl_id"], workers=4, per_second=5, resume=True,
+                       on_result=lambda row, result: report.write({**row, **result}))
+
+- operation(item) returns a result dict with at least ``ok`` and ``error``.
+- All workers share one AdaptiveRateLimiter: a 429 doubles the spacing between calls
+  (and the item is retried with exponential backoff); successes ease it back to the base rate.
+- Every finished item is journaled in BulkOperationItem, so resume=True skips items already
+  done (failed ones are retried) even after a crash or deploy restart.
+- on_result is called as each item finishes (e.g. a StreamingCsvWriter), so reports are
+  never lost to a crash at the end of a long run.
+"""
+import csv
+import logging
+import threading
+import time
+
+from .lock_in.fanout import RateLimiter, run_parallel
+from .models import BulkOperationItem
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 60
+# Spacing a 429 imposes even on an unlimited (per_second=0) limiter.
+MIN_THROTTLED_INTERVAL = 0.2
+# An unlimited limiter recovering from throttling goes back to no spacing below this.
+UNTHROTTLED_BELOW = 0.02
+
+
+def is_rate_limited(error):
+    """True for GHL ('GHL API 429: ...') and Jobber ('Jobber API HTTP 429' / THROTTLED) throttling errors."""
+    err = str(error or "")
+    return " 429" in err or "THROTTLED" in err.upper()
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """RateLimiter whose spacing doubles on throttling and decays back to the base rate on success."""
+
+    def __init__(self, per_second, *, max_interval=30.0):
+        super().__init__(per_second)
+        self._base_interval = self._interval
+        self._max_interval = max_interval
+
+    def slow_down(self):
+        with self._lock:
+            self._interval = min(max(self._interval * 2, self._base_interval, MIN_THROTTLED_INTERVAL), self._max_interval)
+            self._next_at = max(self._next_at, time.monotonic() + self._interval)
+            return self._interval
+
+    def speed_up(self):
+        with self._lock:
+            if self._interval > self._base_interval:
+                self._interval = max(self._base_interval, self._interval * 0.9)
+                if not self._base_interval and self._interval < UNTHROTTLED_BELOW:
+                    self._interval = 0.0
+
+
+class StreamingCsvWriter:
+    """Thread-safe CSV report that appends and flushes one row at a time."""
+
+    def __init__(self, path, fieldnames):
+        self._lock = threading.Lock()
+        exists = path.is_file() and path.stat().st_size > 0
+        self._file = open(path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction="ignore")
+        if not exists:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def write(self, row):
+        with self._lock:
+            self._writer.writerow(row)
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def completed_keys(job_name):
+    return set(
+        BulkOperationItem.objects.filter(job_name=job_name, status=BulkOperationItem.STATUS_DONE).values_list(
+            "item_key", flat=True
+        )
+    )
+
+
+def reset_journal(job_name):
+    return BulkOperationItem.objects.filter(job_name=job_name).delete()[0]
+
+
+def _journal(job_name, item_key, result, attempts):
+    BulkOperationItem.objects.update_or_create(
+        job_name=job_name,
+        item_key=item_key,
+        defaults={
+            "status": BulkOperationItem.STATUS_DONE if result.get("ok") else BulkOperationItem.STATUS_FAILED,
+            "attempts": attempts,
+            "error": str(result.get("error") or "")[:2000],
+        },
+    )
+
+
+def run_bulk(
+    job_name, items, operation, *, key, workers=4, per_second=5.0, max_attempts=5, resume=False, on_result=None, sleep=time.sleep
+):
+    """
+    Apply ``operation`` to every item not yet done for ``job_name``.
+    Without resume the job's journal is cleared first (start over).
+    on_result(item, result) runs in the worker thread right after each item finishes.
+    sleep(seconds) is used for the 429 backoff (injectable for tests).
+    Returns dict: { total, skipped, succeeded, failed, rate_limited }.
+    """
+    items = list(items or [])
+    if resume:
+        done = completed_keys(job_name)
+    else:
+        reset_journal(job_name)
+        done = set()
+    pending = [item for item in items if str(key(item)) not in done]
+
+    limiter = AdaptiveRateLimiter(per_second)
+    lock = threading.Lock()
+    counts = {"succeeded": 0, "failed": 0, "rate_limited": 0}
+
+    def process(item):
+        item_key = str(key(item))
+        attempts = 0
+        while True:
+            attempts += 1
+            limiter.wait()
+            try:
+                result = operation(item)
+            except Exception as exc:
+                logger.exception("Bulk job %s item %s raised", job_name, item_key)
+                result = {"ok": False, "error": str(exc)}
+            if result.get("ok") or not is_rate_limited(result.get("error")) or attempts >= max_attempts:
+                break
+            interval = limiter.slow_down()
+            with lock:
+                counts["rate_limited"] += 1
+            backoff = min(2 ** attempts, MAX_BACKOFF_SECONDS)
+            logger.warning(
+                "Bulk job %s throttled on %s (attempt %s); backing off %ss, spacing now %.2fs",
+                job_name,
+                item_key,
+                attempts,
+                backoff,
+                interval,
+            )
+            sleep(backoff)
+        if result.get("ok"):
+            limiter.speed_up()
+        _journal(job_name, item_key, result, attempts)
+        with lock:
+            counts["succeeded" if result.get("ok") else "failed"] += 1
+        if on_result:
+            on_result(item, result)
+        return result
+
+    run_parallel(process, pending, workers=workers)
+    summary = {"total": len(items), "skipped": len(items) - len(pending), **counts}
+    logger.info("Bulk job %s finished: %s", job_name, summary)
+    return summary
@@ -0,0 +1,251 @@
+"""
+Outbound call ledger (OutboundCallLog): one row per sampled GHL / Jobber / Hub request.
+
+Recorded at ``requests.Session.send``, so every client helper is covered: vendor, operation
+(GraphQL operation name for Jobber, else the endpoint family), method, duration, status or
+error, request / response size, the correlation id of the triggering request, webhook or task
+(service_backend.correlation) and the attempt number — a repeat of the same request (method,
+URL and body) within one correlation (401 refresh retries, backoff loops) counts as attempt
+2, 3, ...
+
+Rows are buffered in memory and bulk-inserted by a background thread every
+OUTBOUND_LEDGER_FLUSH_SECONDS (or once OUTBOUND_LEDGER_BATCH_SIZE rows are waiting), so
+callers never wait on the insert.
+
+Sampling: OUTBOUND_LEDGER_SAMPLE_RATE (0..1) keeps or drops whole correlations, so a sampled
+booking shows all of its calls. Errors, HTTP >= 400 and calls slower than
+OUTBOUND_LEDGER_SLOW_MS are always kept. OUTBOUND_LEDGER_ENABLED=false turns it off.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import timedelta
+
+import requests
+from decouple import config
+from django.db import close_old_connections
+from django.utils import timezone
+
+from service_backend import correlation
+from service_backend.metrics import classify_url
+
+logger = logging.getLogger(__name__)
+
+LEDGER_VENDORS = ("ghl", "jobber", "hub")
+_GRAPHQL_OPERATION = re.compile(r"^\s*(?:query|mutation)\s+(\w+)")
+
+
+def enabled():
+    return config("OUTBOUND_LEDGER_ENABLED", default=True, cast=bool)
+
+
+def sample_rate():
+    return min(max(config("OUTBOUND_LEDGER_SAMPLE_RATE", default=1.0, cast=float), 0.0), 1.0)
+
+
+def slow_ms():
+    return config("OUTBOUND_LEDGER_SLOW_MS", default=1000, cast=int)
+
+
+def retention_days():
+    return config("OUTBOUND_LEDGER_RETENTION_DAYS", default=14, cast=int)
+
+
+def operation_name(vendor, endpoint, body):
+    """GraphQL operation name from a Jobber request body, else the endpoint family."""
+    if vendor == "jobber" and isinstance(body, (bytes, str)) and body:
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            payload = None
+        # Decoded, so multi-line queries (JSON-escaped "\n...") match too.
+        query = payload.get("query") if isinstance(payload, dict) else None
+        if isinstance(query, str):
+            match = _GRAPHQL_OPERATION.match(query)
+            if match:
+                return match.group(1)
+    return endpoint
+
+
+def sampled(correlation_id, rate=None):
+    """Deterministic per-correlation decision, so one request's calls are kept or dropped together."""
+    rate = sample_rate() if rate is None else rate
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    key = (correlation_id or str(time.monotonic_ns())).encode("utf-8")
+    return zlib.crc32(key) % 10000 < rate * 10000
+
+
+def _request_signature(method, operation, url, body):
+    """Identifies one request; a retry repeats it exactly, distinct calls to one endpoint differ."""
+    if isinstance(body, str):
+        body = body.encode("utf-8", "ignore")
+    raw = body if isinstance(body, bytes) else b""
+    return method, operation, zlib.crc32((url or "").encode("utf-8", "ignore") + b"\0" + raw)
+
+
+def _attempt(signature):
+    state = correlation.current()
+    if state is None:
+        return 1
+    attempts = state["attempts"]
+    attempts[signature] = attempts.get(signature, 0) + 1
+    return attempts[signature]
+
+
+class _Writer:
+    """Per-process buffer drained by a daemon thread with bulk_create."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = []
+        self._wake = threading.Event()
+        self._pid = None
+
+    def add(self, row):
+        with self._lock:
+            self._rows.append(row)
+            pending = len(self._rows)
+            if self._pid != os.getpid():
+                # First row in this process (or after a fork): start the flusher here.
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="call-ledger", daemon=True).start()
+        if pending >= config("OUTBOUND_LEDGER_BATCH_SIZE", default=200, cast=int):
+            self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+        return rows
+
+    def flush(self):
+        from .models import OutboundCallLog
+
+        rows = self._take()
+        if not rows:
+            return 0
+        try:
+            OutboundCallLog.objects.bulk_create([OutboundCallLog(**row) for row in rows], batch_size=500)
+        except Exception as exc:
+            logger.warning("Outbound call ledger dropped %s rows: %s", len(rows), exc)
+            return 0
+        finally:
+            close_old_connections()
+        return len(rows)
+
+    def _run(self):
+        interval = config("OUTBOUND_LEDGER_FLUSH_SECONDS", default=2.0, cast=float)
+        while True:
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+
+writer = _Writer()
+atexit.register(writer.flush)
+
+
+def record(*, vendor, endpoint, method, body, started, duration_ms, status_code=None, error="", response_bytes=0, url=""):
+    operation = operation_name(vendor, endpoint, body)
+    attempt = _attempt(_request_signature(method, operation, url, body))
+    failed = bool(error) or (status_code or 0) >= 400
+    correlation_id = correlation.current_id()
+    if not (failed or duration_ms >= slow_ms() or sampled(correlation_id)):
+        return
+    writer.add(
+        {
+            "created_at": started,
+            "vendor": vendor,
+            "operation": operation[:128],
+            "method": method[:8],
+            "endpoint": endpoint[:255],
+            "status_code": status_code,
+            "error": error[:255],
+            "duration_ms": duration_ms,
+            "request_bytes": _body_bytes(body),
+            "response_bytes": response_bytes,
+            "correlation_id": correlation_id,
+            "attempt": attempt,
+        }
+    )
+
+
+def _body_bytes(body):
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    # File or generator uploads: size unknown without consuming the stream.
+    return 0
+
+
+def _response_bytes(response, stream):
+    if not stream and response._content not in (False, None):
+        return len(response._content)
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+def install_call_ledger():
+    """Record GHL / Jobber / Hub requests made through ``requests`` (idempotent)."""
+    if getattr(requests.Session.send, "_call_ledger", False):
+        return
+    original_send = requests.Session.send
+
+    @functools.wraps(original_send)
+    def send(self, request, **kwargs):
+        vendor, endpoint = classify_url(request.url)
+        if vendor not in LEDGER_VENDORS or not enabled():
+            return original_send(self, request, **kwargs)
+        started = timezone.now()
+        start = time.perf_counter()
+        try:
+            response = original_send(self, request, **kwargs)
+        except Exception as exc:
+            record(
+                vendor=vendor,
+                endpoint=endpoint,
+                method=request.method,
+                url=request.url,
+                body=request.body,
+                started=started,
+                duration_ms=round((time.perf_counter() - start) * 1000),
+                error=f"{type(exc).__name__}: {exc}",
+            )
+            raise
+        record(
+            vendor=vendor,
+            endpoint=endpoint,
+            method=request.method,
+            url=request.url,
+            body=request.body,
+            started=started,
+            duration_ms=round((time.perf_counter() - start) * 1000),
+            status_code=response.status_code,
+            response_bytes=_response_bytes(response, kwargs.get("stream", False)),
+        )
+        return response
+
+    send._call_ledger = True
+    requests.Session.send = send
+
+
+def prune(days=None, batch_size=5000):
+    """Delete ledger rows older than the retention window in batches. Returns rows deleted."""
+    from .models import OutboundCallLog
+
+    cutoff = timezone.now() - timedelta(days=retention_days() if days is None else days)
+    deleted = 0
+    while True:
+        ids = list(OutboundCallLog.objects.filter(created_at__lt=cutoff).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboundCallLog.objects.filter(id__in=ids).delete()[0]
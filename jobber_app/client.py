@@ -1,108 +1,41 @@
 """
 Jobber GraphQL API client.
-Uses stored JobberAuthCredentials from accounts app.
-Automatically refreshes the access token when it expires.
+Uses stored JobberAuthCredentials from accounts app via accounts.token_manager.
+Refreshes the access token shortly before it expires, and again on a 401.
 """
 import json
 import logging
 import requests
 from decouple import config
+from django.core.cache import cache
+
+from accounts.token_manager import jobber_tokens
+from service_backend.circuit_breaker import error_when_open
 
 logger = logging.getLogger(__name__)
 
 JOBBER_GRAPHQL_URL = "https://api.getjobber.com/api/graphql"
-JOBBER_TOKEN_URL = "https://api.getjobber.com/api/oauth/token"
 
 
 def get_access_token():
-    """Get current Jobber access token from DB."""
-    from accounts.models import JobberAuthCredentials
-    creds = JobberAuthCredentials.objects.first()
-    if not creds:
-        return None
-    return creds.access_token
+    """Current Jobber access token (in-process cache, proactively refreshed before expiry)."""
+    token, _ = jobber_tokens.get_access_token()
+    return token
 
 
 def _refresh_jobber_tokens(stale_access_token=None):
     """
     Exchange refresh_token for new access_token (and possibly new refresh_token).
 
-    Uses a DB row lock so only one gunicorn worker refreshes at a time. Jobber rotates
-    refresh tokens; concurrent refreshes with the same token invalidate the connection.
-
-    If ``stale_access_token`` is provided and another worker already refreshed while we
-    waited for the lock, reuse the new access token without calling Jobber again.
+    Delegates to accounts.token_manager.jobber_tokens: single-flight across threads and
+    workers (DB row lock). Jobber rotates refresh tokens; concurrent refreshes with the same
+    token invalidate the connection. If ``stale_access_token`` is provided and another worker
+    already refreshed, the new access token is reused without calling Jobber again.
 
-    Updates JobberAuthCredentials in DB. Returns (new_access_token, None) or (None, error_message).
+    Returns (new_access_token, None) or (None, error_message).
     Does not touch GHL credentials or any non-Jobber auth.
     """
-    from django.db import transaction
-    from accounts.models import JobberAuthCredentials
-
-    with transaction.atomic():
-        creds = (
-            JobberAuthCredentials.objects.select_for_update()
-            .order_by("id")
-            .first()
-        )
-        if not creds or not creds.refresh_token:
-            return None, "No refresh token. Reconnect Jobber at /api/accounts/jobber/connect/"
-
-        # Another worker refreshed while we waited — Jobber's recommended skip pattern.
-        if (
-            stale_access_token
-            and creds.access_token
-            and creds.access_token != stale_access_token
-        ):
-            logger.info(
-                "Jobber tokens already refreshed by another worker; reusing stored access token"
-            )
-            return creds.access_token, None
-
-        try:
-            client_id = config("JOBBER_CLIENT_ID")
-            client_secret = config("JOBBER_CLIENT_SECRET")
-        except Exception as e:
-            return None, f"Jobber env not configured: {e}"
-        data = {
-            "grant_type": "refresh_token",
-            "refresh_token": creds.refresh_token,
-            "client_id": client_id,
-            "client_secret": client_secret,
-        }
-        resp = requests.post(JOBBER_TOKEN_URL, data=data, timeout=30)
-        try:
-            response_data = resp.json()
-        except requests.exceptions.JSONDecodeError:
-            response_data = {}
-        if resp.status_code != 200:
-            err = (
-                response_data.get("error_description")
-                or response_data.get("error")
-                or resp.text[:300].strip()
-            ) or "Unknown error"
-            logger.warning("Jobber token refresh failed: %s", err)
-            msg = f"Token refresh failed: {err}"
-            if "refresh token" in err.lower() and (
-                "not valid" in err.lower()
-                or "invalid" in err.lower()
-                or "expired" in err.lower()
-            ):
-                msg += " Reconnect Jobber at /api/accounts/jobber/connect/"
-            return None, msg
-        access_token = response_data.get("access_token")
-        refresh_token = response_data.get("refresh_token") or creds.refresh_token
-        if not access_token:
-            return None, "Missing access_token in refresh response"
-        if not response_data.get("refresh_token"):
-            logger.warning(
-                "Jobber refresh response omitted refresh_token; keeping previous refresh_token"
-            )
-        creds.access_token = access_token
-        creds.refresh_token = refresh_token
-        creds.save(update_fields=["access_token", "refresh_token", "updated_at"])
-        logger.info("Jobber access token refreshed successfully")
-        return access_token, None
+    return jobber_tokens.refresh(stale_access_token=stale_access_token)
 
 
 def _is_token_expired_error(status_code, data):
@@ -118,6 +51,7 @@ def _is_token_expired_error(status_code, data):
     return False
 
 
+@error_when_open
 def _request(query, variables=None, _retried=False):
     """POST a GraphQL request to Jobber. Returns (data dict, error message or None). Auto-refreshes token on expiry."""
     token = get_access_token()
@@ -414,6 +348,62 @@ def get_client_properties(client_id):
     return prop_id, nodes, None
 
 
+# -----------------------------------------------------------------------------
+# Client directory (identity + property addresses for the local lookup table)
+# -----------------------------------------------------------------------------
+
+CLIENT_DIRECTORY_FIELDS = """
+      id
+      firstName
+      lastName
+      emails { address }
+      phones { number }
+      clientProperties(first: 10) {
+        nodes {
+          id
+          address { street1 postalCode }
+        }
+      }
+"""
+
+QUERY_CLIENT_DIRECTORY = """
+query ClientDirectory($id: EncodedId!) {
+  client(id: $id) {%s  }
+}
+""" % CLIENT_DIRECTORY_FIELDS
+
+QUERY_CLIENTS_DIRECTORY_PAGE = """
+query ClientsDirectoryPage($first: Int, $after: String) {
+  clients(first: $first, after: $after) {
+    nodes {%s    }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+""" % CLIENT_DIRECTORY_FIELDS
+
+
+def get_client_for_directory(client_id):
+    """Client identity + property addresses. Returns (client dict or None, error)."""
+    data, err = _request(QUERY_CLIENT_DIRECTORY, {"id": client_id})
+    if err:
+        return None, err
+    return (data or {}).get("client"), None
+
+
+def list_clients_directory_page(first=25, after=None):
+    """
+    One page of clients with identity fields for the directory backfill.
+    Returns (nodes list, next cursor or None, error).
+    """
+    data, err = _request(QUERY_CLIENTS_DIRECTORY_PAGE, {"first": first, "after": after})
+    if err:
+        return [], None, err
+    clients = (data or {}).get("clients") or {}
+    page_info = clients.get("pageInfo") or {}
+    cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return clients.get("nodes") or [], cursor, None
+
+
 # -----------------------------------------------------------------------------
 # Create property for a client (service address)
 # -----------------------------------------------------------------------------
@@ -820,9 +810,7 @@ def edit_job_visit(
 # Jobber Tag type exposes `label` (not `name`) in current GraphQL API versions.
 # -----------------------------------------------------------------------------
 
-QUERY_CLIENT_TAG_SYNC = """
-query ClientTagSync($id: EncodedId!) {
-  client(id: $id) {
+CLIENT_TAG_SYNC_FIELDS = """
     id
     firstName
     lastName
@@ -834,9 +822,22 @@ query ClientTagSync($id: EncodedId!) {
         label
       }
     }
+"""
+
+QUERY_CLIENT_TAG_SYNC = """
+query ClientTagSync($id: EncodedId!) {
+  client(id: $id) {%s  }
+}
+""" % CLIENT_TAG_SYNC_FIELDS
+
+QUERY_CLIENTS_TAG_SYNC_PAGE = """
+query ClientsTagSyncPage($first: Int, $after: String) {
+  clients(first: $first, after: $after) {
+    nodes {%s    }
+    pageInfo { hasNextPage endCursor }
   }
 }
-"""
+""" % CLIENT_TAG_SYNC_FIELDS
 
 QUERY_ACCOUNT_TAGS = """
 query JobberAccountTags {
@@ -903,11 +904,33 @@ def get_client_for_tag_sync(client_id):
     return client, None
 
 
-def get_account_tag_name_to_id():
+def list_clients_tag_sync_page(first=25, after=None):
     """
-    Map lowercased tag name -> Jobber tag id for the connected account.
-    Returns dict (may be empty if query shape differs).
+    One page of clients with emails, phones and tags (nightly tag reconciliation).
+    Returns (nodes list, next cursor or None, error).
     """
+    data, err = _request(QUERY_CLIENTS_TAG_SYNC_PAGE, {"first": first, "after": after})
+    if err:
+        return [], None, err
+    clients = (data or {}).get("clients") or {}
+    page_info = clients.get("pageInfo") or {}
+    cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+    return clients.get("nodes") or [], cursor, None
+
+
+JOBBER_ACCOUNT_TAGS_CACHE_KEY = "jobber:account_tags:name_to_id"
+# Set while a reload triggered by an unknown tag name is still recent (see _resolve_tag_ids).
+JOBBER_ACCOUNT_TAGS_MISS_REFRESH_KEY = "jobber:account_tags:miss_refresh"
+
+
+def _account_tags_cache_ttl():
+    try:
+        return int(config("JOBBER_ACCOUNT_TAGS_CACHE_TTL", default="900"))
+    except ValueError:
+        return 900
+
+
+def _fetch_account_tag_name_to_id():
     last_err = None
     for q in (QUERY_ACCOUNT_TAGS, QUERY_ROOT_TAGS):
         data, err = _request(q)
@@ -923,13 +946,7 @@ def get_account_tag_name_to_id():
             conn = data.get("tags")
         if not conn:
             continue
-        nodes = conn.get("nodes") or []
-        out = {}
-        for n in nodes:
-            tid = n.get("id")
-            nm = _tag_node_display_name(n)
-            if tid and nm:
-                out[nm.lower()] = tid
+        out = _tag_label_to_id(conn.get("nodes") or [])
         if out:
             return out
     if last_err:
@@ -937,6 +954,43 @@ def get_account_tag_name_to_id():
     return {}
 
 
+def get_account_tag_name_to_id(force_refresh=False):
+    """
+    Map lowercased tag name -> Jobber tag id for the connected account.
+    Cached for JOBBER_ACCOUNT_TAGS_CACHE_TTL seconds (default 900); pass force_refresh=True
+    to reload, e.g. when a name is missing from the cached catalog.
+    Returns dict (may be empty if query shape differs).
+    """
+    if not force_refresh:
+        cached = cache.get(JOBBER_ACCOUNT_TAGS_CACHE_KEY)
+        if cached:
+            return dict(cached)
+    out = _fetch_account_tag_name_to_id()
+    if out:
+        cache.set(JOBBER_ACCOUNT_TAGS_CACHE_KEY, out, _account_tags_cache_ttl())
+    return out
+
+
+def _tag_label_to_id(nodes):
+    out = {}
+    for n in nodes or []:
+        tid = (n or {}).get("id")
+        nm = _tag_node_display_name(n)
+        if tid and nm:
+            out[nm.lower()] = tid
+    return out
+
+
+def client_tag_state(client):
+    """
+    Tag names and label -> id map from a client dict returned by get_client_for_tag_sync.
+    Returns (sorted display names, {lowercased label: tag id}).
+    """
+    nodes = (((client or {}).get("tags") or {}).get("nodes")) or []
+    names = sorted({_tag_node_display_name(n) for n in nodes if _tag_node_display_name(n)})
+    return names, _tag_label_to_id(nodes)
+
+
 def get_client_tag_label_to_id(client_id):
     """
     Map lowercased label -> tag id from tags already on this client.
@@ -947,14 +1001,7 @@ def get_client_tag_label_to_id(client_id):
     client, err = get_client_for_tag_sync(client_id)
     if err or not client:
         return {}
-    nodes = ((client.get("tags") or {}).get("nodes")) or []
-    out = {}
-    for n in nodes:
-        tid = n.get("id")
-        nm = _tag_node_display_name(n)
-        if tid and nm:
-            out[nm.lower()] = tid
-    return out
+    return client_tag_state(client)[1]
 
 
 def list_client_tag_names(client_id):
@@ -962,41 +1009,26 @@ def list_client_tag_names(client_id):
     client, err = get_client_for_tag_sync(client_id)
     if err or not client:
         return [], err or "Client not found"
-    nodes = ((client.get("tags") or {}).get("nodes")) or []
-    names = []
-    for n in nodes:
-        nm = _tag_node_display_name(n)
-        if nm:
-            names.append(nm)
-    return sorted(set(names)), None
+    return client_tag_state(client)[0], None
 
 
-def set_client_tags_by_names(client_id, tag_names):
+def _resolve_tag_ids(tag_names, client_map):
     """
-    Replace Jobber client tags to match the given display names (best effort).
-    Resolves names to ids via account tag list; names with no matching Jobber tag are skipped.
-
-    Returns (True, None) or (False, error_message).
+    Resolve display names to Jobber tag ids using the cached account catalog. An unknown name
+    reloads the catalog at most once per JOBBER_ACCOUNT_TAGS_CACHE_TTL: GHL tags with no Jobber
+    equivalent are normal and must not reload it on every webhook.
+    Returns (ordered unique tag ids, account map used).
     """
-    if not client_id:
-        return False, "client_id is required"
-    tag_names = tag_names or []
     account_map = get_account_tag_name_to_id()
-    client_map = get_client_tag_label_to_id(client_id)
+    wanted = [str(raw).strip() for raw in tag_names or [] if str(raw).strip()]
+    missing = any(nm.lower() not in account_map and nm.lower() not in client_map for nm in wanted)
+    if missing and cache.add(JOBBER_ACCOUNT_TAGS_MISS_REFRESH_KEY, 1, _account_tags_cache_ttl()):
+        account_map = get_account_tag_name_to_id(force_refresh=True) or account_map
     # Account catalog wins on key collision; client map fills gaps (e.g. account query unavailable).
     name_to_id = {**client_map, **account_map}
-    if not name_to_id and tag_names:
-        return (
-            False,
-            "Could not load Jobber tags (account tag list and client tags empty); "
-            "cannot map tag names to ids. Check Jobber GraphQL access and tag queries.",
-        )
     tag_ids = []
     seen = set()
-    for raw in tag_names:
-        nm = str(raw).strip()
-        if not nm:
-            continue
+    for nm in wanted:
         tid = name_to_id.get(nm.lower())
         if not tid:
             logger.warning("Jobber tag name not found in account, skipping: %s", nm)
@@ -1004,6 +1036,38 @@ def set_client_tags_by_names(client_id, tag_names):
         if tid not in seen:
             seen.add(tid)
             tag_ids.append(tid)
+    return tag_ids, name_to_id
+
+
+def apply_client_tag_names(client_id, tag_names, client=None):
+    """
+    Make the Jobber client's tags match ``tag_names`` (best effort), diffing locally against
+    the client's current tags so no mutation is sent when nothing changed.
+
+    ``client`` is a dict from get_client_for_tag_sync; it is fetched when omitted.
+    Returns (result dict, error). result: tags (names after write), added, removed, changed.
+    """
+    if not client_id:
+        return None, "client_id is required"
+    if client is None:
+        client, err = get_client_for_tag_sync(client_id)
+        if err:
+            return None, err
+    current_names, client_map = client_tag_state(client)
+    tag_ids, name_to_id = _resolve_tag_ids(tag_names, client_map)
+    if not name_to_id and tag_names:
+        return (
+            None,
+            "Could not load Jobber tags (account tag list and client tags empty); "
+            "cannot map tag names to ids. Check Jobber GraphQL access and tag queries.",
+        )
+
+    current_ids = set(client_map.values())
+    added = sorted(tid for tid in tag_ids if tid not in current_ids)
+    removed = sorted(current_ids - set(tag_ids))
+    if not added and not removed:
+        return {"tags": current_names, "added": [], "removed": [], "changed": False}, None
+
     input_obj = {"id": client_id, "tagIds": tag_ids}
     data, err = _request(MUTATION_CLIENT_UPDATE, {"input": input_obj})
     if err:
@@ -1011,12 +1075,34 @@ def set_client_tags_by_names(client_id, tag_names):
         input_obj_alt = {"clientId": client_id, "tagIds": tag_ids}
         data, err = _request(MUTATION_CLIENT_UPDATE, {"input": input_obj_alt})
     if err:
-        return False, err
+        return None, err
     result = (data or {}).get("clientUpdate") or {}
     user_errors = result.get("userErrors") or []
     if user_errors:
         msg = "; ".join([e.get("message", str(e)) for e in user_errors])
-        return False, msg
+        return None, msg
+    id_to_name = {tid: nm for nm, tid in name_to_id.items()}
+    after_names, _ = client_tag_state(result.get("client"))
+    if not after_names:
+        after_names = sorted({id_to_name.get(tid, tid) for tid in tag_ids})
+    return {
+        "tags": after_names,
+        "added": [id_to_name.get(tid, tid) for tid in added],
+        "removed": [id_to_name.get(tid, tid) for tid in removed],
+        "changed": True,
+    }, None
+
+
+def set_client_tags_by_names(client_id, tag_names):
+    """
+    Replace Jobber client tags to match the given display names (best effort).
+    Resolves names to ids via the cached account tag list; names with no matching Jobber tag are skipped.
+
+    Returns (True, None) or (False, error_message).
+    """
+    _result, err = apply_client_tag_names(client_id, tag_names)
+    if err:
+        return False, err
     return True, None
 
 
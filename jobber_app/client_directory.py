@@ -0,0 +1,216 @@
+"""
+Local Jobber client directory (JobberClientDirectory + JobberClientDirectoryKey).
+
+Booking confirmation and GHL → Jobber resolution look clients up here by normalized email,
+phone digits or property address before falling back to Jobber `clients(searchTerm:)`.
+Rows are refreshed by CLIENT_CREATE / CLIENT_UPDATE webhooks, by bookings that create
+clients/properties, and by the paginated backfill (manage.py backfill_jobber_client_directory).
+"""
+import logging
+import re
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .client import get_client_for_directory, list_clients_directory_page
+from .models import JobberClientDirectory, JobberClientDirectoryKey
+
+logger = logging.getLogger(__name__)
+
+KIND_EMAIL = JobberClientDirectoryKey.KIND_EMAIL
+KIND_PHONE = JobberClientDirectoryKey.KIND_PHONE
+KIND_ADDRESS = JobberClientDirectoryKey.KIND_ADDRESS
+
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+
+def phone_digits(phone):
+    """Comparable phone key: digits only, North American numbers without the leading 1."""
+    digits = re.sub(r"\D", "", str(phone or ""))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else ""
+
+
+def address_key(street1, postal_code):
+    """'12 Main St.' + 'h2x 1y4' → '12 main st|H2X1Y4'; '' without a street."""
+    street = re.sub(r"[^a-z0-9]+", " ", str(street1 or "").lower()).strip()
+    if not street:
+        return ""
+    postal = re.sub(r"\s+", "", str(postal_code or "")).upper()
+    return f"{street}|{postal}"[:255]
+
+
+def _property_nodes(client_node):
+    conn = client_node.get("clientProperties")
+    if not isinstance(conn, dict):
+        return None
+    nodes = conn.get("nodes")
+    if not nodes:
+        nodes = [e.get("node") for e in conn.get("edges") or [] if isinstance(e, dict)]
+    return [n for n in nodes or [] if isinstance(n, dict) and n.get("id")]
+
+
+def _client_keys(client_node):
+    """
+    Lookup keys per kind from a Jobber client dict. A kind is omitted when the node
+    did not include that field, so partial nodes do not wipe existing keys.
+    """
+    keys = {}
+    if "emails" in client_node:
+        keys[KIND_EMAIL] = {
+            (normalize_email(e.get("address"))[:255], "")
+            for e in client_node.get("emails") or []
+            if isinstance(e, dict) and normalize_email(e.get("address"))
+        }
+    if "phones" in client_node:
+        keys[KIND_PHONE] = {
+            (phone_digits(p.get("number")), "")
+            for p in client_node.get("phones") or []
+            if isinstance(p, dict) and phone_digits(p.get("number"))
+        }
+    properties = _property_nodes(client_node)
+    if properties is not None:
+        keys[KIND_ADDRESS] = set()
+        for prop in properties:
+            addr = prop.get("address") or {}
+            key = address_key(addr.get("street1"), addr.get("postalCode"))
+            if key:
+                keys[KIND_ADDRESS].add((key, str(prop["id"])))
+    return keys
+
+
+def upsert_client_directory(client_node):
+    """
+    Insert/refresh one directory client from a Jobber client dict (search, create or
+    directory query shape). Returns the JobberClientDirectory row, or None without an id.
+    """
+    if not isinstance(client_node, dict) or not client_node.get("id"):
+        return None
+    client_id = str(client_node["id"])
+    keys = _client_keys(client_node)
+    defaults = {"synced_at": timezone.now()}
+    if "firstName" in client_node:
+        defaults["first_name"] = (client_node.get("firstName") or "")[:255]
+    if "lastName" in client_node:
+        defaults["last_name"] = (client_node.get("lastName") or "")[:255]
+    properties = _property_nodes(client_node)
+    if properties is not None:
+        defaults["primary_property_id"] = str(properties[0]["id"]) if properties else ""
+
+    with transaction.atomic():
+        row, _ = JobberClientDirectory.objects.update_or_create(jobber_client_id=client_id, defaults=defaults)
+        if keys:
+            JobberClientDirectoryKey.objects.filter(client=row, kind__in=list(keys)).delete()
+            JobberClientDirectoryKey.objects.bulk_create(
+                [
+                    JobberClientDirectoryKey(client=row, kind=kind, value=value, property_id=property_id)
+                    for kind, values in keys.items()
+                    for value, property_id in values
+                ]
+            )
+    return row
+
+
+def record_client_directory(client_node):
+    """Best-effort upsert after a Jobber read/write; never raises."""
+    try:
+        return upsert_client_directory(client_node)
+    except Exception as e:
+        logger.warning("Jobber client directory upsert failed: %s", e)
+        return None
+
+
+def remove_client_directory(client_id):
+    if client_id:
+        JobberClientDirectory.objects.filter(jobber_client_id=str(client_id)).delete()
+
+
+def add_directory_property(client_id, property_id, street1, postal_code):
+    """Record a property created for a directory client (keeps the first property as primary)."""
+    try:
+        row = JobberClientDirectory.objects.filter(jobber_client_id=str(client_id)).first()
+        if not row or not property_id:
+            return
+        if not row.primary_property_id:
+            row.primary_property_id = str(property_id)
+            row.save(update_fields=["primary_property_id"])
+        key = address_key(street1, postal_code)
+        if key:
+            JobberClientDirectoryKey.objects.get_or_create(
+                client=row, kind=KIND_ADDRESS, value=key, defaults={"property_id": str(property_id)}
+            )
+    except Exception as e:
+        logger.warning("Jobber client directory property add failed client=%s: %s", client_id, e)
+
+
+def refresh_client_directory(client_id):
+    """
+    Reload one client from Jobber into the directory (webhook path).
+    Returns dict: { ok, jobber_client_id, removed?, error? }.
+    """
+    client_node, err = get_client_for_directory(client_id)
+    if err:
+        return {"ok": False, "jobber_client_id": str(client_id), "error": err}
+    if not client_node:
+        remove_client_directory(client_id)
+        return {"ok": True, "jobber_client_id": str(client_id), "removed": True}
+    upsert_client_directory(client_node)
+    return {"ok": True, "jobber_client_id": str(client_id)}
+
+
+def _clients_for_key(kind, value):
+    if not value:
+        return []
+    return list(
+        JobberClientDirectory.objects.filter(keys__kind=kind, keys__value=value)
+        .distinct()
+        .order_by("-synced_at")
+    )
+
+
+def find_directory_client(*, email=None, phone=None, street1="", postal_code=""):
+    """
+    Indexed lookup: email first, then phone digits. When several clients share the
+    email/phone, the one with a property at the booking address wins, then the most recently synced.
+    Returns JobberClientDirectory or None.
+    """
+    candidates = _clients_for_key(KIND_EMAIL, normalize_email(email))
+    if not candidates:
+        candidates = _clients_for_key(KIND_PHONE, phone_digits(phone))
+    if len(candidates) > 1:
+        addr = address_key(street1, postal_code)
+        if addr:
+            at_address = {c.id for c in _clients_for_key(KIND_ADDRESS, addr)}
+            for candidate in candidates:
+                if candidate.id in at_address:
+                    return candidate
+    return candidates[0] if candidates else None
+
+
+def backfill_client_directory(*, page_size=25, max_pages=None, sleep_seconds=0.0):
+    """
+    Paginated Jobber → directory import. Returns dict: { ok, pages, clients, error? }.
+    Stops at the last page, at max_pages, or on the first API error (rows already written stay).
+    """
+    pages = 0
+    written = 0
+    cursor = None
+    while max_pages is None or pages < max_pages:
+        nodes, next_cursor, err = list_clients_directory_page(first=page_size, after=cursor)
+        if err:
+            logger.warning("Jobber client directory backfill stopped after %s pages: %s", pages, err)
+            return {"ok": False, "pages": pages, "clients": written, "error": err}
+        pages += 1
+        for node in nodes:
+            if upsert_client_directory(node):
+                written += 1
+        if not next_cursor:
+            break
+        cursor = next_cursor
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+    return {"ok": True, "pages": pages, "clients": written}
@@ -12,6 +12,7 @@ from .client import (
     create_property_for_client,
     get_client_properties,
 )
+from .client_directory import record_client_directory
 from .jobber_client_resolve import resolve_jobber_client_for_ghl_contact
 from .ghl_contacts import (
     get_contact_by_id,
@@ -136,6 +137,7 @@ def _resolve_or_create_jobber_client(contact, *, ghl_contact_id, existing_map=No
             }
         jobber_client_id = client.get("id")
         client_created = True
+        record_client_directory(client)
         logger.info(
             "Created Jobber client for GHL contact=%s jobber_client=%s",
             ghl_contact_id,
@@ -20,7 +20,8 @@ import requests
 from decouple import config
 from django.utils import dateparse
 
-from accounts.models import GHLAuthCredentials
+from accounts.token_manager import ghl_tokens
+from service_backend.circuit_breaker import error_when_open
 
 logger = logging.getLogger(__name__)
 
@@ -39,44 +40,13 @@ def _private_integration_token():
 
 
 def _get_credentials():
-    return GHLAuthCredentials.objects.order_by("-updated_at").first()
+    """Cached GHLAuthCredentials row, refreshed shortly before expiry (accounts.token_manager)."""
+    return ghl_tokens.get_credentials()
 
 
 def _refresh_access_token(creds):
-    """Refresh OAuth token using stored refresh_token (same token URL as accounts.views.tokens)."""
-    try:
-        client_id = config("GHL_CLIENT_ID")
-        client_secret = config("GHL_CLIENT_SECRET")
-    except Exception as e:
-        return None, f"GHL env not configured: {e}"
-    data = {
-        "grant_type": "refresh_token",
-        "refresh_token": creds.refresh_token,
-        "client_id": client_id,
-        "client_secret": client_secret,
-    }
-    resp = requests.post(
-        "https://services.leadconnectorhq.com/oauth/token",
-        data=data,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        timeout=30,
-    )
-    try:
-        body = resp.json()
-    except requests.exceptions.JSONDecodeError:
-        return None, f"Invalid JSON from GHL token endpoint: {resp.text[:300]}"
-    if resp.status_code != 200:
-        return None, body.get("error_description") or body.get("error") or resp.text[:300]
-    access = body.get("access_token")
-    refresh = body.get("refresh_token") or creds.refresh_token
-    if not access:
-        return None, "Missing access_token in GHL refresh response"
-    creds.access_token = access
-    creds.refresh_token = refresh
-    if body.get("expires_in") is not None:
-        creds.expires_in = int(body["expires_in"])
-    creds.save(update_fields=["access_token", "refresh_token", "expires_in", "updated_at"])
-    return access, None
+    """Single-flight OAuth refresh after a 401; reuses a token another worker already rotated."""
+    return ghl_tokens.refresh(stale_access_token=creds.access_token)
 
 
 def _headers_bearer(access_token, *, include_json=True):
@@ -105,6 +75,7 @@ def _parse_ghl_response(resp):
     return data, None
 
 
+@error_when_open
 def _request(method, path, *, json=None, _retry=True):
     """
     Call LeadConnector API.
@@ -148,7 +119,6 @@ def _request(method, path, *, json=None, _retry=True):
         _, err = _refresh_access_token(creds)
         if err:
             return None, f"GHL unauthorized and token refresh failed: {err}"
-        creds.refresh_from_db()
         return _request(method, path, json=json, _retry=False)
     return _parse_ghl_response(resp)
 
@@ -11,8 +11,15 @@ from urllib.parse import quote
 import requests
 from decouple import config
 
-from accounts.models import GHLAuthCredentials
+from accounts.contact_mirror import (
+    delete_mirrored_contact,
+    find_mirrored_contact_id,
+    mirror_ghl_contacts,
+    upsert_contact_from_ghl,
+)
+from accounts.token_manager import ghl_tokens
 from jobber_app.ghl_calendar_client import _private_integration_token
+from service_backend.circuit_breaker import error_when_open
 
 logger = logging.getLogger(__name__)
 
@@ -21,43 +28,13 @@ GHL_API_VERSION = config("GHL_API_VERSION", default="2021-07-28")
 
 
 def _get_credentials():
-    return GHLAuthCredentials.objects.order_by("-updated_at").first()
+    """Cached GHLAuthCredentials row, refreshed shortly before expiry (accounts.token_manager)."""
+    return ghl_tokens.get_credentials()
 
 
 def _refresh_access_token(creds):
-    try:
-        client_id = config("GHL_CLIENT_ID")
-        client_secret = config("GHL_CLIENT_SECRET")
-    except Exception as e:
-        return None, f"GHL env not configured: {e}"
-    data = {
-        "grant_type": "refresh_token",
-        "refresh_token": creds.refresh_token,
-        "client_id": client_id,
-        "client_secret": client_secret,
-    }
-    resp = requests.post(
-        f"{GHL_BASE_URL}/oauth/token",
-        data=data,
-        headers={"Content-Type": "application/x-www-form-urlencoded"},
-        timeout=30,
-    )
-    try:
-        body = resp.json()
-    except requests.exceptions.JSONDecodeError:
-        return None, f"Invalid JSON from GHL token endpoint: {resp.text[:300]}"
-    if resp.status_code != 200:
-        return None, body.get("error_description") or body.get("error") or resp.text[:300]
-    access = body.get("access_token")
-    refresh = body.get("refresh_token") or creds.refresh_token
-    if not access:
-        return None, "Missing access_token in GHL refresh response"
-    creds.access_token = access
-    creds.refresh_token = refresh
-    if body.get("expires_in") is not None:
-        creds.expires_in = int(body["expires_in"])
-    creds.save(update_fields=["access_token", "refresh_token", "expires_in", "updated_at"])
-    return access, None
+    """Single-flight OAuth refresh after a 401; reuses a token another worker already rotated."""
+    return ghl_tokens.refresh(stale_access_token=creds.access_token)
 
 
 def _headers(creds, *, include_json=True):
@@ -71,6 +48,7 @@ def _headers(creds, *, include_json=True):
     return h
 
 
+@error_when_open
 def _request(method, path, *, json=None, _retry=True):
     url = f"{GHL_BASE_URL}{path}"
     include_json = method.upper() in ("POST", "PUT", "PATCH")
@@ -112,7 +90,6 @@ def _request(method, path, *, json=None, _retry=True):
         _, err = _refresh_access_token(creds)
         if err:
             return None, f"GHL unauthorized and token refresh failed: {err}"
-        creds.refresh_from_db()
         return _request(method, path, json=json, _retry=False)
     try:
         data = resp.json() if resp.content else {}
@@ -137,13 +114,39 @@ def get_contact_by_id(contact_id):
     """GET /contacts/:id → (contact dict or None, error)."""
     data, err = _request("GET", f"/contacts/{contact_id}")
     if err:
+        if err.startswith("GHL API 404"):
+            delete_mirrored_contact(contact_id)
         return None, err
     c = data.get("contact") if isinstance(data, dict) else None
     if not isinstance(c, dict):
         return None, "No contact in GHL response"
+    upsert_contact_from_ghl(c)
     return c, None
 
 
+def list_contacts_page(location_id, *, limit=100, start_after=None, start_after_id=None):
+    """
+    GET /contacts/?locationId=&limit=&startAfter=&startAfterId= → one page for bulk import.
+    Returns (contacts list, next cursor dict or None, error).
+    """
+    if not location_id:
+        return [], None, "location_id required"
+    path = f"/contacts/?locationId={quote(location_id, safe='')}&limit={int(limit)}"
+    if start_after and start_after_id:
+        path += f"&startAfter={quote(str(start_after), safe='')}&startAfterId={quote(str(start_after_id), safe='')}"
+    data, err = _request("GET", path)
+    if err:
+        return [], None, err
+    contacts = (data or {}).get("contacts") if isinstance(data, dict) else None
+    if not isinstance(contacts, list):
+        contacts = []
+    meta = (data or {}).get("meta") or {}
+    cursor = None
+    if contacts and meta.get("startAfterId") and meta.get("startAfter"):
+        cursor = {"start_after": meta.get("startAfter"), "start_after_id": meta.get("startAfterId")}
+    return contacts, cursor, None
+
+
 def search_contacts_by_query(location_id, query):
     """GET /contacts/?locationId=&query= → first contact or None."""
     if not location_id or not query:
@@ -156,18 +159,16 @@ def search_contacts_by_query(location_id, query):
         return None, None
     contacts = data.get("contacts")
     if isinstance(contacts, list) and contacts:
+        mirror_ghl_contacts(contacts, location_id)
         return contacts[0], None
     c = data.get("contact")
     if isinstance(c, dict):
+        upsert_contact_from_ghl(c, location_id)
         return c, None
     return None, None
 
 
-def find_ghl_contact_for_jobber_client(client_dict, location_id):
-    """
-    Resolve GHL contact from Jobber client emails/phones.
-    Returns (contact dict or None, error or None).
-    """
+def _jobber_client_email_and_phone(client_dict):
     emails = (client_dict.get("emails") or []) if isinstance(client_dict, dict) else []
     phones = (client_dict.get("phones") or []) if isinstance(client_dict, dict) else []
     primary_email = None
@@ -182,6 +183,10 @@ def find_ghl_contact_for_jobber_client(client_dict, location_id):
             primary_phone = (p.get("number") or "").strip()
             if primary_phone:
                 break
+    return primary_email, primary_phone
+
+
+def _search_ghl_contact(location_id, primary_email, primary_phone):
     if primary_email:
         c, err = search_contacts_by_query(location_id, primary_email)
         if err:
@@ -197,6 +202,38 @@ def find_ghl_contact_for_jobber_client(client_dict, location_id):
     return None, None
 
 
+def find_ghl_contact_id_for_jobber_client(client_dict, location_id):
+    """
+    Resolve a GHL contact id from Jobber client emails/phones: local mirror first,
+    live GHL search only on a miss. Returns (contact id or None, error or None).
+    """
+    primary_email, primary_phone = _jobber_client_email_and_phone(client_dict)
+    mirrored = find_mirrored_contact_id(location_id, email=primary_email, phone=primary_phone)
+    if mirrored:
+        return mirrored, None
+    c, err = _search_ghl_contact(location_id, primary_email, primary_phone)
+    if err:
+        return None, err
+    return (str(c["id"]) if c and c.get("id") else None), None
+
+
+def find_ghl_contact_for_jobber_client(client_dict, location_id):
+    """
+    Resolve GHL contact from Jobber client emails/phones.
+    A mirror hit is loaded by id (current tags/fields); misses and stale mirror ids
+    fall back to the email/phone search.
+    Returns (contact dict or None, error or None).
+    """
+    primary_email, primary_phone = _jobber_client_email_and_phone(client_dict)
+    mirrored = find_mirrored_contact_id(location_id, email=primary_email, phone=primary_phone)
+    if mirrored:
+        c, err = get_contact_by_id(mirrored)
+        if c:
+            return c, None
+        logger.info("GHL mirror contact %s could not be loaded (%s); searching instead", mirrored, err)
+    return _search_ghl_contact(location_id, primary_email, primary_phone)
+
+
 _CANADIAN_POSTAL_RE = re.compile(
     r"^[A-Za-z]\d[A-Za-z][ -]?\d[A-Za-z]\d$",
     re.IGNORECASE,
@@ -1,5 +1,5 @@
 """
-Resolve a GHL contact to a Jobber client id (search-only).
+Resolve a GHL contact to a Jobber client id (map → local client directory → Jobber search).
 
 Used by note sync, tag sync, and contact sync before optional clientCreate.
 """
@@ -7,6 +7,7 @@ import logging
 import re
 
 from .client import search_clients
+from .client_directory import find_directory_client, record_client_directory
 from .models import GhlContactJobberClientMap
 
 logger = logging.getLogger(__name__)
@@ -46,12 +47,13 @@ def _search_jobber_client(term, *, first=5):
     client_id = (nodes[0] or {}).get("id")
     if not client_id:
         return None, "Jobber search returned no id"
+    record_client_directory(nodes[0])
     return str(client_id), None
 
 
 def resolve_jobber_client_for_ghl_contact(ghl_contact_id, email, phone):
     """
-    Find Jobber client for a GHL contact using map → email → phone variants.
+    Find Jobber client for a GHL contact using map → local directory → email → phone variants.
 
     Returns dict with ok, jobber_client_id, match_source; or ok=False and error.
     """
@@ -73,6 +75,19 @@ def resolve_jobber_client_for_ghl_contact(ghl_contact_id, email, phone):
                 "match_source": "ghl_contact_map",
             }
 
+    listed = find_directory_client(email=email, phone=phone)
+    if listed:
+        logger.info(
+            "Resolved Jobber client via client directory contact=%s client=%s",
+            ghl_contact_id,
+            listed.jobber_client_id,
+        )
+        return {
+            "ok": True,
+            "jobber_client_id": listed.jobber_client_id,
+            "match_source": "client_directory",
+        }
+
     if email:
         client_id, err = _search_jobber_client(email)
         if err:
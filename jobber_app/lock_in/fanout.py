@@ -0,0 +1,92 @@
+"""Fan-out helpers for lock-in stages: bounded thread pool, shared rate limiter, step timings."""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from decouple import config
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+def max_workers():
+    return max(1, int(config("LOCK_IN_FANOUT_WORKERS", default="4")))
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / per_second`` apart across all threads that share it."""
+
+    def __init__(self, per_second):
+        self._interval = 1.0 / per_second if per_second and per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# GHL allows ~100 requests / 10 s per location; stay well under it for staff SMS bursts.
+ghl_limiter = RateLimiter(float(config("LOCK_IN_GHL_CALLS_PER_SECOND", default="5")))
+
+
+def _in_thread(fn, *args):
+    try:
+        return fn(*args)
+    finally:
+        # Worker threads open their own DB connections (token manager, contact mirror).
+        connection.close()
+
+
+def _submit(pool, fn, *args):
+    # Each task runs in a copy of the caller's context (correlation id for the outbound call ledger).
+    return pool.submit(contextvars.copy_context().run, _in_thread, fn, *args)
+
+
+def run_parallel(fn, items, *, workers=None):
+    """fn(item) for every item on a bounded pool; results keep input order."""
+    items = list(items or [])
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(workers or max_workers(), len(items))) as pool:
+        futures = [_submit(pool, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def run_concurrently(**calls):
+    """Run zero-arg callables side by side. Returns {name: result}; exceptions propagate."""
+    if len(calls) <= 1:
+        return {name: call() for name, call in calls.items()}
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = {name: _submit(pool, call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+class StepTimer:
+    """Collects per-step wall times in milliseconds for result dicts."""
+
+    def __init__(self):
+        self.timings_ms = {}
+        self._started = time.monotonic()
+
+    @contextmanager
+    def step(self, name):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings_ms[name] = round((time.monotonic() - start) * 1000)
+
+    def finish(self):
+        self.timings_ms["total"] = round((time.monotonic() - self._started) * 1000)
+        return self.timings_ms
@@ -5,6 +5,7 @@ from urllib.parse import quote
 
 from decouple import config
 
+from accounts.contact_mirror import find_mirrored_contact, mirror_ghl_contacts, upsert_contact_from_ghl
 from jobber_app.ghl_calendar_client import _private_integration_token, _request
 from jobber_app.ghl_contacts import normalize_ghl_tags
 
@@ -41,6 +42,7 @@ def _get_contact_by_id(contact_id):
     c = data.get("contact") if isinstance(data, dict) else None
     if not isinstance(c, dict):
         return None, "No contact in GHL response"
+    upsert_contact_from_ghl(c)
     return c, None
 
 
@@ -55,9 +57,11 @@ def _search_contact(location_id, query):
         return None, None
     contacts = data.get("contacts")
     if isinstance(contacts, list) and contacts:
+        mirror_ghl_contacts(contacts, location_id)
         return contacts[0], None
     c = data.get("contact")
     if isinstance(c, dict):
+        upsert_contact_from_ghl(c, location_id)
         return c, None
     return None, None
 
@@ -79,6 +83,7 @@ def create_contact(*, phone, name, location_id, tags=None):
     contact = (data or {}).get("contact") if isinstance(data, dict) else None
     if not isinstance(contact, dict):
         return None, "No contact in GHL create response"
+    upsert_contact_from_ghl(contact, location_id)
     return contact, None
 
 
@@ -99,6 +104,14 @@ def resolve_staff_contact(*, phone, name, existing_ghl_id=""):
             logger.warning("GHL get contact %s failed: %s", existing_ghl_id, err)
             contact = None
 
+    # Local GHL mirror first; live search only on a miss.
+    from_mirror = False
+    if not contact and phone:
+        row = find_mirrored_contact(location_id, phone=phone)
+        if row:
+            contact = {"id": row.contact_id, "tags": list(row.tags or [])}
+            from_mirror = True
+
     if not contact and phone:
         contact, err = _search_contact(location_id, phone)
         if err:
@@ -120,6 +133,13 @@ def resolve_staff_contact(*, phone, name, existing_ghl_id=""):
 
     if tag:
         current = normalize_ghl_tags(contact)
+        if tag not in current and from_mirror:
+            # Mirror tags may lag; reload before replacing the tag list.
+            fresh, ferr = _get_contact_by_id(cid)
+            if ferr:
+                logger.warning("GHL get mirrored contact %s failed: %s", cid, ferr)
+            else:
+                current = normalize_ghl_tags(fresh)
         if tag not in current:
             _, uerr = _request("PUT", f"/contacts/{cid}", json={"tags": sorted(set(current + [tag]))})
             if uerr:
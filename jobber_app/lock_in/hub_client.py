@@ -1,17 +1,33 @@
-"""HTTP client: service-creator → Hub lock-in APIs. No Jobber OAuth in Hub."""
+"""
+HTTP client: service-creator → Hub lock-in APIs. No Jobber OAuth in Hub.
+
+All calls share one pooled ``requests.Session`` (keep-alive to the Hub). Fire-and-forget writes
+are normally queued through jobber_app.lock_in.outbox rather than called directly.
+"""
 
 import logging
 
 import requests
 from decouple import config
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+_session = requests.Session()
+_session.headers.update({"Accept": "application/json", "Content-Type": "application/json"})
+for _prefix in ("https://", "http://"):
+    _session.mount(_prefix, HTTPAdapter(pool_maxsize=int(config("HUB_HTTP_POOL_SIZE", default="10"))))
+
 
 def _base():
     return (config("HUB_BASE_URL", default="") or "").rstrip("/")
 
 
+def bulk_api_enabled():
+    """Hub bulk endpoints (visits/upsert/bulk, bonuses/sms/bulk); off until the Hub exposes them."""
+    return (config("HUB_BULK_API_ENABLED", default="false") or "").strip().lower() in ("1", "true", "yes")
+
+
 class HubLockInError(Exception):
     pass
 
@@ -22,17 +38,7 @@ def _request(method, path, *, json=None, params=None):
         raise HubLockInError("HUB_BASE_URL is not configured")
     url = f"{base}{path}"
     try:
-        resp = requests.request(
-            method,
-            url,
-            json=json,
-            params=params,
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
-            timeout=30,
-        )
+        resp = _session.request(method, url, json=json, params=params, timeout=30)
     except requests.RequestException as exc:
         raise HubLockInError(f"Hub unreachable: {exc}") from exc
     try:
@@ -49,6 +55,11 @@ def upsert_visit(payload):
     return _request("POST", "/api/internal/lock-in/visits/upsert/", json=payload)
 
 
+def upsert_visits(payloads):
+    """Bulk visit upsert: one Hub call for many visits."""
+    return _request("POST", "/api/internal/lock-in/visits/upsert/bulk/", json={"visits": list(payloads)})
+
+
 def list_visits(*, jobber_visit_ids=None, client_id=None):
     params = {}
     if jobber_visit_ids:
@@ -89,6 +100,11 @@ def mark_bonus_sms(bonus_id, **flags):
     return _request("PATCH", f"/api/internal/lock-in/bonuses/{bonus_id}/sms/", json=flags)
 
 
+def mark_bonuses_sms(updates):
+    """Bulk SMS flags: updates = [{"id": bonus_id, "potential_sms_sent": True}, ...]."""
+    return _request("PATCH", "/api/internal/lock-in/bonuses/sms/bulk/", json={"bonuses": list(updates)})
+
+
 def set_user_ghl_id(user_id, ghl_id):
     return _request(
         "PATCH",
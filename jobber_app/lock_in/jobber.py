@@ -68,9 +68,39 @@ query LockInVisit($id: EncodedId!) {
 }
 """
 
-QUERY_JOB_VISITS_ASSIGNEES = """
-query LockInJobVisits($id: EncodedId!) {
-  job(id: $id) {
+# Superset of QUERY_VISIT_LOCK_IN and client.QUERY_VISIT_FOR_GHL_FEEDBACK: one fetch feeds
+# both VISIT_COMPLETE branches (lock-in Stage 2 and GHL Visit Completed?).
+QUERY_VISIT_COMPLETE = """
+query VisitComplete($id: EncodedId!) {
+  visit(id: $id) {
+    id
+    title
+    startAt
+    endAt
+    client {
+      id
+      name
+      firstName
+      lastName
+      emails { address }
+      phones { number }
+    }
+    assignedUsers {
+      nodes {
+        id
+        name { full }
+      }
+    }
+    job {
+      id
+      title
+      jobType
+    }
+  }
+}
+"""
+
+JOB_VISITS_ASSIGNEES_FIELDS = """
     id
     title
     jobType
@@ -87,10 +117,17 @@ query LockInJobVisits($id: EncodedId!) {
         }
       }
     }
-  }
-}
 """
 
+QUERY_JOB_VISITS_ASSIGNEES = """
+query LockInJobVisits($id: EncodedId!) {
+  job(id: $id) {%s  }
+}
+""" % JOB_VISITS_ASSIGNEES_FIELDS
+
+# Jobs per aliased query; keeps each request well under Jobber's query cost limit.
+JOBS_PER_ALIASED_QUERY = 5
+
 
 def get_quote(quote_id):
     data, err = _request(QUERY_QUOTE, {"id": quote_id})
@@ -118,6 +155,14 @@ def get_visit_lock_in(visit_id):
     return (data or {}).get("visit"), None
 
 
+def get_visit_complete(visit_id):
+    """Visit for both VISIT_COMPLETE handlers. Returns (visit dict or None, error)."""
+    data, err = _request(QUERY_VISIT_COMPLETE, {"id": visit_id})
+    if err:
+        return None, err
+    return (data or {}).get("visit"), None
+
+
 def get_job_visits_with_assignees(job_id):
     data, err = _request(QUERY_JOB_VISITS_ASSIGNEES, {"id": job_id})
     if err:
@@ -128,3 +173,30 @@ def get_job_visits_with_assignees(job_id):
 def list_job_visits(job_id):
     visits, err = get_job_visits(job_id)
     return visits, err
+
+
+def get_jobs_visits_with_assignees(job_ids):
+    """
+    Visits + assignees for several jobs using aliased `job(id:)` fields
+    (one request per JOBS_PER_ALIASED_QUERY jobs instead of one per job).
+    Returns ({job_id: job dict}, errors list).
+    """
+    job_ids = [str(j) for j in job_ids or [] if j]
+    jobs = {}
+    errors = []
+    for start in range(0, len(job_ids), JOBS_PER_ALIASED_QUERY):
+        chunk = job_ids[start:start + JOBS_PER_ALIASED_QUERY]
+        params = ", ".join(f"$j{i}: EncodedId!" for i in range(len(chunk)))
+        fields = "\n".join(
+            f"  j{i}: job(id: $j{i}) {{{JOB_VISITS_ASSIGNEES_FIELDS}  }}" for i in range(len(chunk))
+        )
+        query = f"query LockInJobsVisits({params}) {{\n{fields}\n}}"
+        data, err = _request(query, {f"j{i}": job_id for i, job_id in enumerate(chunk)})
+        if err:
+            errors.append(err)
+            continue
+        for i, job_id in enumerate(chunk):
+            job = (data or {}).get(f"j{i}")
+            if job:
+                jobs[job_id] = job
+    return jobs, errors
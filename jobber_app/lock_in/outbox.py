@@ -0,0 +1,183 @@
+"""
+Hub write outbox (HubOutboxMessage).
+
+Lock-in handlers enqueue fire-and-forget Hub writes here instead of calling the Hub inline,
+so a slow or unavailable Hub no longer fails the Jobber webhook (and triggers a redelivery of
+the whole event). flush_outbox delivers due rows — bulk endpoints when HUB_BULK_API_ENABLED —
+and retries failures with exponential backoff; the Celery task jobber_app.tasks.flush_hub_outbox
+runs it after each commit that enqueued something and every minute from beat.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from jobber_app.models import HubOutboxMessage
+
+from . import hub_client
+
+logger = logging.getLogger(__name__)
+
+OP_UPSERT_VISIT = "upsert_visit"
+OP_MARK_BONUS_SMS = "mark_bonus_sms"
+OP_SET_USER_GHL_ID = "set_user_ghl_id"
+
+MAX_ATTEMPTS = 8
+LEASE = timedelta(minutes=2)
+
+
+def _backoff(attempts):
+    """30s, 1m, 2m, ... capped at 1h."""
+    return timedelta(seconds=min(30 * (2 ** max(attempts - 1, 0)), 3600))
+
+
+def enqueue(operation, dedupe_key, payload):
+    """
+    Queue one Hub write (latest payload wins per dedupe_key). Re-enqueueing an identical,
+    already-sent message is a no-op. Schedules a flush once the current transaction commits.
+    """
+    existing = HubOutboxMessage.objects.filter(dedupe_key=dedupe_key).first()
+    if existing and existing.status == HubOutboxMessage.STATUS_SENT and existing.payload == payload:
+        return existing
+    msg, _ = HubOutboxMessage.objects.update_or_create(
+        dedupe_key=dedupe_key,
+        defaults={
+            "operation": operation,
+            "payload": payload,
+            "status": HubOutboxMessage.STATUS_PENDING,
+            "attempts": 0,
+            "next_attempt_at": timezone.now(),
+            "last_error": "",
+        },
+    )
+    transaction.on_commit(_schedule_flush)
+    return msg
+
+
+def _schedule_flush():
+    from jobber_app.tasks import flush_hub_outbox
+
+    try:
+        flush_hub_outbox.delay()
+    except Exception as exc:
+        # Broker down: the beat schedule still drains the outbox.
+        logger.warning("Hub outbox flush not scheduled: %s", exc)
+
+
+def enqueue_visit_upsert(payload):
+    return enqueue(OP_UPSERT_VISIT, f"visit:{payload.get('jobber_visit_id')}", payload)
+
+
+def enqueue_bonus_sms(bonus_id, **flags):
+    flag_key = ",".join(sorted(flags))
+    return enqueue(OP_MARK_BONUS_SMS, f"bonus_sms:{bonus_id}:{flag_key}", {"id": bonus_id, **flags})
+
+
+def enqueue_user_ghl_id(user_id, ghl_id):
+    return enqueue(OP_SET_USER_GHL_ID, f"user_ghl_id:{user_id}", {"user_id": user_id, "ghl_id": ghl_id})
+
+
+def settle_wait_seconds(msg_id, minimum=15):
+    """
+    None once outbox row ``msg_id`` is sent, has given up, or is gone; otherwise seconds until
+    its next delivery attempt (at least ``minimum``). Lets dependent work run after the write.
+    """
+    row = (
+        HubOutboxMessage.objects.filter(id=msg_id, status=HubOutboxMessage.STATUS_PENDING)
+        .values("next_attempt_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return max(int((row["next_attempt_at"] - timezone.now()).total_seconds()) + 1, minimum)
+
+
+def _send_one(msg):
+    p = msg.payload or {}
+    if msg.operation == OP_UPSERT_VISIT:
+        hub_client.upsert_visit(p)
+    elif msg.operation == OP_MARK_BONUS_SMS:
+        flags = {k: v for k, v in p.items() if k != "id"}
+        hub_client.mark_bonus_sms(p["id"], **flags)
+    elif msg.operation == OP_SET_USER_GHL_ID:
+        hub_client.set_user_ghl_id(p["user_id"], p["ghl_id"])
+    else:
+        raise hub_client.HubLockInError(f"Unknown outbox operation {msg.operation}")
+
+
+_BULK_SENDERS = {
+    OP_UPSERT_VISIT: lambda msgs: hub_client.upsert_visits([m.payload for m in msgs]),
+    OP_MARK_BONUS_SMS: lambda msgs: hub_client.mark_bonuses_sms([m.payload for m in msgs]),
+}
+
+
+def _claim(limit):
+    """
+    Lease up to ``limit`` due rows (skipping rows another flusher holds).
+    Returns (rows, lease_until); rows re-enqueued meanwhile get a new next_attempt_at,
+    so results are only recorded on rows still carrying this lease.
+    """
+    now = timezone.now()
+    lease_until = now + LEASE
+    with transaction.atomic():
+        rows = list(
+            HubOutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=HubOutboxMessage.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        if rows:
+            HubOutboxMessage.objects.filter(id__in=[r.id for r in rows]).update(next_attempt_at=lease_until)
+    return rows, lease_until
+
+
+def _mark_sent(msgs, lease_until):
+    HubOutboxMessage.objects.filter(id__in=[m.id for m in msgs], next_attempt_at=lease_until).update(
+        status=HubOutboxMessage.STATUS_SENT, sent_at=timezone.now(), last_error=""
+    )
+
+
+def _mark_failed(msg, error, lease_until):
+    attempts = msg.attempts + 1
+    status = HubOutboxMessage.STATUS_FAILED if attempts >= MAX_ATTEMPTS else HubOutboxMessage.STATUS_PENDING
+    HubOutboxMessage.objects.filter(id=msg.id, next_attempt_at=lease_until).update(
+        attempts=attempts,
+        status=status,
+        last_error=str(error)[:2000],
+        next_attempt_at=timezone.now() + _backoff(attempts),
+    )
+    logger.warning("Hub outbox %s %s failed (attempt %s): %s", msg.operation, msg.dedupe_key, attempts, error)
+
+
+def flush_outbox(limit=200):
+    """Deliver due outbox rows. Returns dict: { sent, failed }."""
+    rows, lease_until = _claim(limit)
+    sent = failed = 0
+    by_operation = {}
+    for row in rows:
+        by_operation.setdefault(row.operation, []).append(row)
+
+    for operation, msgs in by_operation.items():
+        bulk = _BULK_SENDERS.get(operation)
+        if bulk and len(msgs) > 1 and hub_client.bulk_api_enabled():
+            try:
+                bulk(msgs)
+            except hub_client.HubLockInError as exc:
+                for msg in msgs:
+                    _mark_failed(msg, exc, lease_until)
+                failed += len(msgs)
+            else:
+                _mark_sent(msgs, lease_until)
+                sent += len(msgs)
+            continue
+        for msg in msgs:
+            try:
+                _send_one(msg)
+            except (hub_client.HubLockInError, KeyError) as exc:
+                _mark_failed(msg, exc, lease_until)
+                failed += 1
+            else:
+                _mark_sent([msg], lease_until)
+                sent += 1
+    return {"sent": sent, "failed": failed}
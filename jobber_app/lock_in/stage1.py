@@ -1,8 +1,16 @@
-"""Stage 1 — QUOTE_APPROVED → pending lock-in + potential SMS."""
+"""
+Stage 1 — QUOTE_APPROVED → pending lock-in + potential SMS.
+
+Outbound calls fan out where they are independent: technician discovery (one aliased Jobber
+query for all first-clean jobs, then Hub) runs beside the expected-start lookup, and potential
+SMS (staff contact resolve + send) run on a bounded pool under the shared GHL rate limiter.
+Per-step wall times are returned as ``timings_ms``.
+"""
 
 import logging
 
-from . import ghl_sms, hub_client, jobber
+from . import ghl_sms, hub_client, jobber, outbox
+from .fanout import StepTimer, ghl_limiter, run_concurrently, run_parallel
 from .matching import (
     assigned_user_ids,
     classify_jobs,
@@ -74,10 +82,13 @@ def _tech_ids_from_jobber(jobs):
     techs = []
     visit_ids = []
     seen = set()
-    for job in jobs or []:
-        detail, err = jobber.get_job_visits_with_assignees(job.get("id"))
-        if err or not detail:
-            logger.warning("Lock-in stage1 job visits %s: %s", job.get("id"), err)
+    job_ids = [str(job.get("id")) for job in jobs or [] if job and job.get("id")]
+    details, errors = jobber.get_jobs_visits_with_assignees(job_ids)
+    for err in errors:
+        logger.warning("Lock-in stage1 job visits: %s", err)
+    for job_id in job_ids:
+        detail = details.get(job_id)
+        if not detail:
             continue
         for visit in ((detail.get("visits") or {}).get("nodes") or []):
             visit_ids.append(str(visit.get("id")))
@@ -88,6 +99,27 @@ def _tech_ids_from_jobber(jobs):
     return techs, visit_ids
 
 
+def _discover_technicians(quote_id, client_id, source_jobs, timer):
+    """Jobber first-clean visits → Hub visits; Hub-by-client when Jobber yields nothing."""
+    with timer.step("jobber_job_visits"):
+        jobber_techs, jobber_visit_ids = _tech_ids_from_jobber(source_jobs)
+    with timer.step("hub_visits"):
+        hub_techs, hub_visit_ids = _tech_ids_from_hub_visits(jobber_visit_ids)
+        if not hub_techs and not jobber_techs:
+            hub_techs, hub_visit_ids = _tech_ids_from_hub_client(client_id)
+            if hub_techs:
+                logger.info(
+                    "Lock-in stage1 quote=%s: techs from Hub visits by client (Jobber visits throttled or empty)",
+                    quote_id,
+                )
+    return hub_techs or jobber_techs, hub_visit_ids or jobber_visit_ids
+
+
+def _timed_expected_start(recurring_jobs, timer):
+    with timer.step("jobber_expected_start"):
+        return _expected_first_recurring_start(recurring_jobs)
+
+
 def _expected_first_recurring_start(recurring_jobs):
     """Make used 2nd visit startAt on a related job; else unknown."""
     for job in recurring_jobs or []:
@@ -107,11 +139,13 @@ def process_quote_approved(quote_id):
     if not quote_id:
         return {"ok": False, "error": "missing quote id"}
 
-    quote, err = jobber.get_quote(quote_id)
+    timer = StepTimer()
+    with timer.step("jobber_quote"):
+        quote, err = jobber.get_quote(quote_id)
     if err:
-        return {"ok": False, "error": err}
+        return {"ok": False, "error": err, "timings_ms": timer.finish()}
     if not quote:
-        return {"ok": False, "skipped": True, "reason": "quote_not_found"}
+        return {"ok": False, "skipped": True, "reason": "quote_not_found", "timings_ms": timer.finish()}
 
     client = quote.get("client") or {}
     client_id = str(client.get("id") or "")
@@ -119,15 +153,16 @@ def process_quote_approved(quote_id):
         p for p in [client.get("firstName"), client.get("lastName")] if p
     ).strip()
     if not client_id:
-        return {"ok": False, "skipped": True, "reason": "no_client"}
+        return {"ok": False, "skipped": True, "reason": "no_client", "timings_ms": timer.finish()}
 
-    jobs, err = jobber.get_client_jobs(client_id)
+    with timer.step("jobber_client_jobs"):
+        jobs, err = jobber.get_client_jobs(client_id)
     if err:
-        return {"ok": False, "error": err}
+        return {"ok": False, "error": err, "timings_ms": timer.finish()}
 
     first_clean_jobs, recurring_jobs = classify_jobs(jobs)
     if not recurring_jobs:
-        return {"ok": True, "skipped": True, "reason": "no_recurring_job_title"}
+        return {"ok": True, "skipped": True, "reason": "no_recurring_job_title", "timings_ms": timer.finish()}
 
     frequency = pick_frequency(recurring_jobs)
     recurring_job_id = str((recurring_jobs[0] or {}).get("id") or "")
@@ -135,55 +170,55 @@ def process_quote_approved(quote_id):
     source_jobs = first_clean_jobs or [
         j for j in jobs if title_is_first_cleaning((j or {}).get("title"))
     ]
-    jobber_techs, jobber_visit_ids = _tech_ids_from_jobber(source_jobs or first_clean_jobs)
-    hub_techs, hub_visit_ids = _tech_ids_from_hub_visits(jobber_visit_ids)
-    if not hub_techs and not jobber_techs:
-        hub_techs, hub_visit_ids = _tech_ids_from_hub_client(client_id)
-        if hub_techs:
-            logger.info(
-                "Lock-in stage1 quote=%s: techs from Hub visits by client (Jobber visits throttled or empty)",
-                quote_id,
-            )
-    technician_jobber_ids = hub_techs or jobber_techs
-    original_visit_ids = hub_visit_ids or jobber_visit_ids
+    # Fan-out: technician discovery and the expected-start lookup are independent.
+    branches = run_concurrently(
+        technicians=lambda: _discover_technicians(quote_id, client_id, source_jobs or first_clean_jobs, timer),
+        expected=lambda: _timed_expected_start(recurring_jobs, timer),
+    )
+    technician_jobber_ids, original_visit_ids = branches["technicians"]
 
     if not technician_jobber_ids:
         logger.warning("Lock-in stage1 quote=%s: no technicians from first-clean visits", quote_id)
-        return {"ok": True, "skipped": True, "reason": "no_technicians"}
+        return {"ok": True, "skipped": True, "reason": "no_technicians", "timings_ms": timer.finish()}
 
-    expected = _expected_first_recurring_start(recurring_jobs)
+    expected = branches["expected"]
     confirm_label = format_confirm_date(expected)
 
     try:
-        result = hub_client.create_pending(
-            {
-                "quote_id": quote_id,
-                "client_id": client_id,
-                "client_name": client_name,
-                "job_id": recurring_job_id,
-                "original_visit_ids": original_visit_ids,
-                "quote_sent_at": quote.get("createdAt"),
-                "quote_approved_at": quote.get("createdAt"),
-                "frequency": frequency,
-                "expected_first_visit_at": expected.isoformat() if expected else None,
-                "technician_jobber_ids": technician_jobber_ids,
-            }
-        )
+        with timer.step("hub_create_pending"):
+            result = hub_client.create_pending(
+                {
+                    "quote_id": quote_id,
+                    "client_id": client_id,
+                    "client_name": client_name,
+                    "job_id": recurring_job_id,
+                    "original_visit_ids": original_visit_ids,
+                    "quote_sent_at": quote.get("createdAt"),
+                    "quote_approved_at": quote.get("createdAt"),
+                    "frequency": frequency,
+                    "expected_first_visit_at": expected.isoformat() if expected else None,
+                    "technician_jobber_ids": technician_jobber_ids,
+                }
+            )
     except hub_client.HubLockInError as exc:
-        return {"ok": False, "error": str(exc)}
+        return {"ok": False, "error": str(exc), "timings_ms": timer.finish()}
 
     pending = (result or {}).get("pending") or {}
     created = bool((result or {}).get("created"))
     sms_results = []
     if created:
-        for bonus in pending.get("bonuses") or []:
-            sms_results.append(_sms_potential(bonus, client_name, frequency, confirm_label))
+        with timer.step("sms"):
+            sms_results = run_parallel(
+                lambda bonus: _sms_potential(bonus, client_name, frequency, confirm_label),
+                pending.get("bonuses") or [],
+            )
     return {
         "ok": True,
         "created": created,
         "pending_id": pending.get("id"),
         "sms": sms_results,
         "reason": None if created else "duplicate_or_rule1",
+        "timings_ms": timer.finish(),
     }
 
 
@@ -201,6 +236,7 @@ def _sms_potential(bonus, client_name, frequency, confirm_label):
     except (TypeError, ValueError):
         pass
 
+    ghl_limiter.wait()
     cid, err = ghl_sms.resolve_staff_contact(
         phone=tech.get("phone") or "",
         name=tech.get("name") or "",
@@ -211,10 +247,7 @@ def _sms_potential(bonus, client_name, frequency, confirm_label):
         return {"ok": False, "error": err, "technician_id": tech.get("id")}
 
     if cid and cid != (tech.get("ghl_id") or "") and tech.get("id"):
-        try:
-            hub_client.set_user_ghl_id(tech["id"], cid)
-        except hub_client.HubLockInError as exc:
-            logger.warning("Lock-in store ghl_id: %s", exc)
+        outbox.enqueue_user_ghl_id(tech["id"], cid)
 
     msg = _potential_sms(
         client_name=client_name,
@@ -222,12 +255,10 @@ def _sms_potential(bonus, client_name, frequency, confirm_label):
         frequency=frequency,
         confirm_date=confirm_label,
     )
+    ghl_limiter.wait()
     _, serr = ghl_sms.send_sms(contact_id=cid, to_number=tech.get("phone") or "", message=msg)
     if serr:
         logger.warning("Lock-in potential SMS send: %s", serr)
         return {"ok": False, "error": serr, "technician_id": tech.get("id")}
-    try:
-        hub_client.mark_bonus_sms(bonus["id"], potential_sms_sent=True)
-    except hub_client.HubLockInError as exc:
-        logger.warning("Lock-in mark potential SMS: %s", exc)
+    outbox.enqueue_bonus_sms(bonus["id"], potential_sms_sent=True)
     return {"ok": True, "technician_id": tech.get("id")}
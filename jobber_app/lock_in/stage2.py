@@ -5,7 +5,7 @@ import logging
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-from . import ghl_sms, hub_client
+from . import ghl_sms, hub_client, outbox
 from .matching import format_confirm_date, is_internal_client, title_is_first_cleaning
 
 logger = logging.getLogger(__name__)
@@ -121,10 +121,7 @@ def _sms_confirm(bonus, client_name, confirm_label):
         logger.warning("Lock-in confirm SMS contact: %s", err)
         return {"ok": False, "error": err, "technician_id": tech.get("id")}
     if cid and cid != (tech.get("ghl_id") or "") and tech.get("id"):
-        try:
-            hub_client.set_user_ghl_id(tech["id"], cid)
-        except hub_client.HubLockInError as exc:
-            logger.warning("Lock-in store ghl_id: %s", exc)
+        outbox.enqueue_user_ghl_id(tech["id"], cid)
 
     msg = _confirm_sms(
         client_name=client_name,
@@ -136,8 +133,5 @@ def _sms_confirm(bonus, client_name, confirm_label):
     if serr:
         logger.warning("Lock-in confirm SMS send: %s", serr)
         return {"ok": False, "error": serr, "technician_id": tech.get("id")}
-    try:
-        hub_client.mark_bonus_sms(bonus["id"], confirmation_sms_sent=True)
-    except hub_client.HubLockInError as exc:
-        logger.warning("Lock-in mark confirm SMS: %s", exc)
+    outbox.enqueue_bonus_sms(bonus["id"], confirmation_sms_sent=True)
     return {"ok": True, "technician_id": tech.get("id")}
@@ -1,19 +1,30 @@
-"""VISIT_COMPLETE: persist visit assignees in Hub, then Stage 2 confirm."""
+"""
+VISIT_COMPLETE: queue visit assignees for the Hub (outbox), then queue Stage 2 confirm.
+
+The confirm task (jobber_app.tasks.confirm_jobber_visit_complete) waits for the visit upsert
+to be delivered, so the Hub still sees the visit before the pending bonus is confirmed.
+"""
 
 import logging
 
-from . import hub_client, jobber, stage2
+from django.db import transaction
+
+from . import jobber, outbox
 from .matching import assigned_user_ids, is_internal_client
 
 logger = logging.getLogger(__name__)
 
 
-def process_visit_complete(visit_id):
+def process_visit_complete(visit_id, prefetched=None):
+    """
+    prefetched: optional (visit, error) from jobber.get_visit_complete, so the
+    VISIT_COMPLETE orchestrator can share one fetch with the GHL feedback branch.
+    """
     visit_id = str(visit_id or "").strip()
     if not visit_id:
         return {"ok": False, "error": "missing visit id"}
 
-    visit, err = jobber.get_visit_lock_in(visit_id)
+    visit, err = prefetched if prefetched is not None else jobber.get_visit_lock_in(visit_id)
     if err:
         return {"ok": False, "error": err}
     if not visit:
@@ -25,23 +36,25 @@ def process_visit_complete(visit_id):
         return {"ok": True, "skipped": True, "reason": "internal_client"}
 
     job = visit.get("job") or {}
-    upserted = None
-    try:
-        upserted = hub_client.upsert_visit(
-            {
-                "jobber_visit_id": visit.get("id") or visit_id,
-                "title": visit.get("title") or "",
-                "client_id": client.get("id") or "",
-                "client_name": client_name,
-                "job_id": job.get("id") or "",
-                "job_type": job.get("jobType") or "",
-                "start_at": visit.get("startAt"),
-                "assignee_jobber_ids": assigned_user_ids(visit),
-            }
-        )
-    except hub_client.HubLockInError as exc:
-        logger.warning("Lock-in visit upsert failed visit=%s: %s", visit_id, exc)
-        return {"ok": False, "error": str(exc)}
-
-    confirm = stage2.process_visit_complete_confirm(visit, upserted=upserted)
-    return {"ok": True, "visit_upsert": upserted, "confirm": confirm}
+    # Hub write goes through the outbox so a Hub blip does not fail the Jobber webhook.
+    queued = outbox.enqueue_visit_upsert(
+        {
+            "jobber_visit_id": visit.get("id") or visit_id,
+            "title": visit.get("title") or "",
+            "client_id": client.get("id") or "",
+            "client_name": client_name,
+            "job_id": job.get("id") or "",
+            "job_type": job.get("jobType") or "",
+            "start_at": visit.get("startAt"),
+            "assignee_jobber_ids": assigned_user_ids(visit),
+        }
+    )
+    upserted = {"queued": True, "outbox_id": queued.id}
+    transaction.on_commit(lambda: _schedule_confirm(visit, queued.id))
+    return {"ok": True, "visit_upsert": upserted, "confirm": {"queued": True}}
+
+
+def _schedule_confirm(visit, outbox_id):
+    from jobber_app.tasks import confirm_jobber_visit_complete
+
+    confirm_jobber_visit_complete.delay(visit, outbox_id)
@@ -2,14 +2,15 @@
 One-time backfill: tag exact-matched GHL contacts + set Visit Count from Airtable visits CSV.
 
 Default is dry-run (no GHL writes). Use --execute only after reviewing the report.
+Execute runs on jobber_app.bulk_executor: concurrent, rate limited, journaled (--resume).
 """
-import time
 from datetime import datetime
 from pathlib import Path
 
 from decouple import config
 from django.core.management.base import BaseCommand, CommandError
 
+from jobber_app.bulk_executor import StreamingCsvWriter, run_bulk
 from jobber_app.ghl_contacts import (
     get_contact_by_id,
     normalize_ghl_tags,
@@ -24,8 +25,14 @@ from jobber_app.visit_count_backfill import (
     write_csv,
 )
 
-DEFAULT_VISITS = r"d:\Downloads\Visits-All Visits.csv"
-DEFAULT_GHL = r"d:\Downloads\GHL Contacts-Grid view.csv"
+RESULT_FIELDS = [
+    "client",
+    "ghl_id",
+    "visit_count",
+    "already_has_tag",
+    "matched_client_count",
+    "error",
+]
 
 
 class Command(BaseCommand):
@@ -35,13 +42,27 @@ class Command(BaseCommand):
     )
 
     def add_arguments(self, parser):
-        parser.add_argument("--visits-csv", default=DEFAULT_VISITS)
-        parser.add_argument("--ghl-csv", default=DEFAULT_GHL)
+        parser.add_argument(
+            "--visits-csv",
+            default=config("GHL_VISIT_COUNT_VISITS_CSV", default=""),
+            help="Airtable visits export (default: env GHL_VISIT_COUNT_VISITS_CSV).",
+        )
+        parser.add_argument(
+            "--ghl-csv",
+            default=config("GHL_VISIT_COUNT_GHL_CSV", default=""),
+            help="GHL contacts export (default: env GHL_VISIT_COUNT_GHL_CSV).",
+        )
         parser.add_argument(
             "--out-dir",
             default="",
             help="Directory for report CSVs (default: backfill_out/ghl_visit_count_<timestamp>)",
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            default=False,
+            help="Execute only: skip contacts already updated by an earlier (interrupted) run.",
+        )
         parser.add_argument(
             "--dry-run",
             action="store_true",
@@ -55,10 +76,16 @@ class Command(BaseCommand):
             help="Write tag + Visit Count to GHL for exact matches only.",
         )
         parser.add_argument(
-            "--sleep",
+            "--workers",
+            type=int,
+            default=4,
+            help="Concurrent GHL writers (execute only).",
+        )
+        parser.add_argument(
+            "--rate",
             type=float,
-            default=0.2,
-            help="Seconds to sleep between GHL writes (execute only).",
+            default=5.0,
+            help="Max contacts per second across all workers; halves on GHL 429 (execute only).",
         )
         parser.add_argument(
             "--tag",
@@ -75,6 +102,10 @@ class Command(BaseCommand):
         if options["execute"] and options["dry_run"]:
             raise CommandError("Pass either --execute or --dry-run, not both.")
         execute = bool(options["execute"])
+        if options["resume"] and not execute:
+            raise CommandError("--resume only applies with --execute.")
+        if not options["visits_csv"] or not options["ghl_csv"]:
+            raise CommandError("Pass --visits-csv and --ghl-csv (or set GHL_VISIT_COUNT_VISITS_CSV / GHL_VISIT_COUNT_GHL_CSV).")
         visits_csv = Path(options["visits_csv"])
         ghl_csv = Path(options["ghl_csv"])
         if not visits_csv.is_file():
@@ -147,78 +178,67 @@ class Command(BaseCommand):
             self.stdout.write("Re-run with --execute after the would_update.csv looks right.")
             return
 
-        successes = []
-        failures = []
-        sleep_s = max(0.0, float(options["sleep"]))
         rows = matched["would_update"]
-        total = len(rows)
-        self.stdout.write(self.style.WARNING(f"EXECUTE — updating {total} GHL contacts…"))
+        self.stdout.write(
+            self.style.WARNING(
+                f"EXECUTE — updating {len(rows)} GHL contacts "
+                f"({options['workers']} workers, {options['rate']}/s{', resuming' if options['resume'] else ''})…"
+            )
+        )
 
-        for i, row in enumerate(rows, start=1):
+        def apply_row(row):
             gid = row["ghl_id"]
-            visit_count = int(row["visit_count"])
-            try:
-                contact, err = get_contact_by_id(gid)
-                if err or not contact:
-                    failures.append({**row, "error": err or "contact not found"})
-                    self.stderr.write(f"[{i}/{total}] FAIL get {gid}: {err}")
-                    continue
-                existing = normalize_ghl_tags(contact)
-                already = any(t.lower() == tag.lower() for t in existing)
-                merged_tags = list(existing)
-                if not already:
-                    merged_tags.append(tag)
-                ok, uerr = update_contact(
-                    gid,
-                    tags=merged_tags,
-                    custom_fields=[{"id": field_id, "field_value": str(visit_count)}],
+            contact, err = get_contact_by_id(gid)
+            if err or not contact:
+                return {"ok": False, "error": err or "contact not found"}
+            existing = normalize_ghl_tags(contact)
+            already = any(t.lower() == tag.lower() for t in existing)
+            merged_tags = list(existing)
+            if not already:
+                merged_tags.append(tag)
+            ok, uerr = update_contact(
+                gid,
+                tags=merged_tags,
+                custom_fields=[{"id": field_id, "field_value": str(int(row["visit_count"]))}],
+            )
+            return {"ok": ok, "already_has_tag": already, "error": "" if ok else (uerr or "update failed")}
+
+        success_report = StreamingCsvWriter(out_dir / "success.csv", RESULT_FIELDS)
+        failure_report = StreamingCsvWriter(out_dir / "failed.csv", RESULT_FIELDS)
+
+        def on_result(row, result):
+            report_row = {**row, **result}
+            if result["ok"]:
+                success_report.write(report_row)
+                self.stdout.write(
+                    f"OK {row['ghl_id']} visits={row['visit_count']} tag_existed={result.get('already_has_tag')}"
                 )
-                result = {
-                    **row,
-                    "already_has_tag": already,
-                    "error": "" if ok else (uerr or "update failed"),
-                }
-                if ok:
-                    successes.append(result)
-                    self.stdout.write(
-                        f"[{i}/{total}] OK {gid} visits={visit_count} tag_existed={already}"
-                    )
-                else:
-                    failures.append(result)
-                    self.stderr.write(f"[{i}/{total}] FAIL put {gid}: {uerr}")
-            except Exception as exc:
-                failures.append({**row, "error": str(exc)})
-                self.stderr.write(f"[{i}/{total}] FAIL {gid}: {exc}")
-            if sleep_s and i < total:
-                time.sleep(sleep_s)
-
-        write_csv(
-            out_dir / "success.csv",
-            successes,
-            [
-                "client",
-                "ghl_id",
-                "visit_count",
-                "already_has_tag",
-                "matched_client_count",
-                "error",
-            ],
-        )
-        write_csv(
-            out_dir / "failed.csv",
-            failures,
-            [
-                "client",
-                "ghl_id",
-                "visit_count",
-                "already_has_tag",
-                "matched_client_count",
-                "error",
-            ],
-        )
-        self.stdout.write(self.style.SUCCESS(f"Success: {len(successes)}"))
-        if failures:
-            self.stdout.write(self.style.ERROR(f"Failed:  {len(failures)}"))
+            else:
+                failure_report.write(report_row)
+                self.stderr.write(f"FAIL {row['ghl_id']}: {result['error']}")
+
+        try:
+            summary = run_bulk(
+                f"backfill_ghl_visit_count:{field_id}:{tag.lower()}",
+                rows,
+                apply_row,
+                key=lambda row: row["ghl_id"],
+                workers=max(1, options["workers"]),
+                per_second=options["rate"],
+                resume=options["resume"],
+                on_result=on_result,
+            )
+        finally:
+            success_report.close()
+            failure_report.close()
+
+        if summary["skipped"]:
+            self.stdout.write(f"Skipped (done in earlier run): {summary['skipped']}")
+        if summary["rate_limited"]:
+            self.stdout.write(self.style.WARNING(f"GHL 429 retries: {summary['rate_limited']}"))
+        self.stdout.write(self.style.SUCCESS(f"Success: {summary['succeeded']}"))
+        if summary["failed"]:
+            self.stdout.write(self.style.ERROR(f"Failed:  {summary['failed']}"))
         else:
             self.stdout.write("Failed:  0")
         self.stdout.write(f"Reports: {out_dir.resolve()}")
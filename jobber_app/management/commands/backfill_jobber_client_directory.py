@@ -0,0 +1,36 @@
+"""
+Load every Jobber client (emails, phones, property addresses) into the local client directory.
+
+Run once after deploying the directory; CLIENT_CREATE / CLIENT_UPDATE webhooks keep it fresh afterwards.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from jobber_app.client_directory import backfill_client_directory
+
+
+class Command(BaseCommand):
+    help = "Page through Jobber clients and upsert them into the local client directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=25)
+        parser.add_argument("--max-pages", type=int, default=None)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds between page requests (Jobber query cost throttling).",
+        )
+
+    def handle(self, *args, **options):
+        result = backfill_client_directory(
+            page_size=options["page_size"],
+            max_pages=options["max_pages"],
+            sleep_seconds=options["sleep"],
+        )
+        if not result["ok"]:
+            raise CommandError(
+                f"Backfill stopped after {result['pages']} pages ({result['clients']} clients): {result['error']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Upserted {result['clients']} Jobber clients from {result['pages']} pages.")
+        )
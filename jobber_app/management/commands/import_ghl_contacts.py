@@ -0,0 +1,36 @@
+"""
+Load every GHL contact into the local contact mirror (accounts.Contact).
+
+Run once after deploying the mirror; the Celery beat job keeps it fresh afterwards.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from jobber_app.tasks import import_ghl_contacts
+
+
+class Command(BaseCommand):
+    help = "Page through GHL contacts and bulk-upsert them into the local contact mirror."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--max-pages", type=int, default=None)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.2,
+            help="Seconds between page requests (rate limit).",
+        )
+
+    def handle(self, *args, **options):
+        result = import_ghl_contacts(
+            page_size=options["page_size"],
+            max_pages=options["max_pages"],
+            sleep_seconds=options["sleep"],
+        )
+        if not result["ok"]:
+            raise CommandError(
+                f"Import stopped after {result['pages']} pages ({result['contacts']} contacts): {result['error']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Mirrored {result['contacts']} GHL contacts from {result['pages']} pages.")
+        )
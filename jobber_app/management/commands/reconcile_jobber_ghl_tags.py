@@ -0,0 +1,52 @@
+"""
+Reconcile Jobber client tags with GHL contact tags in one batched pass.
+
+Also runs nightly from Celery beat (jobber_app.tasks.reconcile_jobber_ghl_tags_nightly).
+Use --dry-run first to see how much drift there is; --resume continues an interrupted run.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from jobber_app.tag_reconcile import reconcile_tags
+
+
+class Command(BaseCommand):
+    help = "Page through Jobber clients and GHL contacts and repair tag drift between them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resume", action="store_true", help="Continue the last unfinished run.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it.")
+        parser.add_argument("--page-size", type=int, default=25)
+        parser.add_argument("--max-pages", type=int, default=None)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds between Jobber page requests (query cost throttling).",
+        )
+        parser.add_argument(
+            "--skip-ghl-import",
+            action="store_true",
+            help="Use the GHL contact mirror as is instead of refreshing it first.",
+        )
+
+    def handle(self, *args, **options):
+        result = reconcile_tags(
+            resume=options["resume"],
+            dry_run=options["dry_run"],
+            page_size=options["page_size"],
+            max_pages=options["max_pages"],
+            sleep_seconds=options["sleep"],
+            skip_ghl_import=options["skip_ghl_import"],
+        )
+        summary = (
+            f"{result.get('clients', 0)} clients in {result.get('pages', 0)} pages: "
+            f"{result.get('in_sync', 0)} in sync, {result.get('unmatched', 0)} unmatched, "
+            f"{result.get('drifted', 0)} drifted, {result.get('repaired', 0)} repaired, "
+            f"{result.get('skipped', 0)} skipped, "
+            f"{result.get('failed', 0)} failed"
+        )
+        if not result["ok"]:
+            raise CommandError(f"Reconciliation stopped ({summary}): {result['error']}")
+        for item in result.get("drift") or []:
+            self.stdout.write(f"{item['direction']}: jobber={item['jobber_client_id']} ghl={item['ghl_contact_id']}")
+        self.stdout.write(self.style.SUCCESS(f"Run {result.get('run_id') or '(dry run)'} {result['status']}: {summary}"))
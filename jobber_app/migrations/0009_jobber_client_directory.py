@@ -0,0 +1,65 @@
+# Local Jobber client directory (identity lookup keys for booking / GHL resolution)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0008_jobber_visit_completed_ghl_trigger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobberClientDirectory",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("jobber_client_id", models.CharField(db_index=True, max_length=255, unique=True)),
+                ("first_name", models.CharField(blank=True, default="", max_length=255)),
+                ("last_name", models.CharField(blank=True, default="", max_length=255)),
+                ("primary_property_id", models.CharField(blank=True, default="", max_length=255)),
+                ("synced_at", models.DateTimeField()),
+            ],
+            options={
+                "db_table": "jobber_client_directory",
+                "ordering": ["-synced_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="JobberClientDirectoryKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("email", "Email"), ("phone", "Phone"), ("address", "Property address")],
+                        max_length=16,
+                    ),
+                ),
+                ("value", models.CharField(max_length=255)),
+                (
+                    "property_id",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Jobber property id for address keys.",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="keys",
+                        to="jobber_app.jobberclientdirectory",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "jobber_client_directory_key",
+                "unique_together": {("client", "kind", "value")},
+                "indexes": [models.Index(fields=["kind", "value"], name="jobber_dir_kind_value_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Transactional outbox for Hub lock-in writes
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0009_jobber_client_directory"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HubOutboxMessage",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("operation", models.CharField(max_length=64)),
+                ("dedupe_key", models.CharField(max_length=255, unique=True)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("sent", "Sent"), ("failed", "Failed")],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("next_attempt_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "hub_outbox_message",
+                "ordering": ["created_at"],
+                "indexes": [models.Index(fields=["status", "next_attempt_at"], name="hub_outbox_due_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Latest-wins debounce state for bursty Jobber VISIT_* / CLIENT_* webhooks
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0010_hub_outbox_message"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobberWebhookCoalesce",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("family", models.CharField(choices=[("visit", "Visit"), ("client", "Client")], max_length=16)),
+                ("item_id", models.CharField(max_length=255)),
+                ("last_topic", models.CharField(blank=True, default="", max_length=64)),
+                ("pending", models.BooleanField(default=False)),
+                ("pending_events", models.PositiveIntegerField(default=0)),
+                ("first_pending_at", models.DateTimeField(blank=True, null=True)),
+                ("due_at", models.DateTimeField(blank=True, null=True)),
+                ("events_total", models.PositiveIntegerField(default=0)),
+                ("syncs_total", models.PositiveIntegerField(default=0)),
+                ("last_synced_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "jobber_webhook_coalesce",
+                "ordering": ["-updated_at"],
+                "unique_together": {("family", "item_id")},
+                "indexes": [models.Index(fields=["pending", "due_at"], name="jobber_webhook_coalesce_due")],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Checkpoints for the nightly Jobber <-> GHL tag reconciliation
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0011_jobber_webhook_coalesce"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobberGhlTagReconcileRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("running", "Running"), ("completed", "Completed"), ("failed", "Failed")],
+                        default="running",
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "ghl_imported",
+                    models.BooleanField(default=False, help_text="GHL contact mirror refreshed for this run."),
+                ),
+                ("jobber_cursor", models.CharField(blank=True, default="", max_length=512)),
+                ("pages", models.PositiveIntegerField(default=0)),
+                ("clients_seen", models.PositiveIntegerField(default=0)),
+                ("in_sync", models.PositiveIntegerField(default=0)),
+                ("unmatched", models.PositiveIntegerField(default=0)),
+                ("drifted", models.PositiveIntegerField(default=0)),
+                ("repaired", models.PositiveIntegerField(default=0)),
+                ("repair_failed", models.PositiveIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "jobber_ghl_tag_reconcile_run",
+                "ordering": ["-started_at"],
+            },
+        ),
+    ]
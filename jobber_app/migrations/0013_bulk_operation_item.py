@@ -0,0 +1,30 @@
+# Progress journal for resumable backfills
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0012_jobber_ghl_tag_reconcile_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BulkOperationItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("job_name", models.CharField(max_length=128)),
+                ("item_key", models.CharField(max_length=255)),
+                ("status", models.CharField(choices=[("done", "Done"), ("failed", "Failed")], max_length=16)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "bulk_operation_item",
+                "ordering": ["-updated_at"],
+                "unique_together": {("job_name", "item_key")},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Sampled outbound vendor call ledger
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0013_bulk_operation_item"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboundCallLog",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ("vendor", models.CharField(max_length=16)),
+                ("operation", models.CharField(help_text="GraphQL operation name, else endpoint family", max_length=128)),
+                ("method", models.CharField(max_length=8)),
+                ("endpoint", models.CharField(max_length=255)),
+                ("status_code", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("error", models.CharField(blank=True, default="", max_length=255)),
+                ("duration_ms", models.PositiveIntegerField()),
+                ("request_bytes", models.PositiveIntegerField(default=0)),
+                ("response_bytes", models.PositiveIntegerField(default=0)),
+                ("correlation_id", models.CharField(blank=True, db_index=True, default="", max_length=64)),
+                ("attempt", models.PositiveSmallIntegerField(default=1, help_text="1 = first call of this operation in the request")),
+            ],
+            options={
+                "db_table": "outbound_call_log",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(fields=["vendor", "operation", "-created_at"], name="ocl_vendor_op_created_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Count echo-skipped tag reconcile repairs separately
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobber_app", "0014_outbound_call_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobberghltagreconcilerun",
+            name="repair_skipped",
+            field=models.PositiveIntegerField(default=0, help_text="Drifted pairs the sync skipped as echoes."),
+        ),
+    ]
@@ -2,6 +2,7 @@
 Models for Jobber ↔ external integrations (e.g. GHL calendar block sync).
 """
 from django.db import models
+from django.utils import timezone
 
 
 class JobberVisitGhlBlockMap(models.Model):
@@ -161,3 +162,225 @@ class JobberTaskIdempotency(models.Model):
 
     def __str__(self):
         return f"{self.idempotency_key} → {self.jobber_task_id}"
+
+
+class JobberClientDirectory(models.Model):
+    """
+    Local copy of a Jobber client's identity (emails, phones, property addresses) so
+    booking / GHL resolution can find the client with an indexed lookup instead of
+    sequential Jobber searches. Filled by CLIENT_* webhooks, bookings and the paginated backfill.
+    """
+
+    jobber_client_id = models.CharField(max_length=255, unique=True, db_index=True)
+    first_name = models.CharField(max_length=255, blank=True, default="")
+    last_name = models.CharField(max_length=255, blank=True, default="")
+    primary_property_id = models.CharField(max_length=255, blank=True, default="")
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "jobber_client_directory"
+        ordering = ["-synced_at"]
+
+    def __str__(self):
+        return f"{self.jobber_client_id} ({self.first_name} {self.last_name})".strip()
+
+
+class JobberClientDirectoryKey(models.Model):
+    """One normalized lookup key (email, phone digits, property address) for a directory client."""
+
+    KIND_EMAIL = "email"
+    KIND_PHONE = "phone"
+    KIND_ADDRESS = "address"
+    KIND_CHOICES = [
+        (KIND_EMAIL, "Email"),
+        (KIND_PHONE, "Phone"),
+        (KIND_ADDRESS, "Property address"),
+    ]
+
+    client = models.ForeignKey(JobberClientDirectory, on_delete=models.CASCADE, related_name="keys")
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255)
+    property_id = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="Jobber property id for address keys.",
+    )
+
+    class Meta:
+        db_table = "jobber_client_directory_key"
+        unique_together = ("client", "kind", "value")
+        indexes = [models.Index(fields=["kind", "value"], name="jobber_dir_kind_value_idx")]
+
+    def __str__(self):
+        return f"{self.kind}:{self.value} → {self.client_id}"
+
+
+class HubOutboxMessage(models.Model):
+    """
+    Transactional outbox for fire-and-forget Hub lock-in writes (visit upserts, SMS flags, staff ghl_id).
+    Webhook handlers enqueue here; jobber_app.lock_in.outbox.flush_outbox delivers with retries.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    operation = models.CharField(max_length=64)
+    dedupe_key = models.CharField(max_length=255, unique=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "hub_outbox_message"
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="hub_outbox_due_idx")]
+
+    def __str__(self):
+        return f"{self.operation} {self.dedupe_key} ({self.status})"
+
+
+class JobberWebhookCoalesce(models.Model):
+    """
+    Latest-wins debounce state for bursty Jobber webhooks, one row per entity (topic family + item id).
+    Events inside the window only bump the counters; one deferred sync then fetches the final state.
+    events_total - syncs_total is the number of events collapsed away for the entity.
+    """
+
+    FAMILY_VISIT = "visit"
+    FAMILY_CLIENT = "client"
+    FAMILY_CHOICES = [
+        (FAMILY_VISIT, "Visit"),
+        (FAMILY_CLIENT, "Client"),
+    ]
+
+    family = models.CharField(max_length=16, choices=FAMILY_CHOICES)
+    item_id = models.CharField(max_length=255)
+    last_topic = models.CharField(max_length=64, blank=True, default="")
+    pending = models.BooleanField(default=False)
+    pending_events = models.PositiveIntegerField(default=0)
+    first_pending_at = models.DateTimeField(null=True, blank=True)
+    due_at = models.DateTimeField(null=True, blank=True)
+    events_total = models.PositiveIntegerField(default=0)
+    syncs_total = models.PositiveIntegerField(default=0)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "jobber_webhook_coalesce"
+        ordering = ["-updated_at"]
+        unique_together = ("family", "item_id")
+        indexes = [models.Index(fields=["pending", "due_at"], name="jobber_webhook_coalesce_due")]
+
+    def __str__(self):
+        return f"{self.family}:{self.item_id} ({self.pending_events} pending)"
+
+
+class JobberGhlTagReconcileRun(models.Model):
+    """
+    Checkpoint for the nightly Jobber ↔ GHL tag reconciliation (jobber_app.tag_reconcile).
+    jobber_cursor is the Jobber clients page to continue from, so an interrupted run resumes.
+    """
+
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_RUNNING)
+    ghl_imported = models.BooleanField(default=False, help_text="GHL contact mirror refreshed for this run.")
+    jobber_cursor = models.CharField(max_length=512, blank=True, default="")
+    pages = models.PositiveIntegerField(default=0)
+    clients_seen = models.PositiveIntegerField(default=0)
+    in_sync = models.PositiveIntegerField(default=0)
+    unmatched = models.PositiveIntegerField(default=0)
+    drifted = models.PositiveIntegerField(default=0)
+    repaired = models.PositiveIntegerField(default=0)
+    repair_skipped = models.PositiveIntegerField(default=0, help_text="Drifted pairs the sync skipped as echoes.")
+    repair_failed = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "jobber_ghl_tag_reconcile_run"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"Tag reconcile #{self.pk} ({self.status}, {self.pages} pages)"
+
+
+class BulkOperationItem(models.Model):
+    """
+    Progress journal for resumable GHL / Jobber backfills (jobber_app.bulk_executor).
+    One row per (job, item key); --resume skips items already marked done.
+    """
+
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    job_name = models.CharField(max_length=128)
+    item_key = models.CharField(max_length=255)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "bulk_operation_item"
+        ordering = ["-updated_at"]
+        unique_together = ("job_name", "item_key")
+
+    def __str__(self):
+        return f"{self.job_name}:{self.item_key} ({self.status})"
+
+
+class OutboundCallLog(models.Model):
+    """
+    One sampled outbound GHL / Jobber / Hub request (jobber_app.call_ledger), for finding which
+    vendor call made a booking or webhook slow. Rows are written in batches and pruned after
+    OUTBOUND_LEDGER_RETENTION_DAYS.
+    """
+
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    vendor = models.CharField(max_length=16)
+    operation = models.CharField(max_length=128, help_text="GraphQL operation name, else endpoint family")
+    method = models.CharField(max_length=8)
+    endpoint = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True, default="")
+    duration_ms = models.PositiveIntegerField()
+    request_bytes = models.PositiveIntegerField(default=0)
+    response_bytes = models.PositiveIntegerField(default=0)
+    correlation_id = models.CharField(max_length=64, blank=True, default="", db_index=True)
+    attempt = models.PositiveSmallIntegerField(default=1, help_text="1 = first call of this operation in the request")
+
+    class Meta:
+        db_table = "outbound_call_log"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["vendor", "operation", "-created_at"], name="ocl_vendor_op_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.vendor} {self.operation} {self.status_code or self.error} {self.duration_ms}ms"
@@ -0,0 +1,263 @@
+"""
+Nightly Jobber ↔ GHL tag reconciliation.
+
+Event-driven tag sync (tag_sync) leaves permanent drift whenever a webhook is missed. This pass:
+  1. refreshes the GHL contact mirror (accounts.Contact, tags included) with the paginated import;
+  2. pages through every Jobber client with its tags;
+  3. joins each client to its GHL contact via GhlContactJobberClientMap, then
+     JobberClientGhlTagSyncState, then the mirror's email / phone keys — all in memory;
+  4. repairs only drifted pairs with the existing one-client syncs (on the joined ids),
+     concurrently and rate limited.
+
+Direction: if the Jobber tag set still matches the last synced signature, GHL changed (missed
+GHL webhook) → GHL → Jobber. Otherwise Jobber wins → Jobber → GHL. Tags either sync keeps on
+one side only (quote workflow / JOBBER_GHL_TAG_SYNC_PRESERVE_GHL, JOBBER_GHL_TAG_SYNC_PRESERVE_JOBBER)
+are left out of the comparison. Repairs the sync skips as echoes are counted apart from repairs.
+
+Progress is checkpointed per Jobber page in JobberGhlTagReconcileRun; resume=True continues
+the latest unfinished run from its saved cursor.
+"""
+import logging
+import time
+
+from decouple import config
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.contact_mirror import normalize_email, normalize_phone_e164
+from accounts.models import Contact
+
+from .client import client_tag_state, list_clients_tag_sync_page
+from .ghl_contacts import _get_credentials, _location_id
+from .lock_in.fanout import RateLimiter, run_parallel
+from .models import GhlContactJobberClientMap, JobberClientGhlTagSyncState, JobberGhlTagReconcileRun
+from .tag_sync import (
+    _ghl_preserve_tags,
+    _jobber_preserve_tags,
+    _signature,
+    sync_ghl_contact_tags_to_jobber,
+    sync_jobber_client_tags_to_ghl,
+)
+from .tasks import import_ghl_contacts
+
+logger = logging.getLogger(__name__)
+
+DIRECTION_JOBBER_TO_GHL = "jobber_to_ghl"
+DIRECTION_GHL_TO_JOBBER = "ghl_to_jobber"
+
+
+def _workers():
+    return max(1, config("TAG_RECONCILE_WORKERS", default=4, cast=int))
+
+
+def _writes_per_second():
+    return config("TAG_RECONCILE_REPAIRS_PER_SECOND", default=2.0, cast=float)
+
+
+class _GhlIndex:
+    """GHL contacts from the mirror: tags by contact id, contact id by email / E.164 phone."""
+
+    def __init__(self, location_id):
+        self.tags = {}
+        self.by_email = {}
+        self.by_phone = {}
+        rows = (
+            Contact.objects.filter(Q(location_id=location_id) | Q(location_id=""))
+            .order_by("date_added", "id")
+            .values_list("contact_id", "email_normalized", "phone_e164", "tags")
+        )
+        for contact_id, email, phone, tags in rows.iterator(chunk_size=2000):
+            self.tags[contact_id] = [str(t).strip() for t in tags or [] if str(t).strip()]
+            # Newest contact wins a shared email / phone, like find_mirrored_contact.
+            if email:
+                self.by_email[email] = contact_id
+            if phone:
+                self.by_phone[phone] = contact_id
+
+    def match(self, client):
+        for e in client.get("emails") or []:
+            cid = self.by_email.get(normalize_email((e or {}).get("address")))
+            if cid:
+                return cid
+        for p in client.get("phones") or []:
+            cid = self.by_phone.get(normalize_phone_e164((p or {}).get("number")))
+            if cid:
+                return cid
+        return None
+
+
+def _links():
+    """Returns ({jobber_client_id: mapped ghl_contact_id}, {jobber_client_id: sync state})."""
+    mapped = {}
+    for jobber_id, ghl_id in (
+        GhlContactJobberClientMap.objects.order_by("updated_at").values_list("jobber_client_id", "ghl_contact_id")
+    ):
+        if ghl_id:
+            mapped[jobber_id] = ghl_id
+    states = {st.jobber_client_id: st for st in JobberClientGhlTagSyncState.objects.all()}
+    return mapped, states
+
+
+def _comparable(tags, preserve):
+    return _signature([t for t in tags if t.lower() not in preserve])
+
+
+def comparison_preserve_tags():
+    """Lower-cased tags kept on one side only by tag_sync; never drift."""
+    return {t.lower() for t in _ghl_preserve_tags() | _jobber_preserve_tags()}
+
+
+def find_drift(clients, index, mapped, states, preserve):
+    """
+    Compare one page of Jobber clients with their GHL contacts.
+    Returns (drift list of {jobber_client_id, ghl_contact_id, direction}, in_sync count, unmatched count).
+    """
+    drift = []
+    in_sync = unmatched = 0
+    for client in clients:
+        jobber_id = str(client.get("id") or "")
+        if not jobber_id:
+            continue
+        st = states.get(jobber_id)
+        ghl_id = mapped.get(jobber_id) or (st.ghl_contact_id if st else "") or index.match(client)
+        if not ghl_id or ghl_id not in index.tags:
+            unmatched += 1
+            continue
+        jb_tags, _ = client_tag_state(client)
+        ghl_tags = index.tags[ghl_id]
+        if _comparable(jb_tags, preserve) == _comparable(ghl_tags, preserve):
+            in_sync += 1
+            continue
+        direction = DIRECTION_JOBBER_TO_GHL
+        # Jobber unchanged since the last sync → the difference came from GHL. (The stored GHL
+        # signature includes preserved tags, so it is not compared here.)
+        if st and st.last_jobber_tag_signature == _signature(jb_tags):
+            direction = DIRECTION_GHL_TO_JOBBER
+        drift.append({"jobber_client_id": jobber_id, "ghl_contact_id": ghl_id, "direction": direction})
+    return drift, in_sync, unmatched
+
+
+def _repairer(limiter):
+    def repair(item):
+        limiter.wait()
+        try:
+            if item["direction"] == DIRECTION_GHL_TO_JOBBER:
+                result = sync_ghl_contact_tags_to_jobber(item["ghl_contact_id"], jobber_client_id=item["jobber_client_id"])
+            else:
+                result = sync_jobber_client_tags_to_ghl(item["jobber_client_id"], ghl_contact_id=item["ghl_contact_id"])
+        except Exception as exc:
+            logger.exception("Tag reconcile repair failed: %s", item)
+            result = {"ok": False, "error": str(exc)}
+        if not result.get("ok"):
+            logger.warning("Tag reconcile repair failed: %s result=%s", item, result)
+        return result
+
+    return repair
+
+
+def tally_repairs(results):
+    """(repaired, skipped, failed) counts for repair results; echo skips are not repairs."""
+    skipped = sum(1 for r in results if r.get("ok") and r.get("skipped"))
+    repaired = sum(1 for r in results if r.get("ok") and not r.get("skipped"))
+    return repaired, skipped, len(results) - repaired - skipped
+
+
+def _run_summary(run, **extra):
+    return {
+        "ok": run.status != JobberGhlTagReconcileRun.STATUS_FAILED,
+        "run_id": run.pk,
+        "status": run.status,
+        "pages": run.pages,
+        "clients": run.clients_seen,
+        "in_sync": run.in_sync,
+        "unmatched": run.unmatched,
+        "drifted": run.drifted,
+        "repaired": run.repaired,
+        "skipped": run.repair_skipped,
+        "failed": run.repair_failed,
+        **extra,
+    }
+
+
+def reconcile_tags(*, resume=False, dry_run=False, page_size=25, max_pages=None, sleep_seconds=0.5, skip_ghl_import=False):
+    """
+    Run (or resume) a reconciliation. dry_run only counts drift (no repairs, no checkpoint).
+    Returns dict: { ok, run_id, status, pages, clients, in_sync, unmatched, drifted, repaired, skipped, failed, error?, drift? }.
+    """
+    location_id = _location_id(_get_credentials())
+    if not location_id:
+        return {"ok": False, "error": "GHL_LOCATION_ID or credentials.location_id required"}
+
+    run = None
+    if resume and not dry_run:
+        run = JobberGhlTagReconcileRun.objects.filter(status=JobberGhlTagReconcileRun.STATUS_RUNNING).first()
+    if run is None:
+        run = JobberGhlTagReconcileRun(ghl_imported=skip_ghl_import)
+        if not dry_run:
+            JobberGhlTagReconcileRun.objects.filter(status=JobberGhlTagReconcileRun.STATUS_RUNNING).update(
+                status=JobberGhlTagReconcileRun.STATUS_FAILED, last_error="Superseded by a new run"
+            )
+            run.save()
+    else:
+        logger.info("Resuming tag reconcile run %s at page %s", run.pk, run.pages + 1)
+
+    if not run.ghl_imported:
+        imported = import_ghl_contacts(sleep_seconds=0.2)
+        if not imported["ok"]:
+            return _fail(run, f"GHL contact import failed: {imported['error']}", dry_run)
+        run.ghl_imported = True
+        if not dry_run:
+            run.save(update_fields=["ghl_imported", "updated_at"])
+
+    index = _GhlIndex(location_id)
+    mapped, states = _links()
+    preserve = comparison_preserve_tags()
+    repair = _repairer(RateLimiter(_writes_per_second()))
+    dry_drift = []
+
+    cursor = run.jobber_cursor or None
+    pages_this_call = 0
+    while max_pages is None or pages_this_call < max_pages:
+        clients, next_cursor, err = list_clients_tag_sync_page(first=page_size, after=cursor)
+        if err:
+            return _fail(run, err, dry_run)
+        drift, in_sync, unmatched = find_drift(clients, index, mapped, states, preserve)
+        run.pages += 1
+        run.clients_seen += len(clients)
+        run.in_sync += in_sync
+        run.unmatched += unmatched
+        run.drifted += len(drift)
+        if dry_run:
+            dry_drift.extend(drift)
+        elif drift:
+            results = run_parallel(repair, drift, workers=_workers())
+            repaired, skipped, failed = tally_repairs(results)
+            run.repaired += repaired
+            run.repair_skipped += skipped
+            run.repair_failed += failed
+        pages_this_call += 1
+        run.jobber_cursor = next_cursor or ""
+        if not next_cursor:
+            run.status = JobberGhlTagReconcileRun.STATUS_COMPLETED
+            run.finished_at = timezone.now()
+        if not dry_run:
+            run.save()
+        if not next_cursor:
+            break
+        cursor = next_cursor
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+
+    logger.info("Tag reconcile run %s: %s", run.pk, _run_summary(run))
+    if dry_run:
+        return _run_summary(run, drift=dry_drift)
+    return _run_summary(run)
+
+
+def _fail(run, error, dry_run):
+    logger.warning("Tag reconcile run %s stopped after %s pages: %s", run.pk, run.pages, error)
+    run.last_error = str(error)[:2000]
+    if not dry_run:
+        # Stay resumable: a later resume=True call continues from the saved cursor.
+        run.save(update_fields=["last_error", "updated_at"])
+    return {**_run_summary(run), "ok": False, "error": error}
@@ -14,7 +14,7 @@ from decouple import config
 
 from quote_app.helpers import BID_IN_PERSON_TAG, QUOTE_STATUS_TAGS
 
-from .client import get_client_for_tag_sync, list_client_tag_names, set_client_tags_by_names
+from .client import apply_client_tag_names, client_tag_state, get_client_for_tag_sync
 from .jobber_client_resolve import resolve_jobber_client_for_ghl_contact
 from .ghl_contacts import (
     _get_credentials,
@@ -88,9 +88,10 @@ def _save_state_ghl_to_jobber(jobber_client_id, ghl_contact_id, ghl_tag_names, j
     )
 
 
-def sync_jobber_client_tags_to_ghl(jobber_client_id):
+def sync_jobber_client_tags_to_ghl(jobber_client_id, ghl_contact_id=None):
     """
-    Read Jobber client tags and mirror onto matching GHL contact (by email/phone).
+    Read Jobber client tags and mirror onto matching GHL contact (by email/phone, or
+    ``ghl_contact_id`` when the caller already joined the pair).
     Preserves GHL tags listed in JOBBER_GHL_TAG_SYNC_PRESERVE_GHL + quote status tags.
 
     Returns dict: { ok, skipped, reason?, jobber_client_id, ghl_contact_id?, error?, tags? }
@@ -109,16 +110,17 @@ def sync_jobber_client_tags_to_ghl(jobber_client_id):
     if not client:
         return {"ok": False, "error": "Client not found", "jobber_client_id": jobber_client_id}
 
-    jb_names, e2 = list_client_tag_names(jobber_client_id)
-    if e2:
-        return {"ok": False, "error": e2, "jobber_client_id": jobber_client_id}
+    jb_names, _label_to_id = client_tag_state(client)
 
     jb_sig = _signature(jb_names)
     st = _get_state(jobber_client_id)
     if st and st.last_sync_source == "ghl" and st.last_jobber_tag_signature == jb_sig:
         return {"ok": True, "skipped": True, "reason": "echo_from_ghl_sync", "jobber_client_id": jobber_client_id}
 
-    ghl_contact, ferr = find_ghl_contact_for_jobber_client(client, location_id)
+    if ghl_contact_id:
+        ghl_contact, ferr = get_contact_by_id(ghl_contact_id)
+    else:
+        ghl_contact, ferr = find_ghl_contact_for_jobber_client(client, location_id)
     if ferr:
         return {"ok": False, "error": ferr, "jobber_client_id": jobber_client_id}
     if not ghl_contact:
@@ -143,9 +145,10 @@ def sync_jobber_client_tags_to_ghl(jobber_client_id):
     }
 
 
-def sync_ghl_contact_tags_to_jobber(ghl_contact_id, tag_names_from_payload=None):
+def sync_ghl_contact_tags_to_jobber(ghl_contact_id, tag_names_from_payload=None, jobber_client_id=None):
     """
-    Read GHL contact tags (or use payload), resolve Jobber client by email/phone, update Jobber tags.
+    Read GHL contact tags (or use payload), resolve Jobber client by email/phone (unless
+    ``jobber_client_id`` is given), update Jobber tags.
     Drops GHL-only preserved tags (quote workflow) from the set applied to Jobber.
     Preserves Jobber tags in JOBBER_GHL_TAG_SYNC_PRESERVE_JOBBER.
 
@@ -166,23 +169,25 @@ def sync_ghl_contact_tags_to_jobber(ghl_contact_id, tag_names_from_payload=None)
 
     ghl_sig = _signature(ghl_tags)
 
-    email, phone = ghl_contact_email_and_phone(contact)
-    if not email and not phone:
-        return {"ok": False, "error": "GHL contact has no email or phone to match Jobber client", "ghl_contact_id": ghl_contact_id}
+    if not jobber_client_id:
+        email, phone = ghl_contact_email_and_phone(contact)
+        if not email and not phone:
+            return {"ok": False, "error": "GHL contact has no email or phone to match Jobber client", "ghl_contact_id": ghl_contact_id}
 
-    resolved = resolve_jobber_client_for_ghl_contact(ghl_contact_id, email, phone)
-    if not resolved.get("ok"):
-        return {"ok": False, "error": resolved.get("error"), "ghl_contact_id": ghl_contact_id}
+        resolved = resolve_jobber_client_for_ghl_contact(ghl_contact_id, email, phone)
+        if not resolved.get("ok"):
+            return {"ok": False, "error": resolved.get("error"), "ghl_contact_id": ghl_contact_id}
 
-    jobber_client_id = resolved.get("jobber_client_id")
+        jobber_client_id = resolved.get("jobber_client_id")
 
     st = _get_state(jobber_client_id)
     if st and st.last_sync_source == "jobber" and st.last_ghl_tag_signature == ghl_sig:
         return {"ok": True, "skipped": True, "reason": "echo_from_jobber_sync", "jobber_client_id": jobber_client_id, "ghl_contact_id": ghl_contact_id}
 
-    jb_existing, je = list_client_tag_names(jobber_client_id)
+    client, je = get_client_for_tag_sync(jobber_client_id)
     if je:
         return {"ok": False, "error": je, "jobber_client_id": jobber_client_id}
+    jb_existing, _label_to_id = client_tag_state(client)
 
     preserve_j = _jobber_preserve_tags()
     kept_j = [t for t in jb_existing if t.lower() in preserve_j]
@@ -190,19 +195,24 @@ def sync_ghl_contact_tags_to_jobber(ghl_contact_id, tag_names_from_payload=None)
     ghl_for_jobber = [t for t in ghl_tags if t.lower() not in preserve_ghl]
     merged_j = sorted(set(kept_j) | set(ghl_for_jobber))
 
-    ok, uerr = set_client_tags_by_names(jobber_client_id, merged_j)
-    if not ok:
+    applied, uerr = apply_client_tag_names(jobber_client_id, merged_j, client=client)
+    if uerr:
         return {"ok": False, "error": uerr, "jobber_client_id": jobber_client_id, "ghl_contact_id": ghl_contact_id}
-
-    jb_after, je2 = list_client_tag_names(jobber_client_id)
-    if je2:
-        jb_after = merged_j
+    jb_after = applied["tags"]
 
     _save_state_ghl_to_jobber(jobber_client_id, ghl_contact_id, ghl_tags, jb_after)
-    logger.info("Synced GHL→Jobber tags client=%s contact=%s count=%s", jobber_client_id, ghl_contact_id, len(merged_j))
+    logger.info(
+        "Synced GHL→Jobber tags client=%s contact=%s count=%s added=%s removed=%s",
+        jobber_client_id,
+        ghl_contact_id,
+        len(merged_j),
+        applied["added"],
+        applied["removed"],
+    )
     return {
         "ok": True,
         "jobber_client_id": jobber_client_id,
         "ghl_contact_id": ghl_contact_id,
         "tags": merged_j,
+        "changed": applied["changed"],
     }
@@ -0,0 +1,161 @@
+"""
+Periodic Celery jobs for jobber_app.
+
+import_ghl_contacts_to_mirror walks every GHL contact page (startAfter/startAfterId cursor)
+and bulk-upserts each page into the local contact mirror (accounts.Contact), so identity
+lookups can skip live GHL searches.
+
+flush_hub_outbox delivers queued lock-in Hub writes (jobber_app.lock_in.outbox).
+
+sync_coalesced_jobber_webhook / sync_due_jobber_webhooks run debounced VISIT_* / CLIENT_*
+webhook bursts (jobber_app.webhook_coalesce).
+
+reconcile_jobber_ghl_tags_nightly repairs Jobber ↔ GHL tag drift (jobber_app.tag_reconcile).
+
+prune_outbound_call_log drops outbound call ledger rows past retention (jobber_app.call_ledger).
+
+process_jobber_quote_approved / process_jobber_visit_complete run the lock-in webhooks off the
+request (Hub + Jobber + GHL calls); failures retry here instead of via a Jobber redelivery.
+confirm_jobber_visit_complete runs Stage 2 once that visit's queued Hub upsert has settled.
+"""
+import logging
+import time
+
+from celery import shared_task
+
+from accounts.contact_mirror import upsert_contacts_from_ghl
+
+from .ghl_contacts import _get_credentials, _location_id, list_contacts_page
+
+logger = logging.getLogger(__name__)
+
+LOCK_IN_MAX_RETRIES = 8
+
+
+def _lock_in_retry_seconds(retries):
+    """30s, 1m, 2m, ... capped at 1h (same curve as the Hub outbox)."""
+    return min(30 * (2 ** retries), 3600)
+
+
+def import_ghl_contacts(*, page_size=100, max_pages=None, sleep_seconds=0.0):
+    """
+    Paginated GHL → mirror import. Returns dict: { ok, pages, contacts, error? }.
+    Stops at the last page, at max_pages, or on the first API error (rows already written stay).
+    """
+    location_id = _location_id(_get_credentials())
+    if not location_id:
+        return {"ok": False, "pages": 0, "contacts": 0, "error": "GHL_LOCATION_ID or credentials.location_id required"}
+
+    pages = 0
+    written = 0
+    cursor = {}
+    while max_pages is None or pages < max_pages:
+        contacts, next_cursor, err = list_contacts_page(location_id, limit=page_size, **cursor)
+        if err:
+            logger.warning("GHL contact mirror import stopped after %s pages: %s", pages, err)
+            return {"ok": False, "pages": pages, "contacts": written, "error": err}
+        pages += 1
+        written += upsert_contacts_from_ghl(contacts, location_id)
+        if not next_cursor or len(contacts) < page_size:
+            break
+        cursor = next_cursor
+        if sleep_seconds:
+            time.sleep(sleep_seconds)
+
+    logger.info("GHL contact mirror import: %s contacts in %s pages", written, pages)
+    return {"ok": True, "pages": pages, "contacts": written}
+
+
+@shared_task
+def import_ghl_contacts_to_mirror(page_size=100, max_pages=None):
+    return import_ghl_contacts(page_size=page_size, max_pages=max_pages, sleep_seconds=0.2)
+
+
+@shared_task
+def flush_hub_outbox(limit=200):
+    from .lock_in.outbox import flush_outbox
+
+    return flush_outbox(limit=limit)
+
+
+@shared_task
+def sync_coalesced_jobber_webhook(family, item_id):
+    from .webhook_coalesce import run_coalesced
+
+    result = run_coalesced(family, item_id)
+    if result.get("reason") == "not_due":
+        # More events slid the window; run again when the burst settles.
+        sync_coalesced_jobber_webhook.apply_async(args=[family, item_id], countdown=result["retry_in"])
+    return result
+
+
+@shared_task
+def sync_due_jobber_webhooks():
+    from .webhook_coalesce import run_due_coalesced
+
+    return run_due_coalesced()
+
+
+@shared_task
+def reconcile_jobber_ghl_tags_nightly():
+    from .tag_reconcile import reconcile_tags
+
+    # Continues last night's run if it was interrupted; otherwise starts a new one.
+    return reconcile_tags(resume=True)
+
+
+@shared_task
+def prune_outbound_call_log():
+    from .call_ledger import prune
+
+    return {"deleted": prune()}
+
+
+@shared_task(bind=True, max_retries=LOCK_IN_MAX_RETRIES)
+def process_jobber_quote_approved(self, quote_id):
+    from .lock_in import process_quote_approved
+
+    result = process_quote_approved(quote_id)
+    logger.warning("Jobber lock-in stage1: quote_id=%s result=%s", quote_id, result)
+    if not result.get("ok"):
+        raise self.retry(countdown=_lock_in_retry_seconds(self.request.retries))
+    return result
+
+
+@shared_task(bind=True, max_retries=LOCK_IN_MAX_RETRIES)
+def process_jobber_visit_complete(self, visit_id):
+    from .visit_complete import handle_visit_complete
+
+    outcome = handle_visit_complete(visit_id)
+    logger.warning(
+        "Jobber lock-in visit_complete: visit_id=%s result=%s feedback=%s",
+        visit_id,
+        outcome["lock_in"],
+        outcome["ghl_visit_completed"],
+    )
+    if not (outcome["lock_in"].get("ok") and outcome["ghl_visit_completed"].get("ok")):
+        # Both branches are idempotent (deduped visit upsert, one-shot GHL trigger).
+        raise self.retry(countdown=_lock_in_retry_seconds(self.request.retries))
+    return outcome
+
+
+@shared_task(bind=True, max_retries=None)
+def confirm_jobber_visit_complete(self, visit, outbox_id, attempts=0):
+    """
+    Stage 2 confirm/expire for a completed visit, after its Hub visit upsert (outbox row
+    ``outbox_id``) is sent or has given up, so the Hub sees the visit before the confirm.
+    """
+    from .lock_in.outbox import settle_wait_seconds
+    from .lock_in.stage2 import process_visit_complete_confirm
+
+    wait = settle_wait_seconds(outbox_id)
+    if wait is not None:
+        # Bounded by the outbox's own MAX_ATTEMPTS.
+        raise self.retry(countdown=wait)
+    result = process_visit_complete_confirm(visit, upserted={"queued": True, "outbox_id": outbox_id})
+    logger.warning("Jobber lock-in stage2: visit_id=%s result=%s", visit.get("id"), result)
+    if not result.get("ok"):
+        if attempts >= LOCK_IN_MAX_RETRIES:
+            return result
+        raise self.retry(args=[visit, outbox_id, attempts + 1], countdown=_lock_in_retry_seconds(attempts))
+    return result
@@ -188,3 +188,574 @@ class VisitCompleteGhlFeedbackTests(SimpleTestCase):
         self.assertEqual(args[1][0]["id"], "nX55NHpRyzOnQkkvdHOK")
         self.assertEqual(args[1][0]["field_value"], "yes")
 
+
+
+class JobberClientTagDiffTests(SimpleTestCase):
+    def _client(self, *labels):
+        return {
+            "id": "c1",
+            "tags": {"nodes": [{"id": f"t-{l.lower()}", "label": l} for l in labels]},
+        }
+
+    @patch("jobber_app.client.get_account_tag_name_to_id", return_value={"vip": "t-vip", "weekly": "t-weekly"})
+    @patch("jobber_app.client._request")
+    def test_unchanged_tags_skip_mutation(self, request, _account):
+        from jobber_app.client import apply_client_tag_names
+
+        result, err = apply_client_tag_names("c1", ["VIP", "Weekly"], client=self._client("VIP", "Weekly"))
+        self.assertIsNone(err)
+        self.assertFalse(result["changed"])
+        request.assert_not_called()
+
+    @patch("jobber_app.client.get_account_tag_name_to_id", return_value={"vip": "t-vip", "weekly": "t-weekly"})
+    @patch("jobber_app.client._request")
+    def test_diff_sends_single_mutation(self, request, _account):
+        from jobber_app.client import apply_client_tag_names
+
+        request.return_value = (
+            {"clientUpdate": {"client": self._client("Weekly"), "userErrors": []}},
+            None,
+        )
+        result, err = apply_client_tag_names("c1", ["Weekly"], client=self._client("VIP"))
+        self.assertIsNone(err)
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["tags"], ["Weekly"])
+        self.assertEqual(result["removed"], ["vip"])
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(request.call_args[0][1]["input"]["tagIds"], ["t-weekly"])
+
+    @patch("jobber_app.client._fetch_account_tag_name_to_id", return_value={"vip": "t-vip"})
+    def test_account_tags_cached(self, fetch):
+        from django.core.cache import cache
+        from jobber_app.client import JOBBER_ACCOUNT_TAGS_CACHE_KEY, get_account_tag_name_to_id
+
+        cache.delete(JOBBER_ACCOUNT_TAGS_CACHE_KEY)
+        self.assertEqual(get_account_tag_name_to_id(), {"vip": "t-vip"})
+        self.assertEqual(get_account_tag_name_to_id(), {"vip": "t-vip"})
+        self.assertEqual(fetch.call_count, 1)
+        get_account_tag_name_to_id(force_refresh=True)
+        self.assertEqual(fetch.call_count, 2)
+
+    @patch("jobber_app.client._fetch_account_tag_name_to_id", return_value={"vip": "t-vip"})
+    def test_unknown_tag_reloads_catalog_once_per_ttl(self, fetch):
+        from django.core.cache import cache
+        from jobber_app.client import (
+            JOBBER_ACCOUNT_TAGS_CACHE_KEY,
+            JOBBER_ACCOUNT_TAGS_MISS_REFRESH_KEY,
+            _resolve_tag_ids,
+        )
+
+        cache.delete_many([JOBBER_ACCOUNT_TAGS_CACHE_KEY, JOBBER_ACCOUNT_TAGS_MISS_REFRESH_KEY])
+        for _ in range(3):
+            tag_ids, _map = _resolve_tag_ids(["VIP", "GHL only"], {})
+            self.assertEqual(tag_ids, ["t-vip"])
+        # Initial load plus a single forced reload for the unknown name.
+        self.assertEqual(fetch.call_count, 2)
+
+
+class GhlContactMirrorLookupTests(SimpleTestCase):
+    def test_normalize_phone_e164(self):
+        from accounts.contact_mirror import normalize_phone_e164
+
+        self.assertEqual(normalize_phone_e164("(514) 555-0100"), "+15145550100")
+        self.assertEqual(normalize_phone_e164("+1 514 555 0100"), "+15145550100")
+        self.assertEqual(normalize_phone_e164("+44 20 7946 0958"), "+442079460958")
+        self.assertEqual(normalize_phone_e164("123"), "")
+
+    @patch("jobber_app.ghl_contacts.search_contacts_by_query")
+    @patch("jobber_app.ghl_contacts.find_mirrored_contact_id", return_value="ghl-1")
+    def test_mirror_hit_skips_search(self, mirrored, search):
+        from jobber_app.ghl_contacts import find_ghl_contact_id_for_jobber_client
+
+        client = {"emails": [{"address": "Jane@Example.com"}], "phones": []}
+        contact_id, err = find_ghl_contact_id_for_jobber_client(client, "loc-1")
+        self.assertEqual((contact_id, err), ("ghl-1", None))
+        search.assert_not_called()
+        mirrored.assert_called_once_with("loc-1", email="Jane@Example.com", phone=None)
+
+    @patch("jobber_app.ghl_contacts.search_contacts_by_query", return_value=({"id": "ghl-2"}, None))
+    @patch("jobber_app.ghl_contacts.find_mirrored_contact_id", return_value=None)
+    def test_mirror_miss_falls_back_to_search(self, _mirrored, search):
+        from jobber_app.ghl_contacts import find_ghl_contact_id_for_jobber_client
+
+        client = {"emails": [], "phones": [{"number": "514-555-0100"}]}
+        contact_id, err = find_ghl_contact_id_for_jobber_client(client, "loc-1")
+        self.assertEqual((contact_id, err), ("ghl-2", None))
+        search.assert_called_once_with("loc-1", "514-555-0100")
+
+
+class JobberClientDirectoryTests(SimpleTestCase):
+    def test_lookup_key_normalization(self):
+        from jobber_app.client_directory import address_key, phone_digits
+
+        self.assertEqual(phone_digits("+1 (514) 555-0100"), "5145550100")
+        self.assertEqual(phone_digits("514.555.0100"), "5145550100")
+        self.assertEqual(phone_digits("12"), "")
+        self.assertEqual(address_key("12 Main St.", "h2x 1y4"), "12 main st|H2X1Y4")
+        self.assertEqual(address_key("", "H2X1Y4"), "")
+
+    def test_partial_nodes_only_replace_present_kinds(self):
+        from jobber_app.client_directory import _client_keys
+
+        keys = _client_keys({"id": "c1", "emails": [{"address": "Jane@Example.com"}], "phones": []})
+        self.assertEqual(keys, {"email": {("jane@example.com", "")}, "phone": set()})
+
+        keys = _client_keys(
+            {
+                "id": "c1",
+                "clientProperties": {"nodes": [{"id": "p1", "address": {"street1": "12 Main St", "postalCode": "H2X 1Y4"}}]},
+            }
+        )
+        self.assertEqual(keys, {"address": {("12 main st|H2X1Y4", "p1")}})
+
+    @patch("jobber_app.jobber_client_resolve.search_clients")
+    @patch("jobber_app.jobber_client_resolve.find_directory_client")
+    @patch("jobber_app.jobber_client_resolve.GhlContactJobberClientMap")
+    def test_directory_hit_skips_search(self, client_map, find, search):
+        from jobber_app.jobber_client_resolve import resolve_jobber_client_for_ghl_contact
+
+        client_map.objects.filter.return_value.first.return_value = None
+        find.return_value = MagicMock(jobber_client_id="jc-1")
+        result = resolve_jobber_client_for_ghl_contact("g1", "jane@example.com", "5145550100")
+        self.assertEqual(result["jobber_client_id"], "jc-1")
+        self.assertEqual(result["match_source"], "client_directory")
+        search.assert_not_called()
+
+
+class LockInStage1FanoutTests(SimpleTestCase):
+    @patch("jobber_app.lock_in.stage1.outbox")
+    @patch("jobber_app.lock_in.stage1.ghl_sms")
+    @patch("jobber_app.lock_in.stage1.hub_client")
+    @patch("jobber_app.lock_in.stage1.jobber")
+    def test_pipeline_batches_visits_and_fans_out_sms(self, jobber, hub, ghl_sms, outbox):
+        from jobber_app.lock_in import stage1
+
+        jobber.get_quote.return_value = ({"id": "q1", "client": {"id": "c1", "name": "Jane"}}, None)
+        jobber.get_client_jobs.return_value = (
+            [
+                {"id": "j1", "title": "First Cleaning"},
+                {"id": "j2", "title": "First Cleaning - Kitchen"},
+                {"id": "jr", "title": "Weekly Recurring"},
+            ],
+            None,
+        )
+        jobber.get_jobs_visits_with_assignees.return_value = (
+            {
+                "j1": {"visits": {"nodes": [{"id": "v1", "assignedUsers": {"nodes": [{"id": "u1"}]}}]}},
+                "j2": {"visits": {"nodes": [{"id": "v2", "assignedUsers": {"nodes": [{"id": "u2"}]}}]}},
+            },
+            [],
+        )
+        jobber.list_job_visits.return_value = ([], None)
+        hub.HubLockInError = Exception
+        hub.list_visits.return_value = []
+        hub.create_pending.return_value = {
+            "created": True,
+            "pending": {
+                "id": "p1",
+                "bonuses": [
+                    {"id": "b1", "amount": "50", "technician": {"id": "t1", "phone": "+15145550101", "ghl_id": "g1"}},
+                    {"id": "b2", "amount": "50", "technician": {"id": "t2", "phone": "+15145550102", "ghl_id": "g2"}},
+                ],
+            },
+        }
+        ghl_sms.resolve_staff_contact.side_effect = lambda **kw: (kw["existing_ghl_id"], None)
+        ghl_sms.send_sms.return_value = ({}, None)
+
+        out = stage1.process_quote_approved("q1")
+
+        self.assertTrue(out["created"])
+        jobber.get_jobs_visits_with_assignees.assert_called_once_with(["j1", "j2"])
+        self.assertEqual(hub.create_pending.call_args[0][0]["technician_jobber_ids"], ["u1", "u2"])
+        self.assertEqual([r["technician_id"] for r in out["sms"]], ["t1", "t2"])
+        self.assertEqual(ghl_sms.send_sms.call_count, 2)
+        for step in ("jobber_quote", "jobber_client_jobs", "jobber_job_visits", "hub_create_pending", "sms", "total"):
+            self.assertIn(step, out["timings_ms"])
+
+
+class HubOutboxFlushTests(SimpleTestCase):
+    def _msg(self, pk, operation, payload):
+        return MagicMock(id=pk, operation=operation, payload=payload, attempts=0, dedupe_key=f"k{pk}")
+
+    @patch("jobber_app.lock_in.outbox._mark_failed")
+    @patch("jobber_app.lock_in.outbox._mark_sent")
+    @patch("jobber_app.lock_in.outbox._claim")
+    @patch("jobber_app.lock_in.outbox.hub_client")
+    def test_groups_bulk_writes_and_retries_failures(self, hub, claim, mark_sent, mark_failed):
+        from jobber_app.lock_in import outbox
+
+        hub.HubLockInError = RuntimeError
+        hub.bulk_api_enabled.return_value = True
+        hub.set_user_ghl_id.side_effect = RuntimeError("hub down")
+        visits = [
+            self._msg(1, outbox.OP_UPSERT_VISIT, {"jobber_visit_id": "v1"}),
+            self._msg(2, outbox.OP_UPSERT_VISIT, {"jobber_visit_id": "v2"}),
+        ]
+        ghl = self._msg(3, outbox.OP_SET_USER_GHL_ID, {"user_id": 7, "ghl_id": "g7"})
+        claim.return_value = (visits + [ghl], "lease")
+
+        result = outbox.flush_outbox()
+
+        self.assertEqual(result, {"sent": 2, "failed": 1})
+        hub.upsert_visits.assert_called_once_with([{"jobber_visit_id": "v1"}, {"jobber_visit_id": "v2"}])
+        hub.upsert_visit.assert_not_called()
+        mark_sent.assert_called_once_with(visits, "lease")
+        self.assertEqual(mark_failed.call_args[0][0], ghl)
+
+    def test_backoff_is_capped(self):
+        from jobber_app.lock_in.outbox import _backoff
+
+        self.assertEqual(_backoff(1), timedelta(seconds=30))
+        self.assertEqual(_backoff(3), timedelta(seconds=120))
+        self.assertEqual(_backoff(20), timedelta(hours=1))
+
+
+class VisitCompleteOrchestratorTests(SimpleTestCase):
+    @patch("jobber_app.visit_complete.process_visit_complete_ghl_feedback")
+    @patch("jobber_app.visit_complete.process_visit_complete")
+    @patch("jobber_app.visit_complete.lock_in_jobber")
+    def test_fetches_visit_once_for_both_branches(self, jobber, lock_in, feedback):
+        from jobber_app.visit_complete import handle_visit_complete
+
+        visit = _feedback_visit()
+        jobber.get_visit_complete.return_value = (visit, None)
+        lock_in.return_value = {"ok": True}
+        feedback.return_value = {"ok": True, "ghl_contact_id": "ghl-1"}
+
+        out = handle_visit_complete("v-1")
+
+        jobber.get_visit_complete.assert_called_once_with("v-1")
+        lock_in.assert_called_once_with("v-1", prefetched=(visit, None))
+        feedback.assert_called_once_with("v-1", prefetched=(visit, None))
+        self.assertEqual(out["lock_in"], {"ok": True})
+        self.assertEqual(out["ghl_visit_completed"]["ghl_contact_id"], "ghl-1")
+        self.assertIn("total", out["timings_ms"])
+
+    def test_prefetched_fetch_error_keeps_feedback_shape(self):
+        from jobber_app.visit_complete_ghl import process_visit_complete_ghl_feedback
+
+        qs = MagicMock()
+        qs.exists.return_value = False
+        with patch(
+            "jobber_app.visit_complete_ghl.get_visit_for_ghl_feedback"
+        ) as fetch, patch(
+            "jobber_app.visit_complete_ghl.JobberVisitCompletedGhlTrigger.objects"
+        ) as objects:
+            objects.filter.return_value = qs
+            out = process_visit_complete_ghl_feedback("v-2", prefetched=(None, "Throttled"))
+        fetch.assert_not_called()
+        self.assertEqual(out, {"ok": False, "error": "Throttled", "jobber_visit_id": "v-2"})
+
+
+class LockInQueueTests(SimpleTestCase):
+    def test_visit_complete_webhook_is_acknowledged_once_queued(self):
+        import json
+
+        from django.test import RequestFactory
+
+        from jobber_app.views import JobberWebhookView
+
+        body = {"data": {"webHookEvent": {"topic": "VISIT_COMPLETE", "itemId": "v-1"}}}
+        request = RequestFactory().post("/jobber/webhook/", data=json.dumps(body), content_type="application/json")
+        with patch("jobber_app.views.config", return_value=""), patch(
+            "jobber_app.tasks.process_jobber_visit_complete.delay"
+        ) as delay, patch("jobber_app.visit_complete.handle_visit_complete") as inline:
+            response = JobberWebhookView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["queued"])
+        delay.assert_called_once_with("v-1")
+        inline.assert_not_called()
+
+    @patch("jobber_app.lock_in.visits.transaction")
+    @patch("jobber_app.lock_in.visits.outbox")
+    @patch("jobber_app.lock_in.stage2.hub_client")
+    def test_confirm_is_queued_after_visit_upsert(self, hub, outbox, transaction):
+        from jobber_app.lock_in.visits import process_visit_complete
+
+        visit = {"id": "v-1", "title": "Weekly", "client": {"id": "c1", "name": "Ann"}, "job": {"id": "j1"}}
+        outbox.enqueue_visit_upsert.return_value = MagicMock(id=7)
+
+        out = process_visit_complete("v-1", prefetched=(visit, None))
+
+        self.assertEqual(out["confirm"], {"queued": True})
+        hub.lookup_pending.assert_not_called()
+        on_commit = transaction.on_commit.call_args[0][0]
+        with patch("jobber_app.tasks.confirm_jobber_visit_complete.delay") as delay:
+            on_commit()
+        delay.assert_called_once_with(visit, 7)
+
+    def test_confirm_waits_for_pending_visit_upsert(self):
+        from jobber_app.tasks import confirm_jobber_visit_complete
+
+        visit = {"id": "v-1"}
+        with patch("jobber_app.lock_in.outbox.settle_wait_seconds", return_value=40), patch(
+            "jobber_app.lock_in.stage2.process_visit_complete_confirm"
+        ) as confirm, patch.object(confirm_jobber_visit_complete, "retry", side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaises(RuntimeError):
+                confirm_jobber_visit_complete(visit, 7)
+        confirm.assert_not_called()
+        self.assertEqual(retry.call_args.kwargs["countdown"], 40)
+
+        with patch("jobber_app.lock_in.outbox.settle_wait_seconds", return_value=None), patch(
+            "jobber_app.lock_in.stage2.process_visit_complete_confirm", return_value={"ok": True, "confirmed": True}
+        ) as confirm:
+            self.assertEqual(confirm_jobber_visit_complete(visit, 7), {"ok": True, "confirmed": True})
+        confirm.assert_called_once_with(visit, upserted={"queued": True, "outbox_id": 7})
+
+
+class JobberWebhookCoalesceTests(SimpleTestCase):
+    def test_uncoalesced_topic_is_handled_inline(self):
+        from jobber_app.webhook_coalesce import coalesce_event
+
+        self.assertIsNone(coalesce_event("JOB_CREATE", "j1"))
+        with patch("jobber_app.webhook_coalesce.window_seconds", return_value=0):
+            self.assertIsNone(coalesce_event("VISIT_UPDATE", "v1"))
+
+    @patch("jobber_app.webhook_coalesce.transaction")
+    @patch("jobber_app.webhook_coalesce.JobberWebhookCoalesce.objects")
+    def test_burst_schedules_one_sync(self, objects, transaction):
+        from jobber_app.webhook_coalesce import coalesce_event
+
+        row = MagicMock(pending=False, pending_events=0, events_total=0)
+        objects.select_for_update.return_value.get_or_create.return_value = (row, True)
+
+        coalesce_event("VISIT_UPDATE", "v1")
+        coalesce_event("VISIT_UPDATE", "v1")
+        out = coalesce_event("VISIT_CREATE", "v1")
+
+        self.assertEqual(out["pending_events"], 3)
+        self.assertEqual(row.events_total, 3)
+        self.assertEqual(transaction.on_commit.call_count, 1)
+
+    @patch("jobber_app.webhook_coalesce.transaction")
+    @patch("jobber_app.webhook_coalesce.JobberWebhookCoalesce.objects")
+    def test_due_burst_syncs_final_state_once(self, objects, transaction):
+        from jobber_app import webhook_coalesce
+
+        row = MagicMock(pending=True, pending_events=4, syncs_total=0, due_at=timezone.now() - timedelta(seconds=1))
+        objects.select_for_update.return_value.filter.return_value.first.return_value = row
+        handler = MagicMock(return_value={"ok": True})
+        with patch.dict(webhook_coalesce._HANDLERS, {"visit": handler}):
+            out = webhook_coalesce.run_coalesced("visit", "v1")
+        handler.assert_called_once_with("v1")
+        self.assertEqual(out["collapsed"], 3)
+        self.assertFalse(row.pending)
+        self.assertEqual(row.syncs_total, 1)
+
+
+class TagReconcileDriftTests(SimpleTestCase):
+    def _client(self, cid, *labels, email="jane@example.com"):
+        return {
+            "id": cid,
+            "emails": [{"address": email}],
+            "phones": [],
+            "tags": {"nodes": [{"id": f"t-{label}", "label": label} for label in labels]},
+        }
+
+    def _index(self, tags_by_contact, by_email=None):
+        index = MagicMock()
+        index.tags = tags_by_contact
+        index.match.side_effect = lambda client: (by_email or {}).get(client["emails"][0]["address"])
+        return index
+
+    def test_ignores_preserved_ghl_tags_and_counts_unmatched(self):
+        from jobber_app.tag_reconcile import find_drift
+
+        index = self._index({"g1": ["VIP", "quote sent"]}, {"jane@example.com": "g1"})
+        clients = [self._client("c1", "VIP"), self._client("c2", "VIP", email="nobody@example.com")]
+
+        drift, in_sync, unmatched = find_drift(clients, index, {}, {}, {"quote sent"})
+
+        self.assertEqual(drift, [])
+        self.assertEqual((in_sync, unmatched), (1, 1))
+
+    def test_direction_follows_the_side_that_changed(self):
+        from jobber_app.tag_reconcile import DIRECTION_GHL_TO_JOBBER, DIRECTION_JOBBER_TO_GHL, find_drift
+        from jobber_app.tag_sync import _signature
+
+        index = self._index({"g1": ["VIP", "Pets"], "g2": ["VIP"]})
+        state = MagicMock(
+            ghl_contact_id="g1",
+            last_jobber_tag_signature=_signature(["VIP"]),
+            last_ghl_tag_signature=_signature(["VIP"]),
+        )
+        clients = [self._client("c1", "VIP"), self._client("c2", "VIP", "Weekly")]
+
+        drift, _, _ = find_drift(clients, index, {"c2": "g2"}, {"c1": state}, set())
+
+        self.assertEqual(
+            drift,
+            [
+                {"jobber_client_id": "c1", "ghl_contact_id": "g1", "direction": DIRECTION_GHL_TO_JOBBER},
+                {"jobber_client_id": "c2", "ghl_contact_id": "g2", "direction": DIRECTION_JOBBER_TO_GHL},
+            ],
+        )
+
+    @patch("jobber_app.tag_reconcile._jobber_preserve_tags", return_value={"Internal"})
+    @patch("jobber_app.tag_reconcile._ghl_preserve_tags", return_value={"quote sent"})
+    def test_jobber_only_preserved_tags_are_not_drift(self, _ghl_preserve, _jobber_preserve):
+        from jobber_app.tag_reconcile import comparison_preserve_tags, find_drift
+
+        index = self._index({"g1": ["VIP", "quote sent"]}, {"jane@example.com": "g1"})
+        preserve = comparison_preserve_tags()
+        drift, in_sync, _ = find_drift([self._client("c1", "VIP", "Internal")], index, {}, {}, preserve)
+
+        self.assertEqual((drift, in_sync), ([], 1))
+
+    @patch("jobber_app.tag_reconcile.sync_ghl_contact_tags_to_jobber")
+    @patch("jobber_app.tag_reconcile.sync_jobber_client_tags_to_ghl")
+    def test_repairs_use_the_joined_pair_and_count_echo_skips(self, to_ghl, to_jobber):
+        from jobber_app.lock_in.fanout import RateLimiter
+        from jobber_app.tag_reconcile import (
+            DIRECTION_GHL_TO_JOBBER,
+            DIRECTION_JOBBER_TO_GHL,
+            _repairer,
+            tally_repairs,
+        )
+
+        to_ghl.return_value = {"ok": True, "skipped": True, "reason": "echo_from_ghl_sync"}
+        to_jobber.return_value = {"ok": True, "changed": True}
+        repair = _repairer(RateLimiter(0))
+
+        results = [
+            repair({"jobber_client_id": "c1", "ghl_contact_id": "g1", "direction": DIRECTION_JOBBER_TO_GHL}),
+            repair({"jobber_client_id": "c2", "ghl_contact_id": "g2", "direction": DIRECTION_GHL_TO_JOBBER}),
+            {"ok": False, "error": "boom"},
+        ]
+
+        to_ghl.assert_called_once_with("c1", ghl_contact_id="g1")
+        to_jobber.assert_called_once_with("g2", jobber_client_id="c2")
+        self.assertEqual(tally_repairs(results), (1, 1, 1))
+
+
+class BulkExecutorTests(SimpleTestCase):
+    @patch("jobber_app.bulk_executor._journal")
+    @patch("jobber_app.bulk_executor.completed_keys", return_value={"a"})
+    def test_resume_skips_done_items_and_retries_429(self, completed, journal):
+        from jobber_app.bulk_executor import run_bulk
+
+        sleep = MagicMock()
+        calls = []
+
+        def operation(item):
+            calls.append(item["id"])
+            if item["id"] == "b" and calls.count("b") == 1:
+                return {"ok": False, "error": "GHL API 429: Too many requests"}
+            if item["id"] == "c":
+                return {"ok": False, "error": "GHL API 404: not found"}
+            return {"ok": True, "error": ""}
+
+        seen = []
+        summary = run_bulk(
+            "job",
+            [{"id": "a"}, {"id": "b"}, {"id": "c"}],
+            operation,
+            key=lambda item: item["id"],
+            workers=1,
+            per_second=0,
+            resume=True,
+            on_result=lambda item, result: seen.append((item["id"], result["ok"])),
+            sleep=sleep,
+        )
+
+        self.assertEqual(summary, {"total": 3, "skipped": 1, "succeeded": 1, "failed": 1, "rate_limited": 1})
+        self.assertEqual(calls, ["b", "b", "c"])
+        self.assertEqual(seen, [("b", True), ("c", False)])
+        self.assertEqual(journal.call_count, 2)
+        sleep.assert_called_once_with(2)
+
+    def test_rate_limiter_slows_down_and_recovers(self):
+        from jobber_app.bulk_executor import AdaptiveRateLimiter
+
+        limiter = AdaptiveRateLimiter(10)
+        self.assertAlmostEqual(limiter.slow_down(), 0.2)
+        self.assertAlmostEqual(limiter.slow_down(), 0.4)
+        for _ in range(50):
+            limiter.speed_up()
+        self.assertAlmostEqual(limiter._interval, 0.1)
+
+    def test_unlimited_rate_limiter_recovers_to_no_spacing(self):
+        from jobber_app.bulk_executor import AdaptiveRateLimiter
+
+        limiter = AdaptiveRateLimiter(0)
+        self.assertAlmostEqual(limiter.slow_down(), 0.2)
+        for _ in range(50):
+            limiter.speed_up()
+        self.assertEqual(limiter._interval, 0.0)
+
+
+class OutboundCallLedgerTests(SimpleTestCase):
+    def test_operation_name_prefers_graphql_operation(self):
+        from jobber_app.call_ledger import operation_name
+
+        body = b'{"query": "mutation CreateJob($input: JobCreateAttributes!) { jobCreate }"}'
+        self.assertEqual(operation_name("jobber", "graphql", body), "CreateJob")
+        self.assertEqual(operation_name("jobber", "graphql", b'{"query": "{ account { id } }"}'), "graphql")
+        self.assertEqual(operation_name("ghl", "contacts/{id}", b"{}"), "contacts/{id}")
+
+    def test_operation_name_for_multi_line_query(self):
+        import json
+
+        from jobber_app.call_ledger import operation_name
+
+        body = json.dumps({
+            "query": "\n  query ClientTags($id: EncodedId!) {\n    client(id: $id) { tags { nodes { label } } }\n  }\n",
+            "variables": {"id": "c1"},
+        }).encode()
+        self.assertIn(b"\\n", body)
+        self.assertEqual(operation_name("jobber", "api/graphql", body), "ClientTags")
+        self.assertEqual(operation_name("jobber", "api/graphql", b"not json"), "api/graphql")
+
+    def test_sampling_keeps_whole_correlations(self):
+        from jobber_app.call_ledger import sampled
+
+        self.assertTrue(sampled("abc", rate=1.0))
+        self.assertFalse(sampled("abc", rate=0.0))
+        self.assertEqual(sampled("abc", rate=0.5), sampled("abc", rate=0.5))
+
+    @patch("jobber_app.call_ledger.writer")
+    def test_retries_within_a_correlation_count_as_attempts(self, writer):
+        from jobber_app.call_ledger import record
+        from service_backend import correlation
+
+        token = correlation.begin("req-1")
+        try:
+            for _ in range(2):
+                record(
+                    vendor="ghl",
+                    endpoint="contacts/{id}",
+                    method="GET",
+                    body=None,
+                    started=timezone.now(),
+                    duration_ms=5,
+                    status_code=401,
+                )
+        finally:
+            correlation.end(token)
+
+        rows = [c.args[0] for c in writer.add.call_args_list]
+        self.assertEqual([r["attempt"] for r in rows], [1, 2])
+        self.assertEqual({r["correlation_id"] for r in rows}, {"req-1"})
+
+    @patch("jobber_app.call_ledger.writer")
+    def test_distinct_calls_to_one_operation_are_not_retries(self, writer):
+        from jobber_app.call_ledger import record
+        from service_backend import correlation
+
+        token = correlation.begin("req-2")
+        try:
+            for contact_id in ("a1", "b2", "a1"):
+                record(
+                    vendor="ghl",
+                    endpoint="contacts/{id}",
+                    method="GET",
+                    url=f"https://services.leadconnectorhq.com/contacts/{contact_id}",
+                    body=None,
+                    started=timezone.now(),
+                    duration_ms=5,
+                    status_code=200,
+                )
+        finally:
+            correlation.end(token)
+
+        self.assertEqual([c.args[0]["attempt"] for c in writer.add.call_args_list], [1, 1, 2])
@@ -27,6 +27,11 @@ urlpatterns = [
         views.GhlContactTagsWebhookView.as_view(),
         name="ghl-contact-tags-webhook",
     ),
+    path(
+        "webhooks/ghl/contact-mirror/",
+        views.GhlContactMirrorWebhookView.as_view(),
+        name="ghl-contact-mirror-webhook",
+    ),
     path(
         "webhooks/ghl/contact-note/",
         views.GhlContactNoteWebhookView.as_view(),
@@ -52,4 +57,9 @@ urlpatterns = [
         views.GhlCalendarSyncFromJobberView.as_view(),
         name="ghl-calendar-sync-from-jobber",
     ),
+    path(
+        "admin/outbound-calls/",
+        views.OutboundCallLogView.as_view(),
+        name="outbound-call-log",
+    ),
 ]
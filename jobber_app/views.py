@@ -10,7 +10,7 @@ from datetime import timezone as dt_timezone
 from decimal import Decimal
 
 from decouple import config
-from django.db.models import Sum
+from django.db.models import Avg, Count, Max, Q, Sum
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 from rest_framework import status
@@ -18,7 +18,10 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
+from accounts.contact_mirror import delete_mirrored_contact, upsert_contact_from_ghl
 from quote_app.models import CustomerPackageQuote, CustomerSubmission
+from service_app.views import IsAdminPermission
+from service_backend.metrics import observe_webhook
 
 from .booking_schedule import (
     booking_window_from_payload,
@@ -38,7 +41,14 @@ from .client import (
     create_property_for_client,
     get_job_visits,
 )
-from .models import GhlAppointmentJobberJobMap, JobberTaskIdempotency
+from .client_directory import (
+    add_directory_property,
+    find_directory_client,
+    record_client_directory,
+    refresh_client_directory,
+    remove_client_directory,
+)
+from .models import GhlAppointmentJobberJobMap, JobberTaskIdempotency, JobberWebhookCoalesce, OutboundCallLog
 from .sync_ghl_calendar import (
     delete_jobber_visit_from_ghl_blocks,
     sync_jobber_job_to_ghl_blocks,
@@ -48,6 +58,7 @@ from .sync_ghl_calendar import (
 from .contact_sync import sync_ghl_contact_to_jobber
 from .note_sync import sync_ghl_note_to_jobber
 from .tag_sync import sync_ghl_contact_tags_to_jobber, sync_jobber_client_tags_to_ghl
+from .webhook_coalesce import cancel_pending, coalesce_event
 
 try:
     from zoneinfo import ZoneInfo
@@ -1012,24 +1023,39 @@ def execute_booking_confirm(data, calendar_obj=None):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-    search_term = email or phone
-    nodes, _, err = search_clients(search_term, first=5)
-    if err:
-        return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
     client_id = None
     client_created = False
-    if nodes:
-        client_id = nodes[0].get("id")
+    prop_id = None
+    # Local client directory first; the properties query doubles as the confirming call.
+    listed = find_directory_client(email=email, phone=phone, street1=street1, postal_code=postal_code)
+    if listed:
+        prop_id, _, err = get_client_properties(listed.jobber_client_id)
+        if err == "Client not found":
+            remove_client_directory(listed.jobber_client_id)
+        elif err:
+            return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
+        else:
+            client_id = listed.jobber_client_id
+
     if not client_id:
-        client, err = create_client(first_name, last_name, email=email, phone=phone)
+        search_term = email or phone
+        nodes, _, err = search_clients(search_term, first=5)
         if err:
             return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
-        client_id = client.get("id")
-        client_created = True
+        if nodes:
+            client_id = nodes[0].get("id")
+            record_client_directory(nodes[0])
+        if not client_id:
+            client, err = create_client(first_name, last_name, email=email, phone=phone)
+            if err:
+                return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
+            client_id = client.get("id")
+            client_created = True
+            record_client_directory(client)
 
-    prop_id, _, err = get_client_properties(client_id)
-    if err:
-        return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
+        prop_id, _, err = get_client_properties(client_id)
+        if err:
+            return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
     if not prop_id:
         if not street1 or not city or not province or not postal_code:
             return None, Response(
@@ -1047,6 +1073,7 @@ def execute_booking_confirm(data, calendar_obj=None):
         if err:
             return None, Response({"error": err}, status=status.HTTP_502_BAD_GATEWAY)
         prop_id = prop.get("id")
+        add_directory_property(client_id, prop_id, street1, postal_code)
 
     job_notes = _build_booking_job_notes(data)
     job, err = create_job(
@@ -2135,6 +2162,7 @@ class GhlBookingConfirmedWebhookView(APIView):
 
     permission_classes = [AllowAny]
 
+    @observe_webhook("ghl", "booking_confirmed")
     def post(self, request):
         if not _can_run_ghl_booking_webhook(request):
             logger.warning("GHL booking webhook forbidden: missing/invalid secret header")
@@ -2603,21 +2631,52 @@ def _extract_jobber_webhook_fields(payload):
     return topic, item_id
 
 
+JOBBER_WEBHOOK_TOPICS = (
+    "CLIENT_CREATE",
+    "CLIENT_UPDATE",
+    "CLIENT_DESTROY",
+    "VISIT_CREATE",
+    "VISIT_UPDATE",
+    "VISIT_DESTROY",
+    "VISIT_COMPLETE",
+    "QUOTE_APPROVED",
+    "JOB_CREATE",
+)
+
+
+# Lock-in topics run in Celery (jobber_app.tasks), which retries Hub / Jobber / GHL failures.
+_LOCK_IN_TASKS = {
+    "QUOTE_APPROVED": "process_jobber_quote_approved",
+    "VISIT_COMPLETE": "process_jobber_visit_complete",
+}
+
+
+def _jobber_webhook_metric_topic(request):
+    """Topic label for webhook metrics; unsupported topics share one label."""
+    topic, _ = _extract_jobber_webhook_fields(_parse_webhook_json_payload(request))
+    return topic if topic in JOBBER_WEBHOOK_TOPICS else "unsupported"
+
+
 class JobberWebhookView(APIView):
     """
     POST — Receive Jobber webhook events.
     Core behavior:
-      - CLIENT_CREATE / CLIENT_UPDATE: sync client tags → GHL contact tags
-      - QUOTE_APPROVED: lock-in Stage 1 (Hub pending + GHL potential SMS)
-      - VISIT_COMPLETE: lock-in visit upsert + Stage 2 confirm/expire; GHL Visit Completed?=yes
+      - CLIENT_CREATE / CLIENT_UPDATE: refresh local client directory; sync client tags → GHL contact tags
+      - CLIENT_DESTROY: drop the client from the local client directory
+      - QUOTE_APPROVED: lock-in Stage 1 (Hub pending + GHL potential SMS), queued
+      - VISIT_COMPLETE: lock-in visit upsert, then Stage 2 confirm/expire; GHL Visit Completed?=yes; queued
       - VISIT_CREATE / VISIT_UPDATE: sync that visit to GHL block slots (if block sync enabled)
       - VISIT_DESTROY: delete mapped GHL block slot (if block sync enabled)
       - JOB_CREATE: sync that job's visits to GHL block slots (fallback, if enabled)
 
+    QUOTE_APPROVED / VISIT_COMPLETE are acknowledged once queued; the Celery tasks retry failures.
     Visit → GHL block sync is skipped when JOBBER_GHL_CALENDAR_BLOCK_SYNC_ENABLED=false.
+    CLIENT_CREATE/UPDATE and VISIT_CREATE/UPDATE are debounced per entity (webhook_coalesce):
+    the response only acknowledges the event and one deferred sync handles the burst.
     """
     permission_classes = [AllowAny]
 
+    @observe_webhook("jobber", _jobber_webhook_metric_topic)
     def post(self, request):
         if not _can_run_jobber_webhook(request):
             logger.warning("Jobber webhook forbidden: missing/invalid secret header")
@@ -2642,16 +2701,7 @@ class JobberWebhookView(APIView):
             )
         )
 
-        if topic not in (
-            "CLIENT_CREATE",
-            "CLIENT_UPDATE",
-            "VISIT_CREATE",
-            "VISIT_UPDATE",
-            "VISIT_DESTROY",
-            "VISIT_COMPLETE",
-            "QUOTE_APPROVED",
-            "JOB_CREATE",
-        ):
+        if topic not in JOBBER_WEBHOOK_TOPICS:
             logger.warning("Jobber webhook ignored: unsupported topic=%s payload=%s", topic, payload)
             print("[Jobber webhook] ignored topic=%s payload=%s" % (topic, payload))
             return Response(
@@ -2662,54 +2712,55 @@ class JobberWebhookView(APIView):
             logger.warning("Jobber webhook invalid: missing item id for topic=%s payload=%s", topic, payload)
             return Response({"error": f"Missing itemId for {topic} webhook"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if topic == "QUOTE_APPROVED":
-            from jobber_app.lock_in import process_quote_approved
+        if topic in _LOCK_IN_TASKS:
+            from jobber_app import tasks as jobber_tasks
 
-            result = process_quote_approved(str(item_id))
-            logger.warning("Jobber webhook lock-in stage1: item_id=%s result=%s", item_id, result)
-            status_code = status.HTTP_200_OK if result.get("ok") else status.HTTP_502_BAD_GATEWAY
+            task = getattr(jobber_tasks, _LOCK_IN_TASKS[topic])
+            try:
+                task.delay(str(item_id))
+            except Exception as exc:
+                # Not queued: let Jobber redeliver the event.
+                logger.warning("Jobber webhook lock-in not queued: topic=%s item_id=%s error=%s", topic, item_id, exc)
+                return Response(
+                    {"received": False, "topic": topic, "itemId": str(item_id), "error": "Queue unavailable"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
             return Response(
-                {"received": True, "topic": topic, "itemId": str(item_id), "lock_in": result},
-                status=status_code,
+                {"received": True, "topic": topic, "itemId": str(item_id), "queued": True},
+                status=status.HTTP_200_OK,
             )
 
-        if topic == "VISIT_COMPLETE":
-            from jobber_app.lock_in import process_visit_complete
-            from jobber_app.visit_complete_ghl import process_visit_complete_ghl_feedback
-
-            result = process_visit_complete(str(item_id))
-            feedback = process_visit_complete_ghl_feedback(str(item_id))
-            logger.warning(
-                "Jobber webhook lock-in visit_complete: item_id=%s result=%s feedback=%s",
-                item_id,
-                result,
-                feedback,
+        coalesced = coalesce_event(topic, str(item_id))
+        if coalesced:
+            return Response(
+                {"received": True, "topic": topic, "itemId": str(item_id), "coalesced": coalesced},
+                status=status.HTTP_200_OK,
             )
-            ok = bool(result.get("ok")) and bool(feedback.get("ok"))
-            status_code = status.HTTP_200_OK if ok else status.HTTP_502_BAD_GATEWAY
+
+        if topic == "CLIENT_DESTROY":
+            cancel_pending(JobberWebhookCoalesce.FAMILY_CLIENT, str(item_id))
+            remove_client_directory(str(item_id))
             return Response(
-                {
-                    "received": True,
-                    "topic": topic,
-                    "itemId": str(item_id),
-                    "lock_in": result,
-                    "ghl_visit_completed": feedback,
-                },
-                status=status_code,
+                {"received": True, "topic": topic, "itemId": str(item_id), "directory": {"removed": True}},
+                status=status.HTTP_200_OK,
             )
 
         if topic in ("CLIENT_CREATE", "CLIENT_UPDATE"):
+            directory = refresh_client_directory(str(item_id))
+            if not directory.get("ok"):
+                logger.warning("Jobber client directory refresh failed: item_id=%s result=%s", item_id, directory)
             result = sync_jobber_client_tags_to_ghl(str(item_id))
             logger.warning("Jobber webhook tag_sync result: topic=%s item_id=%s result=%s", topic, item_id, result)
             print("[Jobber webhook] tag_sync topic=%s item_id=%s result=%s" % (topic, item_id, result))
             return Response(
-                {"received": True, "topic": topic, "itemId": str(item_id), "tag_sync": result},
+                {"received": True, "topic": topic, "itemId": str(item_id), "tag_sync": result, "directory": directory},
                 status=status.HTTP_200_OK,
             )
 
         if topic in ("VISIT_CREATE", "VISIT_UPDATE"):
             result = sync_jobber_visit_to_ghl_blocks(str(item_id))
         elif topic == "VISIT_DESTROY":
+            cancel_pending(JobberWebhookCoalesce.FAMILY_VISIT, str(item_id))
             result = delete_jobber_visit_from_ghl_blocks(str(item_id))
         else:
             result = sync_jobber_job_to_ghl_blocks(str(item_id))
@@ -2894,6 +2945,7 @@ class GhlContactSyncWebhookView(APIView):
 
     permission_classes = [AllowAny]
 
+    @observe_webhook("ghl", "contact_sync")
     def post(self, request):
         data = _parse_webhook_json_payload(request)
         contact_id = _extract_ghl_webhook_contact_id(data)
@@ -2931,6 +2983,7 @@ class GhlContactTagsWebhookView(APIView):
     """
     permission_classes = [AllowAny]
 
+    @observe_webhook("ghl", "contact_tags")
     def post(self, request):
         if not _can_run_ghl_tag_sync_webhook(request):
             return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -2956,6 +3009,43 @@ class GhlContactTagsWebhookView(APIView):
         return Response({"received": True, "contactId": str(contact_id), "tag_sync": result}, status=status_code)
 
 
+class GhlContactMirrorWebhookView(APIView):
+    """
+    POST — Native GHL contact webhooks that keep the local contact mirror (accounts.Contact) fresh.
+
+    Subscribe ContactCreate, ContactUpdate, ContactTagUpdate, ContactDndUpdate and ContactDelete:
+      { "type": "ContactUpdate", "locationId": "...", "id": "...", "email": "...", "phone": "...", "tags": [...] }
+
+    Auth: same secret/header as the contact-tags webhook (GHL_TAG_SYNC_WEBHOOK_SECRET).
+    """
+    permission_classes = [AllowAny]
+
+    @observe_webhook("ghl", "contact_mirror")
+    def post(self, request):
+        if not _can_run_ghl_tag_sync_webhook(request):
+            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        data = _parse_webhook_json_payload(request)
+        contact = data.get("contact") if isinstance(data.get("contact"), dict) else data
+        contact_id = str(contact.get("id") or data.get("contactId") or "").strip()
+        event_type = str(data.get("type") or "").strip()
+        if not contact_id:
+            logger.warning(
+                "GHL contact-mirror webhook missing id; type=%s keys=%s",
+                event_type,
+                sorted(data.keys()) if isinstance(data, dict) else [],
+            )
+            return Response({"error": "id required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if event_type == "ContactDelete":
+            delete_mirrored_contact(contact_id)
+            return Response({"received": True, "contactId": contact_id, "deleted": True}, status=status.HTTP_200_OK)
+
+        contact = {**contact, "id": contact_id}
+        mirrored = upsert_contact_from_ghl(contact, str(data.get("locationId") or ""))
+        return Response({"received": True, "contactId": contact_id, "mirrored": mirrored}, status=status.HTTP_200_OK)
+
+
 class GhlContactNoteWebhookView(APIView):
     """
     POST — Forward one GHL CRM contact note to Jobber client notes (internal notes area).
@@ -2969,6 +3059,7 @@ class GhlContactNoteWebhookView(APIView):
 
     permission_classes = [AllowAny]
 
+    @observe_webhook("ghl", "contact_note")
     def post(self, request):
         if not _can_run_ghl_note_sync_webhook(request):
             return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
@@ -3026,3 +3117,68 @@ class JobberClientSyncTagsToGhlView(APIView):
         result = sync_jobber_client_tags_to_ghl(client_id)
         status_code = status.HTTP_200_OK if result.get("ok") or result.get("skipped") else status.HTTP_502_BAD_GATEWAY
         return Response({"tag_sync": result}, status=status_code)
+
+
+class OutboundCallLogView(APIView):
+    """
+    GET — Query the outbound call ledger (jobber_app.call_ledger). Admin only.
+
+    Filters (query params): vendor, operation, correlation_id, status (code, or "error" for
+    transport errors / HTTP >= 400), min_duration_ms, since (ISO datetime; default last 24h), limit.
+    summary=1 groups by vendor + operation instead: calls, errors, avg / max duration, slowest first.
+    """
+    permission_classes = [IsAdminPermission]
+
+    def get(self, request):
+        params = request.query_params
+        since = parse_datetime(params.get("since") or "") if params.get("since") else None
+        if params.get("since") and since is None:
+            return Response({"error": "since must be an ISO datetime"}, status=status.HTTP_400_BAD_REQUEST)
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since, dt_timezone.utc)
+        qs = OutboundCallLog.objects.filter(created_at__gte=since or timezone.now() - timedelta(hours=24))
+
+        for field in ("vendor", "operation", "correlation_id"):
+            if params.get(field):
+                qs = qs.filter(**{field: params[field]})
+        status_filter = (params.get("status") or "").strip()
+        try:
+            if status_filter == "error":
+                qs = qs.filter(Q(status_code__gte=400) | ~Q(error=""))
+            elif status_filter:
+                qs = qs.filter(status_code=int(status_filter))
+            if params.get("min_duration_ms"):
+                qs = qs.filter(duration_ms__gte=int(params["min_duration_ms"]))
+            limit = min(max(int(params.get("limit") or 200), 1), 1000)
+        except ValueError:
+            return Response({"error": "status, min_duration_ms and limit must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if params.get("summary") in ("1", "true"):
+            rows = (
+                qs.values("vendor", "operation")
+                .annotate(
+                    calls=Count("id"),
+                    avg_ms=Avg("duration_ms"),
+                    max_ms=Max("duration_ms"),
+                    retries=Count("id", filter=Q(attempt__gt=1)),
+                    errors=Count("id", filter=Q(status_code__gte=400) | ~Q(error="")),
+                )
+                .order_by("-avg_ms")[:limit]
+            )
+            return Response({"summary": [{**row, "avg_ms": round(row["avg_ms"] or 0)} for row in rows]})
+
+        calls = qs.order_by("-created_at").values(
+            "created_at",
+            "vendor",
+            "operation",
+            "method",
+            "endpoint",
+            "status_code",
+            "error",
+            "duration_ms",
+            "request_bytes",
+            "response_bytes",
+            "correlation_id",
+            "attempt",
+        )[:limit]
+        return Response({"count": len(calls), "calls": list(calls)})
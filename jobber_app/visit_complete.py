@@ -0,0 +1,42 @@
+"""
+Jobber VISIT_COMPLETE orchestrator.
+
+Fetches the visit once (lock_in.jobber.get_visit_complete, a superset of the lock-in and
+GHL feedback queries) and runs the two independent branches side by side:
+  - lock-in: Hub visit upsert (outbox) + Stage 2 confirm/expire + SMS
+  - GHL feedback: resolve contact + set Visit Completed? = yes
+"""
+import logging
+
+from jobber_app.lock_in import jobber as lock_in_jobber
+from jobber_app.lock_in import process_visit_complete
+from jobber_app.lock_in.fanout import StepTimer, run_concurrently
+from jobber_app.visit_complete_ghl import process_visit_complete_ghl_feedback
+
+logger = logging.getLogger(__name__)
+
+
+def handle_visit_complete(visit_id):
+    """
+    Returns dict: { lock_in, ghl_visit_completed, timings_ms } where the first two
+    are the results of process_visit_complete / process_visit_complete_ghl_feedback.
+    """
+    visit_id = str(visit_id or "").strip()
+    timer = StepTimer()
+    prefetched = None
+    if visit_id:
+        with timer.step("fetch_visit"):
+            prefetched = lock_in_jobber.get_visit_complete(visit_id)
+
+    with timer.step("branches"):
+        results = run_concurrently(
+            lock_in=lambda: process_visit_complete(visit_id, prefetched=prefetched),
+            ghl_visit_completed=lambda: process_visit_complete_ghl_feedback(visit_id, prefetched=prefetched),
+        )
+    timings = timer.finish()
+    logger.info("VISIT_COMPLETE visit=%s timings_ms=%s", visit_id, timings)
+    return {
+        "lock_in": results["lock_in"],
+        "ghl_visit_completed": results["ghl_visit_completed"],
+        "timings_ms": timings,
+    }
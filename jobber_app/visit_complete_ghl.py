@@ -13,7 +13,7 @@ from jobber_app.client import get_visit_for_ghl_feedback
 from jobber_app.ghl_contacts import (
     _get_credentials,
     _location_id,
-    find_ghl_contact_for_jobber_client,
+    find_ghl_contact_id_for_jobber_client,
     get_contact_by_id,
     update_contact_custom_fields,
 )
@@ -80,17 +80,13 @@ def _resolve_ghl_contact(client, location_id):
                 err,
             )
 
-    contact, err = find_ghl_contact_for_jobber_client(client or {}, location_id)
-    if err:
-        return None, err
-    if contact and contact.get("id"):
-        return str(contact["id"]), None
-    return None, None
+    return find_ghl_contact_id_for_jobber_client(client or {}, location_id)
 
 
-def process_visit_complete_ghl_feedback(visit_id):
+def process_visit_complete_ghl_feedback(visit_id, prefetched=None):
     """
     Set GHL Visit Completed? to yes for the Jobber visit's client.
+    prefetched: optional (visit, error) already fetched by the VISIT_COMPLETE orchestrator.
 
     Missing GHL contact → ok=True skipped (do not 5xx Jobber).
     Duplicate visit_id → ok=True skipped.
@@ -107,7 +103,7 @@ def process_visit_complete_ghl_feedback(visit_id):
             "jobber_visit_id": visit_id,
         }
 
-    visit, err = get_visit_for_ghl_feedback(visit_id)
+    visit, err = prefetched if prefetched is not None else get_visit_for_ghl_feedback(visit_id)
     if err:
         return {"ok": False, "error": err, "jobber_visit_id": visit_id}
     if not visit:
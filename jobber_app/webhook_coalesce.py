@@ -0,0 +1,192 @@
+"""
+Latest-wins coalescing for bursty Jobber webhooks (JobberWebhookCoalesce).
+
+Dragging a visit around the schedule fires a burst of VISIT_UPDATE for one visit, and bulk
+edits fire CLIENT_UPDATE storms. Instead of syncing every event, the webhook records it
+against (topic family, item id) and returns; one deferred Celery run per burst then fetches
+the entity's final state and syncs it:
+  - visit:  sync_jobber_visit_to_ghl_blocks
+  - client: refresh_client_directory + sync_jobber_client_tags_to_ghl
+
+The window slides with each event (JOBBER_WEBHOOK_COALESCE_SECONDS, default 15; 0 disables)
+but never delays a sync more than JOBBER_WEBHOOK_COALESCE_MAX_WAIT_SECONDS (default 120)
+after the first event of the burst. run_due_coalesced (beat) picks up bursts whose
+scheduled task was lost.
+"""
+import logging
+from datetime import timedelta
+
+from decouple import config
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .client_directory import refresh_client_directory
+from .models import JobberWebhookCoalesce
+from .sync_ghl_calendar import sync_jobber_visit_to_ghl_blocks
+from .tag_sync import sync_jobber_client_tags_to_ghl
+
+logger = logging.getLogger(__name__)
+
+TOPIC_FAMILIES = {
+    "VISIT_CREATE": JobberWebhookCoalesce.FAMILY_VISIT,
+    "VISIT_UPDATE": JobberWebhookCoalesce.FAMILY_VISIT,
+    "CLIENT_CREATE": JobberWebhookCoalesce.FAMILY_CLIENT,
+    "CLIENT_UPDATE": JobberWebhookCoalesce.FAMILY_CLIENT,
+}
+
+# Sweep only bursts this far past due, so it does not race the scheduled task.
+SWEEP_GRACE = timedelta(seconds=30)
+
+
+def window_seconds():
+    return max(0, config("JOBBER_WEBHOOK_COALESCE_SECONDS", default=15, cast=int))
+
+
+def max_wait_seconds():
+    return max(window_seconds(), config("JOBBER_WEBHOOK_COALESCE_MAX_WAIT_SECONDS", default=120, cast=int))
+
+
+def _sync_visit(item_id):
+    return sync_jobber_visit_to_ghl_blocks(item_id)
+
+
+def _sync_client(item_id):
+    directory = refresh_client_directory(item_id)
+    if not directory.get("ok"):
+        logger.warning("Jobber client directory refresh failed: item_id=%s result=%s", item_id, directory)
+    return {"tag_sync": sync_jobber_client_tags_to_ghl(item_id), "directory": directory}
+
+
+_HANDLERS = {
+    JobberWebhookCoalesce.FAMILY_VISIT: _sync_visit,
+    JobberWebhookCoalesce.FAMILY_CLIENT: _sync_client,
+}
+
+
+def _schedule(family, item_id, countdown):
+    from jobber_app.tasks import sync_coalesced_jobber_webhook
+
+    try:
+        sync_coalesced_jobber_webhook.apply_async(args=[family, item_id], countdown=max(0, countdown))
+    except Exception as exc:
+        # Broker down: run_due_coalesced picks the burst up from beat.
+        logger.warning("Coalesced Jobber webhook %s:%s not scheduled: %s", family, item_id, exc)
+
+
+def coalesce_event(topic, item_id):
+    """
+    Record one webhook event for later sync. Returns None when the topic is not coalesced
+    (or coalescing is disabled) — the caller then handles the event inline — else a dict:
+    { family, pending_events, due_at }.
+    """
+    family = TOPIC_FAMILIES.get(topic)
+    window = window_seconds()
+    item_id = str(item_id or "").strip()
+    if not family or not window or not item_id:
+        return None
+
+    now = timezone.now()
+    with transaction.atomic():
+        row, _ = JobberWebhookCoalesce.objects.select_for_update().get_or_create(family=family, item_id=item_id)
+        starts_burst = not row.pending
+        if starts_burst:
+            row.pending = True
+            row.pending_events = 0
+            row.first_pending_at = now
+        row.pending_events += 1
+        row.events_total += 1
+        row.last_topic = topic
+        row.due_at = min(now + timedelta(seconds=window), row.first_pending_at + timedelta(seconds=max_wait_seconds()))
+        row.save()
+        if starts_burst:
+            transaction.on_commit(lambda: _schedule(family, item_id, window))
+    return {"family": family, "pending_events": row.pending_events, "due_at": row.due_at.isoformat()}
+
+
+def cancel_pending(family, item_id):
+    """Drop a pending burst (e.g. the entity was destroyed before its sync ran)."""
+    JobberWebhookCoalesce.objects.filter(family=family, item_id=str(item_id), pending=True).update(
+        pending=False, pending_events=0, first_pending_at=None, due_at=None
+    )
+
+
+def run_coalesced(family, item_id):
+    """
+    Sync one entity if its burst is due. Returns dict:
+    { ok, skipped?, reason?, retry_in?, events, collapsed, result }.
+    """
+    handler = _HANDLERS.get(family)
+    if not handler:
+        return {"ok": False, "error": f"Unknown coalesce family {family}"}
+
+    now = timezone.now()
+    with transaction.atomic():
+        row = JobberWebhookCoalesce.objects.select_for_update().filter(family=family, item_id=item_id).first()
+        if not row or not row.pending:
+            return {"ok": True, "skipped": True, "reason": "nothing_pending"}
+        if row.due_at and row.due_at > now:
+            return {
+                "ok": True,
+                "skipped": True,
+                "reason": "not_due",
+                "retry_in": (row.due_at - now).total_seconds(),
+            }
+        events = row.pending_events
+        # Clear before syncing: events arriving during the sync start a new burst.
+        row.pending = False
+        row.pending_events = 0
+        row.first_pending_at = None
+        row.due_at = None
+        row.syncs_total += 1
+        row.last_synced_at = now
+        row.save()
+
+    result = handler(item_id)
+    logger.info(
+        "Coalesced Jobber webhook sync %s:%s events=%s collapsed=%s result=%s",
+        family,
+        item_id,
+        events,
+        max(events - 1, 0),
+        result,
+    )
+    return {"ok": True, "events": events, "collapsed": max(events - 1, 0), "result": result}
+
+
+def run_due_coalesced(limit=200):
+    """Sync bursts whose scheduled task never ran. Returns dict: { synced }."""
+    cutoff = timezone.now() - SWEEP_GRACE
+    due = list(
+        JobberWebhookCoalesce.objects.filter(pending=True, due_at__lte=cutoff)
+        .order_by("due_at")
+        .values_list("family", "item_id")[:limit]
+    )
+    for family, item_id in due:
+        run_coalesced(family, item_id)
+    return {"synced": len(due)}
+
+
+def coalesce_stats():
+    """Totals per family: { family: { entities, events, syncs, collapsed, pending } }."""
+    rows = JobberWebhookCoalesce.objects.values("family").annotate(
+        entities=Count("id"),
+        events=Sum("events_total"),
+        syncs=Sum("syncs_total"),
+        pending=Count("id", filter=Q(pending=True)),
+        pending_events=Sum("pending_events"),
+    )
+    stats = {}
+    for row in rows:
+        events = row["events"] or 0
+        syncs = row["syncs"] or 0
+        stats[row["family"]] = {
+            "entities": row["entities"],
+            "events": events,
+            "syncs": syncs,
+            # Events still waiting on a sync are not collapsed yet.
+            "collapsed": max(events - syncs - (row["pending_events"] or 0), 0),
+            "pending": row["pending"],
+        }
+    return stats
+
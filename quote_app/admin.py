@@ -1,13 +1,26 @@
 from django.contrib import admin
 from service_app.models import ServicePackageSizeMapping
-from .models import CustomerSubmission
+from .models import ArchivedSubmission, CustomerSubmission, SubmissionStatusEvent
 
 admin.site.register(ServicePackageSizeMapping)
 
 
+class SubmissionStatusEventInline(admin.TabularInline):
+    """Append-only status transition log (read-only)."""
+    model = SubmissionStatusEvent
+    extra = 0
+    can_delete = False
+    fields = ['at', 'from_status', 'to_status', 'source']
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(CustomerSubmission)
 class CustomerSubmissionAdmin(admin.ModelAdmin):
     """Admin configuration for CustomerSubmission"""
+    inlines = [SubmissionStatusEventInline]
     list_display = [
         'id', 'first_name', 'last_name', 'customer_email', 'status',
         'is_deleted', 'created_at',
@@ -59,4 +72,16 @@ class CustomerSubmissionAdmin(admin.ModelAdmin):
         }),
     )
 
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(admin.ModelAdmin):
+    """Read-only view of archived submissions (quote_app.archive)."""
+    list_display = ['id', 'customer_email', 'status', 'final_total', 'period', 'archived_at']
+    list_filter = ['status', 'period']
+    search_fields = ['id', 'customer_email', 'ghl_contact_id']
+    readonly_fields = [f.name for f in ArchivedSubmission._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
 # Register your models here.
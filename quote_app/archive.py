@@ -0,0 +1,162 @@
+"""
+Archive for closed submissions (ArchivedSubmission).
+
+Approved / declined / expired submissions untouched for ARCHIVE_AFTER_MONTHS have their response
+rows moved out of the hot tables: each becomes one ArchivedSubmission row holding its detail
+payload as JSON (plus its status transition log), then its question / option / sub-question /
+measurement responses and availabilities are deleted. That keeps the response tables (and their
+indexes and autovacuum work) sized to the active working set.
+
+The CustomerSubmission row stays, flagged with ``archived_at``, together with its selections,
+package quotes, add-ons, images and status events: dashboards, client stats, the funnel and the
+exports keep counting archived submissions (status, final_total, heard_about_us, location...)
+without having to read the archive table.
+
+SubmissionDetailView serves archived_snapshot() for archived ids (and for ids archived before the
+row was kept), so old quote links keep working read-only. Image files are kept: archived
+snapshots link to them.
+
+Batches run in their own transaction under a time budget, like quote_app.lifecycle.
+"""
+import json
+import logging
+import time
+from datetime import timedelta
+
+from decouple import config
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    ArchivedSubmission,
+    CustomerAvailability,
+    CustomerQuestionResponse,
+    CustomerSubmission,
+    SubmissionStatusEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED_STATUSES = ("approved", "declined", "expired")
+
+
+def archive_after_months():
+    return config("ARCHIVE_AFTER_MONTHS", default=12, cast=int)
+
+
+def batch_size():
+    return max(1, config("ARCHIVE_BATCH_SIZE", default=100, cast=int))
+
+
+def time_budget_seconds():
+    return config("ARCHIVE_TIME_BUDGET_SECONDS", default=300, cast=float)
+
+
+def archivable(now=None):
+    """Closed, live, not yet archived submissions whose last update is older than the archive threshold."""
+    cutoff = (now or timezone.now()) - timedelta(days=30 * archive_after_months())
+    return CustomerSubmission.objects.filter(
+        status__in=CLOSED_STATUSES, updated_at__lt=cutoff, archived_at__isnull=True
+    )
+
+
+def _json(data):
+    # Serializer output can still hold Decimal / UUID / datetime values from method fields.
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def snapshot(submission):
+    """Detail payload for ``submission`` as plain JSON (load it with .with_detail())."""
+    from .serializers import CustomerSubmissionDetailSerializer
+
+    return _json(CustomerSubmissionDetailSerializer(submission).data)
+
+
+def archived_snapshot(submission_id):
+    """Stored detail payload for an archived submission id, flagged is_archived; None if not archived."""
+    row = ArchivedSubmission.objects.filter(id=submission_id).values("snapshot", "archived_at").first()
+    if row is None:
+        return None
+    return {**row["snapshot"], "is_archived": True, "archived_at": row["archived_at"]}
+
+
+def _archive_row(submission, events):
+    return ArchivedSubmission(
+        id=submission.id,
+        period=submission.created_at.strftime("%Y-%m"),
+        status=submission.status,
+        customer_email=submission.customer_email,
+        ghl_contact_id=submission.ghl_contact_id,
+        location_id=submission.location_id,
+        heard_about_us=submission.heard_about_us,
+        final_total=submission.final_total,
+        is_on_the_go=bool(submission.is_on_the_go),
+        created_at=submission.created_at,
+        closed_at=submission.updated_at,
+        snapshot=snapshot(submission),
+        status_events=events,
+    )
+
+
+def archive_batch(ids):
+    """Snapshot one batch of closed submissions and drop their responses. Returns dict: { archived, deleted_rows }."""
+    with transaction.atomic():
+        # Lock and re-check: a submission reopened since the batch was picked stays hot.
+        locked = list(
+            archivable().filter(id__in=ids).order_by().select_for_update().values_list("id", flat=True)
+        )
+        if not locked:
+            return {"archived": 0, "deleted_rows": 0}
+        submissions = list(CustomerSubmission.objects.with_detail().filter(id__in=locked))
+        events = {}
+        for event in SubmissionStatusEvent.objects.filter(submission_id__in=locked).values(
+            "submission_id", "from_status", "to_status", "at", "source"
+        ):
+            events.setdefault(event.pop("submission_id"), []).append(_json(event))
+        ArchivedSubmission.objects.bulk_create(
+            [_archive_row(submission, events.get(submission.id, [])) for submission in submissions],
+            ignore_conflicts=True,
+        )
+        responses, _ = CustomerQuestionResponse.objects.filter(service_selection__submission_id__in=locked).delete()
+        availabilities, _ = CustomerAvailability.objects.filter(submission_id__in=locked).delete()
+        # update() leaves updated_at alone: closed_at and the lifecycle cutoffs stay as they were.
+        CustomerSubmission.all_objects.filter(id__in=locked).update(archived_at=timezone.now())
+        rows = responses + availabilities
+    return {"archived": len(submissions), "deleted_rows": rows}
+
+
+def run_archive(*, budget_seconds=None, on_progress=None):
+    """
+    Archive closed submissions in batches until none are left or the time budget runs out.
+    Returns dict: { ok, complete, archived, deleted_rows, batches, elapsed_ms }.
+    """
+    budget = time_budget_seconds() if budget_seconds is None else budget_seconds
+    started = time.monotonic()
+    size = batch_size()
+    now = timezone.now()
+    summary = {"ok": True, "complete": False, "archived": 0, "deleted_rows": 0, "batches": 0}
+
+    while time.monotonic() - started < budget:
+        ids = list(archivable(now).order_by("updated_at").values_list("id", flat=True)[:size])
+        if not ids:
+            summary["complete"] = True
+            break
+        result = archive_batch(ids)
+        summary["archived"] += result["archived"]
+        summary["deleted_rows"] += result["deleted_rows"]
+        summary["batches"] += 1
+        summary["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+        if on_progress:
+            on_progress(dict(summary))
+
+    summary["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    logger.info(
+        "Submission archive: archived=%s rows=%s batches=%s complete=%s in %sms",
+        summary["archived"],
+        summary["deleted_rows"],
+        summary["batches"],
+        summary["complete"],
+        summary["elapsed_ms"],
+    )
+    return summary
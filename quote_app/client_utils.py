@@ -10,6 +10,7 @@ from django.db.models import Count, Max, Q, Sum
 from django.db.models.expressions import RawSQL
 
 from quote_app.models import CustomerSubmission
+from service_app.search import search_submissions, uses_trigram
 
 # PostgreSQL expression — must stay in sync with client_key_for_submission().
 # All columns are table-qualified so RawSQL stays valid when JOINs exist (e.g. select_related).
@@ -74,28 +75,21 @@ def submissions_for_client_id(client_id, *, include_on_the_go=False):
 def grouped_clients_queryset(*, include_on_the_go=False, search=None):
     qs = annotate_client_key(base_submissions_queryset(include_on_the_go=include_on_the_go))
 
-    if search:
-        term = search.strip()
-        if term:
-            qs = qs.filter(
-                Q(first_name__icontains=term)
-                | Q(last_name__icontains=term)
-                | Q(customer_email__icontains=term)
-                | Q(customer_phone__icontains=term)
-                | Q(company_name__icontains=term)
-                | Q(ghl_contact_id__icontains=term)
-            )
-
-    return (
-        qs.values("client_key", "client_id")
-        .annotate(
-            submission_count=Count("pk"),
-            latest_submission_at=Max("created_at"),
-            approved_count=Count("pk", filter=Q(status="approved")),
-            total_revenue=Sum("final_total", filter=Q(status="approved")),
-        )
-        .order_by("-latest_submission_at")
+    ranked = False
+    if search and search.strip():
+        # Trigram-indexed on PostgreSQL (service_app.search); icontains elsewhere.
+        qs = search_submissions(qs, search)
+        ranked = uses_trigram(qs)
+
+    grouped = qs.values("client_key", "client_id").annotate(
+        submission_count=Count("pk"),
+        latest_submission_at=Max("created_at"),
+        approved_count=Count("pk", filter=Q(status="approved")),
+        total_revenue=Sum("final_total", filter=Q(status="approved")),
     )
+    if ranked:
+        return grouped.annotate(search_rank=Max("search_similarity")).order_by("-search_rank", "-latest_submission_at")
+    return grouped.order_by("-latest_submission_at")
 
 
 def latest_submission_for_client(client_id, *, include_on_the_go=False):
@@ -1,12 +1,77 @@
-from accounts.models import GHLAuthCredentials
+from accounts.contact_mirror import (
+    delete_mirrored_contact,
+    find_mirrored_contact_id,
+    mirror_ghl_contacts,
+    upsert_contact_from_ghl,
+)
+from accounts.token_manager import ghl_tokens
+
+import functools
+import logging
+import mimetypes
+import os
 
 import requests
 from decouple import config
+from django.core.cache import cache
+
+from service_backend.circuit_breaker import is_open, open_seconds
+
+logger = logging.getLogger(__name__)
 
 # Quote status tags in GHL - only one of these should be on the contact at a time
 QUOTE_STATUS_TAGS = ("quote drafted", "quote_requested", "quote_accepted")
 BID_IN_PERSON_TAG = "bid in person"
 GHL_BOOKING_LINK_FIELD_ID = "vWNjYOQajJAPtx2Hkq2e"
+# Quote-flow GHL calls used to have no timeout; a slow GHL tied up request workers indefinitely.
+GHL_TIMEOUT_SECONDS = 15
+
+
+def ghl_contacts_circuit_open():
+    """True while the GHL contacts circuit is open (service_backend.circuit_breaker)."""
+    return is_open("ghl", "contacts") or is_open("ghl", "contacts/{id}")
+
+
+def ghl_deferred_key(action, submission_id, options=None):
+    """Dedupe key of a pending deferred sync; calls with different options are separate retries."""
+    flags = ",".join(f"{name}={value!r}" for name, value in sorted((options or {}).items()))
+    return f"ghl-deferred:{action}:{submission_id}:{flags}"
+
+
+def queue_ghl_submission_retry(action, submission, options=None):
+    """Queue a deferred GHL contact sync; one pending retry per (action, submission, options)."""
+    from .tasks import retry_ghl_submission_sync
+
+    key = ghl_deferred_key(action, submission.pk, options)
+    try:
+        if not cache.add(key, 1, timeout=open_seconds() * 40):
+            return
+        retry_ghl_submission_sync.apply_async(
+            args=[action, str(submission.pk), options or {}], countdown=open_seconds()
+        )
+        logger.info("GHL circuit open: deferred %s for submission %s", action, submission.pk)
+    except Exception as exc:
+        cache.delete(key)
+        logger.warning("GHL %s for submission %s dropped; retry not queued: %s", action, submission.pk, exc)
+
+
+def deferred_while_ghl_down(action):
+    """
+    Non-critical GHL contact writes: while the GHL circuit is open, queue a retry
+    (quote_app.tasks.retry_ghl_submission_sync) and return at once instead of calling GHL.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(submission, **options):
+            if ghl_contacts_circuit_open():
+                queue_ghl_submission_retry(action, submission, options)
+                return None
+            return func(submission, **options)
+
+        return wrapper
+
+    return decorator
 
 
 def _submission_booking_custom_fields(submission):
@@ -19,38 +84,63 @@ def _submission_booking_custom_fields(submission):
     return [{"id": GHL_BOOKING_LINK_FIELD_ID, "field_value": booking_url}]
 
 
-def _get_ghl_contact_results(submission, credentials, headers, location_id):
-    """Fetch GHL contact by ghl_contact_id or search by email/phone. Returns list of contact dicts (or empty)."""
+def _get_ghl_contact_by_id(contact_id, headers):
+    """GET one GHL contact by id and refresh its mirror row. Returns list with the contact dict (or empty)."""
+    search_url = f"https://services.leadconnectorhq.com/contacts/{contact_id}"
+    search_response = requests.get(search_url, headers=headers, timeout=GHL_TIMEOUT_SECONDS)
+    if search_response.status_code == 200:
+        search_data = search_response.json()
+        if "contact" in search_data and isinstance(search_data["contact"], dict):
+            upsert_contact_from_ghl(search_data["contact"])
+            return [search_data["contact"]]
+    elif search_response.status_code == 404:
+        delete_mirrored_contact(contact_id)
+    return []
+
+
+def _search_ghl_contacts(query, headers, location_id):
+    """Live GHL contact search; results are written to the local mirror. Returns list of contact dicts."""
     results = []
+    search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={query}"
+    search_response = requests.get(search_url, headers=headers, timeout=GHL_TIMEOUT_SECONDS)
+    if search_response.status_code == 200:
+        search_data = search_response.json()
+        # Handle both cases: list of contacts or single contact
+        if "contacts" in search_data and isinstance(search_data["contacts"], list):
+            results = search_data["contacts"]
+        elif "contact" in search_data and isinstance(search_data["contact"], dict):
+            results = [search_data["contact"]]
+    if results:
+        mirror_ghl_contacts(results, location_id)
+    return results
+
+
+def _get_ghl_contact_results(submission, credentials, headers, location_id):
+    """
+    Fetch GHL contact by ghl_contact_id, else resolve it from the local contact mirror
+    (email, then phone) and GET it by id; live search by email/phone only on a mirror miss.
+    Returns list of contact dicts (or empty).
+    """
     if submission.ghl_contact_id:
-        search_url = f"https://services.leadconnectorhq.com/contacts/{submission.ghl_contact_id}"
-        search_response = requests.get(search_url, headers=headers)
-        if search_response.status_code == 200:
-            search_data = search_response.json()
-            if "contact" in search_data and isinstance(search_data["contact"], dict):
-                results = [search_data["contact"]]
-    else:
-        if submission.customer_email:
-            search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_email}"
-            search_response = requests.get(search_url, headers=headers)
-            if search_response.status_code == 200:
-                search_data = search_response.json()
-                if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                    results = search_data["contacts"]
-                elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                    results = [search_data["contact"]]
-        if not results and submission.customer_phone:
-            search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_phone}"
-            search_response = requests.get(search_url, headers=headers)
-            if search_response.status_code == 200:
-                search_data = search_response.json()
-                if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                    results = search_data["contacts"]
-                elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                    results = [search_data["contact"]]
+        return _get_ghl_contact_by_id(submission.ghl_contact_id, headers)
+
+    mirrored_id = find_mirrored_contact_id(
+        location_id, email=submission.customer_email, phone=submission.customer_phone
+    )
+    if mirrored_id:
+        results = _get_ghl_contact_by_id(mirrored_id, headers)
+        if results:
+            return results
+
+    results = []
+    if submission.customer_email:
+        results = _search_ghl_contacts(submission.customer_email, headers, location_id)
+    if not results and submission.customer_phone:
+        results = _search_ghl_contacts(submission.customer_phone, headers, location_id)
     return results
 
 
+@deferred_while_ghl_down("status_tags")
 def sync_ghl_contact_tags_for_submission_status(submission):
     """
     Update GHL contact tags to match submission.status:
@@ -59,7 +149,7 @@ def sync_ghl_contact_tags_for_submission_status(submission):
     - approved -> "quote_accepted" (remove quote drafted, quote_requested)
     """
     try:
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         if not credentials:
             return
         token = credentials.access_token
@@ -104,6 +194,7 @@ def sync_ghl_contact_tags_for_submission_status(submission):
             f"https://services.leadconnectorhq.com/contacts/{ghl_contact_id}",
             json=contact_payload,
             headers=headers,
+            timeout=GHL_TIMEOUT_SECONDS,
         )
         if resp.status_code in (200, 201):
             if not submission.ghl_contact_id:
@@ -114,10 +205,11 @@ def sync_ghl_contact_tags_for_submission_status(submission):
         print(f"Error syncing GHL contact tags for submission status: {e}")
 
 
+@deferred_while_ghl_down("quote_drafted_tag")
 def add_quote_drafted_tag_to_ghl(submission):
     """Add 'quote drafted' tag to GHL contact when submission is created"""
     try:
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         if not credentials:
             print("No GHL credentials found")
             return
@@ -131,39 +223,7 @@ def add_quote_drafted_tag_to_ghl(submission):
         }
 
         location_id = credentials.location_id
-        results = []
-
-        # Search for existing contact
-        if submission.ghl_contact_id:
-            # If we have a GHL contact ID, fetch directly
-            search_url = f"https://services.leadconnectorhq.com/contacts/{submission.ghl_contact_id}"
-            search_response = requests.get(search_url, headers=headers)
-            if search_response.status_code == 200:
-                search_data = search_response.json()
-                if "contact" in search_data and isinstance(search_data["contact"], dict):
-                    results = [search_data["contact"]]
-        else:
-            # Search by email first (if available)
-            if submission.customer_email:
-                search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_email}"
-                search_response = requests.get(search_url, headers=headers)
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                        results = search_data["contacts"]
-                    elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                        results = [search_data["contact"]]
-            
-            # If no results from email search, search by phone (if available)
-            if not results and submission.customer_phone:
-                search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_phone}"
-                search_response = requests.get(search_url, headers=headers)
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                        results = search_data["contacts"]
-                    elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                        results = [search_data["contact"]]
+        results = _get_ghl_contact_results(submission, credentials, headers, location_id)
 
         booking_cf = _submission_booking_custom_fields(submission)
 
@@ -183,7 +243,8 @@ def add_quote_drafted_tag_to_ghl(submission):
             contact_response = requests.put(
                 f"https://services.leadconnectorhq.com/contacts/{ghl_contact_id}",
                 json=contact_payload,
-                headers=headers
+                headers=headers,
+                timeout=GHL_TIMEOUT_SECONDS
             )
 
             if contact_response.status_code in [200, 201]:
@@ -206,12 +267,15 @@ def add_quote_drafted_tag_to_ghl(submission):
             contact_response = requests.post(
                 "https://services.leadconnectorhq.com/contacts/",
                 json=contact_payload,
-                headers=headers
+                headers=headers,
+                timeout=GHL_TIMEOUT_SECONDS
             )
             
             if contact_response.status_code in [200, 201]:
-                ghl_contact_id = contact_response.json().get("contact", {}).get("id")
+                created_contact = contact_response.json().get("contact", {})
+                ghl_contact_id = created_contact.get("id")
                 if ghl_contact_id:
+                    upsert_contact_from_ghl(created_contact, location_id)
                     submission.ghl_contact_id = ghl_contact_id
                     submission.save()
                     print(f"Created new contact with 'quote drafted' tag: {ghl_contact_id}")
@@ -223,7 +287,7 @@ def add_quote_drafted_tag_to_ghl(submission):
                     if contact_id_from_error:
                         # Fetch and update existing contact
                         fetch_url = f"https://services.leadconnectorhq.com/contacts/{contact_id_from_error}"
-                        fetch_response = requests.get(fetch_url, headers=headers)
+                        fetch_response = requests.get(fetch_url, headers=headers, timeout=GHL_TIMEOUT_SECONDS)
                         if fetch_response.status_code == 200:
                             existing_tags = fetch_response.json().get("contact", {}).get("tags", [])
                             if isinstance(existing_tags, str):
@@ -238,7 +302,8 @@ def add_quote_drafted_tag_to_ghl(submission):
                             update_response = requests.put(
                                 f"https://services.leadconnectorhq.com/contacts/{contact_id_from_error}",
                                 json=update_payload,
-                                headers=headers
+                                headers=headers,
+                                timeout=GHL_TIMEOUT_SECONDS
                             )
 
                             if update_response.status_code in [200, 201]:
@@ -249,9 +314,10 @@ def add_quote_drafted_tag_to_ghl(submission):
     except Exception as e:
         print(f"Error adding 'quote drafted' tag to GHL: {e}")
 
+@deferred_while_ghl_down("contact")
 def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False):
     try:
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         token = credentials.access_token
         headers = {
             "Accept": "application/json",
@@ -261,42 +327,9 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
         }
 
         location_id = credentials.location_id
-        results = []
-
-        # Step 1: Determine search URL
-        if submission.ghl_contact_id:
-            # If we have a GHL contact ID, fetch directly
-            search_url = f"https://services.leadconnectorhq.com/contacts/{submission.ghl_contact_id}"
-            search_response = requests.get(search_url, headers=headers)
-            if search_response.status_code == 200:
-                search_data = search_response.json()
-                if "contact" in search_data and isinstance(search_data["contact"], dict):
-                    results = [search_data["contact"]]
-        else:
-            # Step 2: Search by email first (if available)
-            if submission.customer_email:
-                search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_email}"
-                search_response = requests.get(search_url, headers=headers)
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    # Handle both cases: list of contacts or single contact
-                    if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                        results = search_data["contacts"]
-                    elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                        results = [search_data["contact"]]
-            
-            # Step 3: If no results from email search, search by phone (if available)
-            if not results and submission.customer_phone:
-                search_url = f"https://services.leadconnectorhq.com/contacts/?locationId={location_id}&query={submission.customer_phone}"
-                search_response = requests.get(search_url, headers=headers)
-                if search_response.status_code == 200:
-                    search_data = search_response.json()
-                    # Handle both cases: list of contacts or single contact
-                    if "contacts" in search_data and isinstance(search_data["contacts"], list):
-                        results = search_data["contacts"]
-                    elif "contact" in search_data and isinstance(search_data["contact"], dict):
-                        results = [search_data["contact"]]
-            
+        results = _get_ghl_contact_results(submission, credentials, headers, location_id)
+
+        if not submission.ghl_contact_id:
             # If still no results and no identifiers, return early
             if not results and not submission.customer_email and not submission.customer_phone:
                 print("No identifier (email or phone) to search GHL contact.")
@@ -387,7 +420,8 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
             contact_response = requests.put(
                 f"https://services.leadconnectorhq.com/contacts/{ghl_contact_id}",
                 json=contact_payload,
-                headers=headers
+                headers=headers,
+                timeout=GHL_TIMEOUT_SECONDS
             )
 
         else:
@@ -411,7 +445,8 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
             contact_response = requests.post(
                 "https://services.leadconnectorhq.com/contacts/",
                 json=contact_payload,
-                headers=headers
+                headers=headers,
+                timeout=GHL_TIMEOUT_SECONDS
             )
             
             # Handle duplicate contact error - try to find and update existing contact
@@ -424,7 +459,7 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
                         print(f"Duplicate contact detected. Updating existing contact: {contact_id_from_error}")
                         # Fetch the existing contact
                         fetch_url = f"https://services.leadconnectorhq.com/contacts/{contact_id_from_error}"
-                        fetch_response = requests.get(fetch_url, headers=headers)
+                        fetch_response = requests.get(fetch_url, headers=headers, timeout=GHL_TIMEOUT_SECONDS)
                         if fetch_response.status_code == 200:
                             # Update the existing contact instead
                             existing_tags = fetch_response.json().get("contact", {}).get("tags", [])
@@ -458,7 +493,8 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
                             contact_response = requests.put(
                                 f"https://services.leadconnectorhq.com/contacts/{contact_id_from_error}",
                                 json=update_payload,
-                                headers=headers
+                                headers=headers,
+                                timeout=GHL_TIMEOUT_SECONDS
                             )
                             
                             if contact_response.status_code in [200, 201]:
@@ -474,8 +510,10 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
             print("Failed to create/update contact in GHL:", contact_response.text)
             return
 
-        ghl_contact_id = contact_response.json().get("contact", {}).get("id")
+        synced_contact = contact_response.json().get("contact", {})
+        ghl_contact_id = synced_contact.get("id")
         if ghl_contact_id:
+            upsert_contact_from_ghl(synced_contact, location_id)
             submission.ghl_contact_id = ghl_contact_id
             submission.save()
             print(f"Contact synced successfully: {ghl_contact_id}")
@@ -487,11 +525,11 @@ def create_or_update_ghl_contact(submission, is_submit=False, is_declined=False)
 def upload_file_to_ghl_media(file, parent_id):
     """
     Upload a file to GHL media storage.
-    :param file: Django UploadedFile (e.g. request.FILES['file'])
+    :param file: Django UploadedFile (e.g. request.FILES['file']) or an open stored File
     :param parent_id: GHL location ID (parentId in API)
     :return: dict with fileId, url, traceId on success; None on failure
     """
-    credentials = GHLAuthCredentials.objects.first()
+    credentials = ghl_tokens.get_credentials()
     if not credentials:
         return None
     token = credentials.access_token
@@ -502,7 +540,8 @@ def upload_file_to_ghl_media(file, parent_id):
     }
     url = "https://services.leadconnectorhq.com/medias/upload-file"
     data = {"parentId": parent_id}
-    files = {"file": (file.name, file, file.content_type or "application/octet-stream")}
+    content_type = getattr(file, "content_type", None) or mimetypes.guess_type(file.name)[0]
+    files = {"file": (os.path.basename(file.name), file, content_type or "application/octet-stream")}
     try:
         resp = requests.post(url, headers=headers, data=data, files=files, timeout=30)
         if resp.status_code not in (200, 201):
@@ -520,7 +559,7 @@ def delete_file_from_ghl_media(file_id, location_id):
     :param location_id: GHL location ID (altId in query)
     :return: True if delete succeeded, False otherwise
     """
-    credentials = GHLAuthCredentials.objects.first()
+    credentials = ghl_tokens.get_credentials()
     if not credentials:
         return False
     token = credentials.access_token
@@ -538,3 +577,9 @@ def delete_file_from_ghl_media(file_id, location_id):
         return False
 
 
+# Actions retry_ghl_submission_sync may replay (see deferred_while_ghl_down).
+DEFERRABLE_GHL_SYNCS = {
+    "status_tags": sync_ghl_contact_tags_for_submission_status,
+    "quote_drafted_tag": add_quote_drafted_tag_to_ghl,
+    "contact": create_or_update_ghl_contact,
+}
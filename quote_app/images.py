@@ -0,0 +1,212 @@
+"""
+Quote image ingestion (SubmissionImage).
+
+The upload endpoint used to stream every file to GHL media inside the request, so customers on
+slow mobile links waited for two uploads back to back. Now:
+  1. accept_upload saves the file under MEDIA_ROOT (local_file) and returns a pending
+     SubmissionImage straight away;
+  2. the upload_submission_image Celery task renders a small JPEG thumbnail, pushes the local
+     copy to GHL media, retrying with backoff, then records url / file_id and deletes the local
+     copy (the thumbnail stays);
+  3. retry_stalled_submission_images (beat) re-queues pending images whose task was lost and
+     deletes the local copy of images that failed for good FAILED_LOCAL_FILE_RETENTION ago.
+"""
+import io
+import logging
+import os
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SubmissionImage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (400, 400)
+THUMBNAIL_QUALITY = 70
+MAX_UPLOAD_ATTEMPTS = 6
+# Pending images untouched this long are assumed to have lost their task.
+STALLED_AFTER = timedelta(minutes=15)
+# Failed images keep their local copy this long (for inspection / a manual re-upload), then it is deleted.
+FAILED_LOCAL_FILE_RETENTION = timedelta(days=7)
+
+
+def make_thumbnail(file):
+    """
+    Render ``file`` as a compressed JPEG no larger than THUMBNAIL_SIZE.
+    Returns ContentFile, or None when the file is not an image Pillow can read.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        file.seek(0)
+        with Image.open(file) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail(THUMBNAIL_SIZE)
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    except Exception as exc:
+        logger.info("No thumbnail for %s: %s", getattr(file, "name", file), exc)
+        return None
+    finally:
+        file.seek(0)
+    return ContentFile(out.getvalue())
+
+
+def _queue_upload(image_id):
+    from .tasks import upload_submission_image
+
+    try:
+        upload_submission_image.delay(str(image_id))
+    except Exception as exc:
+        # Broker down: retry_stalled_submission_images picks the image up from beat.
+        logger.warning("Quote image %s upload not queued: %s", image_id, exc)
+
+
+def accept_upload(submission, uploaded_file):
+    """Store ``uploaded_file`` locally as a pending SubmissionImage and queue its GHL upload."""
+    name = os.path.basename(uploaded_file.name or "upload")
+    image = SubmissionImage(submission=submission, status=SubmissionImage.STATUS_PENDING, original_name=name[:255])
+    image.local_file.save(name, uploaded_file, save=False)
+    image.save()
+    transaction.on_commit(lambda: _queue_upload(image.id))
+    return image
+
+
+def _discard_local_file(image):
+    if image.local_file:
+        image.local_file.delete(save=False)
+
+
+def ensure_thumbnail(image):
+    """Render the thumbnail from the local copy if the image has none yet (upload task, not the request)."""
+    if image.thumbnail or not image.local_file:
+        return
+    try:
+        with image.local_file.open("rb") as fh:
+            thumbnail = make_thumbnail(fh)
+    except OSError as exc:
+        logger.info("No thumbnail for quote image %s: %s", image.id, exc)
+        return
+    if thumbnail is None:
+        return
+    stem = os.path.splitext(image.original_name or "upload")[0] or "upload"
+    image.thumbnail.save(f"{stem}.jpg", thumbnail, save=False)
+    SubmissionImage.objects.filter(id=image.id).update(thumbnail=image.thumbnail.name)
+
+
+def delete_local_files(image):
+    """Remove the temporary copy and thumbnail of an image that is being deleted."""
+    _discard_local_file(image)
+    if image.thumbnail:
+        image.thumbnail.delete(save=False)
+
+
+def push_to_ghl(image_id):
+    """
+    Upload one pending image to GHL media.
+    Returns dict: { ok, skipped?, reason?, retry?, error? } — retry=True means try again later.
+    """
+    from accounts.token_manager import ghl_tokens
+
+    from .helpers import upload_file_to_ghl_media
+
+    image = SubmissionImage.objects.filter(id=image_id).first()
+    if not image:
+        return {"ok": True, "skipped": True, "reason": "deleted"}
+    if image.status != SubmissionImage.STATUS_PENDING:
+        return {"ok": True, "skipped": True, "reason": image.status}
+    ensure_thumbnail(image)
+    if not image.local_file:
+        image.status = SubmissionImage.STATUS_FAILED
+        image.last_error = "Local file missing"
+        image.save(update_fields=["status", "last_error", "updated_at"])
+        return {"ok": False, "error": image.last_error}
+
+    credentials = ghl_tokens.get_credentials()
+    if not credentials or not credentials.location_id:
+        return _attempt_failed(image, "GHL credentials or location ID not configured.")
+
+    try:
+        with image.local_file.open("rb") as fh:
+            result = upload_file_to_ghl_media(fh, credentials.location_id)
+    except (OSError, ValueError) as exc:
+        image.status = SubmissionImage.STATUS_FAILED
+        image.last_error = f"Local file unreadable: {exc}"
+        _discard_local_file(image)
+        image.local_file = None
+        image.save(update_fields=["status", "last_error", "local_file", "updated_at"])
+        return {"ok": False, "error": image.last_error}
+    if not result:
+        return _attempt_failed(image, "Failed to upload file to media storage.")
+
+    updated = SubmissionImage.objects.filter(id=image.id, status=SubmissionImage.STATUS_PENDING).update(
+        status=SubmissionImage.STATUS_UPLOADED,
+        url=result.get("url", ""),
+        file_id=result.get("fileId", ""),
+        trace_id=result.get("traceId"),
+        upload_attempts=image.upload_attempts + 1,
+        last_error="",
+        uploaded_at=timezone.now(),
+        local_file=None,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        # Deleted (or uploaded by an overlapping attempt) meanwhile: do not leave an orphan in GHL media.
+        from .helpers import delete_file_from_ghl_media
+
+        delete_file_from_ghl_media(result.get("fileId", ""), credentials.location_id)
+        return {"ok": True, "skipped": True, "reason": "superseded"}
+    _discard_local_file(image)
+    return {"ok": True}
+
+
+def _attempt_failed(image, error):
+    image.upload_attempts += 1
+    image.last_error = error
+    retry = image.upload_attempts < MAX_UPLOAD_ATTEMPTS
+    if not retry:
+        image.status = SubmissionImage.STATUS_FAILED
+    image.save(update_fields=["status", "upload_attempts", "last_error", "updated_at"])
+    logger.warning("Quote image %s upload attempt %s failed: %s", image.id, image.upload_attempts, error)
+    return {"ok": False, "retry": retry, "attempts": image.upload_attempts, "error": error}
+
+
+def retry_backoff_seconds(attempts):
+    """30s, 60s, 2m, 4m, 8m — kept under STALLED_AFTER so the sweep does not double-queue."""
+    return min(30 * 2 ** max(attempts - 1, 0), 600)
+
+
+def requeue_stalled(limit=100):
+    """
+    Queue pending images whose upload task never ran, and drop the local copy of images that
+    failed more than FAILED_LOCAL_FILE_RETENTION ago. Returns dict: { queued, discarded }.
+    """
+    now = timezone.now()
+    ids = list(
+        SubmissionImage.objects.filter(status=SubmissionImage.STATUS_PENDING, updated_at__lte=now - STALLED_AFTER)
+        .order_by("updated_at")
+        .values_list("id", flat=True)[:limit]
+    )
+    for image_id in ids:
+        _queue_upload(image_id)
+
+    failed = list(
+        SubmissionImage.objects.filter(
+            status=SubmissionImage.STATUS_FAILED,
+            updated_at__lte=now - FAILED_LOCAL_FILE_RETENTION,
+        )
+        .exclude(local_file="")
+        .exclude(local_file__isnull=True)
+        .order_by("updated_at")[:limit]
+    )
+    for image in failed:
+        _discard_local_file(image)
+    # Keep updated_at: it still records when the image failed.
+    SubmissionImage.objects.filter(id__in=[image.id for image in failed]).update(local_file=None)
+    return {"queued": len(ids), "discarded": len(failed)}
+
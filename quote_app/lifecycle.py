@@ -0,0 +1,176 @@
+"""
+Lifecycle job for stale submissions (run nightly by quote_app.tasks.run_submission_lifecycle).
+
+  1. expire: drafts untouched for DRAFT_EXPIRY_DAYS become ``expired``, one
+     ``UPDATE ... WHERE id IN (batch)`` per batch (status_log.transition_submissions, so the
+     transitions are logged). "Untouched" covers the answers too: responses, package quotes,
+     availabilities and images are rewritten rather than updated in place, so a child row created
+     inside the window keeps the draft alive even when the submission row itself was not saved;
+  2. purge: expired submissions older than EXPIRED_SUBMISSION_RETENTION_DAYS and soft-deleted ones
+     older than DELETED_SUBMISSION_RETENTION_DAYS are hard-deleted batch by batch, cascading to
+     selections, responses, package quotes, add-ons, availabilities, images and status events.
+     Local image files are removed; copies already in GHL media are left alone.
+
+Each batch is its own transaction, so an interrupted run keeps what it finished. The run stops
+at the time budget and reports ``complete: False``; the task then queues a continuation.
+A retention of 0 days disables that purge.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from decouple import config
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import (
+    CustomerAvailability,
+    CustomerMeasurementResponse,
+    CustomerOptionResponse,
+    CustomerPackageQuote,
+    CustomerQuestionResponse,
+    CustomerServiceSelection,
+    CustomerSubmission,
+    CustomerSubQuestionResponse,
+    SubmissionImage,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def draft_expiry_days():
+    return config("DRAFT_EXPIRY_DAYS", default=30, cast=int)
+
+
+def expired_retention_days():
+    return config("EXPIRED_SUBMISSION_RETENTION_DAYS", default=180, cast=int)
+
+
+def deleted_retention_days():
+    return config("DELETED_SUBMISSION_RETENTION_DAYS", default=90, cast=int)
+
+
+def batch_size():
+    return max(1, config("SUBMISSION_LIFECYCLE_BATCH_SIZE", default=200, cast=int))
+
+
+def time_budget_seconds():
+    return config("SUBMISSION_LIFECYCLE_TIME_BUDGET_SECONDS", default=300, cast=float)
+
+
+# (model, path to the submission, timestamp written when the row changes)
+_DRAFT_ACTIVITY = [
+    (CustomerServiceSelection, "submission", "created_at"),
+    (CustomerQuestionResponse, "service_selection__submission", "created_at"),
+    (CustomerOptionResponse, "question_response__service_selection__submission", "created_at"),
+    (CustomerSubQuestionResponse, "question_response__service_selection__submission", "created_at"),
+    (CustomerMeasurementResponse, "question_response__service_selection__submission", "created_at"),
+    (CustomerPackageQuote, "service_selection__submission", "created_at"),
+    (CustomerAvailability, "submission", "created_at"),
+    (SubmissionImage, "submission", "updated_at"),
+]
+
+
+def stale_drafts(now=None):
+    """Drafts whose row and every child row are older than the expiry cutoff."""
+    cutoff = (now or timezone.now()) - timedelta(days=draft_expiry_days())
+    drafts = CustomerSubmission.objects.filter(status="draft", updated_at__lt=cutoff)
+    for model, path, field in _DRAFT_ACTIVITY:
+        recent = model.objects.filter(**{path: OuterRef("pk"), f"{field}__gte": cutoff})
+        drafts = drafts.exclude(Exists(recent))
+    return drafts
+
+
+def purgeable(now=None):
+    """Expired past retention or soft-deleted past retention (any status)."""
+    now = now or timezone.now()
+    condition = Q()
+    if expired_retention_days() > 0:
+        condition |= Q(status="expired", is_deleted=False, updated_at__lt=now - timedelta(days=expired_retention_days()))
+    if deleted_retention_days() > 0:
+        condition |= Q(is_deleted=True, deleted_at__lt=now - timedelta(days=deleted_retention_days()))
+    if not condition:
+        return CustomerSubmission.all_objects.none()
+    return CustomerSubmission.all_objects.filter(condition)
+
+
+def expire_batch(ids):
+    from .status_log import transition_submissions
+
+    return transition_submissions(
+        CustomerSubmission.objects.filter(id__in=ids, status="draft"), "expired", source="draft_expiry"
+    )
+
+
+def purge_batch(ids):
+    """Hard-delete one batch of submissions and everything hanging off them. Returns dict: { submissions, rows, files }."""
+    files = 0
+    with transaction.atomic():
+        images = SubmissionImage.objects.filter(submission_id__in=ids).exclude(local_file="", thumbnail="")
+        paths = [(image.local_file, image.thumbnail) for image in images.only("id", "local_file", "thumbnail")]
+        rows, per_model = CustomerSubmission.all_objects.filter(id__in=ids).only("id").delete()
+    # Files go only once the rows are gone for good.
+    for local_file, thumbnail in paths:
+        for field in (local_file, thumbnail):
+            if field:
+                try:
+                    field.storage.delete(field.name)
+                    files += 1
+                except OSError as exc:
+                    logger.warning("Lifecycle purge could not remove %s: %s", field.name, exc)
+    return {"submissions": per_model.get("quote_app.CustomerSubmission", 0), "rows": rows, "files": files}
+
+
+def run_lifecycle(*, budget_seconds=None, on_progress=None):
+    """
+    Expire stale drafts, then purge past retention, in batches until done or out of time.
+    Returns dict: { ok, complete, expired, purged, deleted_rows, files, batches, elapsed_ms }.
+    ``on_progress(summary)`` is called after every batch.
+    """
+    budget = time_budget_seconds() if budget_seconds is None else budget_seconds
+    started = time.monotonic()
+    size = batch_size()
+    summary = {"ok": True, "complete": False, "expired": 0, "purged": 0, "deleted_rows": 0, "files": 0, "batches": 0}
+
+    def out_of_time():
+        return time.monotonic() - started >= budget
+
+    def batches(queryset, order_field):
+        while not out_of_time():
+            ids = list(queryset.order_by(order_field).values_list("id", flat=True)[:size])
+            if not ids:
+                return
+            yield ids
+
+    def progress():
+        summary["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+        if on_progress:
+            on_progress(dict(summary))
+
+    now = timezone.now()
+    for ids in batches(stale_drafts(now), "updated_at"):
+        summary["expired"] += expire_batch(ids)
+        summary["batches"] += 1
+        progress()
+
+    for ids in batches(purgeable(now), "updated_at"):
+        result = purge_batch(ids)
+        summary["purged"] += result["submissions"]
+        summary["deleted_rows"] += result["rows"]
+        summary["files"] += result["files"]
+        summary["batches"] += 1
+        progress()
+
+    summary["complete"] = not out_of_time() or not (stale_drafts(now).exists() or purgeable(now).exists())
+    progress()
+    logger.info(
+        "Submission lifecycle: expired=%s purged=%s rows=%s batches=%s complete=%s in %sms",
+        summary["expired"],
+        summary["purged"],
+        summary["deleted_rows"],
+        summary["batches"],
+        summary["complete"],
+        summary["elapsed_ms"],
+    )
+    return summary
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0034_customersubmission_bundle_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customersubmission',
+            index=models.Index(
+                fields=['is_deleted', 'is_on_the_go', '-created_at', '-id'],
+                name='cs_live_created_id_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# GIN trigram index over the combined admin search document (service_app.search).
+# The expression must stay identical to service_app.search.SUBMISSION_DOCUMENT_INDEX_SQL;
+# it is inlined here so later edits to that module cannot silently change this migration.
+from django.db import migrations
+
+SEARCH_DOCUMENT_SQL = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || "
+    "coalesce(customer_email, '') || ' ' || coalesce(company_name, '') || ' ' || "
+    "coalesce(ghl_contact_id, '') || ' ' || "
+    "regexp_replace(coalesce(customer_phone, ''), '[^0-9]', '', 'g'))"
+)
+
+
+CREATE_SQL = (
+    "CREATE INDEX IF NOT EXISTS cs_search_trgm_idx ON customer_submissions "
+    f"USING gin (({SEARCH_DOCUMENT_SQL}) gin_trgm_ops);"
+)
+DROP_SQL = "DROP INDEX IF EXISTS cs_search_trgm_idx;"
+
+
+def create_search_index(apps, schema_editor):
+    # pg_trgm / regexp_replace only exist on PostgreSQL; other backends (SQLite in tests) skip it.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0035_customersubmission_keyset_index'),
+        ('service_app', '0030_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
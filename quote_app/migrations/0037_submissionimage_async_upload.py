@@ -0,0 +1,65 @@
+# Async quote image ingestion: local pending copy, background GHL upload, thumbnails.
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0036_customersubmission_search_trgm_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submissionimage',
+            name='url',
+            field=models.URLField(blank=True, help_text='Public URL of the image (from GHL media storage)', max_length=1000),
+        ),
+        migrations.AlterField(
+            model_name='submissionimage',
+            name='file_id',
+            field=models.CharField(blank=True, help_text='GHL media file ID, used for delete API', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], db_index=True, default='uploaded', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='local_file',
+            field=models.FileField(blank=True, help_text='Temporary copy until the GHL upload succeeds', null=True, upload_to='quote_images/pending/'),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='quote_images/thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='upload_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='uploaded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submissionimage',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
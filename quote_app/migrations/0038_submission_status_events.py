@@ -0,0 +1,63 @@
+# Append-only CustomerSubmission status transition log, backfilled from current status.
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_events(apps, schema_editor):
+    """
+    One draft event at created_at per existing submission, plus one event for its current status
+    (declined_at or updated_at) when that is not draft. Marked source="backfill": the real
+    intermediate steps and times were never stored.
+    """
+    CustomerSubmission = apps.get_model('quote_app', 'CustomerSubmission')
+    SubmissionStatusEvent = apps.get_model('quote_app', 'SubmissionStatusEvent')
+    batch = []
+    rows = CustomerSubmission._base_manager.values_list(
+        'id', 'status', 'created_at', 'updated_at', 'declined_at'
+    ).iterator(chunk_size=2000)
+    for pk, status, created_at, updated_at, declined_at in rows:
+        batch.append(SubmissionStatusEvent(
+            submission_id=pk, from_status=None, to_status='draft', at=created_at, source='backfill',
+        ))
+        if status and status != 'draft':
+            at = (declined_at if status == 'declined' else None) or updated_at or created_at
+            batch.append(SubmissionStatusEvent(
+                submission_id=pk, from_status='draft', to_status=status, at=at, source='backfill',
+            ))
+        if len(batch) >= 2000:
+            SubmissionStatusEvent.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        SubmissionStatusEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0037_submissionimage_async_upload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('draft', 'Draft'), ('submitted', 'Submitted'), ('packages_selected', 'Packages Selected'), ('approved', 'Approved'), ('declined', 'Declined'), ('expired', 'Expired')], max_length=20)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('source', models.CharField(blank=True, default='', max_length=50)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='quote_app.customersubmission')),
+            ],
+            options={
+                'db_table': 'submission_status_events',
+                'ordering': ['at', 'id'],
+                'indexes': [
+                    models.Index(fields=['to_status', 'at'], name='sse_status_at_idx'),
+                    models.Index(fields=['submission', 'at'], name='sse_submission_at_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Index for the submission lifecycle job (stale drafts, expired past retention).
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0038_submission_status_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customersubmission',
+            index=models.Index(fields=['status', 'updated_at'], name='cs_status_updated_idx'),
+        ),
+    ]
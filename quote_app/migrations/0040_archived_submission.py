@@ -0,0 +1,42 @@
+# Cold storage for closed submissions moved out of the hot tables.
+
+from decimal import Decimal
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0039_customersubmission_status_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.UUIDField(help_text='Original CustomerSubmission id', primary_key=True, serialize=False)),
+                ('period', models.CharField(max_length=7)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('submitted', 'Submitted'), ('packages_selected', 'Packages Selected'), ('approved', 'Approved'), ('declined', 'Declined'), ('expired', 'Expired')], max_length=20)),
+                ('customer_email', models.EmailField(blank=True, db_index=True, max_length=254, null=True)),
+                ('ghl_contact_id', models.CharField(blank=True, db_index=True, max_length=100, null=True)),
+                ('location_id', models.UUIDField(blank=True, null=True)),
+                ('heard_about_us', models.CharField(blank=True, max_length=255, null=True)),
+                ('final_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('is_on_the_go', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('closed_at', models.DateTimeField(help_text='Last update before archiving')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('snapshot', models.JSONField()),
+                ('status_events', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'db_table': 'archived_submissions',
+                'ordering': ['-created_at'],
+                'indexes': [
+                    models.Index(fields=['period', 'status'], name='as_period_status_idx'),
+                ],
+            },
+        ),
+    ]
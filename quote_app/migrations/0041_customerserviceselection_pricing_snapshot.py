@@ -0,0 +1,20 @@
+# Pin each service selection to the pricing snapshot its quotes were generated with.
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_app', '0031_pricing_snapshot'),
+        ('quote_app', '0040_archived_submission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerserviceselection',
+            name='pricing_snapshot',
+            field=models.ForeignKey(blank=True, help_text='Pricing rules the package quotes were generated with', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='service_selections', to='service_app.pricingsnapshot'),
+        ),
+    ]
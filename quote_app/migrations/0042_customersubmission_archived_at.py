@@ -0,0 +1,18 @@
+# Archiving keeps the submission row (for dashboards / exports) and flags it instead of deleting it.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quote_app', '0041_customerserviceselection_pricing_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customersubmission',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -7,6 +7,7 @@ from decouple import config
 from service_app.models import (
     Service,
     Package,
+    PricingSnapshot,
     Location,
     Question,
     QuestionOption,
@@ -22,23 +23,34 @@ class CustomerSubmissionQuerySet(models.QuerySet):
     def active(self):
         return self.filter(is_deleted=False)
 
+    def with_detail(self):
+        """Everything CustomerSubmissionDetailSerializer reads, in a fixed number of queries."""
+        return self.select_related(
+            'location', 'applied_coupon', 'applied_bundle',
+        ).prefetch_related(
+            'applied_bundle__services',
+            'customerserviceselection_set__service',
+            'customerserviceselection_set__package_quotes__package',
+            'customerserviceselection_set__question_responses__question',
+            'customerserviceselection_set__question_responses__option_responses__option',
+            'customerserviceselection_set__question_responses__sub_question_responses__sub_question',
+            'customerserviceselection_set__question_responses__measurement_responses__option'
+        )
+
     def deleted_only(self):
         return self.filter(is_deleted=True)
 
 
-class CustomerSubmissionManager(models.Manager):
+class CustomerSubmissionManager(models.Manager.from_queryset(CustomerSubmissionQuerySet)):
     """Default manager: excludes soft-deleted submissions."""
 
     def get_queryset(self):
-        return CustomerSubmissionQuerySet(self.model, using=self._db).filter(is_deleted=False)
+        return super().get_queryset().filter(is_deleted=False)
 
 
-class CustomerSubmissionAllObjectsManager(models.Manager):
+class CustomerSubmissionAllObjectsManager(models.Manager.from_queryset(CustomerSubmissionQuerySet)):
     """Unfiltered manager for admin / internal use."""
 
-    def get_queryset(self):
-        return CustomerSubmissionQuerySet(self.model, using=self._db)
-
 
 class CustomerSubmission(models.Model):
     """Main customer submission model (revamped)"""
@@ -164,6 +176,8 @@ class CustomerSubmission(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField(null=True, blank=True)
+    # Set when quote_app.archive moved the responses to ArchivedSubmission; the row stays for reporting.
+    archived_at = models.DateTimeField(null=True, blank=True)
 
     objects = CustomerSubmissionManager()
     all_objects = CustomerSubmissionAllObjectsManager()
@@ -171,10 +185,26 @@ class CustomerSubmission(models.Model):
     class Meta:
         db_table = "customer_submissions"
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of admin lists: newest first on (created_at, id) for live rows.
+            models.Index(
+                fields=["is_deleted", "is_on_the_go", "-created_at", "-id"],
+                name="cs_live_created_id_idx",
+            ),
+            # Lifecycle job (quote_app.lifecycle): stale drafts / expired past retention by age.
+            models.Index(fields=["status", "updated_at"], name="cs_status_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.customer_email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so the post_save transition log (quote_app.status_log) sees what changed.
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
     def soft_delete(self, deleted_by=None):
         """Mark submission deleted without removing related rows from the database."""
         if self.is_deleted:
@@ -198,25 +228,110 @@ class CustomerSubmission(models.Model):
         super().save(*args, **kwargs)
 
 
+class SubmissionStatusEvent(models.Model):
+    """
+    Append-only log of CustomerSubmission.status transitions (quote_app.status_log), the source
+    for funnel conversion and time-in-stage analytics. from_status is null for the initial status.
+    """
+
+    submission = models.ForeignKey(CustomerSubmission, on_delete=models.CASCADE, related_name="status_events")
+    from_status = models.CharField(max_length=20, null=True, blank=True)
+    to_status = models.CharField(max_length=20, choices=CustomerSubmission.STATUS_CHOICES)
+    at = models.DateTimeField(default=timezone.now)
+    source = models.CharField(max_length=50, blank=True, default="")
+
+    class Meta:
+        db_table = "submission_status_events"
+        ordering = ["at", "id"]
+        indexes = [
+            models.Index(fields=["to_status", "at"], name="sse_status_at_idx"),
+            models.Index(fields=["submission", "at"], name="sse_submission_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.submission_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
+class ArchivedSubmission(models.Model):
+    """
+    Cold storage for a closed submission's responses (quote_app.archive).
+    ``snapshot`` is the CustomerSubmissionDetailSerializer payload at archive time (selections,
+    responses, package quotes, images...), so the detail endpoint can still serve it; the other
+    columns are kept for lookups. Reporting keeps reading the CustomerSubmission row itself. ``period`` (YYYY-MM of created_at) lets a month be exported or
+    dropped as a unit.
+    """
+
+    id = models.UUIDField(primary_key=True, help_text="Original CustomerSubmission id")
+    period = models.CharField(max_length=7)
+    status = models.CharField(max_length=20, choices=CustomerSubmission.STATUS_CHOICES)
+    customer_email = models.EmailField(null=True, blank=True, db_index=True)
+    ghl_contact_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    location_id = models.UUIDField(null=True, blank=True)
+    heard_about_us = models.CharField(max_length=255, null=True, blank=True)
+    final_total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    is_on_the_go = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    closed_at = models.DateTimeField(help_text="Last update before archiving")
+    archived_at = models.DateTimeField(default=timezone.now)
+    snapshot = models.JSONField()
+    status_events = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        db_table = "archived_submissions"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["period", "status"], name="as_period_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.status}, archived {self.archived_at:%Y-%m-%d})"
+
+
 class SubmissionImage(models.Model):
-    """Images attached to a quote (submission), stored in GHL media; we store url and file_id."""
+    """
+    Images attached to a quote (submission), stored in GHL media; we store url and file_id.
+    Uploads are accepted locally first (status pending, local_file set) and pushed to GHL in the
+    background (quote_app.images); thumbnail is a small local JPEG for list views.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_UPLOADED = "uploaded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_UPLOADED, "Uploaded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     submission = models.ForeignKey(
         CustomerSubmission,
         on_delete=models.CASCADE,
         related_name="images"
     )
-    url = models.URLField(max_length=1000, help_text="Public URL of the image (from GHL media storage)")
-    file_id = models.CharField(max_length=100, help_text="GHL media file ID, used for delete API")
+    url = models.URLField(max_length=1000, blank=True, help_text="Public URL of the image (from GHL media storage)")
+    file_id = models.CharField(max_length=100, blank=True, help_text="GHL media file ID, used for delete API")
     trace_id = models.CharField(max_length=100, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_UPLOADED, db_index=True)
+    original_name = models.CharField(max_length=255, blank=True)
+    local_file = models.FileField(
+        upload_to="quote_images/pending/",
+        blank=True,
+        null=True,
+        help_text="Temporary copy until the GHL upload succeeds",
+    )
+    thumbnail = models.FileField(upload_to="quote_images/thumbnails/", blank=True, null=True)
+    upload_attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    uploaded_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "submission_images"
         ordering = ["-created_at"]
 
     def __str__(self):
-        return f"Image {self.file_id} for submission {self.submission_id}"
+        return f"Image {self.file_id or self.original_name} for submission {self.submission_id}"
 
 
 class CustomerAvailability(models.Model):
@@ -278,6 +393,16 @@ class CustomerServiceSelection(models.Model):
     
     # Selected package (set after user chooses)
     selected_package = models.ForeignKey(Package, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Pricing rules the package quotes were generated with (service_app.pricing_snapshot)
+    pricing_snapshot = models.ForeignKey(
+        PricingSnapshot,
+        related_name='service_selections',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text='Pricing rules the package quotes were generated with',
+    )
     
     # Service-level pricing summary
     question_adjustments = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
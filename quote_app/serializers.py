@@ -251,12 +251,22 @@ class MultipleAvailabilitySerializer(serializers.Serializer):
 
 
 class SubmissionImageSerializer(serializers.ModelSerializer):
-    """Serializer for quote submission images (URL + metadata from GHL media)."""
+    """
+    Serializer for quote submission images (URL + metadata from GHL media).
+    url stays empty while status is pending; thumbnail_url is a small local JPEG for list views.
+    """
+    thumbnail_url = serializers.SerializerMethodField()
 
     class Meta:
         model = SubmissionImage
-        fields = ["id", "url", "file_id", "trace_id", "created_at"]
-        read_only_fields = ["id", "url", "file_id", "trace_id", "created_at"]
+        fields = ["id", "url", "thumbnail_url", "status", "original_name", "file_id", "trace_id", "created_at"]
+        read_only_fields = fields
+
+    def get_thumbnail_url(self, obj):
+        if not obj.thumbnail:
+            return None
+        request = self.context.get("request")
+        return request.build_absolute_uri(obj.thumbnail.url) if request else obj.thumbnail.url
 
 
 from service_app.serializers import GlobalSizePackageSerializer
@@ -2,6 +2,8 @@
 Signals to keep CustomerSubmission and GHL contact tags in sync.
 Whenever submission.status is draft, submitted, or approved, the GHL contact
 tag is updated to match (quote drafted, quote_requested, quote_accepted).
+
+Every status change is also appended to the transition log (quote_app.status_log).
 """
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -9,6 +11,15 @@ from django.dispatch import receiver
 from .models import CustomerSubmission
 
 
+@receiver(post_save, sender=CustomerSubmission)
+def log_submission_status_transition(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Single choke point for SubmissionStatusEvent rows written by model saves."""
+    if raw:
+        return
+    from .status_log import record_save
+    record_save(instance, created, update_fields=update_fields)
+
+
 @receiver(post_save, sender=CustomerSubmission)
 def sync_ghl_tags_on_submission_status_change(sender, instance, **kwargs):
     """
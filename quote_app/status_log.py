@@ -0,0 +1,214 @@
+"""
+Submission status transitions (SubmissionStatusEvent) and the funnel built from them.
+
+CustomerSubmission.status only holds the current value, so every change is also appended to the
+event log from one place:
+  - model saves: the post_save receiver in quote_app.signals calls record_save();
+  - bulk changes that skip save(): transition_submissions() updates the rows and bulk-inserts
+    their events in one transaction.
+
+funnel() reads only the log (first time each submission reached each status) to compute
+step-to-step conversion and time-in-stage percentiles, optionally grouped by service, location
+or heard_about_us.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import CustomerServiceSelection, CustomerSubmission, SubmissionStatusEvent
+
+logger = logging.getLogger(__name__)
+
+# Main path in order; EXIT_STATUSES end a submission without approval.
+FUNNEL_STAGES = ("draft", "submitted", "packages_selected", "approved")
+EXIT_STATUSES = ("declined", "expired")
+GROUP_BY_CHOICES = ("service", "location", "heard_about_us")
+PERCENTILES = (50, 90)
+
+_UNKNOWN = object()
+
+
+def record_save(instance, created, update_fields=None, source=""):
+    """Log the status change made by this save, if any. Returns the event or None."""
+    previous = None if created else getattr(instance, "_loaded_status", _UNKNOWN)
+    instance._loaded_status = instance.status
+    if not created and update_fields is not None and "status" not in update_fields:
+        return None
+    if previous is _UNKNOWN or (not created and previous == instance.status):
+        # Unchanged, or loaded with status deferred (previous value unknown).
+        return None
+    return SubmissionStatusEvent.objects.create(
+        submission_id=instance.pk,
+        from_status=previous,
+        to_status=instance.status,
+        source=source,
+    )
+
+
+def transition_submissions(queryset, to_status, *, source="", extra_updates=None, batch_size=500):
+    """
+    Move every submission in ``queryset`` that is not already ``to_status`` to it with one UPDATE,
+    logging one event per row. Skips save() and its signals. Returns the number moved.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(status=to_status).order_by().select_for_update().values_list("id", "status")
+        )
+        if not rows:
+            return 0
+        CustomerSubmission.all_objects.filter(id__in=[pk for pk, _ in rows]).update(
+            status=to_status, updated_at=now, **(extra_updates or {})
+        )
+        SubmissionStatusEvent.objects.bulk_create(
+            [
+                SubmissionStatusEvent(submission_id=pk, from_status=previous, to_status=to_status, at=now, source=source)
+                for pk, previous in rows
+            ],
+            batch_size=batch_size,
+        )
+    return len(rows)
+
+
+def _percentiles(values):
+    if not values:
+        return {"count": 0, **{f"p{p}": None for p in PERCENTILES}}
+    ordered = sorted(values)
+    out = {"count": len(ordered)}
+    for p in PERCENTILES:
+        # Nearest-rank percentile.
+        rank = max(-(-p * len(ordered) // 100), 1)
+        out[f"p{p}"] = round(ordered[rank - 1], 2)
+    return out
+
+
+def _hours(delta):
+    return delta.total_seconds() / 3600
+
+
+def summarize(first_reached):
+    """
+    Funnel for one group. ``first_reached`` maps submission id → {status: first time reached}.
+    A submission counts as having reached a stage when it reached that stage or any later one
+    (e.g. approved straight from draft still counts as submitted).
+    """
+    reached = dict.fromkeys(FUNNEL_STAGES, 0)
+    exits = dict.fromkeys(EXIT_STATUSES, 0)
+    in_stage = {stage: [] for stage in FUNNEL_STAGES[:-1]}
+    to_approval = []
+
+    for times in first_reached.values():
+        deepest = max((FUNNEL_STAGES.index(s) for s in times if s in FUNNEL_STAGES), default=0)
+        for index in range(deepest + 1):
+            reached[FUNNEL_STAGES[index]] += 1
+        for status in EXIT_STATUSES:
+            if status in times:
+                exits[status] += 1
+        for index, stage in enumerate(FUNNEL_STAGES[:-1]):
+            entered = times.get(stage)
+            if entered is None:
+                continue
+            # Time in stage: until the first later status (next stage, a skip ahead, or an exit).
+            left = [at for s, at in times.items() if at >= entered and s != stage and (
+                s in EXIT_STATUSES or FUNNEL_STAGES.index(s) > index
+            )]
+            if left:
+                in_stage[stage].append(_hours(min(left) - entered))
+        if "approved" in times:
+            to_approval.append(_hours(times["approved"] - min(times.values())))
+
+    stages = []
+    for index, stage in enumerate(FUNNEL_STAGES):
+        previous = reached[FUNNEL_STAGES[index - 1]] if index else None
+        stages.append(
+            {
+                "status": stage,
+                "reached": reached[stage],
+                "conversion_from_previous": (
+                    round(reached[stage] / previous * 100, 1) if previous else None
+                ),
+                "time_in_stage_hours": _percentiles(in_stage[stage]) if stage in in_stage else None,
+            }
+        )
+    total = len(first_reached)
+    return {
+        "submissions": total,
+        "stages": stages,
+        "exits": exits,
+        "overall_conversion": round(reached["approved"] / total * 100, 1) if total else None,
+        "time_to_approval_hours": _percentiles(to_approval),
+    }
+
+
+def _group_keys(cohort, group_by):
+    """submission id → [(key, label), ...] for the chosen dimension."""
+    keys = defaultdict(list)
+    if group_by == "service":
+        rows = CustomerServiceSelection.objects.filter(submission__in=cohort).values_list(
+            "submission_id", "service_id", "service__name"
+        )
+        for submission_id, key, label in rows:
+            keys[submission_id].append((str(key), label))
+    elif group_by == "location":
+        for submission_id, key, label in cohort.values_list("id", "location_id", "location__name"):
+            keys[submission_id].append((str(key) if key else None, label or "Unknown"))
+    else:
+        for submission_id, source in cohort.values_list("id", "heard_about_us"):
+            source = (source or "").strip()
+            keys[submission_id].append((source or None, source or "Unknown"))
+    return keys
+
+
+def funnel(*, start=None, end=None, service_id=None, location_id=None, heard_about_us=None, group_by=None,
+           include_on_the_go=False):
+    """
+    Funnel for submissions created in [start, end) (default: the last 90 days), from the event log.
+    Returns dict: { range, group_by, overall, groups }.
+    """
+    end = end or timezone.now()
+    start = start or end - timedelta(days=90)
+    cohort = CustomerSubmission.objects.filter(created_at__gte=start, created_at__lt=end)
+    if not include_on_the_go:
+        cohort = cohort.filter(is_on_the_go=False)
+    if service_id:
+        cohort = cohort.filter(customerserviceselection__service_id=service_id)
+    if location_id:
+        cohort = cohort.filter(location_id=location_id)
+    if heard_about_us:
+        cohort = cohort.filter(heard_about_us=heard_about_us)
+    cohort = cohort.order_by().distinct()
+
+    first_reached = defaultdict(dict)
+    rows = (
+        SubmissionStatusEvent.objects.filter(submission__in=cohort.values("id"))
+        .values("submission_id", "to_status")
+        .annotate(first_at=Min("at"))
+        .order_by()
+    )
+    for row in rows.iterator(chunk_size=5000):
+        first_reached[row["submission_id"]][row["to_status"]] = row["first_at"]
+
+    result = {
+        "range": {"start": start, "end": end},
+        "group_by": group_by,
+        "overall": summarize(first_reached),
+        "groups": [],
+    }
+    if group_by:
+        grouped = defaultdict(dict)
+        labels = {}
+        for submission_id, keys in _group_keys(cohort, group_by).items():
+            if submission_id not in first_reached:
+                continue
+            for key, label in keys:
+                grouped[key][submission_id] = first_reached[submission_id]
+                labels[key] = label
+        result["groups"] = sorted(
+            ({"key": key, "label": labels[key], **summarize(members)} for key, members in grouped.items()),
+            key=lambda group: -group["submissions"],
+        )
+    return result
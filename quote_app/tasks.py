@@ -0,0 +1,85 @@
+"""
+Celery jobs for quote_app.
+
+upload_submission_image / retry_stalled_submission_images thumbnail locally accepted quote images
+and push them to GHL media; the sweep also drops local copies of long-failed images (quote_app.images).
+
+retry_ghl_submission_sync replays GHL contact / tag syncs deferred while the GHL circuit was
+open (quote_app.helpers.deferred_while_ghl_down).
+
+run_submission_lifecycle expires stale drafts and purges submissions past retention
+(quote_app.lifecycle).
+
+archive_closed_submissions moves old closed submissions to cold storage (quote_app.archive).
+"""
+from celery import shared_task
+from django.core.cache import cache
+
+# ~1 hour of retries at the default 30s open period before giving up.
+MAX_GHL_SYNC_RETRIES = 120
+
+
+@shared_task(bind=True, max_retries=None)
+def upload_submission_image(self, image_id):
+    from .images import push_to_ghl, retry_backoff_seconds
+
+    result = push_to_ghl(image_id)
+    if result.get("retry"):
+        raise self.retry(countdown=retry_backoff_seconds(result["attempts"]))
+    return result
+
+
+@shared_task
+def retry_stalled_submission_images():
+    from .images import requeue_stalled
+
+    return requeue_stalled()
+
+
+@shared_task(bind=True, max_retries=MAX_GHL_SYNC_RETRIES)
+def retry_ghl_submission_sync(self, action, submission_id, options=None):
+    from service_backend.circuit_breaker import open_seconds
+
+    from .helpers import DEFERRABLE_GHL_SYNCS, ghl_contacts_circuit_open, ghl_deferred_key
+    from .models import CustomerSubmission
+
+    if ghl_contacts_circuit_open():
+        raise self.retry(countdown=open_seconds())
+    # Later changes to the submission can queue their own retry from here on.
+    cache.delete(ghl_deferred_key(action, submission_id, options))
+    submission = CustomerSubmission.objects.filter(id=submission_id).first()
+    if submission is None:
+        return {"ok": True, "skipped": True, "reason": "submission_not_found"}
+    # Undecorated call: re-reads the submission's current state and talks to GHL directly.
+    DEFERRABLE_GHL_SYNCS[action].__wrapped__(submission, **(options or {}))
+    return {"ok": True}
+
+
+@shared_task(bind=True)
+def run_submission_lifecycle(self):
+    from .lifecycle import run_lifecycle
+
+    def report(summary):
+        # Visible in Flower / result backend while the run is going.
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=summary)
+
+    result = run_lifecycle(on_progress=report)
+    if not result["complete"]:
+        # Out of time budget: carry on in a fresh task rather than holding a worker.
+        run_submission_lifecycle.apply_async(countdown=60)
+    return result
+
+
+@shared_task(bind=True)
+def archive_closed_submissions(self):
+    from .archive import run_archive
+
+    def report(summary):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta=summary)
+
+    result = run_archive(on_progress=report)
+    if not result["complete"]:
+        archive_closed_submissions.apply_async(countdown=60)
+    return result
@@ -1,3 +1,601 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from quote_app.models import CustomerSubmission, SubmissionImage
+
+
+def _png_bytes(size=(900, 600)):
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", size, "red").save(out, format="PNG")
+    return out.getvalue()
+
+
+class SubmissionImageTests(TestCase):
+    """Quote images: accepted locally, thumbnailed and pushed to GHL by the task (quote_app.images)."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.submission = CustomerSubmission.objects.create(first_name="Ann")
+
+    def _accept(self):
+        from quote_app.images import accept_upload
+
+        upload = SimpleUploadedFile("porch.png", _png_bytes(), content_type="image/png")
+        with patch("quote_app.tasks.upload_submission_image.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                image = accept_upload(self.submission, upload)
+        delay.assert_called_once_with(str(image.id))
+        return image
+
+    def test_upload_request_does_not_render_thumbnail(self):
+        with patch("quote_app.images.make_thumbnail") as make_thumbnail:
+            image = self._accept()
+        make_thumbnail.assert_not_called()
+        image.refresh_from_db()
+        self.assertEqual(image.status, SubmissionImage.STATUS_PENDING)
+        self.assertTrue(image.local_file)
+        self.assertFalse(image.thumbnail)
+
+    def test_task_renders_thumbnail_and_uploads(self):
+        from quote_app.images import push_to_ghl
+
+        image = self._accept()
+        credentials = MagicMock(location_id="loc")
+        with patch("accounts.token_manager.ghl_tokens.get_credentials", return_value=credentials), patch(
+            "quote_app.helpers.upload_file_to_ghl_media", return_value={"url": "https://cdn/x.png", "fileId": "f1"}
+        ):
+            self.assertEqual(push_to_ghl(image.id), {"ok": True})
+
+        image.refresh_from_db()
+        self.assertEqual((image.status, image.file_id), (SubmissionImage.STATUS_UPLOADED, "f1"))
+        self.assertFalse(image.local_file)
+        self.assertTrue(image.thumbnail.name.endswith(".jpg"))
+
+    def test_failed_upload_local_copy_is_discarded_after_retention(self):
+        from quote_app.images import FAILED_LOCAL_FILE_RETENTION, requeue_stalled
+
+        image = self._accept()
+        path = image.local_file.path
+        SubmissionImage.objects.filter(id=image.id).update(status=SubmissionImage.STATUS_FAILED)
+
+        self.assertEqual(requeue_stalled(), {"queued": 0, "discarded": 0})
+
+        SubmissionImage.objects.filter(id=image.id).update(
+            updated_at=timezone.now() - FAILED_LOCAL_FILE_RETENTION - timedelta(minutes=1)
+        )
+        self.assertEqual(requeue_stalled(), {"queued": 0, "discarded": 1})
+        image.refresh_from_db()
+        self.assertFalse(image.local_file)
+        self.assertFalse(os.path.exists(path))
+
+
+class DeferredGhlSyncTests(TestCase):
+    """GHL contact writes deferred while the GHL circuit is open (quote_app.helpers)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.submission = CustomerSubmission.objects.create(first_name="Ann")
+
+    def test_calls_with_different_flags_are_all_replayed(self):
+        from quote_app.helpers import DEFERRABLE_GHL_SYNCS, create_or_update_ghl_contact
+        from quote_app.tasks import retry_ghl_submission_sync
+
+        with patch("quote_app.helpers.ghl_contacts_circuit_open", return_value=True), patch(
+            "quote_app.tasks.retry_ghl_submission_sync.apply_async"
+        ) as apply_async:
+            create_or_update_ghl_contact(self.submission, is_submit=True)
+            create_or_update_ghl_contact(self.submission, is_submit=True)
+            create_or_update_ghl_contact(self.submission, is_declined=True)
+
+        queued = [call.kwargs["args"] for call in apply_async.call_args_list]
+        submission_id = str(self.submission.pk)
+        self.assertEqual(
+            queued,
+            [["contact", submission_id, {"is_submit": True}], ["contact", submission_id, {"is_declined": True}]],
+        )
+
+        sync = MagicMock()
+        with patch("quote_app.helpers.ghl_contacts_circuit_open", return_value=False), patch.dict(
+            DEFERRABLE_GHL_SYNCS, {"contact": MagicMock(__wrapped__=sync)}
+        ):
+            for args in queued:
+                retry_ghl_submission_sync(*args)
+        self.assertEqual(
+            [call.kwargs for call in sync.call_args_list], [{"is_submit": True}, {"is_declined": True}]
+        )
+
+        # Replayed retries no longer block new ones with the same flags.
+        with patch("quote_app.helpers.ghl_contacts_circuit_open", return_value=True), patch(
+            "quote_app.tasks.retry_ghl_submission_sync.apply_async"
+        ) as apply_async:
+            create_or_update_ghl_contact(self.submission, is_submit=True)
+        apply_async.assert_called_once()
+
+
+class StatusLogTests(TestCase):
+    """Status transition log and the funnel built from it (quote_app.status_log)."""
+
+    def _events(self, submission):
+        return list(submission.status_events.values_list("from_status", "to_status"))
+
+    def test_saves_log_only_real_transitions(self):
+        submission = CustomerSubmission.objects.create(first_name="Ann")
+        submission.status = "submitted"
+        submission.save()
+        submission.first_name = "Anne"
+        submission.save(update_fields=["first_name"])
+        submission.save()
+        reloaded = CustomerSubmission.objects.get(pk=submission.pk)
+        reloaded.status = "approved"
+        reloaded.save(update_fields=["status"])
+
+        self.assertEqual(
+            self._events(submission), [(None, "draft"), ("draft", "submitted"), ("submitted", "approved")]
+        )
+
+    def test_bulk_transition_logs_each_row(self):
+        from quote_app.status_log import transition_submissions
+
+        moved = [CustomerSubmission.objects.create(first_name=str(i)) for i in range(2)]
+        already = CustomerSubmission.objects.create(first_name="x", status="expired")
+
+        count = transition_submissions(CustomerSubmission.objects.all(), "expired", source="test")
+
+        self.assertEqual(count, 2)
+        for submission in moved:
+            self.assertEqual(self._events(submission)[-1], ("draft", "expired"))
+        self.assertEqual(self._events(already), [(None, "expired")])
+
+    def test_percentiles_use_nearest_rank(self):
+        from quote_app.status_log import _percentiles
+
+        self.assertEqual(_percentiles(list(range(10, 0, -1))), {"count": 10, "p50": 5, "p90": 9})
+        self.assertEqual(_percentiles([2.5]), {"count": 1, "p50": 2.5, "p90": 2.5})
+        self.assertEqual(_percentiles([]), {"count": 0, "p50": None, "p90": None})
+
+    def test_summarize_counts_skips_and_exits(self):
+        from quote_app.status_log import summarize
+
+        t0 = timezone.now()
+
+        def hours(n):
+            return t0 + timedelta(hours=n)
+
+        out = summarize({
+            "a": {"draft": hours(0), "submitted": hours(2), "packages_selected": hours(3), "approved": hours(7)},
+            "b": {"draft": hours(0), "approved": hours(10)},  # skipped ahead: counts for every stage
+            "c": {"draft": hours(0), "submitted": hours(4), "declined": hours(5)},
+            "d": {"draft": hours(0), "expired": hours(48)},
+        })
+
+        stages = {s["status"]: s for s in out["stages"]}
+        self.assertEqual([s["reached"] for s in out["stages"]], [4, 3, 2, 2])
+        self.assertEqual(stages["submitted"]["conversion_from_previous"], 75.0)
+        self.assertEqual(out["exits"], {"declined": 1, "expired": 1})
+        self.assertEqual(out["overall_conversion"], 50.0)
+        self.assertEqual(stages["draft"]["time_in_stage_hours"], {"count": 4, "p50": 4.0, "p90": 48.0})
+        self.assertEqual(out["time_to_approval_hours"], {"count": 2, "p50": 7.0, "p90": 10.0})
+
+    def test_funnel_reads_the_log_for_the_cohort(self):
+        from quote_app.status_log import funnel
+
+        won = CustomerSubmission.objects.create(first_name="won", heard_about_us="Google")
+        won.status = "submitted"
+        won.save()
+        won.status = "approved"
+        won.save()
+        lost = CustomerSubmission.objects.create(first_name="lost", heard_about_us="Flyer")
+        CustomerSubmission.objects.create(first_name="otg", is_on_the_go=True)
+
+        out = funnel(group_by="heard_about_us")
+
+        self.assertEqual(out["overall"]["submissions"], 2)
+        self.assertEqual([s["reached"] for s in out["overall"]["stages"]], [2, 1, 1, 1])
+        groups = {g["label"]: g["overall_conversion"] for g in out["groups"]}
+        self.assertEqual(groups, {"Google": 100.0, "Flyer": 0.0})
+        self.assertEqual(lost.status_events.count(), 1)
+
+    def test_backfill_migration(self):
+        import importlib
+
+        from django.apps import apps
+
+        from quote_app.models import SubmissionStatusEvent
+
+        backfill_events = importlib.import_module(
+            "quote_app.migrations.0038_submission_status_events"
+        ).backfill_events
+        draft = CustomerSubmission.objects.create(first_name="d")
+        declined = CustomerSubmission.objects.create(first_name="x")
+        declined_at = timezone.now() - timedelta(days=2)
+        CustomerSubmission.objects.filter(pk=declined.pk).update(status="declined", declined_at=declined_at)
+        SubmissionStatusEvent.objects.all().delete()
+
+        backfill_events(apps, None)
+
+        self.assertEqual(self._events(draft), [(None, "draft")])
+        self.assertCountEqual(self._events(declined), [(None, "draft"), ("draft", "declined")])
+        self.assertEqual(declined.status_events.get(to_status="declined").at, declined_at)
+        self.assertEqual(set(SubmissionStatusEvent.objects.values_list("source", flat=True)), {"backfill"})
+
+
+class LifecycleTests(TestCase):
+    """Draft expiry and retention purge (quote_app.lifecycle)."""
+
+    def _age(self, submission, days, **fields):
+        CustomerSubmission.all_objects.filter(pk=submission.pk).update(
+            updated_at=timezone.now() - timedelta(days=days), **fields
+        )
+
+    def _status(self, submission):
+        return CustomerSubmission.all_objects.get(pk=submission.pk).status
+
+    def test_drafts_expire_at_the_cutoff(self):
+        from quote_app.lifecycle import draft_expiry_days, run_lifecycle
+
+        days = draft_expiry_days()
+        stale = CustomerSubmission.objects.create(first_name="stale")
+        recent = CustomerSubmission.objects.create(first_name="recent")
+        submitted = CustomerSubmission.objects.create(first_name="sent", status="submitted")
+        self._age(stale, days + 1)
+        self._age(recent, days - 1)
+        self._age(submitted, days + 1)
+
+        summary = run_lifecycle(budget_seconds=60)
+
+        self.assertEqual((summary["expired"], summary["complete"]), (1, True))
+        self.assertEqual(self._status(stale), "expired")
+        self.assertEqual(self._status(recent), "draft")
+        self.assertEqual(self._status(submitted), "submitted")
+        self.assertEqual(stale.status_events.get(to_status="expired").source, "draft_expiry")
+
+    def test_recent_answer_keeps_draft_alive(self):
+        from quote_app.lifecycle import draft_expiry_days, run_lifecycle
+        from quote_app.models import CustomerQuestionResponse, CustomerServiceSelection
+        from service_app.models import Question, Service
+
+        days = draft_expiry_days()
+        service = Service.objects.create(name="Windows")
+        question = Question.objects.create(service=service, question_text="Screens?", question_type="yes_no")
+        draft = CustomerSubmission.objects.create(first_name="answering")
+        selection = CustomerServiceSelection.objects.create(submission=draft, service=service)
+        CustomerServiceSelection.objects.filter(pk=selection.pk).update(
+            created_at=timezone.now() - timedelta(days=days + 5)
+        )
+        CustomerQuestionResponse.objects.create(service_selection=selection, question=question, yes_no_answer=True)
+        self._age(draft, days + 5)
+
+        self.assertEqual(run_lifecycle(budget_seconds=60)["expired"], 0)
+        self.assertEqual(self._status(draft), "draft")
+
+        CustomerQuestionResponse.objects.filter(service_selection=selection).update(
+            created_at=timezone.now() - timedelta(days=days + 1)
+        )
+        self.assertEqual(run_lifecycle(budget_seconds=60)["expired"], 1)
+        self.assertEqual(self._status(draft), "expired")
+
+    def test_purge_respects_retention(self):
+        from quote_app.lifecycle import deleted_retention_days, expired_retention_days, run_lifecycle
+
+        old_expired = CustomerSubmission.objects.create(first_name="old", status="expired")
+        new_expired = CustomerSubmission.objects.create(first_name="new", status="expired")
+        old_deleted = CustomerSubmission.objects.create(first_name="gone", status="approved")
+        new_deleted = CustomerSubmission.objects.create(first_name="binned", status="approved")
+        approved = CustomerSubmission.objects.create(first_name="kept", status="approved")
+        self._age(old_expired, expired_retention_days() + 1)
+        self._age(new_expired, expired_retention_days() - 1)
+        self._age(
+            old_deleted, 0, is_deleted=True, deleted_at=timezone.now() - timedelta(days=deleted_retention_days() + 1)
+        )
+        self._age(
+            new_deleted, 0, is_deleted=True, deleted_at=timezone.now() - timedelta(days=deleted_retention_days() - 1)
+        )
+        self._age(approved, expired_retention_days() + 1)
+
+        summary = run_lifecycle(budget_seconds=60)
+
+        self.assertEqual(summary["purged"], 2)
+        survivors = set(CustomerSubmission.all_objects.values_list("pk", flat=True))
+        self.assertEqual(survivors, {new_expired.pk, new_deleted.pk, approved.pk})
+
+
+class ArchiveTests(TestCase):
+    """Archiving closed submissions' responses (quote_app.archive) without losing them from reporting."""
+
+    def setUp(self):
+        from service_app.models import Package, Question, Service
+
+        self.service = Service.objects.create(name="Windows")
+        self.package = Package.objects.create(service=self.service, name="Basic", base_price="200.00")
+        self.question = Question.objects.create(service=self.service, question_text="Screens?", question_type="yes_no")
+
+    def _submission(self, status, months_old, final_total="0.00", **fields):
+        from quote_app.archive import archive_after_months
+        from quote_app.models import (
+            CustomerAvailability,
+            CustomerPackageQuote,
+            CustomerQuestionResponse,
+            CustomerServiceSelection,
+        )
+
+        submission = CustomerSubmission.objects.create(
+            first_name=status, status=status, final_total=final_total, heard_about_us="Google", **fields
+        )
+        selection = CustomerServiceSelection.objects.create(submission=submission, service=self.service)
+        CustomerQuestionResponse.objects.create(service_selection=selection, question=self.question, yes_no_answer=True)
+        CustomerPackageQuote.objects.create(
+            service_selection=selection, package=self.package, base_price="200.00", total_price=final_total
+        )
+        CustomerAvailability.objects.create(submission=submission, date=timezone.now().date(), time="Morning")
+        # months_old past (or, when negative, short of) the archive threshold.
+        CustomerSubmission.objects.filter(pk=submission.pk).update(
+            updated_at=timezone.now() - timedelta(days=30 * (archive_after_months() + months_old))
+        )
+        return submission
+
+    def _dashboard(self):
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from service_app.views import DashboardAPIView, LeadSourceAnalyticsAPIView
+
+        user, _ = get_user_model().objects.get_or_create(username="analyst", defaults={"email": "a@test.com"})
+        out = {}
+        for name, view in (("dashboard", DashboardAPIView), ("lead_sources", LeadSourceAnalyticsAPIView)):
+            request = APIRequestFactory().get("/")
+            force_authenticate(request, user=user)
+            out[name] = view.as_view()(request).data
+        return out
+
+    def test_cutoff(self):
+        from quote_app.archive import run_archive
+
+        old_approved = self._submission("approved", 1, "500.00")
+        old_declined = self._submission("declined", 1)
+        recent_approved = self._submission("approved", -1, "300.00")
+        old_draft = self._submission("draft", 1)
+
+        self.assertEqual(run_archive(budget_seconds=60)["archived"], 2)
+
+        archived = set(CustomerSubmission.objects.filter(archived_at__isnull=False).values_list("pk", flat=True))
+        self.assertEqual(archived, {old_approved.pk, old_declined.pk})
+        self.assertNotIn(recent_approved.pk, archived)
+        self.assertNotIn(old_draft.pk, archived)
+        # A second run finds nothing new.
+        self.assertEqual(run_archive(budget_seconds=60)["archived"], 0)
+
+    def test_responses_move_to_the_snapshot(self):
+        from decimal import Decimal
+
+        from quote_app.archive import run_archive
+        from quote_app.models import (
+            ArchivedSubmission,
+            CustomerAvailability,
+            CustomerPackageQuote,
+            CustomerQuestionResponse,
+            CustomerServiceSelection,
+        )
+
+        submission = self._submission("approved", 1, "500.00")
+        kept = self._submission("approved", -1, "300.00")
+
+        result = run_archive(budget_seconds=60)
+
+        self.assertEqual((result["archived"], result["deleted_rows"]), (1, 2))
+        archive = ArchivedSubmission.objects.get(pk=submission.pk)
+        self.assertEqual(archive.final_total, Decimal("500.00"))
+        self.assertEqual(len(archive.snapshot["service_selections"][0]["question_responses"]), 1)
+        self.assertFalse(CustomerQuestionResponse.objects.filter(service_selection__submission=submission).exists())
+        self.assertFalse(CustomerAvailability.objects.filter(submission=submission).exists())
+        # The submission row and what reporting reads from it stay.
+        self.assertTrue(CustomerServiceSelection.objects.filter(submission=submission).exists())
+        self.assertTrue(CustomerPackageQuote.objects.filter(service_selection__submission=submission).exists())
+        self.assertTrue(submission.status_events.exists())
+        self.assertEqual(CustomerQuestionResponse.objects.filter(service_selection__submission=kept).count(), 1)
+
+    def test_analytics_totals_survive_archiving(self):
+        from quote_app.archive import run_archive
+
+        self._submission("approved", 1, "500.00")
+        self._submission("declined", 2)
+        self._submission("approved", -1, "300.00")
+        self._submission("draft", 1)
+
+        before = self._dashboard()
+        self.assertEqual(run_archive(budget_seconds=60)["archived"], 2)
+        after = self._dashboard()
+
+        self.assertEqual(after, before)
+        self.assertEqual(after["dashboard"]["statistics"]["total_submissions"], 4)
+        self.assertEqual(after["dashboard"]["statistics"]["total_worth"], 800.0)
+        self.assertEqual(after["lead_sources"]["summary"]["total_revenue"], 800.0)
+
+    def test_detail_serves_the_snapshot(self):
+        from rest_framework.test import APIRequestFactory
+
+        from quote_app.archive import run_archive
+        from quote_app.views import SubmissionDetailView
+
+        submission = self._submission("approved", 1, "500.00")
+        run_archive(budget_seconds=60)
+
+        view = SubmissionDetailView.as_view()
+        response = view(APIRequestFactory().get("/"), id=submission.pk)
+        self.assertTrue(response.data["is_archived"])
+        self.assertEqual(len(response.data["service_selections"][0]["question_responses"]), 1)
+        response = view(APIRequestFactory().patch("/", {"first_name": "x"}, format="json"), id=submission.pk)
+        self.assertEqual(response.status_code, 409)
+
+
+@patch("quote_app.views.create_or_update_ghl_contact")
+class PricingSnapshotQuoteTests(TestCase):
+    """Quotes re-priced from the selection's pinned pricing snapshot (service_app.pricing_snapshot)."""
+
+    def setUp(self):
+        from decimal import Decimal
+
+        from django.core.cache import cache
+
+        from quote_app.models import CustomerServiceSelection
+        from service_app.models import (
+            OptionPricing,
+            Package,
+            QuantityDiscount,
+            Question,
+            QuestionOption,
+            QuestionPricing,
+            Service,
+        )
+
+        cache.clear()
+        self.service = Service.objects.create(name="Windows")
+        self.basic = Package.objects.create(service=self.service, name="Basic", base_price=Decimal("100.00"), order=1)
+        self.premium = Package.objects.create(service=self.service, name="Premium", base_price=Decimal("200.00"), order=2)
+        self.pets = Question.objects.create(service=self.service, question_text="Pets?", question_type="yes_no")
+        self.panes = Question.objects.create(service=self.service, question_text="Panes?", question_type="quantity")
+        self.small = QuestionOption.objects.create(question=self.panes, option_text="Small", allow_quantity=True)
+        self.large = QuestionOption.objects.create(question=self.panes, option_text="Large", allow_quantity=True)
+        for package in (self.basic, self.premium):
+            QuestionPricing.objects.create(
+                question=self.pets, package=package, yes_pricing_type="upcharge_percent", yes_value=Decimal("10.00")
+            )
+            for option in (self.small, self.large):
+                OptionPricing.objects.create(
+                    option=option, package=package, pricing_type="upcharge_percent", value=Decimal("5.00")
+                )
+        QuantityDiscount.objects.create(
+            question=self.panes, option=self.small, scope="option", value=Decimal("10.00"), min_quantity=3
+        )
+        QuantityDiscount.objects.create(question=self.panes, scope="question", value=Decimal("20.00"), min_quantity=5)
+
+        self.submission = CustomerSubmission.objects.create(first_name="Ann", status="submitted")
+        self.selection = CustomerServiceSelection.objects.create(submission=self.submission, service=self.service)
+
+    def _submit(self, status=None):
+        from rest_framework.test import APIRequestFactory
+
+        from quote_app.views import SubmitServiceResponsesView
+
+        if status:
+            CustomerSubmission.objects.filter(pk=self.submission.pk).update(status=status)
+        request = APIRequestFactory().post(
+            "/", {"responses": [{"question_id": str(self.pets.id), "yes_no_answer": True}]}, format="json"
+        )
+        response = SubmitServiceResponsesView.as_view()(
+            request, submission_id=self.submission.pk, service_id=self.service.pk
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return self._quotes()
+
+    def _quotes(self):
+        self.selection.refresh_from_db()
+        return {quote.package_id: quote.base_price for quote in self.selection.package_quotes.all()}
+
+    def _raise_basic_price(self):
+        from decimal import Decimal
+
+        self.basic.base_price = Decimal("150.00")
+        # invalidate_catalog_cache bumps the catalog version in transaction.on_commit.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basic.save()
+
+    def test_submitted_quote_keeps_pinned_prices(self, _ghl):
+        from decimal import Decimal
+
+        self.assertEqual(self._submit()[self.basic.id], Decimal("100.00"))
+        pinned = self.selection.pricing_snapshot_id
+
+        self._raise_basic_price()
+
+        self.assertEqual(self._submit()[self.basic.id], Decimal("100.00"))
+        self.assertEqual(self.selection.pricing_snapshot_id, pinned)
+
+    def test_draft_repins_to_current_catalog(self, _ghl):
+        from decimal import Decimal
+
+        self.assertEqual(self._submit(status="draft")[self.basic.id], Decimal("100.00"))
+        pinned = self.selection.pricing_snapshot_id
+
+        self._raise_basic_price()
+
+        self.assertEqual(self._submit(status="draft")[self.basic.id], Decimal("150.00"))
+        self.assertNotEqual(self.selection.pricing_snapshot_id, pinned)
+
+    def test_edit_reprices_with_current_catalog_only_on_request(self, _ghl):
+        from decimal import Decimal
+
+        from rest_framework.test import APIRequestFactory
+
+        from quote_app.views import EditServiceResponsesView
+
+        self._submit()
+        self._raise_basic_price()
+
+        def switch_package(**extra):
+            request = APIRequestFactory().put("/", {"new_package_id": str(self.basic.id), **extra}, format="json")
+            response = EditServiceResponsesView.as_view()(
+                request, submission_id=self.submission.pk, service_id=self.service.pk
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+            return self._quotes()[self.basic.id]
+
+        self.assertEqual(switch_package(), Decimal("100.00"))
+        self.assertEqual(switch_package(reprice_with_current_catalog=True), Decimal("150.00"))
+        self.selection.refresh_from_db()
+        self.assertEqual(self.selection.final_total_price, Decimal("150.00"))
+
+    def test_package_deleted_after_pinning_is_skipped(self, _ghl):
+        self.assertEqual(set(self._submit()), {self.basic.id, self.premium.id})
+
+        self.premium.delete()
+
+        self.assertEqual(set(self._submit()), {self.basic.id})
+
+    def test_quantity_discounts_match_live_tables(self, _ghl):
+        from decimal import Decimal
+
+        from quote_app.models import CustomerOptionResponse, CustomerQuestionResponse
+        from quote_app.views import SubmitServiceResponsesView
+        from service_app.models import OptionPricing
+        from service_app.pricing_snapshot import pricing_rules_for
+
+        rules = pricing_rules_for(self.selection)
+        live_option_pricings = {(p.option_id, p.package_id): p for p in OptionPricing.objects.all()}
+        view = SubmitServiceResponsesView()
+        view.bid_in_person = False
+
+        cases = [
+            ({self.small: 4, self.large: 2}, Decimal("22.00")),  # both scopes: 30 - 10% of 20 - 20% of 30
+            ({self.small: 3}, Decimal("13.50")),  # option scope only
+            ({self.large: 5}, Decimal("20.00")),  # question scope only
+            ({self.small: 1, self.large: 1}, Decimal("10.00")),  # below every threshold
+        ]
+        for quantities, expected in cases:
+            response = CustomerQuestionResponse.objects.create(service_selection=self.selection, question=self.panes)
+            for option, quantity in quantities.items():
+                CustomerOptionResponse.objects.create(question_response=response, option=option, quantity=quantity)
+            for package in (self.basic, self.premium):
+                live = view._calculate_options_question_adjustment_from_stored_optimized(
+                    response, package, Decimal("0.00"), live_option_pricings
+                )
+                pinned = view._calculate_options_question_adjustment_from_stored_optimized(
+                    response, package, Decimal("0.00"), rules.option_pricings, rules.quantity_discounts
+                )
+                self.assertEqual((pinned, live), (expected, expected), quantities)
+            response.delete()
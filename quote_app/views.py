@@ -12,6 +12,7 @@ from decimal import Decimal
 from datetime import timedelta
 from django.utils import timezone
 from service_app.models import ServiceSettings
+from service_app.pricing_snapshot import pricing_rules_for
 from service_app.models import (
     Service, Package, Feature, PackageFeature, Location,
     Question, QuestionOption, SubQuestion, GlobalSizePackage,
@@ -37,9 +38,10 @@ from quote_app.helpers import (
     create_or_update_ghl_contact,
     add_quote_drafted_tag_to_ghl,
     sync_ghl_contact_tags_for_submission_status,
-    upload_file_to_ghl_media,
     delete_file_from_ghl_media,
 )
+from quote_app.archive import archived_snapshot
+from quote_app.images import accept_upload, delete_local_files
 from quote_app.pricing_utils import (
     build_bundle_preview,
     clear_bundle_if_invalid,
@@ -320,22 +322,14 @@ class SubmitServiceResponsesView(APIView):
                 ordered_responses = self._order_responses_by_dependency(responses)
                 print(f"[DEBUG] Step 7: Ordered responses count: {len(ordered_responses)}")
                 
-                # OPTIMIZATION: Prefetch all packages and related data once
-                print(f"[DEBUG] Step 8: Fetching packages...")
-                packages = Package.objects.filter(service=service_selection.service, is_active=True).select_related('service')
-                print(f"[DEBUG] Step 8: Found {packages.count()} packages")
-                
-                # OPTIMIZATION: Prefetch all sqft mappings for all packages at once
-                print(f"[DEBUG] Step 9: Fetching sqft mappings...")
-                sqft_mappings = {}
-                if submission.size_range:
-                    sqft_mappings = {
-                        mapping.service_package_id: mapping.price
-                        for mapping in ServicePackageSizeMapping.objects.filter(
-                            service_package__in=packages,
-                            global_size=submission.size_range
-                        ).select_related('service_package', 'global_size')
-                    }
+                # Packages and sqft prices come from the pricing snapshot; drafts re-pin to the current catalog
+                print(f"[DEBUG] Step 8: Loading pricing snapshot...")
+                rules = pricing_rules_for(service_selection, refresh=submission.status == 'draft')
+                packages = rules.packages
+                print(f"[DEBUG] Step 8: Snapshot {rules.snapshot_id} with {len(packages)} packages")
+                
+                print(f"[DEBUG] Step 9: Resolving sqft prices...")
+                sqft_mappings = rules.sqft_prices(submission.size_range_id)
                 print(f"[DEBUG] Step 9: Found {len(sqft_mappings)} sqft mappings")
                 
                 # OPTIMIZATION: Prefetch all questions at once to avoid N+1 queries
@@ -403,7 +397,7 @@ class SubmitServiceResponsesView(APIView):
                 # Generate package quotes for ALL packages - optimized
                 print(f"[DEBUG] Step 13: Generating package quotes...")
                 surcharge_applied, surcharge_price = self._generate_all_package_quotes_optimized(
-                    service_selection, submission, packages, sqft_mappings
+                    service_selection, submission, packages, sqft_mappings, rules
                 )
                 
                 print(f"[DEBUG] Step 13: Package quotes generated")
@@ -560,26 +554,26 @@ class SubmitServiceResponsesView(APIView):
                 )
     
     def _calculate_question_adjustment_for_averaging(self, question, response_data, question_response, service_selection):
-        """Calculate average adjustment across packages (for display only)"""
-        packages = Package.objects.filter(service=question.service, is_active=True)
-        if not packages.exists():
+        """Calculate average adjustment across packages (for display only), priced from the selection's snapshot"""
+        rules = pricing_rules_for(service_selection)
+        if not rules.packages:
             return Decimal('0.00')
         
+        sqft_prices = rules.sqft_prices(service_selection.submission.size_range_id)
         total_adjustment = Decimal('0.00')
-        package_count = 0
         
-        for package in packages:
-            # Get package-specific sqft price
-            base_sqft_price = self._get_package_sqft_price(service_selection.submission, package)
-            
-            # Calculate adjustment for this package
-            package_adjustment = self._calculate_single_package_adjustment(
-                question, response_data, question_response, package, base_sqft_price
-            )
+        for package in rules.packages:
+            if question.question_type == 'measurement':
+                package_adjustment = self._calculate_measurement_question_adjustment(question_response, package, rules)
+            else:
+                package_adjustment = self._calculate_package_specific_adjustments_new_optimized(
+                    [question_response], package, sqft_prices.get(package.id, Decimal('0.00')),
+                    rules.question_pricings, rules.option_pricings, rules.sub_question_pricings,
+                    rules.quantity_discounts
+                )
             total_adjustment += package_adjustment
-            package_count += 1
         
-        return total_adjustment / package_count if package_count > 0 else Decimal('0.00')
+        return total_adjustment / len(rules.packages)
     
     def _calculate_question_adjustment_for_averaging_optimized(self, question, response_data, question_response, service_selection, packages, sqft_mappings):
         """Calculate average adjustment across packages (for display only) - OPTIMIZED"""
@@ -756,7 +750,8 @@ class SubmitServiceResponsesView(APIView):
         
         return total_adjustment
     
-    def _calculate_options_question_adjustment_from_stored_optimized(self, question_response, package, base_sqft_price, all_option_pricings):
+    def _calculate_options_question_adjustment_from_stored_optimized(self, question_response, package, base_sqft_price, all_option_pricings,
+                                                                      quantity_discounts=None):
         """Calculate adjustment for options question using stored responses (prevents duplication) - OPTIMIZED"""
         total_adjustment = Decimal('0.00')
         total_quantity = 0
@@ -788,8 +783,11 @@ class SubmitServiceResponsesView(APIView):
         
         # Apply quantity discounts if this is a quantity question
         if question_response.question.question_type == 'quantity':
+            discounts = None
+            if quantity_discounts is not None:
+                discounts = quantity_discounts.get(question_response.question_id, [])
             total_adjustment = self._apply_quantity_discounts(
-                question_response.question, option_adjustments, total_quantity, total_adjustment
+                question_response.question, option_adjustments, total_quantity, total_adjustment, discounts
             )
         
         return total_adjustment
@@ -857,17 +855,21 @@ class SubmitServiceResponsesView(APIView):
         print(f"[DEBUG] Total sub-questions adjustment: {total_adjustment}")
         return total_adjustment
     
-    def _calculate_measurement_question_adjustment(self, question_response, package):
+    def _calculate_measurement_question_adjustment(self, question_response, package, rules=None):
         """Calculate total price for measurement question using stored responses
         
         Returns the total price calculated from measurements (length × width × quantity × price_per_unit).
         This total can replace the base_price if it's higher.
+        With ``rules`` (pricing snapshot) the pricing row is looked up in memory.
         """
         # Get pricing for this question and package
-        pricing = QuestionPricing.objects.filter(
-            question=question_response.question,
-            package=package
-        ).first()
+        if rules is not None:
+            pricing = rules.question_pricings.get((question_response.question_id, package.id))
+        else:
+            pricing = QuestionPricing.objects.filter(
+                question=question_response.question,
+                package=package
+            ).first()
         
         if not pricing:
             print(f"[DEBUG] _calculate_measurement_question_adjustment: No pricing found for question {question_response.question.id} and package {package.id}")
@@ -960,79 +962,61 @@ class SubmitServiceResponsesView(APIView):
             print(f"[DEBUG] Final result (positive): {base_amount}")
             return base_amount
     
-    def _apply_quantity_discounts(self, question, option_adjustments, total_quantity, base_total):
-        """Apply quantity discounts for quantity-type questions"""
+    def _apply_quantity_discounts(self, question, option_adjustments, total_quantity, base_total, discounts=None):
+        """Apply quantity discounts for quantity-type questions (``discounts``: snapshot rules for the question)"""
         discounted_total = base_total
         
-        # Get all quantity discounts for this question
-        quantity_discounts = QuantityDiscount.objects.filter(
-            question=question,
-            min_quantity__lte=total_quantity
-        ).order_by('-min_quantity')
+        # Get all quantity discounts for this question, highest threshold first
+        if discounts is None:
+            discounts = QuantityDiscount.objects.filter(question=question)
+        quantity_discounts = sorted(
+            (d for d in discounts if d.min_quantity <= total_quantity),
+            key=lambda d: -d.min_quantity
+        )
         
         # Apply option-specific discounts
         for option_id, adjustment_data in option_adjustments.items():
-            option_discounts = quantity_discounts.filter(
-                option_id=option_id,
-                scope='option'
+            discount = next(
+                (d for d in quantity_discounts if d.scope == 'option' and str(d.option_id) == option_id), None
             )
-            
-            if option_discounts.exists():
-                discount = option_discounts.first()
-                if discount.discount_type == 'percent':
-                    discount_amount = adjustment_data['base_adjustment'] * (discount.value / 100)
-                    discounted_total -= discount_amount
+            if discount and discount.discount_type == 'percent':
+                discount_amount = adjustment_data['base_adjustment'] * (discount.value / 100)
+                discounted_total -= discount_amount
         
         # Apply whole-question discounts
-        whole_question_discounts = quantity_discounts.filter(
-            option__isnull=True,
-            scope='question'
+        discount = next(
+            (d for d in quantity_discounts if d.scope == 'question' and d.option_id is None), None
         )
-        
-        if whole_question_discounts.exists():
-            discount = whole_question_discounts.first()
-            if discount.discount_type == 'percent':
-                discount_amount = base_total * (discount.value / 100)
-                discounted_total -= discount_amount
+        if discount and discount.discount_type == 'percent':
+            discount_amount = base_total * (discount.value / 100)
+            discounted_total -= discount_amount
         
         return discounted_total
     
     def _generate_all_package_quotes(self, service_selection, submission):
-        """Generate quotes for ALL packages in the service with correct package-specific pricing"""
-        service = service_selection.service
-        packages = Package.objects.filter(service=service, is_active=True).select_related('service')
-        
-        # Prefetch sqft mappings
-        sqft_mappings = {}
-        if submission.size_range:
-            sqft_mappings = {
-                mapping.service_package_id: mapping.price
-                for mapping in ServicePackageSizeMapping.objects.filter(
-                    service_package__in=packages,
-                    global_size=submission.size_range
-                ).select_related('service_package', 'global_size')
-            }
+        """Generate quotes for ALL packages in the service from the selection's pinned pricing snapshot"""
+        rules = pricing_rules_for(service_selection)
+        sqft_mappings = rules.sqft_prices(submission.size_range_id)
         
-        return self._generate_all_package_quotes_optimized(service_selection, submission, packages, sqft_mappings)
+        return self._generate_all_package_quotes_optimized(service_selection, submission, rules.packages, sqft_mappings, rules)
     
-    def _generate_all_package_quotes_optimized(self, service_selection, submission, packages, sqft_mappings):
-        """Generate quotes for ALL packages in the service with correct package-specific pricing - OPTIMIZED"""
-        service = service_selection.service
+    def _generate_all_package_quotes_optimized(self, service_selection, submission, packages, sqft_mappings, rules=None):
+        """Generate quotes for ALL packages in the service with correct package-specific pricing - OPTIMIZED
+
+        ``packages`` / ``sqft_mappings`` / ``rules`` come from the selection's pricing snapshot, so no
+        pricing table is read here and a re-price gives the same result until the selection is re-pinned.
+        """
+        rules = rules or pricing_rules_for(service_selection)
         
         surcharge_applied = False
         surcharge_amount_applied = Decimal('0.00')
         
-        if submission.location and hasattr(service, 'settings'):
-            try:
-                settings = service.settings
-                if settings.apply_trip_charge_to_bid:
-                    surcharge_amount_applied = submission.location.trip_surcharge
-                    service_selection.surcharge_applicable = True
-                    service_selection.surcharge_amount = surcharge_amount_applied
-                    surcharge_applied = True
-                    service_selection.save()
-            except ServiceSettings.DoesNotExist:
-                pass
+        if submission.location and rules.apply_trip_charge_to_bid:
+            surcharge_amount_applied = submission.location.trip_surcharge
+            service_selection.surcharge_applicable = True
+            service_selection.surcharge_amount = surcharge_amount_applied
+            surcharge_applied = True
+            service_selection.save()
         
         # ✅ PRESERVE admin overrides before deleting quotes
         existing_quotes = service_selection.package_quotes.all()
@@ -1048,21 +1032,10 @@ class SubmitServiceResponsesView(APIView):
         # Clear existing quotes for this service
         service_selection.package_quotes.all().delete()
         
-        # OPTIMIZATION: Prefetch all package features for all packages at once
-        all_package_features = PackageFeature.objects.filter(
-            package__in=packages
-        ).select_related('package', 'feature')
-        
-        # Organize features by package
-        features_by_package = {}
-        for pf in all_package_features:
-            package_id = pf.package_id
-            if package_id not in features_by_package:
-                features_by_package[package_id] = {'included': [], 'excluded': []}
-            if pf.is_included:
-                features_by_package[package_id]['included'].append(str(pf.feature.id))
-            else:
-                features_by_package[package_id]['excluded'].append(str(pf.feature.id))
+        # Packages deleted outright since the snapshot was taken can no longer be quoted
+        live_package_ids = set(
+            Package.objects.filter(id__in=[package.id for package in packages]).values_list('id', flat=True)
+        )
         
         # OPTIMIZATION: Prefetch all question responses with related data at once
         question_responses = service_selection.question_responses.all().prefetch_related(
@@ -1072,48 +1045,6 @@ class SubmitServiceResponsesView(APIView):
             'measurement_responses__option'  # Prefetch measurement responses
         )
         
-        # OPTIMIZATION: Prefetch all pricing rules for all packages and questions
-        question_ids = [qr.question_id for qr in question_responses]
-        all_question_pricings = {}
-        if question_ids:
-            all_question_pricings = {
-                (qp.question_id, qp.package_id): qp
-                for qp in QuestionPricing.objects.filter(
-                    question_id__in=question_ids,
-                    package__in=packages
-                ).select_related('question', 'package')
-            }
-        
-        all_option_pricings = {}
-        all_sub_question_pricings = {}
-        
-        # Get all option IDs and sub-question IDs
-        option_ids = []
-        sub_question_ids = []
-        for qr in question_responses:
-            for opt_resp in qr.option_responses.all():
-                option_ids.append(opt_resp.option_id)
-            for sub_resp in qr.sub_question_responses.all():
-                sub_question_ids.append(sub_resp.sub_question_id)
-        
-        if option_ids:
-            all_option_pricings = {
-                (op.option_id, op.package_id): op
-                for op in OptionPricing.objects.filter(
-                    option_id__in=option_ids,
-                    package__in=packages
-                ).select_related('option', 'package')
-            }
-        
-        if sub_question_ids:
-            all_sub_question_pricings = {
-                (sqp.sub_question_id, sqp.package_id): sqp
-                for sqp in SubQuestionPricing.objects.filter(
-                    sub_question_id__in=sub_question_ids,
-                    package__in=packages
-                ).select_related('sub_question', 'package')
-            }
-        
         # All measurement-type questions (sum each; previously only the first was used)
         measurement_question_responses = [
             qr for qr in question_responses
@@ -1122,6 +1053,8 @@ class SubmitServiceResponsesView(APIView):
         
         # Generate quotes for each package
         for package in packages:
+            if package.id not in live_package_ids:
+                continue
             base_price = package.base_price
             
             # Get package-specific sqft price from pre-fetched dict
@@ -1130,7 +1063,7 @@ class SubmitServiceResponsesView(APIView):
             # Sum measurement totals across every measurement question for this package
             measurement_total = Decimal('0.00')
             for mqr in measurement_question_responses:
-                row_total = self._calculate_measurement_question_adjustment(mqr, package)
+                row_total = self._calculate_measurement_question_adjustment(mqr, package, rules)
                 measurement_total += row_total
             if measurement_question_responses:
                 print(f"[DEBUG] Measurement questions ({len(measurement_question_responses)}) for package {package.name} - measurement_total: {measurement_total}, base_price: {base_price}")
@@ -1144,7 +1077,8 @@ class SubmitServiceResponsesView(APIView):
             
             question_adjustments = self._calculate_package_specific_adjustments_new_optimized(
                 other_question_responses, package, sqft_price, 
-                all_question_pricings, all_option_pricings, all_sub_question_pricings
+                rules.question_pricings, rules.option_pricings, rules.sub_question_pricings,
+                rules.quantity_discounts
             )
             
             # Measurement logic: effective_base = max(measurement_total, base_price)
@@ -1170,15 +1104,14 @@ class SubmitServiceResponsesView(APIView):
             
             print(f"[DEBUG] Package {package.name} - base: {base_price}, measurement: {measurement_total}, effective_base: {effective_base_price}, sqft: {sqft_price}, adjustments: {question_adjustments}, surcharge: {surcharge_amount_applied}, total: {total_price}")
             
-            # Get package features from pre-fetched dict
-            package_features_data = features_by_package.get(package.id, {'included': [], 'excluded': []})
-            included_features = package_features_data['included']
-            excluded_features = package_features_data['excluded']
+            # Package features from the snapshot
+            included_features = package.included_features
+            excluded_features = package.excluded_features
             
             # Create the quote
             quote = CustomerPackageQuote.objects.create(
                 service_selection=service_selection,
-                package=package,
+                package_id=package.id,
                 base_price=base_price,  # Original base price
                 sqft_price=sqft_price,
                 question_adjustments=question_adjustments,  # Other adjustments (non-measurement)
@@ -1255,7 +1188,8 @@ class SubmitServiceResponsesView(APIView):
         )
     
     def _calculate_package_specific_adjustments_new_optimized(self, question_responses, package, base_sqft_price, 
-                                                               all_question_pricings, all_option_pricings, all_sub_question_pricings):
+                                                               all_question_pricings, all_option_pricings, all_sub_question_pricings,
+                                                               quantity_discounts=None):
         """Calculate question adjustments specific to a package with package-specific sqft pricing - OPTIMIZED"""
         total_adjustment = Decimal('0.00')
         
@@ -1286,7 +1220,7 @@ class SubmitServiceResponsesView(APIView):
             
             elif question.question_type in ['describe', 'quantity']:
                 adjustment = self._calculate_options_question_adjustment_from_stored_optimized(
-                    question_response, package, base_sqft_price, all_option_pricings
+                    question_response, package, base_sqft_price, all_option_pricings, quantity_discounts
                 )
                 print(f"[DEBUG] Options question {question.id} adjustment for package {package.id}: {adjustment}")
                 total_adjustment += adjustment
@@ -1515,7 +1449,7 @@ class SubmitServiceResponsesView(APIView):
     
 
 class SubmissionDetailView(generics.RetrieveUpdateAPIView):
-    """Get detailed submission with all quotes"""
+    """Get detailed submission with all quotes (primary only: polled right after writes)."""
     queryset = CustomerSubmission.objects.all()
     serializer_class = CustomerSubmissionDetailSerializer
     permission_classes = [AllowAny]
@@ -1523,20 +1457,29 @@ class SubmissionDetailView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         submission_id = self.kwargs['id']
-        return get_object_or_404(
-            CustomerSubmission.objects.select_related(
-                'location', 'applied_coupon', 'applied_bundle',
-            ).prefetch_related(
-                'applied_bundle__services',
-                'customerserviceselection_set__service',
-                'customerserviceselection_set__package_quotes__package',
-                'customerserviceselection_set__question_responses__question',
-                'customerserviceselection_set__question_responses__option_responses__option',
-                'customerserviceselection_set__question_responses__sub_question_responses__sub_question',
-                'customerserviceselection_set__question_responses__measurement_responses__option'
-            ),
-            id=submission_id
-        )
+        return get_object_or_404(CustomerSubmission.objects.with_detail(), id=submission_id)
+
+    def _archived(self):
+        """Stored snapshot when the submission's responses were archived (quote_app.archive), else None."""
+        submission = CustomerSubmission.all_objects.filter(id=self.kwargs['id']).only('archived_at').first()
+        if submission is not None and submission.archived_at is None:
+            return None
+        # Rows archived before the submission was kept are gone from the hot table entirely.
+        return archived_snapshot(self.kwargs['id'])
+
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = self._archived()
+        if snapshot is not None:
+            return Response(snapshot)
+        return super().retrieve(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        if self._archived() is not None:
+            return Response(
+                {'error': 'This submission is archived and can no longer be edited.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return super().update(request, *args, **kwargs)
 
 
 class UpdateSubmissionNotesView(APIView):
@@ -1624,7 +1567,7 @@ class UpdateSubmissionSqftView(APIView):
         )
 
 
-# Quote images (upload to GHL media, store URL in SubmissionImage)
+# Quote images (accepted locally, pushed to GHL media in the background; see quote_app.images)
 class ListQuoteImagesView(APIView):
     """List images for a submission (quote)."""
     permission_classes = [AllowAny]
@@ -1632,12 +1575,15 @@ class ListQuoteImagesView(APIView):
     def get(self, request, submission_id):
         submission = get_object_or_404(CustomerSubmission, id=submission_id)
         images = submission.images.all()
-        serializer = SubmissionImageSerializer(images, many=True)
+        serializer = SubmissionImageSerializer(images, many=True, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 class UploadQuoteImageView(APIView):
-    """Upload an image for a quote; file is stored in GHL media, URL saved in SubmissionImage."""
+    """
+    Upload an image for a quote. The file is stored locally and a pending SubmissionImage is
+    returned at once; a Celery task uploads it to GHL media and fills in url / file_id.
+    """
     permission_classes = [AllowAny]
 
     def post(self, request, submission_id):
@@ -1648,41 +1594,25 @@ class UploadQuoteImageView(APIView):
                 {"error": "No file provided. Send multipart/form-data with key 'file'."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        from accounts.models import GHLAuthCredentials
-        credentials = GHLAuthCredentials.objects.first()
-        if not credentials or not credentials.location_id:
-            return Response(
-                {"error": "GHL credentials or location ID not configured."},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE,
-            )
-        result = upload_file_to_ghl_media(uploaded_file, credentials.location_id)
-        if not result:
-            return Response(
-                {"error": "Failed to upload file to media storage."},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
-        image = SubmissionImage.objects.create(
-            submission=submission,
-            url=result.get("url", ""),
-            file_id=result.get("fileId", ""),
-            trace_id=result.get("traceId"),
-        )
-        serializer = SubmissionImageSerializer(image)
+        image = accept_upload(submission, uploaded_file)
+        serializer = SubmissionImageSerializer(image, context={"request": request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 class DeleteQuoteImageView(APIView):
-    """Delete a quote image: remove from GHL media and delete SubmissionImage."""
+    """Delete a quote image: remove from GHL media (once uploaded), local copies, and the SubmissionImage."""
     permission_classes = [AllowAny]
 
     def delete(self, request, submission_id, image_id):
         submission = get_object_or_404(CustomerSubmission, id=submission_id)
         image = get_object_or_404(SubmissionImage, id=image_id, submission=submission)
-        from accounts.models import GHLAuthCredentials
-        credentials = GHLAuthCredentials.objects.first()
-        location_id = credentials.location_id if credentials else None
-        if location_id:
-            delete_file_from_ghl_media(image.file_id, location_id)
+        if image.file_id:
+            from accounts.token_manager import ghl_tokens
+            credentials = ghl_tokens.get_credentials()
+            location_id = credentials.location_id if credentials else None
+            if location_id:
+                delete_file_from_ghl_media(image.file_id, location_id)
+        delete_local_files(image)
         image.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -1804,6 +1734,8 @@ class EditServiceResponsesView(APIView):
         """
         Edit service responses after submission.
         Preserves package selection and recalculates all totals.
+        Prices come from the pricing snapshot the quote was generated with;
+        send reprice_with_current_catalog=true to re-price with the current catalog.
         """
         self.bid_in_person = False  # Reset for each request
         
@@ -1833,6 +1765,10 @@ class EditServiceResponsesView(APIView):
         
         try:
             with transaction.atomic():
+                # Edits keep the prices the quote was issued with unless the admin asks for current ones
+                if request.data.get('reprice_with_current_catalog') is True:
+                    pricing_rules_for(service_selection, refresh=True)
+
                 # Package-only edit path: switch package and preserve existing responses
                 new_package_id = request.data.get('new_package_id')
                 is_package_only = bool(new_package_id) and (not responses_present or not responses)
@@ -2341,10 +2277,11 @@ class EditServiceResponsesView(APIView):
             self, question_response, package, base_sqft_price
         )
     
-    def _calculate_options_question_adjustment_from_stored_optimized(self, question_response, package, base_sqft_price, all_option_pricings):
+    def _calculate_options_question_adjustment_from_stored_optimized(self, question_response, package, base_sqft_price, all_option_pricings,
+                                                                      quantity_discounts=None):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._calculate_options_question_adjustment_from_stored_optimized(
-            self, question_response, package, base_sqft_price, all_option_pricings
+            self, question_response, package, base_sqft_price, all_option_pricings, quantity_discounts
         )
     
     def _calculate_sub_questions_adjustment_from_stored(self, question_response, package, base_sqft_price):
@@ -2359,10 +2296,10 @@ class EditServiceResponsesView(APIView):
             self, question_response, package, base_sqft_price, all_sub_question_pricings
         )
     
-    def _calculate_measurement_question_adjustment(self, question_response, package):
+    def _calculate_measurement_question_adjustment(self, question_response, package, rules=None):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._calculate_measurement_question_adjustment(
-            self, question_response, package
+            self, question_response, package, rules
         )
     
     def _apply_pricing_rule(self, pricing_type, value, value_type, base_sqft_price, quantity=1):
@@ -2371,20 +2308,20 @@ class EditServiceResponsesView(APIView):
             self, pricing_type, value, value_type, base_sqft_price, quantity
         )
     
-    def _apply_quantity_discounts(self, question, option_adjustments, total_quantity, base_total):
+    def _apply_quantity_discounts(self, question, option_adjustments, total_quantity, base_total, discounts=None):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._apply_quantity_discounts(
-            self, question, option_adjustments, total_quantity, base_total
+            self, question, option_adjustments, total_quantity, base_total, discounts
         )
     
     def _generate_all_package_quotes(self, service_selection, submission):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._generate_all_package_quotes(self, service_selection, submission)
     
-    def _generate_all_package_quotes_optimized(self, service_selection, submission, packages, sqft_mappings):
+    def _generate_all_package_quotes_optimized(self, service_selection, submission, packages, sqft_mappings, rules=None):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._generate_all_package_quotes_optimized(
-            self, service_selection, submission, packages, sqft_mappings
+            self, service_selection, submission, packages, sqft_mappings, rules
         )
     
     def _calculate_package_specific_adjustments_new(self, service_selection, package, base_sqft_price):
@@ -2394,11 +2331,12 @@ class EditServiceResponsesView(APIView):
         )
     
     def _calculate_package_specific_adjustments_new_optimized(self, question_responses, package, base_sqft_price, 
-                                                               all_question_pricings, all_option_pricings, all_sub_question_pricings):
+                                                               all_question_pricings, all_option_pricings, all_sub_question_pricings,
+                                                               quantity_discounts=None):
         """Reuse from SubmitServiceResponsesView"""
         return SubmitServiceResponsesView._calculate_package_specific_adjustments_new_optimized(
             self, question_responses, package, base_sqft_price, 
-            all_question_pricings, all_option_pricings, all_sub_question_pricings
+            all_question_pricings, all_option_pricings, all_sub_question_pricings, quantity_discounts
         )
     
 
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ServiceAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'service_app'
+
+    def ready(self):
+        import service_app.signals  # noqa: F401 - register signals
+        from jobber_app.call_ledger import install_call_ledger
+        from service_backend.circuit_breaker import install_circuit_breakers
+        from service_backend.metrics import install_outbound_instrumentation
+
+        # Breakers first so the metrics wrapper also times fast-failed calls.
+        install_circuit_breakers()
+        install_call_ledger()
+        install_outbound_instrumentation()
@@ -0,0 +1,137 @@
+"""
+Bulk upsert helpers for the admin pricing grid endpoints.
+
+The whole payload is validated before anything is written, then each grid is saved
+with a single ``bulk_create(update_conflicts=True)`` on the model's ``unique_together``
+key, followed by one catalog-cache invalidation for the affected service.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import transaction
+
+from .catalog_cache import invalidate_catalog_cache
+from .models import OptionPricing, Package, QuestionPricing, SubQuestionPricing
+
+
+class BulkPricingValidationError(Exception):
+    """Raised when one or more rules in a bulk payload are invalid; ``errors`` is keyed by rule index."""
+
+    def __init__(self, errors):
+        super().__init__("Invalid pricing rules")
+        self.errors = errors
+
+
+# model -> (parent FK name, pricing type field, value field)
+PRICING_GRID_FIELDS = {
+    QuestionPricing: ("question", "yes_pricing_type", "yes_value"),
+    SubQuestionPricing: ("sub_question", "yes_pricing_type", "yes_value"),
+    OptionPricing: ("option", "pricing_type", "value"),
+}
+
+
+def _parse_decimal(raw):
+    try:
+        value = Decimal(str(raw))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return value if value.is_finite() else None
+
+
+def _value_error(field, value):
+    """Why ``value`` does not fit the field's max_digits / decimal_places, or None."""
+    try:
+        DecimalValidator(field.max_digits, field.decimal_places)(value)
+    except ValidationError as exc:
+        return " ".join(exc.messages)
+    return None
+
+
+def validate_pricing_rules(model, pricing_rules, service_id):
+    """
+    Validate every rule in ``pricing_rules`` for ``model`` against the service's packages.
+
+    Returns a list of cleaned dicts (package_id, pricing_type, value_type, value), one per
+    package; when a package appears twice the last rule wins, like the old sequential loop.
+    Raises BulkPricingValidationError listing every bad rule.
+    """
+    value_field = model._meta.get_field(PRICING_GRID_FIELDS[model][2])
+    pricing_types = {choice for choice, _label in model.PRICING_TYPES}
+    value_types = {choice for choice, _label in model.VALUE_TYPES}
+    package_ids = {
+        str(pk)
+        for pk in Package.objects.filter(service_id=service_id).values_list("id", flat=True)
+    }
+
+    errors = {}
+    cleaned = {}
+    for index, rule in enumerate(pricing_rules):
+        if not isinstance(rule, dict):
+            errors[index] = ["Each pricing rule must be an object"]
+            continue
+        rule_errors = []
+        for field in ("package_id", "pricing_type", "value", "value_type"):
+            if rule.get(field) in (None, ""):
+                rule_errors.append(f"Each pricing rule must have a {field}")
+        if rule_errors:
+            errors[index] = rule_errors
+            continue
+
+        package_id = str(rule["package_id"])
+        if package_id not in package_ids:
+            rule_errors.append(f"Package {package_id} does not belong to this service")
+        if rule["pricing_type"] not in pricing_types:
+            rule_errors.append(f"Invalid pricing_type '{rule['pricing_type']}'")
+        if rule["value_type"] not in value_types:
+            rule_errors.append(f"Invalid value_type '{rule['value_type']}'")
+        value = _parse_decimal(rule["value"])
+        if value is None:
+            rule_errors.append(f"Invalid value '{rule['value']}'")
+        else:
+            problem = _value_error(value_field, value)
+            if problem:
+                rule_errors.append(f"Invalid value '{rule['value']}': {problem}")
+        if rule_errors:
+            errors[index] = rule_errors
+            continue
+
+        cleaned[package_id] = {
+            "package_id": package_id,
+            "pricing_type": rule["pricing_type"],
+            "value_type": rule["value_type"],
+            "value": value,
+        }
+
+    if errors:
+        raise BulkPricingValidationError(errors)
+    return list(cleaned.values())
+
+
+def upsert_pricing_rules(model, parent, rows, service_id):
+    """
+    Insert or update one pricing row per package for ``parent`` in a single statement.
+    ``rows`` must come from validate_pricing_rules.
+    """
+    parent_field, type_field, value_field = PRICING_GRID_FIELDS[model]
+    objs = [
+        model(
+            **{
+                parent_field: parent,
+                "package_id": row["package_id"],
+                type_field: row["pricing_type"],
+                value_field: row["value"],
+                "value_type": row["value_type"],
+            }
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=[parent_field, "package"],
+            update_fields=[type_field, value_field, "value_type", "updated_at"],
+        )
+        invalidate_catalog_cache(service_id)
+    return len(objs)
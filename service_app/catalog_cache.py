@@ -0,0 +1,41 @@
+"""
+Catalog cache versioning.
+
+Anything cached from the pricing catalog (questions, options, pricing tables,
+size mappings) is keyed with the service's current catalog version. Writers bump
+the version once after a change commits instead of deleting individual keys.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "catalog:version:{service_id}"
+
+
+def catalog_version(service_id):
+    """Current catalog version for a service (1 when never invalidated)."""
+    return cache.get(CATALOG_VERSION_KEY.format(service_id=service_id)) or 1
+
+
+def catalog_cache_key(service_id, name):
+    """Build a versioned cache key for a catalog-derived value."""
+    return f"catalog:{service_id}:v{catalog_version(service_id)}:{name}"
+
+
+def _bump(service_ids):
+    for service_id in service_ids:
+        key = CATALOG_VERSION_KEY.format(service_id=service_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def invalidate_catalog_cache(*service_ids):
+    """
+    Bump catalog versions for the given services once the current transaction commits.
+    Duplicate / empty ids are ignored.
+    """
+    ids = sorted({str(s) for s in service_ids if s})
+    if not ids:
+        return
+    transaction.on_commit(lambda: _bump(ids))
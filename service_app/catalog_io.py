@@ -0,0 +1,702 @@
+"""
+Whole-service catalog export / import.
+
+export_catalog(service) writes one JSON document with the service, its settings, packages
+(with package features and size mappings), features, the question tree (options, sub-questions,
+question / option / sub-question pricing, quantity discounts).
+
+import_catalog(document, service=None) validates the whole document first, diffs it against the
+target service and applies only the differences in one transaction: one bulk_create and one
+bulk_update per table, then a single catalog-cache invalidation (service_app.catalog_cache).
+  - service=None creates a new service (clone, e.g. for a new market): every row gets a new id;
+  - otherwise rows are matched by id (document keys are the exported ids) or, for the pricing
+    grids / package features / size mappings, by their unique_together key. Rows missing from
+    the document are deactivated when the model has is_active (submissions still reference
+    them) and deleted otherwise.
+Foreign keys are deferred on PostgreSQL, so rows that point at each other (questions ↔ options)
+are inserted in any order inside the transaction.
+"""
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.core.validators import DecimalValidator
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog_cache import invalidate_catalog_cache
+from .models import (
+    Feature,
+    GlobalSizePackage,
+    OptionPricing,
+    Package,
+    PackageFeature,
+    QuantityDiscount,
+    Question,
+    QuestionOption,
+    QuestionPricing,
+    Service,
+    ServicePackageSizeMapping,
+    ServiceSettings,
+    SubQuestion,
+    SubQuestionPricing,
+)
+
+CATALOG_FORMAT = "service-catalog"
+CATALOG_VERSION = 1
+
+SERVICE_FIELDS = [
+    "name", "description", "is_active", "is_commercial", "is_residential",
+    "is_enable_dollar_minimum", "order", "icon_url", "icon_file_id", "image",
+]
+SETTINGS_FIELDS = [
+    "general_disclaimer", "bid_in_person_disclaimer", "apply_area_minimum",
+    "apply_house_size_minimum", "apply_trip_charge_to_bid", "enable_dollar_minimum",
+]
+PACKAGE_FIELDS = ["name", "base_price", "order", "is_active"]
+FEATURE_FIELDS = ["name", "description", "is_active"]
+QUESTION_FIELDS = [
+    "question_text", "question_type", "condition_answer", "order", "is_active",
+    "measurement_unit", "allow_quantity", "max_measurements", "image",
+]
+OPTION_FIELDS = ["option_text", "order", "is_active", "allow_quantity", "max_quantity", "image"]
+SUB_QUESTION_FIELDS = ["sub_question_text", "order", "is_active", "image"]
+DISCOUNT_FIELDS = ["scope", "discount_type", "value", "min_quantity"]
+DECIMAL_FIELDS = {"base_price", "price", "value", "yes_value"}
+INTEGER_FIELDS = {"order", "min_quantity", "max_quantity", "max_measurements"}
+
+
+class CatalogImportError(Exception):
+    """Raised when a catalog document is invalid; ``errors`` lists every problem with its path."""
+
+    def __init__(self, errors):
+        super().__init__("Invalid catalog document")
+        self.errors = errors
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "name") and hasattr(value, "storage"):
+        # FieldFile: keep the storage path.
+        return value.name or None
+    return value
+
+
+def _fields(obj, names):
+    return {name: _plain(getattr(obj, name)) for name in names}
+
+
+def export_catalog(service):
+    """The catalog document for ``service`` (JSON-serializable dict)."""
+    settings = ServiceSettings.objects.filter(service=service).first()
+    packages = list(
+        Package.objects.filter(service=service)
+        .prefetch_related("package_features", "size_pricings__global_size__property_type")
+        .order_by("order", "name")
+    )
+    questions = list(
+        Question.objects.filter(service=service)
+        .prefetch_related(
+            "options__pricing_rules",
+            "sub_questions__pricing_rules",
+            "pricing_rules",
+            "quantity_discounts",
+        )
+        .order_by("order", "created_at")
+    )
+
+    def pricing(rules, type_field, value_field):
+        return [
+            {
+                "package": str(rule.package_id),
+                "pricing_type": getattr(rule, type_field),
+                "value_type": rule.value_type,
+                "value": str(getattr(rule, value_field)),
+            }
+            for rule in rules.all()
+        ]
+
+    return {
+        "format": CATALOG_FORMAT,
+        "version": CATALOG_VERSION,
+        "exported_at": timezone.now().isoformat(),
+        "service": {"key": str(service.id), **_fields(service, SERVICE_FIELDS)},
+        "settings": _fields(settings, SETTINGS_FIELDS) if settings else None,
+        "features": [
+            {"key": str(f.id), **_fields(f, FEATURE_FIELDS)}
+            for f in Feature.objects.filter(service=service).order_by("name")
+        ],
+        "packages": [
+            {
+                "key": str(p.id),
+                **_fields(p, PACKAGE_FIELDS),
+                "features": [
+                    {"feature": str(pf.feature_id), "is_included": pf.is_included} for pf in p.package_features.all()
+                ],
+                "size_mappings": [
+                    {
+                        "global_size": {
+                            "id": str(m.global_size_id),
+                            "property_type": m.global_size.property_type.name if m.global_size.property_type else None,
+                            "min_sqft": m.global_size.min_sqft,
+                            "max_sqft": m.global_size.max_sqft,
+                        },
+                        "pricing_type": m.pricing_type,
+                        "price": str(m.price),
+                    }
+                    for m in p.size_pricings.all()
+                ],
+            }
+            for p in packages
+        ],
+        "questions": [
+            {
+                "key": str(q.id),
+                "parent": str(q.parent_question_id) if q.parent_question_id else None,
+                "condition_option": str(q.condition_option_id) if q.condition_option_id else None,
+                **_fields(q, QUESTION_FIELDS),
+                "pricing": pricing(q.pricing_rules, "yes_pricing_type", "yes_value"),
+                "options": [
+                    {
+                        "key": str(o.id),
+                        **_fields(o, OPTION_FIELDS),
+                        "pricing": pricing(o.pricing_rules, "pricing_type", "value"),
+                    }
+                    for o in q.options.all()
+                ],
+                "sub_questions": [
+                    {
+                        "key": str(s.id),
+                        **_fields(s, SUB_QUESTION_FIELDS),
+                        "pricing": pricing(s.pricing_rules, "yes_pricing_type", "yes_value"),
+                    }
+                    for s in q.sub_questions.all()
+                ],
+                "quantity_discounts": [
+                    {
+                        "key": str(d.id),
+                        "option": str(d.option_id) if d.option_id else None,
+                        **_fields(d, DISCOUNT_FIELDS),
+                    }
+                    for d in q.quantity_discounts.all()
+                ],
+            }
+            for q in questions
+        ],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Import: validation and flattening
+# ---------------------------------------------------------------------------
+
+def _decimal(raw):
+    try:
+        value = Decimal(str(raw))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+    return value if value.is_finite() else None
+
+
+def _decimal_error(model, name, value):
+    """Why ``value`` does not fit model.<name>'s max_digits / decimal_places, or None."""
+    field = model._meta.get_field(name)
+    try:
+        DecimalValidator(field.max_digits, field.decimal_places)(value)
+    except ValidationError as exc:
+        return " ".join(exc.messages)
+    return None
+
+
+def _count(model, name, raw):
+    """(value, error) for a non-negative integer field; None is allowed where the column is nullable."""
+    if raw is None and model._meta.get_field(name).null:
+        return None, None
+    if isinstance(raw, bool) or not isinstance(raw, int) or raw < 0:
+        return None, f"expected a non-negative integer, got {raw!r}"
+    return raw, None
+
+
+def _choices(model, attr):
+    return {choice for choice, _label in getattr(model, attr)}
+
+
+class _Plan:
+    """Flattened target rows per table, built from a validated document."""
+
+    def __init__(self, document, existing_ids, existing_by_name, service_id):
+        self.errors = []
+        self.service_id = service_id
+        self._existing_ids = existing_ids
+        self._existing_by_name = existing_by_name
+        self._ids = {}
+        self.service = {}
+        self.settings = None
+        # table -> {match key: field dict}
+        self.rows = {model: {} for model in TABLES}
+        self._build(document)
+
+    def error(self, path, message):
+        self.errors.append(f"{path}: {message}")
+
+    def id_for(self, key, model=None, name=None):
+        """
+        Target id for a document key: the same row when it exists in the target service, else (packages and
+        features) the target's row with the same name, else a new id.
+        """
+        key = str(key)
+        if key not in self._ids:
+            if key in self._existing_ids:
+                self._ids[key] = key
+            else:
+                self._ids[key] = self._existing_by_name.get((model, name)) or str(uuid.uuid4())
+        return self._ids[key]
+
+    def _number(self, model, name, raw, path):
+        """Decimal for model.<name>, or None after recording why ``raw`` does not fit the column."""
+        value = _decimal(raw)
+        if value is None:
+            self.error(f"{path}.{name}", f"invalid number {raw!r}")
+            return None
+        problem = _decimal_error(model, name, value)
+        if problem:
+            self.error(f"{path}.{name}", problem)
+            return None
+        return value
+
+    def _check_names(self, model, named):
+        """
+        (service, name) is unique for inactive rows too, and rows left out of the document keep their
+        name when deactivated: renaming onto such a row's name would fail the import at the database.
+        """
+        for path, name, row_id in named:
+            owner = self._existing_by_name.get((model, name))
+            if owner and owner != row_id and owner not in self.rows[model]:
+                self.error(
+                    f"{path}.name",
+                    f"{name!r} is already used by a {model.__name__.lower()} of this service that is not in the "
+                    "document; include that row (renamed) or pick another name",
+                )
+
+    def _scalar_fields(self, model, source, names, path):
+        out = {}
+        for name in names:
+            if name not in source:
+                continue
+            value = source[name]
+            if name in DECIMAL_FIELDS:
+                value = self._number(model, name, value, path)
+                if value is None:
+                    continue
+            elif name in INTEGER_FIELDS:
+                value, problem = _count(model, name, value)
+                if problem:
+                    self.error(f"{path}.{name}", problem)
+                    continue
+            elif name == "image":
+                value = value or ""
+            out[name] = value
+        return out
+
+    def _pricing(self, model, parent_field, parent_id, rules, type_field, value_field, package_ids, path):
+        pricing_types = _choices(model, "PRICING_TYPES")
+        value_types = _choices(model, "VALUE_TYPES")
+        for index, rule in enumerate(rules or []):
+            rule_path = f"{path}.pricing[{index}]"
+            package_key = str(rule.get("package") or "")
+            if package_key not in package_ids:
+                self.error(rule_path, f"unknown package {package_key!r}")
+                continue
+            if rule.get("pricing_type") not in pricing_types:
+                self.error(rule_path, f"invalid pricing_type {rule.get('pricing_type')!r}")
+                continue
+            if rule.get("value_type", "amount") not in value_types:
+                self.error(rule_path, f"invalid value_type {rule.get('value_type')!r}")
+                continue
+            value = self._number(model, value_field, rule.get("value", "0"), rule_path)
+            if value is None:
+                continue
+            package_id = self.id_for(package_key)
+            self.rows[model][(parent_id, package_id)] = {
+                parent_field: parent_id,
+                "package_id": package_id,
+                type_field: rule["pricing_type"],
+                "value_type": rule.get("value_type", "amount"),
+                value_field: value,
+            }
+
+    def _build(self, document):
+        if not isinstance(document, dict) or document.get("format") != CATALOG_FORMAT:
+            self.error("format", f"expected {CATALOG_FORMAT!r}")
+            return
+        if document.get("version") != CATALOG_VERSION:
+            self.error("version", f"unsupported version {document.get('version')!r}")
+            return
+
+        service = document.get("service") or {}
+        self.service = self._scalar_fields(Service, service, SERVICE_FIELDS, "service")
+        if not (self.service.get("name") or "").strip():
+            self.error("service.name", "required")
+        if document.get("settings"):
+            self.settings = self._scalar_fields(ServiceSettings, document["settings"], SETTINGS_FIELDS, "settings")
+
+        feature_keys = set()
+        feature_names = set()
+        named = []
+        for index, feature in enumerate(document.get("features") or []):
+            path = f"features[{index}]"
+            if not feature.get("key") or not (feature.get("name") or "").strip():
+                self.error(path, "key and name are required")
+                continue
+            if feature["name"] in feature_names:
+                self.error(path, f"duplicate feature name {feature['name']!r}")
+            feature_names.add(feature["name"])
+            feature_keys.add(str(feature["key"]))
+            feature_id = self.id_for(feature["key"], Feature, feature["name"])
+            named.append((path, feature["name"], feature_id))
+            self.rows[Feature][feature_id] = {
+                "service_id": self.service_id, **self._scalar_fields(Feature, feature, FEATURE_FIELDS, path),
+            }
+
+        self._check_names(Feature, named)
+
+        package_keys = set()
+        package_names = set()
+        named = []
+        packages = document.get("packages") or []
+        for index, package in enumerate(packages):
+            path = f"packages[{index}]"
+            if not package.get("key") or not (package.get("name") or "").strip():
+                self.error(path, "key and name are required")
+                continue
+            if package["name"] in package_names:
+                self.error(path, f"duplicate package name {package['name']!r}")
+            package_names.add(package["name"])
+            package_keys.add(str(package["key"]))
+            package_id = self.id_for(package["key"], Package, package["name"])
+            named.append((path, package["name"], package_id))
+            fields = self._scalar_fields(Package, package, PACKAGE_FIELDS, path)
+            if "base_price" not in package:
+                self.error(f"{path}.base_price", "required")
+            self.rows[Package][package_id] = {"service_id": self.service_id, **fields}
+        self._check_names(Package, named)
+
+        sizes = _GlobalSizes()
+        for index, package in enumerate(packages):
+            path = f"packages[{index}]"
+            if str(package.get("key")) not in package_keys:
+                continue
+            package_id = self.id_for(package["key"])
+            for f_index, link in enumerate(package.get("features") or []):
+                feature_key = str(link.get("feature") or "")
+                if feature_key not in feature_keys:
+                    self.error(f"{path}.features[{f_index}]", f"unknown feature {feature_key!r}")
+                    continue
+                feature_id = self.id_for(feature_key)
+                self.rows[PackageFeature][(package_id, feature_id)] = {
+                    "package_id": package_id,
+                    "feature_id": feature_id,
+                    "is_included": bool(link.get("is_included", True)),
+                }
+            for m_index, mapping in enumerate(package.get("size_mappings") or []):
+                m_path = f"{path}.size_mappings[{m_index}]"
+                global_size_id = sizes.resolve(mapping.get("global_size") or {})
+                if global_size_id is None:
+                    self.error(m_path, "global size not found in this database")
+                    continue
+                if mapping.get("pricing_type") not in _choices(ServicePackageSizeMapping, "PRICING_TYPES"):
+                    self.error(m_path, f"invalid pricing_type {mapping.get('pricing_type')!r}")
+                    continue
+                price = self._number(ServicePackageSizeMapping, "price", mapping.get("price", "0"), m_path)
+                if price is None:
+                    continue
+                if mapping["pricing_type"] == "bid_in_person":
+                    # Same rule as ServicePackageSizeMapping.save().
+                    price = Decimal("0")
+                self.rows[ServicePackageSizeMapping][(package_id, global_size_id)] = {
+                    "service_package_id": package_id,
+                    "global_size_id": global_size_id,
+                    "pricing_type": mapping["pricing_type"],
+                    "price": price,
+                }
+
+        questions = document.get("questions") or []
+        question_keys = {str(q["key"]) for q in questions if q.get("key")}
+        option_owner = {}
+        for question in questions:
+            for option in question.get("options") or []:
+                if option.get("key"):
+                    option_owner[str(option["key"])] = str(question.get("key"))
+
+        question_types = _choices(Question, "QUESTION_TYPES")
+        for index, question in enumerate(questions):
+            path = f"questions[{index}]"
+            if not question.get("key"):
+                self.error(path, "key is required")
+                continue
+            if question.get("question_type") not in question_types:
+                self.error(path, f"invalid question_type {question.get('question_type')!r}")
+                continue
+            question_id = self.id_for(question["key"])
+            parent = question.get("parent")
+            if parent and str(parent) not in question_keys:
+                self.error(f"{path}.parent", f"unknown question {parent!r}")
+            condition_option = question.get("condition_option")
+            if condition_option and str(condition_option) not in option_owner:
+                self.error(f"{path}.condition_option", f"unknown option {condition_option!r}")
+            self.rows[Question][question_id] = {
+                "service_id": self.service_id,
+                "parent_question_id": self.id_for(parent) if parent else None,
+                "condition_option_id": self.id_for(condition_option) if condition_option else None,
+                **self._scalar_fields(Question, question, QUESTION_FIELDS, path),
+            }
+            self._pricing(
+                QuestionPricing, "question_id", question_id, question.get("pricing"),
+                "yes_pricing_type", "yes_value", package_keys, path,
+            )
+
+            own_options = set()
+            for o_index, option in enumerate(question.get("options") or []):
+                o_path = f"{path}.options[{o_index}]"
+                if not option.get("key") or not option.get("option_text"):
+                    self.error(o_path, "key and option_text are required")
+                    continue
+                own_options.add(str(option["key"]))
+                option_id = self.id_for(option["key"])
+                self.rows[QuestionOption][option_id] = {
+                    "question_id": question_id, **self._scalar_fields(QuestionOption, option, OPTION_FIELDS, o_path),
+                }
+                self._pricing(
+                    OptionPricing, "option_id", option_id, option.get("pricing"),
+                    "pricing_type", "value", package_keys, o_path,
+                )
+
+            for s_index, sub_question in enumerate(question.get("sub_questions") or []):
+                s_path = f"{path}.sub_questions[{s_index}]"
+                if not sub_question.get("key") or not sub_question.get("sub_question_text"):
+                    self.error(s_path, "key and sub_question_text are required")
+                    continue
+                sub_question_id = self.id_for(sub_question["key"])
+                self.rows[SubQuestion][sub_question_id] = {
+                    "parent_question_id": question_id,
+                    **self._scalar_fields(SubQuestion, sub_question, SUB_QUESTION_FIELDS, s_path),
+                }
+                self._pricing(
+                    SubQuestionPricing, "sub_question_id", sub_question_id, sub_question.get("pricing"),
+                    "yes_pricing_type", "yes_value", package_keys, s_path,
+                )
+
+            for d_index, discount in enumerate(question.get("quantity_discounts") or []):
+                d_path = f"{path}.quantity_discounts[{d_index}]"
+                option = discount.get("option")
+                if not discount.get("key"):
+                    self.error(d_path, "key is required")
+                    continue
+                if option and str(option) not in own_options:
+                    self.error(d_path, f"option {option!r} is not an option of this question")
+                    continue
+                fields = self._scalar_fields(QuantityDiscount, discount, DISCOUNT_FIELDS, d_path)
+                if fields.get("discount_type") not in _choices(QuantityDiscount, "DISCOUNT_TYPE_CHOICES"):
+                    self.error(d_path, f"invalid discount_type {discount.get('discount_type')!r}")
+                    continue
+                if fields.get("scope") not in _choices(QuantityDiscount, "APPLY_SCOPE_CHOICES"):
+                    self.error(d_path, f"invalid scope {discount.get('scope')!r}")
+                    continue
+                self.rows[QuantityDiscount][self.id_for(discount["key"])] = {
+                    "question_id": question_id,
+                    "option_id": self.id_for(option) if option else None,
+                    **fields,
+                }
+
+
+class _GlobalSizes:
+    """Resolve exported global sizes by id, else by (property type, min, max) for other databases."""
+
+    def __init__(self):
+        self._by_id = {}
+        self._by_range = {}
+        for size in GlobalSizePackage.objects.select_related("property_type"):
+            self._by_id[str(size.id)] = str(size.id)
+            property_type = size.property_type.name if size.property_type else None
+            self._by_range[(property_type, size.min_sqft, size.max_sqft)] = str(size.id)
+
+    def resolve(self, ref):
+        if str(ref.get("id")) in self._by_id:
+            return self._by_id[str(ref["id"])]
+        return self._by_range.get((ref.get("property_type"), ref.get("min_sqft"), ref.get("max_sqft")))
+
+
+# ---------------------------------------------------------------------------
+# Import: diff and apply
+# ---------------------------------------------------------------------------
+
+# table -> (rows of the target service, match key fields or None for id, (parent field, parent table))
+TABLES = {
+    Feature: (lambda s: Feature.objects.filter(service_id=s), None, None),
+    Package: (lambda s: Package.objects.filter(service_id=s), None, None),
+    PackageFeature: (
+        lambda s: PackageFeature.objects.filter(package__service_id=s),
+        ("package_id", "feature_id"),
+        ("package_id", Package),
+    ),
+    ServicePackageSizeMapping: (
+        lambda s: ServicePackageSizeMapping.objects.filter(service_package__service_id=s),
+        ("service_package_id", "global_size_id"),
+        ("service_package_id", Package),
+    ),
+    Question: (lambda s: Question.objects.filter(service_id=s), None, None),
+    QuestionOption: (
+        lambda s: QuestionOption.objects.filter(question__service_id=s), None, ("question_id", Question),
+    ),
+    SubQuestion: (
+        lambda s: SubQuestion.objects.filter(parent_question__service_id=s), None, ("parent_question_id", Question),
+    ),
+    QuestionPricing: (
+        lambda s: QuestionPricing.objects.filter(question__service_id=s),
+        ("question_id", "package_id"),
+        ("question_id", Question),
+    ),
+    OptionPricing: (
+        lambda s: OptionPricing.objects.filter(option__question__service_id=s),
+        ("option_id", "package_id"),
+        ("option_id", QuestionOption),
+    ),
+    SubQuestionPricing: (
+        lambda s: SubQuestionPricing.objects.filter(sub_question__parent_question__service_id=s),
+        ("sub_question_id", "package_id"),
+        ("sub_question_id", SubQuestion),
+    ),
+    QuantityDiscount: (
+        lambda s: QuantityDiscount.objects.filter(question__service_id=s), None, ("question_id", Question),
+    ),
+}
+
+
+def _same(a, b):
+    if a in (None, "") and b in (None, ""):
+        return True
+    if isinstance(a, Decimal) or isinstance(b, Decimal):
+        return _decimal(a) == _decimal(b)
+    return str(a) == str(b) if isinstance(a, uuid.UUID) or isinstance(b, uuid.UUID) else a == b
+
+
+def _has_field(model, name):
+    return any(f.name == name for f in model._meta.concrete_fields)
+
+
+def _sync_table(model, service_id, rows):
+    """Create / update / remove rows of one table (``rows``: every table's target rows). Returns dict: { created, updated, removed }."""
+    queryset, key_fields, parent = TABLES[model]
+    parent_field = parent[0] if parent else None
+    desired = rows[model]
+    field_names = sorted({name for fields in desired.values() for name in fields})
+    existing = {}
+    value_fields = ["pk", "is_active"] if _has_field(model, "is_active") else ["pk"]
+    wanted = value_fields + field_names + list(key_fields or []) + ([parent_field] if parent_field else [])
+    for row in queryset(service_id).values(*dict.fromkeys(wanted)):
+        key = tuple(str(row[f]) for f in key_fields) if key_fields else str(row["pk"])
+        existing[key] = row
+
+    desired = {tuple(str(k) for k in key) if key_fields else key: fields for key, fields in desired.items()}
+    now = timezone.now()
+    creates, updates, changed = [], [], set()
+    for key, fields in desired.items():
+        current = existing.get(key)
+        if current is None:
+            obj = model(**fields) if key_fields else model(id=key, **fields)
+            creates.append(obj)
+            continue
+        diff = [name for name, value in fields.items() if not _same(current.get(name), value)]
+        if diff:
+            changed.update(diff)
+            obj = model(pk=current["pk"], **fields)
+            updates.append(obj)
+
+    if creates:
+        model.objects.bulk_create(creates, batch_size=500)
+    if updates:
+        update_fields = sorted(changed)
+        if _has_field(model, "updated_at"):
+            for obj in updates:
+                obj.updated_at = now
+            update_fields.append("updated_at")
+        model.objects.bulk_update(updates, update_fields, batch_size=500)
+
+    # Rows left out of the document; children of rows dropped from the document are left alone.
+    live_parents = set(rows[parent[1]]) if parent else None
+    stale = [
+        row["pk"]
+        for key, row in existing.items()
+        if key not in desired and (live_parents is None or str(row[parent_field]) in live_parents)
+    ]
+    removed = 0
+    if stale:
+        if "is_active" in value_fields:
+            removed = model.objects.filter(pk__in=stale, is_active=True).update(is_active=False)
+        else:
+            removed = model.objects.filter(pk__in=stale).delete()[0]
+    return {"created": len(creates), "updated": len(updates), "removed": removed}
+
+
+def _existing_ids(service_id):
+    """Ids of the target service's rows, plus package / feature ids by name (names are unique per service)."""
+    ids, by_name = set(), {}
+    if service_id is None:
+        return ids, by_name
+    for model, (queryset, key_fields, _parent) in TABLES.items():
+        if key_fields is None:
+            ids.update(str(pk) for pk in queryset(service_id).values_list("pk", flat=True))
+    for model in (Package, Feature):
+        for pk, name in TABLES[model][0](service_id).values_list("pk", "name"):
+            by_name[(model, name)] = str(pk)
+    return ids, by_name
+
+
+def import_catalog(document, service=None, *, overrides=None, dry_run=False):
+    """
+    Apply a catalog document to ``service`` (or to a new service when None).
+    Returns dict: { service_id, created_service, dry_run, changes: { table: { created, updated, removed } } }.
+    Raises CatalogImportError when the document is invalid (nothing is written).
+    """
+    service_id = str(service.id) if service else str(uuid.uuid4())
+    plan = _Plan(document, *_existing_ids(service.id if service else None), service_id)
+    if plan.errors:
+        raise CatalogImportError(plan.errors)
+    service_fields = {**plan.service, **(overrides or {})}
+
+    changes = {}
+    created_service = service is None
+    with transaction.atomic():
+        if created_service:
+            service = Service.objects.create(id=service_id, **service_fields)
+        else:
+            diff = [name for name, value in service_fields.items() if not _same(_plain(getattr(service, name)), value)]
+            if diff:
+                for name in diff:
+                    setattr(service, name, service_fields[name])
+                service.save(update_fields=diff + ["updated_at"])
+            changes["Service"] = {"created": 0, "updated": int(bool(diff)), "removed": 0}
+        if plan.settings is not None:
+            _, created = ServiceSettings.objects.update_or_create(service_id=service_id, defaults=plan.settings)
+            changes["ServiceSettings"] = {"created": int(created), "updated": int(not created), "removed": 0}
+
+        for model in TABLES:
+            changes[model.__name__] = _sync_table(model, service_id, plan.rows)
+
+        invalidate_catalog_cache(service_id)
+        if dry_run:
+            transaction.set_rollback(True)
+
+    return {
+        "service_id": service_id,
+        "created_service": created_service,
+        "dry_run": dry_run,
+        "changes": changes,
+    }
@@ -9,6 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from quote_app.archive import archived_snapshot
 from quote_app.client_utils import (
     annotate_client_key,
     client_key_for_submission,
@@ -21,13 +22,14 @@ from quote_app.client_utils import (
 from quote_app.helpers import create_or_update_ghl_contact, sync_ghl_contact_tags_for_submission_status
 from quote_app.models import CustomerSubmission
 from quote_app.serializers import CustomerSubmissionDetailSerializer
+from service_backend.db_router import ReplicaReadMixin
 
 from .serializers import (
     AdminClientSubmissionUpdateSerializer,
     ClientProfileUpdateSerializer,
     CustomerSubmissionListSerializer,
 )
-from .views import SubmissionPagination
+from .views import submission_paginator
 
 
 def _client_list_item(row, latest_submission):
@@ -77,24 +79,25 @@ def _client_detail_payload(client_id, *, include_on_the_go=False):
     }
 
 
-class ClientListView(APIView):
-    """Paginated list of clients derived from CustomerSubmission groupings."""
+class ClientListView(ReplicaReadMixin, APIView):
+    """
+    Paginated list of clients derived from CustomerSubmission groupings.
+    ?cursor= switches to keyset pagination on (latest_submission_at, client_id).
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         search = request.query_params.get("search")
         include_on_the_go = request.query_params.get("include_on_the_go", "").lower() == "true"
 
-        grouped = list(
-            grouped_clients_queryset(
-                include_on_the_go=include_on_the_go,
-                search=search,
-            )
+        grouped = grouped_clients_queryset(
+            include_on_the_go=include_on_the_go,
+            search=search,
         )
 
-        paginator = SubmissionPagination()
+        paginator = submission_paginator(request, "latest_submission_at", "client_id")
         page = paginator.paginate_queryset(grouped, request)
-        rows = page if page is not None else grouped
+        rows = page if page is not None else list(grouped)
 
         latest_map = {}
         if rows:
@@ -119,7 +122,7 @@ class ClientListView(APIView):
         return Response(results, status=status.HTTP_200_OK)
 
 
-class ClientDetailView(APIView):
+class ClientDetailView(ReplicaReadMixin, APIView):
     """Client profile, optional GHL mirror data, and aggregate stats."""
     permission_classes = [IsAuthenticated]
 
@@ -177,8 +180,8 @@ class ClientDetailView(APIView):
         )
 
 
-class ClientSubmissionsListView(APIView):
-    """Paginated submission history for a client."""
+class ClientSubmissionsListView(ReplicaReadMixin, APIView):
+    """Paginated submission history for a client (?cursor= for keyset pagination)."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request, client_id):
@@ -197,7 +200,7 @@ class ClientSubmissionsListView(APIView):
         if status_filter:
             qs = qs.filter(status=status_filter)
 
-        paginator = SubmissionPagination()
+        paginator = submission_paginator(request)
         page = paginator.paginate_queryset(qs, request)
         serializer = CustomerSubmissionListSerializer(page, many=True)
         return paginator.get_paginated_response(serializer.data)
@@ -233,6 +236,8 @@ class ClientSubmissionDetailView(APIView):
             self._submission_queryset(client_id, include_on_the_go),
             id=submission_id,
         )
+        if submission.archived_at:
+            return Response(archived_snapshot(submission.id), status=status.HTTP_200_OK)
         data = CustomerSubmissionDetailSerializer(submission, context={"request": request}).data
         return Response(data, status=status.HTTP_200_OK)
 
@@ -242,6 +247,11 @@ class ClientSubmissionDetailView(APIView):
             self._submission_queryset(client_id, include_on_the_go),
             id=submission_id,
         )
+        if submission.archived_at:
+            return Response(
+                {"error": "This submission is archived and can no longer be edited."},
+                status=status.HTTP_409_CONFLICT,
+            )
 
         serializer = AdminClientSubmissionUpdateSerializer(
             submission,
@@ -0,0 +1,323 @@
+"""
+Streaming admin exports (CSV or NDJSON) for submissions, clients and package quotes.
+
+Each export is one pass over a values-only projection read with ``iterator(chunk_size=...)``
+(a server-side cursor on PostgreSQL) and written straight into a StreamingHttpResponse, so
+memory stays flat however many rows match — no serializers, no pagination round trips.
+
+Query params (all exports): export_format=csv|ndjson (default csv), start_date / end_date
+(YYYY-MM-DD, inclusive, on the submission's created_at), status (comma-separated),
+include_on_the_go=true. Clients also take search; package quotes take service_id and
+selected_only=true.
+"""
+import csv
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from quote_app.client_utils import annotate_client_key, base_submissions_queryset
+from quote_app.models import CustomerPackageQuote, CustomerSubmission
+from service_app.search import search_submissions
+from service_backend.db_router import read_alias
+
+from .views import IsAdminPermission
+
+CHUNK_SIZE = 2000
+# Rows per chunk handed to the WSGI server; fewer, larger writes than one per row.
+ROWS_PER_WRITE = 500
+STATUSES = [value for value, _ in CustomerSubmission.STATUS_CHOICES]
+# Spreadsheet apps evaluate cells starting with these as formulas (CSV injection).
+FORMULA_PREFIXES = ("=", "+", "-", "@")
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+SUBMISSION_COLUMNS = [
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+    ("status", "status"),
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("company_name", "company_name"),
+    ("customer_email", "customer_email"),
+    ("customer_phone", "customer_phone"),
+    ("postal_code", "postal_code"),
+    ("street_address", "street_address"),
+    ("city", "location__name"),
+    ("heard_about_us", "heard_about_us"),
+    ("property_type", "property_type"),
+    ("is_on_the_go", "is_on_the_go"),
+    ("total_base_price", "total_base_price"),
+    ("total_adjustments", "total_adjustments"),
+    ("total_surcharges", "total_surcharges"),
+    ("total_addons_price", "total_addons_price"),
+    ("discounted_amount", "discounted_amount"),
+    ("bundle_discount_amount", "bundle_discount_amount"),
+    ("final_total", "final_total"),
+    ("ghl_contact_id", "ghl_contact_id"),
+]
+
+CLIENT_COLUMNS = [
+    "client_id",
+    "client_key",
+    "submission_count",
+    "approved_count",
+    "total_revenue",
+    "first_submission_at",
+    "latest_submission_at",
+    "full_name",
+    "email",
+    "phone",
+    "company_name",
+    "ghl_contact_id",
+]
+
+PACKAGE_QUOTE_COLUMNS = [
+    ("id", "id"),
+    ("submission_id", "service_selection__submission_id"),
+    ("submission_created_at", "service_selection__submission__created_at"),
+    ("submission_status", "service_selection__submission__status"),
+    ("customer_email", "service_selection__submission__customer_email"),
+    ("service_id", "service_selection__service_id"),
+    ("service", "service_selection__service__name"),
+    ("package_id", "package_id"),
+    ("package", "package__name"),
+    ("base_price", "base_price"),
+    ("sqft_price", "sqft_price"),
+    ("question_adjustments", "question_adjustments"),
+    ("measurement_total", "measurement_total"),
+    ("surcharge_amount", "surcharge_amount"),
+    ("total_price", "total_price"),
+    ("admin_override_price", "admin_override_price"),
+    ("effective_total_price", "effective_total_price"),
+    ("is_selected", "is_selected"),
+]
+
+
+class ExportParamError(ValueError):
+    pass
+
+
+class _Echo:
+    """csv.writer target that hands back each formatted line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_rows(rows, columns, export_format):
+    """Yield the export body for an iterable of dicts, ROWS_PER_WRITE rows at a time."""
+    if export_format == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        encode = lambda row: writer.writerow([_csv_value(row.get(column)) for column in columns])  # noqa: E731
+    else:
+        encode = lambda row: json.dumps(row, cls=DjangoJSONEncoder) + "\n"  # noqa: E731
+    buffer = []
+    for row in rows:
+        buffer.append(encode(row))
+        if len(buffer) >= ROWS_PER_WRITE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _date(value, field):
+    try:
+        return timezone.make_aware(datetime.strptime(value, "%Y-%m-%d"))
+    except ValueError:
+        raise ExportParamError(f"{field} must be YYYY-MM-DD")
+
+
+def _statuses(params):
+    statuses = [s.strip() for s in (params.get("status") or "").split(",") if s.strip()]
+    unknown = [s for s in statuses if s not in STATUSES]
+    if unknown:
+        raise ExportParamError(f"status must be one of: {', '.join(STATUSES)} (got {', '.join(unknown)})")
+    return statuses
+
+
+def validate_params(params):
+    """Raise ExportParamError for a bad filter before any response is started."""
+    for field in ("start_date", "end_date"):
+        if params.get(field):
+            _date(params[field], field)
+    _statuses(params)
+    if params.get("service_id"):
+        try:
+            uuid.UUID(params["service_id"])
+        except ValueError:
+            raise ExportParamError("service_id must be a UUID")
+
+
+def filter_submissions(queryset, params, prefix=""):
+    """Apply the shared date / status filters; ``prefix`` reaches the submission from another model."""
+    filters = {}
+    if params.get("start_date"):
+        filters[f"{prefix}created_at__gte"] = _date(params["start_date"], "start_date")
+    if params.get("end_date"):
+        filters[f"{prefix}created_at__lt"] = _date(params["end_date"], "end_date") + timedelta(days=1)
+    statuses = _statuses(params)
+    if statuses:
+        filters[f"{prefix}status__in"] = statuses
+    return queryset.filter(**filters)
+
+
+def _include_on_the_go(params):
+    return (params.get("include_on_the_go") or "").lower() == "true"
+
+
+def submission_rows(params, using=None):
+    qs = filter_submissions(base_submissions_queryset(include_on_the_go=_include_on_the_go(params)), params)
+    values = qs.using(using).order_by("created_at", "id").values_list(*[source for _, source in SUBMISSION_COLUMNS])
+    names = [name for name, _ in SUBMISSION_COLUMNS]
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(names, row))
+
+
+def client_rows(params, using=None):
+    """
+    One row per client (quote_app.client_utils grouping), aggregated while streaming submissions
+    ordered by client key — the latest submission supplies the profile columns.
+    """
+    qs = annotate_client_key(base_submissions_queryset(include_on_the_go=_include_on_the_go(params)))
+    qs = filter_submissions(qs, params)
+    if (params.get("search") or "").strip():
+        qs = search_submissions(qs, params["search"])
+    values = qs.using(using).order_by("client_key", "-created_at").values(
+        "client_key",
+        "client_id",
+        "created_at",
+        "status",
+        "final_total",
+        "first_name",
+        "last_name",
+        "customer_email",
+        "customer_phone",
+        "company_name",
+        "ghl_contact_id",
+    )
+    for client_key, submissions in groupby(values.iterator(chunk_size=CHUNK_SIZE), key=lambda row: row["client_key"]):
+        latest = None
+        count, approved, revenue = 0, 0, Decimal("0.00")
+        for row in submissions:
+            latest = latest or row
+            count += 1
+            first_at = row["created_at"]
+            if row["status"] == "approved":
+                approved += 1
+                revenue += row["final_total"] or 0
+        full_name = f"{latest['first_name'] or ''} {latest['last_name'] or ''}".strip()
+        yield {
+            "client_id": latest["client_id"],
+            "client_key": client_key,
+            "submission_count": count,
+            "approved_count": approved,
+            "total_revenue": revenue,
+            "first_submission_at": first_at,
+            "latest_submission_at": latest["created_at"],
+            "full_name": full_name or None,
+            "email": latest["customer_email"],
+            "phone": latest["customer_phone"],
+            "company_name": latest["company_name"],
+            "ghl_contact_id": latest["ghl_contact_id"],
+        }
+
+
+def package_quote_rows(params, using=None):
+    qs = CustomerPackageQuote.objects.filter(service_selection__submission__is_deleted=False)
+    if not _include_on_the_go(params):
+        qs = qs.filter(service_selection__submission__is_on_the_go=False)
+    qs = filter_submissions(qs, params, prefix="service_selection__submission__")
+    if params.get("service_id"):
+        qs = qs.filter(service_selection__service_id=params["service_id"])
+    if (params.get("selected_only") or "").lower() == "true":
+        qs = qs.filter(is_selected=True)
+    qs = qs.annotate(effective_total_price=Coalesce(F("admin_override_price"), F("total_price")))
+    values = qs.using(using).order_by("service_selection__submission__created_at", "id").values_list(
+        *[source for _, source in PACKAGE_QUOTE_COLUMNS]
+    )
+    names = [name for name, _ in PACKAGE_QUOTE_COLUMNS]
+    for row in values.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(names, row))
+
+
+class _StreamingExportView(APIView):
+    """Shared GET for the exports; subclasses define ``rows(params, using)`` returning an iterable of dicts."""
+    permission_classes = [IsAdminPermission]
+    export_name = ""
+    columns = ()
+
+    def get(self, request):
+        export_format = (request.query_params.get("export_format") or "csv").lower()
+        if export_format not in FORMATS:
+            return Response(
+                {"error": f"export_format must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        params = request.query_params
+        try:
+            # Validate filters now; rows are only read once the response is being sent.
+            validate_params(params)
+        except ExportParamError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type, extension = FORMATS[export_format]
+        rows = self.rows(params, read_alias(request))
+        response = StreamingHttpResponse(stream_rows(rows, list(self.columns), export_format), content_type=content_type)
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        response["Content-Disposition"] = f'attachment; filename="{self.export_name}-{stamp}.{extension}"'
+        # Proxies must not buffer the whole body.
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class SubmissionExportView(_StreamingExportView):
+    """GET — All matching submissions with totals."""
+    export_name = "submissions"
+    columns = [name for name, _ in SUBMISSION_COLUMNS]
+
+    def rows(self, params, using):
+        return submission_rows(params, using)
+
+
+class ClientExportView(_StreamingExportView):
+    """GET — Clients grouped as in the Clients tab, with counts and approved revenue."""
+    export_name = "clients"
+    columns = CLIENT_COLUMNS
+
+    def rows(self, params, using):
+        return client_rows(params, using)
+
+
+class PackageQuoteExportView(_StreamingExportView):
+    """GET — Every package quote per service selection (filter by service_id)."""
+    export_name = "package-quotes"
+    columns = [name for name, _ in PACKAGE_QUOTE_COLUMNS]
+
+    def rows(self, params, using):
+        return package_quote_rows(params, using)
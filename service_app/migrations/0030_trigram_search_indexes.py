@@ -0,0 +1,61 @@
+# pg_trgm extension + GIN trigram indexes for admin search (service_app.search).
+# The DDL only runs on PostgreSQL; other backends (SQLite in tests) just record the index state.
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+INDEXES = [
+    ('location', django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Lower('name'), name='gin_trgm_ops'
+        ),
+        name='loc_name_trgm_idx',
+    )),
+    ('location', django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Lower('address'), name='gin_trgm_ops'
+        ),
+        name='loc_address_trgm_idx',
+    )),
+    ('service', django.contrib.postgres.indexes.GinIndex(
+        django.contrib.postgres.indexes.OpClass(
+            django.db.models.functions.text.Lower('name'), name='gin_trgm_ops'
+        ),
+        name='svc_name_trgm_idx',
+    )),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for model_name, index in INDEXES:
+        schema_editor.add_index(apps.get_model('service_app', model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in INDEXES:
+        schema_editor.remove_index(apps.get_model('service_app', model_name), index)
+    schema_editor.execute('DROP EXTENSION IF EXISTS pg_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_app', '0029_servicebundle'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+        ),
+    ]
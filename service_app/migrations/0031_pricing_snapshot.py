@@ -0,0 +1,32 @@
+# Immutable pricing catalog snapshots referenced by quote_app.CustomerServiceSelection.
+
+import uuid
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_app', '0030_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PricingSnapshot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('version', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pricing_snapshots', to='service_app.service')),
+            ],
+            options={
+                'db_table': 'pricing_snapshots',
+                'ordering': ['service', '-version'],
+                'unique_together': {('service', 'content_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# One snapshot per (service, version): concurrent create_snapshot calls retry instead of sharing a number.
+
+from django.db import migrations, models
+
+
+def renumber_duplicate_versions(apps, schema_editor):
+    """Versions already shared by two snapshots of a service are renumbered in creation order."""
+    PricingSnapshot = apps.get_model('service_app', 'PricingSnapshot')
+    service_ids = (
+        PricingSnapshot.objects.values('service_id', 'version')
+        .annotate(n=models.Count('id'))
+        .filter(n__gt=1)
+        .values_list('service_id', flat=True)
+    )
+    for service_id in set(service_ids):
+        snapshots = list(PricingSnapshot.objects.filter(service_id=service_id).order_by('created_at', 'version', 'id'))
+        for version, snapshot in enumerate(snapshots, start=1):
+            if snapshot.version != version:
+                snapshot.version = version
+                snapshot.save(update_fields=['version'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service_app', '0031_pricing_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_versions, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='pricingsnapshot',
+            unique_together={('service', 'content_hash'), ('service', 'version')},
+        ),
+    ]
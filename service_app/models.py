@@ -1,5 +1,7 @@
 # models.py
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -66,6 +68,11 @@ class Location(models.Model):
     class Meta:
         db_table = 'locations'
         ordering = ['name']
+        indexes = [
+            # Admin ?search= (service_app.search.trigram_search)
+            GinIndex(OpClass(Lower('name'), name='gin_trgm_ops'), name='loc_name_trgm_idx'),
+            GinIndex(OpClass(Lower('address'), name='gin_trgm_ops'), name='loc_address_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.address}"
@@ -92,6 +99,10 @@ class Service(models.Model):
     class Meta:
         db_table = 'services'
         ordering = ['order', 'name']
+        indexes = [
+            # Admin ?search= (service_app.search.trigram_search)
+            GinIndex(OpClass(Lower('name'), name='gin_trgm_ops'), name='svc_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -843,4 +854,21 @@ class ServiceBundle(models.Model):
 
     def apply_discount(self, amount):
         discount = self.get_discount_amount(amount)
-        return max(Decimal(amount) - discount, Decimal('0.00'))
\ No newline at end of file
+        return max(Decimal(amount) - discount, Decimal('0.00'))
+
+class PricingSnapshot(models.Model):
+    """Immutable, content-hashed copy of a service's pricing rules (see service_app.pricing_snapshot)"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    service = models.ForeignKey(Service, related_name='pricing_snapshots', on_delete=models.CASCADE)
+    version = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'pricing_snapshots'
+        ordering = ['service', '-version']
+        unique_together = [['service', 'content_hash'], ['service', 'version']]
+
+    def __str__(self):
+        return f"{self.service_id} v{self.version} ({self.content_hash[:12]})"
@@ -0,0 +1,144 @@
+"""
+Opt-in keyset (cursor) pagination for admin list endpoints.
+
+Page-number pagination runs COUNT(*) plus an OFFSET scan, so deep pages get slower the further
+back the admin scrolls. Passing ``?cursor=`` (empty for the first page) switches an endpoint to
+keyset mode: rows are ordered newest first by (time field, tiebreak field) and each page starts
+strictly after the last row of the previous one, which an index on those columns serves directly.
+
+    paginator = KeysetPagination("created_at", "id") if KeysetPagination.requested(request) \\
+        else SubmissionPagination()
+
+Counts are skipped in keyset mode unless ``?count=estimate`` (planner estimate, PostgreSQL only)
+or ``?count=exact`` is passed. A cursor that does not decode, or whose values the filter rejects
+(e.g. a tiebreak that is not a UUID), is answered with 404 "Invalid cursor", like DRF's
+CursorPagination.
+"""
+import base64
+import json
+import logging
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+logger = logging.getLogger(__name__)
+
+
+def estimated_count(queryset):
+    """Planner row estimate for ``queryset`` (PostgreSQL EXPLAIN), or None elsewhere / on error."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as exc:
+        logger.warning("Estimated count failed: %s", exc)
+        return None
+
+
+class KeysetPagination:
+    """Newest-first keyset pagination over (time_field, tiebreak_field); works on querysets of models or dicts."""
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, time_field, tiebreak_field):
+        self.time_field = time_field
+        self.tiebreak_field = tiebreak_field
+        self.next_cursor = None
+        self.count = None
+        self.request = None
+
+    @classmethod
+    def requested(cls, request):
+        return cls.cursor_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param) or self.page_size)
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def encode_cursor(time_value, tiebreak_value):
+        raw = json.dumps([time_value.isoformat(), str(tiebreak_value)]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        try:
+            time_raw, tiebreak = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            time_value = parse_datetime(time_raw)
+        except (ValueError, TypeError, UnicodeError):
+            time_value = None
+        if time_value is None:
+            raise NotFound(cls.invalid_cursor_message)
+        return time_value, tiebreak
+
+    def _after_cursor(self, queryset, cursor):
+        """Rows strictly after ``cursor``; the field lookups validate the decoded values."""
+        time_value, tiebreak = self.decode_cursor(cursor)
+        try:
+            return queryset.filter(
+                Q(**{f"{self.time_field}__lt": time_value})
+                | Q(**{self.time_field: time_value, f"{self.tiebreak_field}__lt": tiebreak})
+            )
+        except (DjangoValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _value(self, row, field):
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        mode = (request.query_params.get(self.count_query_param) or "").lower()
+        if mode == "exact":
+            self.count = queryset.count()
+        elif mode == "estimate":
+            self.count = estimated_count(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = self._after_cursor(queryset, cursor)
+        size = self.get_page_size(request)
+        rows = list(queryset.order_by(f"-{self.time_field}", f"-{self.tiebreak_field}")[: size + 1])
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            self.next_cursor = self.encode_cursor(
+                self._value(last, self.time_field), self._value(last, self.tiebreak_field)
+            )
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "next_cursor": self.next_cursor,
+                "previous": None,
+                "results": data,
+            }
+        )
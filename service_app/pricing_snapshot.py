@@ -0,0 +1,213 @@
+"""
+Immutable pricing catalog snapshots (PricingSnapshot).
+
+A snapshot is the compact, canonical JSON of everything the quote engine prices with for one
+service: active packages (base price, features), size mappings, question / option / sub-question
+pricing, quantity discounts and the trip-charge setting. It is identified by the SHA-256 of that
+JSON, so an unchanged catalog never produces a second row.
+
+CustomerServiceSelection.pricing_snapshot pins the snapshot a quote was priced with; re-pricing
+(edits, sqft changes, package switches) reuses it, so later admin price changes no longer alter
+existing quotes. A selection is re-pinned only while the submission is a draft, or on request.
+
+Lookups never touch the rule tables once warm:
+  - current_snapshot_id(service_id) is cached under the service's catalog version
+    (service_app.catalog_cache), so a catalog change leads to a new snapshot on the next quote;
+  - load_rules(snapshot_id) reads the shared cache, then the database, and keeps the last
+    SNAPSHOT_LRU_SIZE parsed snapshots in process — they never change.
+"""
+import hashlib
+import json
+import uuid
+from collections import namedtuple
+from decimal import Decimal
+from functools import lru_cache
+
+from decouple import config
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .catalog_cache import catalog_cache_key
+from .models import (
+    OptionPricing,
+    Package,
+    PackageFeature,
+    PricingSnapshot,
+    QuantityDiscount,
+    QuestionPricing,
+    ServicePackageSizeMapping,
+    ServiceSettings,
+    SubQuestionPricing,
+)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_CACHE_KEY = "pricing-snapshot:{snapshot_id}"
+SNAPSHOT_LRU_SIZE = 32
+# Tries at numbering a new snapshot when concurrent writers race for the same version.
+CREATE_ATTEMPTS = 5
+
+# Same attribute names as the model rows the quote engine used to read.
+SnapshotPackage = namedtuple("SnapshotPackage", "id name base_price included_features excluded_features")
+QuestionRule = namedtuple("QuestionRule", "yes_pricing_type value_type yes_value")
+OptionRule = namedtuple("OptionRule", "pricing_type value_type value")
+DiscountRule = namedtuple("DiscountRule", "option_id scope discount_type value min_quantity")
+
+
+def pointer_ttl_seconds():
+    """Upper bound on how long a process may keep pricing with a superseded snapshot (local-memory cache)."""
+    return config("PRICING_SNAPSHOT_POINTER_TTL_SECONDS", default=300, cast=int)
+
+
+def build_snapshot_data(service_id):
+    """Canonical pricing data for a service, read straight from the catalog tables."""
+    packages = list(
+        Package.objects.filter(service_id=service_id, is_active=True)
+        .order_by("order", "name", "id")
+        .values_list("id", "name", "base_price")
+    )
+    package_ids = [package_id for package_id, _name, _price in packages]
+    features = {}
+    for package_id, feature_id, is_included in (
+        PackageFeature.objects.filter(package_id__in=package_ids)
+        .order_by("package_id", "feature_id")
+        .values_list("package_id", "feature_id", "is_included")
+    ):
+        features.setdefault(str(package_id), {"included": [], "excluded": []})[
+            "included" if is_included else "excluded"
+        ].append(str(feature_id))
+
+    def rules(model, parent_field, type_field, value_field):
+        rows = (
+            model.objects.filter(package_id__in=package_ids)
+            .order_by(parent_field, "package_id")
+            .values_list(parent_field, "package_id", type_field, "value_type", value_field)
+        )
+        return [[str(parent), str(package), kind, value_type, str(value)] for parent, package, kind, value_type, value in rows]
+
+    settings = ServiceSettings.objects.filter(service_id=service_id).values("apply_trip_charge_to_bid").first()
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "service_id": str(service_id),
+        "apply_trip_charge_to_bid": bool(settings and settings["apply_trip_charge_to_bid"]),
+        "packages": [
+            [str(package_id), name, str(base_price), features.get(str(package_id), {"included": [], "excluded": []})]
+            for package_id, name, base_price in packages
+        ],
+        "sizes": [
+            [str(package_id), str(size_id), str(price)]
+            for package_id, size_id, price in ServicePackageSizeMapping.objects.filter(service_package_id__in=package_ids)
+            .order_by("service_package_id", "global_size_id")
+            .values_list("service_package_id", "global_size_id", "price")
+        ],
+        "question_pricing": rules(QuestionPricing, "question_id", "yes_pricing_type", "yes_value"),
+        "option_pricing": rules(OptionPricing, "option_id", "pricing_type", "value"),
+        "sub_question_pricing": rules(SubQuestionPricing, "sub_question_id", "yes_pricing_type", "yes_value"),
+        "quantity_discounts": [
+            [str(question_id), str(option_id) if option_id else None, scope, discount_type, str(value), min_quantity]
+            for question_id, option_id, scope, discount_type, value, min_quantity in QuantityDiscount.objects.filter(
+                question__service_id=service_id
+            )
+            .order_by("question_id", "-min_quantity", "id")
+            .values_list("question_id", "option_id", "scope", "discount_type", "value", "min_quantity")
+        ],
+    }
+
+
+def content_hash(data):
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def create_snapshot(service_id):
+    """Snapshot the service's current pricing; returns the existing row when the content is unchanged."""
+    data = build_snapshot_data(service_id)
+    digest = content_hash(data)
+    for attempt in range(CREATE_ATTEMPTS):
+        existing = PricingSnapshot.objects.filter(service_id=service_id, content_hash=digest).first()
+        if existing:
+            return existing
+        version = (PricingSnapshot.objects.filter(service_id=service_id).aggregate(v=Max("version"))["v"] or 0) + 1
+        try:
+            with transaction.atomic():
+                return PricingSnapshot.objects.create(
+                    service_id=service_id, version=version, content_hash=digest, data=data
+                )
+        except IntegrityError:
+            # Another worker stored the same content (returned above on the next pass) or took this
+            # version number for different content (numbered again from the new maximum).
+            if attempt == CREATE_ATTEMPTS - 1:
+                raise
+
+
+def current_snapshot_id(service_id):
+    """Id of the snapshot matching the service's current catalog (created when the catalog changed)."""
+    key = catalog_cache_key(service_id, "pricing-snapshot")
+    snapshot_id = cache.get(key)
+    if snapshot_id is None:
+        snapshot = create_snapshot(service_id)
+        snapshot_id = str(snapshot.id)
+        cache.set(SNAPSHOT_CACHE_KEY.format(snapshot_id=snapshot_id), snapshot.data, timeout=None)
+        cache.set(key, snapshot_id, timeout=pointer_ttl_seconds())
+    return snapshot_id
+
+
+class PricingRules:
+    """Parsed snapshot: dict lookups keyed by UUIDs, values as Decimals, packages in quote order."""
+
+    def __init__(self, snapshot_id, data):
+        self.snapshot_id = str(snapshot_id)
+        self.apply_trip_charge_to_bid = data["apply_trip_charge_to_bid"]
+        self.packages = [
+            SnapshotPackage(uuid.UUID(package_id), name, Decimal(base_price), feats["included"], feats["excluded"])
+            for package_id, name, base_price, feats in data["packages"]
+        ]
+        self._sizes = {
+            (uuid.UUID(package_id), uuid.UUID(size_id)): Decimal(price) for package_id, size_id, price in data["sizes"]
+        }
+        self.question_pricings = self._rules(data["question_pricing"], QuestionRule)
+        self.option_pricings = self._rules(data["option_pricing"], OptionRule)
+        self.sub_question_pricings = self._rules(data["sub_question_pricing"], QuestionRule)
+        self.quantity_discounts = {}
+        for question_id, option_id, scope, discount_type, value, min_quantity in data["quantity_discounts"]:
+            self.quantity_discounts.setdefault(uuid.UUID(question_id), []).append(
+                DiscountRule(option_id, scope, discount_type, Decimal(value), min_quantity)
+            )
+
+    @staticmethod
+    def _rules(rows, rule):
+        return {
+            (uuid.UUID(parent), uuid.UUID(package)): rule(kind, value_type, Decimal(value))
+            for parent, package, kind, value_type, value in rows
+        }
+
+    def sqft_prices(self, size_range_id):
+        """{package_id: price} for a submission's size range (empty without one)."""
+        if not size_range_id:
+            return {}
+        size_range_id = uuid.UUID(str(size_range_id))
+        return {package_id: price for (package_id, size_id), price in self._sizes.items() if size_id == size_range_id}
+
+
+@lru_cache(maxsize=SNAPSHOT_LRU_SIZE)
+def load_rules(snapshot_id):
+    """PricingRules for a snapshot id (shared cache, then database)."""
+    key = SNAPSHOT_CACHE_KEY.format(snapshot_id=snapshot_id)
+    data = cache.get(key)
+    if data is None:
+        data = PricingSnapshot.objects.values_list("data", flat=True).get(id=snapshot_id)
+        cache.set(key, data, timeout=None)
+    return PricingRules(snapshot_id, data)
+
+
+def pricing_rules_for(service_selection, refresh=False):
+    """
+    Rules a CustomerServiceSelection is priced with. Pins the current snapshot when the selection has
+    none yet, or when ``refresh`` is set (drafts, explicit re-price with the current catalog).
+    """
+    if refresh or not service_selection.pricing_snapshot_id:
+        snapshot_id = current_snapshot_id(service_selection.service_id)
+        if str(service_selection.pricing_snapshot_id) != snapshot_id:
+            service_selection.pricing_snapshot_id = snapshot_id
+            service_selection.save(update_fields=["pricing_snapshot"])
+    return load_rules(str(service_selection.pricing_snapshot_id))
@@ -0,0 +1,113 @@
+"""
+Admin search backed by PostgreSQL pg_trgm.
+
+``icontains`` wraps the column in UPPER(), so no index can serve it and every keystroke in an admin
+search box scanned the whole table. Here each searchable text is a lowercased expression with a GIN
+``gin_trgm_ops`` index on exactly that expression (migrations service_app 0030 / quote_app 0036),
+queried with ``LIKE '%term%'`` so the trigram index is used, and ranked by ``word_similarity``.
+
+- search_submissions: one combined document per customer submission (name, email, company,
+  GHL contact id, phone digits). Phone-looking terms also match on their digits only, so
+  "(514) 555-01" finds "+1 514 555 0100".
+- trigram_search: lowercased single columns (Location name/address, Service name).
+
+Other database backends (SQLite in tests) fall back to plain ``icontains`` without ranking.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import F, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Lower
+
+# Digits needed before a term is also matched as a phone number.
+MIN_PHONE_DIGITS = 3
+
+
+def _submission_document_sql(table=""):
+    """Lowercased search document; must stay identical to the cs_search_trgm_idx expression."""
+    col = f"{table}." if table else ""
+    parts = [f"coalesce({col}{name}, '')" for name in ("first_name", "last_name", "customer_email", "company_name", "ghl_contact_id")]
+    parts.append(f"regexp_replace(coalesce({col}customer_phone, ''), '[^0-9]', '', 'g')")
+    return "lower(" + " || ' ' || ".join(parts) + ")"
+
+
+# Table-qualified so the RawSQL stays valid when JOINs exist (see quote_app.client_utils).
+SUBMISSION_DOCUMENT_SQL = _submission_document_sql("customer_submissions")
+# Index definition (quote_app migration 0036).
+SUBMISSION_DOCUMENT_INDEX_SQL = _submission_document_sql()
+
+SUBMISSION_FALLBACK_FIELDS = (
+    "first_name",
+    "last_name",
+    "customer_email",
+    "customer_phone",
+    "company_name",
+    "ghl_contact_id",
+)
+
+
+def uses_trigram(queryset):
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def normalize_search_term(term):
+    """Returns (lowercased text, phone digits or '') for a raw search box value."""
+    text = re.sub(r"\s+", " ", str(term or "")).strip().lower()
+    digits = re.sub(r"\D", "", text)
+    # Only treat it as a phone number when it is mostly digits / phone punctuation.
+    if len(digits) < MIN_PHONE_DIGITS or re.search(r"[^\d\s()+.\-]", text):
+        digits = ""
+    return text, digits
+
+
+def _icontains(fields, term):
+    return reduce(or_, (Q(**{f"{field}__icontains": term}) for field in fields))
+
+
+def search_submissions(queryset, term):
+    """
+    Filter CustomerSubmission rows matching ``term``; on PostgreSQL also adds the alias
+    ``search_similarity`` (0..1) for ordering / aggregation. Returns the queryset unchanged for a blank term.
+    """
+    text, digits = normalize_search_term(term)
+    if not text:
+        return queryset
+    if not uses_trigram(queryset):
+        match = _icontains(SUBMISSION_FALLBACK_FIELDS, text)
+        if digits:
+            match |= Q(customer_phone__icontains=digits)
+        return queryset.filter(match)
+
+    document = RawSQL(SUBMISSION_DOCUMENT_SQL, [], output_field=TextField())
+    match = Q(search_document__contains=text)
+    if digits and digits != text:
+        match |= Q(search_document__contains=digits)
+    return queryset.alias(
+        search_document=document,
+        search_similarity=RawSQL(
+            f"word_similarity(%s, {SUBMISSION_DOCUMENT_SQL})", [digits or text], output_field=FloatField()
+        ),
+    ).filter(match)
+
+
+def trigram_search(queryset, term, fields):
+    """
+    Filter ``queryset`` to rows where any of ``fields`` contains ``term`` (case-insensitive),
+    ordered best match first on PostgreSQL (callers add their own secondary ordering).
+    Each field needs a GIN index on lower(field) gin_trgm_ops to stay index-backed.
+    """
+    text, _digits = normalize_search_term(term)
+    if not text:
+        return queryset
+    if not uses_trigram(queryset):
+        return queryset.filter(_icontains(fields, text))
+
+    lowered = {f"_search_{field}": Lower(field) for field in fields}
+    match = reduce(or_, (Q(**{f"{alias}__contains": text}) for alias in lowered))
+    similarities = [TrigramWordSimilarity(text, F(alias)) for alias in lowered]
+    rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+    return queryset.alias(**lowered).filter(match).annotate(search_similarity=rank)
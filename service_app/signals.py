@@ -0,0 +1,48 @@
+"""
+Catalog cache invalidation for single-row edits.
+
+Bulk writers (bulk_pricing, catalog_io, size mapping bulk views) call invalidate_catalog_cache
+themselves; these receivers cover the per-row admin endpoints, the Django admin and the shell, so
+the pricing snapshot (service_app.pricing_snapshot) follows every change to a priced table.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from .catalog_cache import invalidate_catalog_cache
+from .models import (
+    OptionPricing,
+    Package,
+    PackageFeature,
+    QuantityDiscount,
+    Question,
+    QuestionPricing,
+    ServicePackageSizeMapping,
+    ServiceSettings,
+    SubQuestionPricing,
+)
+
+
+def _package_service(package_id):
+    return Package.objects.filter(id=package_id).values_list("service_id", flat=True).first()
+
+
+SERVICE_OF = {
+    Package: lambda obj: obj.service_id,
+    ServiceSettings: lambda obj: obj.service_id,
+    PackageFeature: lambda obj: _package_service(obj.package_id),
+    ServicePackageSizeMapping: lambda obj: _package_service(obj.service_package_id),
+    QuestionPricing: lambda obj: _package_service(obj.package_id),
+    OptionPricing: lambda obj: _package_service(obj.package_id),
+    SubQuestionPricing: lambda obj: _package_service(obj.package_id),
+    QuantityDiscount: lambda obj: Question.objects.filter(id=obj.question_id).values_list("service_id", flat=True).first(),
+}
+
+
+def invalidate_on_catalog_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_catalog_cache(SERVICE_OF[sender](instance))
+
+
+for model in SERVICE_OF:
+    post_save.connect(invalidate_on_catalog_change, sender=model, dispatch_uid=f"catalog-save-{model.__name__}")
+    post_delete.connect(invalidate_on_catalog_change, sender=model, dispatch_uid=f"catalog-delete-{model.__name__}")
@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -412,6 +412,72 @@ class IntegrationTestCase(APITestCase):
         self.assertEqual(calc_response.data['total_price'], '125.00')
 
 
+class BulkQuestionPricingTestCase(TestCase):
+    """Bulk pricing grid upserts"""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+
+        self.admin_user = User.objects.create_user(
+            username='bulkadmin',
+            email='bulk@test.com',
+            password='testpass123',
+            is_admin=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+        self.service = Service.objects.create(name='Bulk Service', created_by=self.admin_user)
+        self.packages = [
+            Package.objects.create(service=self.service, name=f'Package {i}', base_price=Decimal('100.00'))
+            for i in range(3)
+        ]
+        self.question = Question.objects.create(
+            service=self.service,
+            question_text='Pets?',
+            question_type='yes_no'
+        )
+
+    def _rules(self, value):
+        return [
+            {'package_id': str(p.id), 'pricing_type': 'upcharge_percent', 'value_type': 'amount', 'value': value}
+            for p in self.packages
+        ]
+
+    def test_creates_then_updates_in_place(self):
+        url = '/api/service/questions/bulk-pricing/'
+        data = {'question_id': str(self.question.id), 'pricing_rules': self._rules('10.00')}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = set(QuestionPricing.objects.filter(question=self.question).values_list('id', flat=True))
+        self.assertEqual(len(ids), 3)
+
+        data['pricing_rules'] = self._rules('12.50')
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = QuestionPricing.objects.filter(question=self.question)
+        self.assertEqual(set(rows.values_list('id', flat=True)), ids)
+        self.assertTrue(all(r.yes_value == Decimal('12.50') for r in rows))
+
+    def test_invalid_rule_rejects_whole_batch(self):
+        rules = self._rules('10.00')
+        rules[1]['pricing_type'] = 'bogus'
+        data = {'question_id': str(self.question.id), 'pricing_rules': rules}
+        response = self.client.post('/api/service/questions/bulk-pricing/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, response.data['pricing_rules'])
+        self.assertFalse(QuestionPricing.objects.filter(question=self.question).exists())
+
+    def test_values_must_fit_the_column(self):
+        rules = self._rules('10.00')
+        rules[0]['value'] = '10.005'
+        rules[2]['value'] = '123456789.00'
+        data = {'question_id': str(self.question.id), 'pricing_rules': rules}
+        response = self.client.post('/api/service/questions/bulk-pricing/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sorted(response.data['pricing_rules']), [0, 2])
+        self.assertFalse(QuestionPricing.objects.filter(question=self.question).exists())
+
+
 # ==================================================
 # SETUP INSTRUCTIONS
 """
@@ -611,4 +677,482 @@ When you're ready to build the user side, you can:
 5. Create customer dashboard
 
 The current admin infrastructure will support all user-side operations seamlessly!
-"""
\ No newline at end of file
+"""
+
+class KeysetPaginationTestCase(SimpleTestCase):
+    """Keyset (?cursor=) pagination used by the admin submission and client lists"""
+
+    def _request(self, query):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        return Request(APIRequestFactory().get('/api/service/clients/', query))
+
+    def test_cursor_round_trip_and_next_page_filter(self):
+        from datetime import datetime, timezone as dt_timezone
+        from unittest.mock import MagicMock
+
+        from .pagination import KeysetPagination
+
+        t0 = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        rows = [{'latest_submission_at': t0, 'client_id': f'c{i}'} for i in range(3)]
+        queryset = MagicMock()
+        queryset.order_by.return_value.__getitem__.return_value = rows
+
+        paginator = KeysetPagination('latest_submission_at', 'client_id')
+        request = self._request({'cursor': '', 'page_size': 2})
+        self.assertTrue(KeysetPagination.requested(request))
+        page = paginator.paginate_queryset(queryset, request)
+
+        self.assertEqual(page, rows[:2])
+        queryset.order_by.assert_called_once_with('-latest_submission_at', '-client_id')
+        queryset.filter.assert_not_called()
+        self.assertEqual(KeysetPagination.decode_cursor(paginator.next_cursor), (t0, 'c1'))
+
+        second = KeysetPagination('latest_submission_at', 'client_id')
+        second.paginate_queryset(queryset, self._request({'cursor': paginator.next_cursor}))
+        queryset.filter.assert_called_once()
+
+    def test_page_number_mode_without_cursor(self):
+        from .views import SubmissionPagination, submission_paginator
+
+        self.assertIsInstance(submission_paginator(self._request({'page': 2})), SubmissionPagination)
+
+
+class KeysetPaginationQuerysetTestCase(TestCase):
+    """Keyset pagination against the database: ties on the time field and tampered cursors."""
+
+    def _request(self, query):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        return Request(APIRequestFactory().get('/api/service/services/', query))
+
+    def test_equal_sort_keys_split_across_pages(self):
+        from django.utils import timezone
+
+        from .pagination import KeysetPagination
+
+        for i in range(5):
+            Service.objects.create(name=f'Service {i}')
+        Service.objects.update(created_at=timezone.now())  # every row ties on created_at
+
+        seen = []
+        query = {'cursor': '', 'page_size': 2}
+        while True:
+            paginator = KeysetPagination('created_at', 'id')
+            seen += [row.id for row in paginator.paginate_queryset(Service.objects.all(), self._request(query))]
+            if not paginator.next_cursor:
+                break
+            query = {'cursor': paginator.next_cursor, 'page_size': 2}
+
+        self.assertEqual(seen, list(Service.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_tampered_tiebreak_is_not_found(self):
+        from django.utils import timezone
+        from rest_framework.exceptions import NotFound
+
+        from .pagination import KeysetPagination
+
+        cursor = KeysetPagination.encode_cursor(timezone.now(), 'not-a-uuid')
+        with self.assertRaises(NotFound):
+            KeysetPagination('created_at', 'id').paginate_queryset(
+                Service.objects.all(), self._request({'cursor': cursor})
+            )
+        with self.assertRaises(NotFound):
+            KeysetPagination.decode_cursor('garbage')
+
+
+class SearchTermTestCase(SimpleTestCase):
+    """Search box normalization shared by the trigram admin searches."""
+
+    def test_phone_terms_keep_digits(self):
+        from .search import normalize_search_term
+
+        self.assertEqual(normalize_search_term('  (514) 555-01 '), ('(514) 555-01', '51455501'))
+
+    def test_text_terms_have_no_digits(self):
+        from .search import normalize_search_term
+
+        self.assertEqual(normalize_search_term('John  SMITH'), ('john smith', ''))
+        self.assertEqual(normalize_search_term('unit 12b'), ('unit 12b', ''))
+        self.assertEqual(normalize_search_term(None), ('', ''))
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+    """Read routing for views opted in with ReplicaReadMixin (service_backend.db_router)."""
+
+    def setUp(self):
+        from unittest.mock import patch
+
+        patcher = patch('service_backend.db_router.replica_configured', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_use_replica_only_inside_scope(self):
+        from service_backend.db_router import ReplicaRouter, use_replica
+
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Service), 'default')
+        with use_replica():
+            self.assertEqual(router.db_for_read(Service), 'replica')
+        self.assertEqual(router.db_for_read(Service), 'default')
+
+    def test_write_pins_rest_of_scope_to_primary(self):
+        from service_backend.db_router import ReplicaRouter, use_replica
+
+        router = ReplicaRouter()
+        with use_replica():
+            self.assertEqual(router.db_for_write(Service), 'default')
+            self.assertEqual(router.db_for_read(Service), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'service_app'))
+
+    def test_pin_cookie_after_mutation(self):
+        import time
+
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from service_backend.db_router import PIN_COOKIE, ReplicaStickinessMiddleware, is_pinned
+
+        factory = RequestFactory()
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=201))
+        response = middleware(factory.post('/api/quotes/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertNotIn(PIN_COOKIE, middleware(factory.get('/api/quotes/')).cookies)
+
+        pinned = factory.get('/api/dashboard/')
+        pinned.COOKIES[PIN_COOKIE] = str(time.time() + 5)
+        self.assertTrue(is_pinned(pinned))
+        expired = factory.get('/api/dashboard/')
+        expired.COOKIES[PIN_COOKIE] = str(time.time() - 5)
+        self.assertFalse(is_pinned(expired))
+
+    def test_pin_cookie_samesite_follows_session_cookie(self):
+        from django.http import HttpResponse
+        from django.test import RequestFactory, override_settings
+
+        from service_backend.db_router import PIN_COOKIE, ReplicaStickinessMiddleware
+
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=201))
+        with override_settings(SESSION_COOKIE_SAMESITE='None', DATABASE_REPLICA_PIN_COOKIE_SAMESITE=None):
+            cookie = middleware(RequestFactory().post('/api/quotes/')).cookies[PIN_COOKIE]
+        self.assertEqual(cookie['samesite'], 'None')
+        self.assertTrue(cookie['secure'])
+        with override_settings(SESSION_COOKIE_SAMESITE='None', DATABASE_REPLICA_PIN_COOKIE_SAMESITE='Strict'):
+            cookie = middleware(RequestFactory().post('/api/quotes/')).cookies[PIN_COOKIE]
+        self.assertEqual(cookie['samesite'], 'Strict')
+
+    def test_submission_detail_reads_primary(self):
+        from quote_app.views import SubmissionDetailView
+        from service_backend.db_router import ReplicaReadMixin
+
+        self.assertFalse(issubclass(SubmissionDetailView, ReplicaReadMixin))
+
+
+class SubmissionFunnelViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='funnel', password='x')
+
+    def _get(self, query):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        from .views import SubmissionFunnelAPIView
+
+        request = APIRequestFactory().get('/api/service/submission-funnel/', query)
+        force_authenticate(request, user=self.user)
+        return SubmissionFunnelAPIView.as_view()(request)
+
+    def test_rejects_malformed_ids(self):
+        for name in ('service_id', 'location_id'):
+            response = self._get({name: 'not-a-uuid'})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.data, {'error': f'{name} must be a valid UUID'})
+
+    def test_accepts_valid_ids(self):
+        import uuid
+
+        response = self._get({'service_id': str(uuid.uuid4()), 'location_id': str(uuid.uuid4())})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class MetricsTestCase(SimpleTestCase):
+    """Prometheus text rendering and outbound call classification (service_backend.metrics)."""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        from service_backend.metrics import Histogram
+
+        histogram = Histogram('demo_seconds', 'Demo.', ('view',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, view='a')
+        histogram.observe(0.5, view='a')
+        histogram.observe(5, view='a')
+        lines = histogram.render()
+
+        self.assertIn('# TYPE demo_seconds histogram', lines)
+        self.assertIn('demo_seconds_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{view="a",le="1.0"} 2', lines)
+        self.assertIn('demo_seconds_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('demo_seconds_count{view="a"} 3', lines)
+        with self.assertRaises(ValueError):
+            histogram.observe(1, route='a')
+
+    def test_counter_escapes_label_values(self):
+        from service_backend.metrics import Counter
+
+        counter = Counter('demo_total', 'Demo.', ('topic',))
+        counter.inc(topic='a"b')
+        counter.inc(2, topic='a"b')
+        self.assertIn('demo_total{topic="a\\"b"} 3', counter.render())
+
+    def test_classify_url_collapses_ids(self):
+        from service_backend.metrics import classify_url
+
+        self.assertEqual(
+            classify_url('https://services.leadconnectorhq.com/contacts/aB3dE5gH7jK9mN1pQ2/notes'),
+            ('ghl', 'contacts/{id}/notes'),
+        )
+        self.assertEqual(classify_url('https://api.getjobber.com/api/graphql'), ('jobber', 'api/graphql'))
+        self.assertEqual(
+            classify_url('https://maps.googleapis.com/maps/api/geocode/json?address=x'),
+            ('google', 'maps/api/geocode'),
+        )
+        self.assertEqual(classify_url('https://example.com/a/b'), ('other', 'example.com'))
+
+    def test_metrics_denied_unless_token_or_allowlist(self):
+        from unittest.mock import patch
+
+        from django.test import RequestFactory
+
+        from service_backend.metrics import metrics_view
+
+        factory = RequestFactory()
+        proxied = factory.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        with patch.dict('os.environ', {'METRICS_TOKEN': '', 'METRICS_ALLOWED_IPS': ''}):
+            self.assertEqual(metrics_view(proxied).status_code, 403)
+        with patch.dict('os.environ', {'METRICS_TOKEN': 's3cret', 'METRICS_ALLOWED_IPS': ''}):
+            self.assertEqual(metrics_view(proxied).status_code, 403)
+            authed = factory.get('/metrics', REMOTE_ADDR='203.0.113.9', HTTP_AUTHORIZATION='Bearer s3cret')
+            self.assertEqual(metrics_view(authed).status_code, 200)
+        with patch.dict('os.environ', {'METRICS_TOKEN': '', 'METRICS_ALLOWED_IPS': '10.0.0.0/8, 192.168.1.5'}):
+            self.assertEqual(metrics_view(factory.get('/metrics', REMOTE_ADDR='10.2.3.4')).status_code, 200)
+            self.assertEqual(metrics_view(proxied).status_code, 403)
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    """Open / half-open / closed transitions (service_backend.circuit_breaker)."""
+
+    name = 'ghl:contacts/{id}'
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_opens_after_threshold_then_probes_once(self):
+        from unittest.mock import patch
+
+        from service_backend import circuit_breaker as cb
+
+        with patch.object(cb, 'failure_threshold', return_value=2):
+            cb.record_failure(self.name, probe=False)
+            self.assertEqual(cb.before_call(self.name), (False, True))
+            cb.record_failure(self.name, probe=False)
+        self.assertTrue(cb.is_open('ghl', 'contacts/{id}'))
+        with self.assertRaises(cb.CircuitOpenError):
+            cb.before_call(self.name)
+
+        later = cb.time.time() + cb.open_seconds() + 1
+        with patch.object(cb.time, 'time', return_value=later):
+            self.assertEqual(cb.before_call(self.name), (True, True))
+            with self.assertRaises(cb.CircuitOpenError):
+                cb.before_call(self.name)
+            cb.record_success(self.name, probe=True, had_failures=True)
+            self.assertEqual(cb.before_call(self.name), (False, False))
+
+    def test_failed_probe_reopens(self):
+        from unittest.mock import patch
+
+        from service_backend import circuit_breaker as cb
+
+        with patch.object(cb, 'failure_threshold', return_value=1):
+            cb.record_failure(self.name, probe=False)
+        later = cb.time.time() + cb.open_seconds() + 1
+        with patch.object(cb.time, 'time', return_value=later):
+            probe, _ = cb.before_call(self.name)
+            cb.record_failure(self.name, probe=probe)
+            with self.assertRaises(cb.CircuitOpenError):
+                cb.before_call(self.name)
+
+    def test_error_when_open_returns_error_tuple(self):
+        from service_backend.circuit_breaker import CircuitOpenError, error_when_open
+
+        @error_when_open
+        def call():
+            raise CircuitOpenError('jobber:api/graphql')
+
+        data, err = call()
+        self.assertIsNone(data)
+        self.assertIn('jobber:api/graphql', err)
+
+
+class StreamingExportTestCase(SimpleTestCase):
+    """Row encoding for the streaming admin exports (service_app.exports)."""
+
+    def test_csv_has_header_and_blank_nulls(self):
+        from .exports import stream_rows
+
+        rows = [{'id': 1, 'status': 'approved', 'final_total': Decimal('10.50')}, {'id': 2, 'status': None}]
+        body = ''.join(stream_rows(iter(rows), ['id', 'status', 'final_total'], 'csv'))
+        self.assertEqual(body, 'id,status,final_total\r\n1,approved,10.50\r\n2,,\r\n')
+
+    def test_ndjson_batches_rows(self):
+        import json
+        from unittest.mock import patch
+
+        from .exports import stream_rows
+
+        with patch('service_app.exports.ROWS_PER_WRITE', 2):
+            chunks = list(stream_rows(({'id': i} for i in range(5)), ['id'], 'ndjson'))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([json.loads(line)['id'] for line in ''.join(chunks).splitlines()], [0, 1, 2, 3, 4])
+
+    def test_csv_neutralises_formulas(self):
+        from .exports import stream_rows
+
+        rows = [{'first_name': '=HYPERLINK("http://x")', 'phone': '+15551234', 'note': '-1+1', 'email': '@a', 'total': Decimal('-5.00')}]
+        body = ''.join(stream_rows(iter(rows), ['first_name', 'phone', 'note', 'email', 'total'], 'csv'))
+        self.assertEqual(body.splitlines()[1], '"\'=HYPERLINK(""http://x"")",\'+15551234,\'-1+1,\'@a,-5.00')
+
+    def test_bad_filters_are_rejected_up_front(self):
+        from .exports import ExportParamError, validate_params
+
+        validate_params({'status': 'approved, declined', 'service_id': '0b5e3c1e-6f1a-4b8e-9a55-0f7e1c2d3a4b'})
+        for params in ({'status': 'approved,won'}, {'service_id': 'abc'}, {'end_date': '2024-13-01'}):
+            with self.assertRaises(ExportParamError):
+                validate_params(params)
+
+
+class ServiceCatalogTestCase(TestCase):
+    """Whole-service catalog export / diffing import (service_app.catalog_io)"""
+
+    def setUp(self):
+        self.service = Service.objects.create(name='Window Cleaning')
+        self.package = Package.objects.create(service=self.service, name='Basic', base_price=Decimal('100.00'))
+        self.feature = Feature.objects.create(service=self.service, name='Screens')
+        PackageFeature.objects.create(package=self.package, feature=self.feature, is_included=True)
+        self.question = Question.objects.create(service=self.service, question_text='Size?', question_type='describe')
+        self.option = QuestionOption.objects.create(question=self.question, option_text='Large')
+        OptionPricing.objects.create(
+            option=self.option, package=self.package, pricing_type='upcharge_percent', value=Decimal('5.00')
+        )
+
+    def test_reimport_of_own_export_changes_nothing(self):
+        from .catalog_io import export_catalog, import_catalog
+
+        result = import_catalog(export_catalog(self.service), self.service)
+        self.assertTrue(all(not any(counts.values()) for counts in result['changes'].values()))
+
+    def test_clone_creates_new_rows(self):
+        from .catalog_io import export_catalog, import_catalog
+
+        result = import_catalog(export_catalog(self.service), overrides={'name': 'Window Cleaning (Austin)'})
+        clone = Service.objects.get(id=result['service_id'])
+        self.assertEqual(clone.name, 'Window Cleaning (Austin)')
+        self.assertEqual(clone.packages.get().name, 'Basic')
+        self.assertNotEqual(clone.packages.get().id, self.package.id)
+        self.assertEqual(OptionPricing.objects.filter(option__question__service=clone).get().value, Decimal('5.00'))
+
+    def test_import_applies_changes_and_deactivates_missing(self):
+        from .catalog_io import export_catalog, import_catalog
+
+        document = export_catalog(self.service)
+        document['packages'][0]['base_price'] = '120.00'
+        document['questions'][0]['options'] = []
+        result = import_catalog(document, self.service)
+        self.assertEqual(result['changes']['Package']['updated'], 1)
+        self.package.refresh_from_db()
+        self.option.refresh_from_db()
+        self.assertEqual(self.package.base_price, Decimal('120.00'))
+        self.assertFalse(self.option.is_active)
+
+    def test_invalid_document_writes_nothing(self):
+        from .catalog_io import CatalogImportError, export_catalog, import_catalog
+
+        document = export_catalog(self.service)
+        document['packages'][0]['base_price'] = '120.00'
+        document['questions'][0]['options'][0]['pricing'][0]['package'] = 'missing'
+        with self.assertRaises(CatalogImportError) as caught:
+            import_catalog(document, self.service)
+        self.assertIn('questions[0].options[0].pricing[0]', caught.exception.errors[0])
+        self.package.refresh_from_db()
+        self.assertEqual(self.package.base_price, Decimal('100.00'))
+
+    def test_numbers_must_fit_their_columns(self):
+        from .catalog_io import CatalogImportError, export_catalog, import_catalog
+
+        document = export_catalog(self.service)
+        document['packages'][0]['base_price'] = '123456789.00'
+        document['packages'][0]['order'] = -1
+        document['questions'][0]['max_measurements'] = '3'
+        document['questions'][0]['options'][0]['max_quantity'] = 2.5
+        document['questions'][0]['options'][0]['pricing'][0]['value'] = '5.001'
+        with self.assertRaises(CatalogImportError) as caught:
+            import_catalog(document, self.service)
+        paths = [error.split(':')[0] for error in caught.exception.errors]
+        self.assertEqual(paths, [
+            'packages[0].base_price',
+            'packages[0].order',
+            'questions[0].max_measurements',
+            'questions[0].options[0].max_quantity',
+            'questions[0].options[0].pricing[0].value',
+        ])
+
+        document = export_catalog(self.service)
+        document['questions'][0]['max_measurements'] = None
+        import_catalog(document, self.service)
+
+    def test_rename_onto_a_deactivated_package_is_rejected(self):
+        from .catalog_io import CatalogImportError, export_catalog, import_catalog
+
+        Package.objects.create(service=self.service, name='Premium', base_price=Decimal('200.00'), is_active=False)
+        document = export_catalog(self.service)
+        document['packages'] = [p for p in document['packages'] if p['name'] == 'Basic']
+        document['packages'][0]['name'] = 'Premium'
+        with self.assertRaises(CatalogImportError) as caught:
+            import_catalog(document, self.service)
+        self.assertTrue(caught.exception.errors[0].startswith('packages[0].name:'))
+        self.package.refresh_from_db()
+        self.assertEqual(self.package.name, 'Basic')
+
+
+class PricingSnapshotTestCase(TestCase):
+    """Content-hashed pricing snapshots (service_app.pricing_snapshot)"""
+
+    def setUp(self):
+        self.service = Service.objects.create(name='Gutter Cleaning')
+        self.package = Package.objects.create(service=self.service, name='Basic', base_price=Decimal('100.00'))
+        self.question = Question.objects.create(service=self.service, question_text='Pets?', question_type='yes_no')
+        self.pricing = QuestionPricing.objects.create(
+            question=self.question, package=self.package, yes_pricing_type='upcharge_percent', yes_value=Decimal('10.00')
+        )
+
+    def test_unchanged_catalog_reuses_snapshot(self):
+        from .pricing_snapshot import create_snapshot
+
+        first = create_snapshot(self.service.id)
+        self.assertEqual(create_snapshot(self.service.id).id, first.id)
+
+        self.pricing.yes_value = Decimal('12.00')
+        self.pricing.save()
+        second = create_snapshot(self.service.id)
+        self.assertNotEqual(second.id, first.id)
+        self.assertEqual(second.version, first.version + 1)
+
+    def test_rules_are_keyed_like_the_rule_tables(self):
+        from .pricing_snapshot import create_snapshot, load_rules
+
+        rules = load_rules(str(create_snapshot(self.service.id).id))
+        self.assertEqual([p.id for p in rules.packages], [self.package.id])
+        rule = rules.question_pricings[(self.question.id, self.package.id)]
+        self.assertEqual((rule.yes_pricing_type, rule.yes_value), ('upcharge_percent', Decimal('10.00')))
+        self.assertEqual(rules.sqft_prices(None), {})
@@ -8,6 +8,7 @@ from .client_views import (
     ClientSubmissionDetailView,
     ClientSubmissionsListView,
 )
+from .exports import ClientExportView, PackageQuoteExportView, SubmissionExportView
 
 router = DefaultRouter()
 router.register(r'quantity-discounts', views.QuantityDiscountViewSet, basename='quantity-discount')
@@ -39,6 +40,8 @@ urlpatterns = [
     path('services/<uuid:pk>/', views.ServiceDetailView.as_view(), name='service-detail'),
     path('services/<uuid:service_id>/settings/', views.ServiceSettingsView.as_view(), name='service-settings'),
     path('services/<uuid:service_id>/question-tree/', views.QuestionTreeView.as_view(), name='service-question-tree'),
+    path('services/<uuid:service_id>/catalog/', views.ServiceCatalogView.as_view(), name='service-catalog'),
+    path('services/catalog/import/', views.ServiceCatalogImportView.as_view(), name='service-catalog-import'),
     path('services/analytics/', views.ServiceAnalyticsView.as_view(), name='service-analytics'),
     
     # ============================================================================
@@ -153,6 +156,12 @@ urlpatterns = [
     path('dashboard/', views.DashboardAPIView.as_view(), name='dashboard-api'),
     path('dashboard/submissions/', views.PaginatedSubmissionsList.as_view(), name='dashboard-submissions'),
     path('lead-source-analytics/', views.LeadSourceAnalyticsAPIView.as_view(), name='lead-source-analytics'),
+    path('submission-funnel/', views.SubmissionFunnelAPIView.as_view(), name='submission-funnel'),
+
+    # Streaming CSV / NDJSON exports
+    path('exports/submissions/', SubmissionExportView.as_view(), name='export-submissions'),
+    path('exports/clients/', ClientExportView.as_view(), name='export-clients'),
+    path('exports/package-quotes/', PackageQuoteExportView.as_view(), name='export-package-quotes'),
 
     path('monthly-analytics/',views. MonthlyAnalyticsAPIView.as_view(), name='monthly-analytics'),
     path('yearly-analytics/', views.YearlyAnalyticsAPIView.as_view(), name='yearly-analytics'),
@@ -12,9 +12,15 @@ from decimal import Decimal
 import requests
 from rest_framework.decorators import action
 import os
+import uuid
 from django.db import models
 from .models import Service, ServiceSettings
 from .serializers import ServiceSettingsSerializer
+from .bulk_pricing import BulkPricingValidationError, upsert_pricing_rules, validate_pricing_rules
+from .catalog_cache import invalidate_catalog_cache
+from .catalog_io import CatalogImportError, export_catalog, import_catalog
+from .search import trigram_search, uses_trigram
+from service_backend.db_router import ReplicaReadMixin
 
 from rest_framework.permissions import IsAuthenticated
 
@@ -185,10 +191,9 @@ class LocationListCreateView(generics.ListCreateAPIView):
         queryset = super().get_queryset()
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search) | 
-                models.Q(address__icontains=search)
-            )
+            queryset = trigram_search(queryset, search, ['name', 'address'])
+            if uses_trigram(queryset):
+                return queryset.order_by('-search_similarity', 'name')
         return queryset.order_by('name')
 
 
@@ -220,7 +225,9 @@ class ServiceListCreateView(generics.ListCreateAPIView):
         )
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(name__icontains=search)
+            queryset = trigram_search(queryset, search, ['name'])
+            if uses_trigram(queryset):
+                return queryset.order_by('-search_similarity', 'order', 'name')
         return queryset.order_by('order', 'name')
 
     def get_serializer_class(self):
@@ -252,7 +259,7 @@ class ServiceIconUploadView(APIView):
     permission_classes = [IsAdminPermission]
 
     def post(self, request, pk):
-        from accounts.models import GHLAuthCredentials
+        from accounts.token_manager import ghl_tokens
         from quote_app.helpers import delete_file_from_ghl_media, upload_file_to_ghl_media
 
         service = get_object_or_404(Service, pk=pk)
@@ -262,7 +269,7 @@ class ServiceIconUploadView(APIView):
                 {"error": "No file provided. Send multipart/form-data with key 'file'."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         if not credentials or not credentials.location_id:
             return Response(
                 {"error": "GHL credentials or location ID not configured."},
@@ -291,11 +298,11 @@ class ServiceIconDeleteView(APIView):
     permission_classes = [IsAdminPermission]
 
     def delete(self, request, pk):
-        from accounts.models import GHLAuthCredentials
+        from accounts.token_manager import ghl_tokens
         from quote_app.helpers import delete_file_from_ghl_media
 
         service = get_object_or_404(Service, pk=pk)
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         location_id = credentials.location_id if credentials else None
         if service.icon_file_id and location_id:
             delete_file_from_ghl_media(service.icon_file_id, location_id)
@@ -598,43 +605,20 @@ class BulkQuestionPricingView(APIView):
 
     def post(self, request):
         serializer = BulkPricingUpdateSerializer(data=request.data)
-        if serializer.is_valid():
-            question_id = serializer.validated_data['question_id']
-            pricing_rules = serializer.validated_data['pricing_rules']
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                with transaction.atomic():
-                    question = get_object_or_404(Question, id=question_id)
-                    
-                    # Update or create pricing rules
-                    for rule in pricing_rules:
-                        package_id = rule['package_id']
-                        pricing_type = rule['pricing_type']
-                        value_type = rule['value_type']
-                        value = Decimal(str(rule['value']))
-                        
-                        pricing, created = QuestionPricing.objects.get_or_create(
-                            question=question,
-                            package_id=package_id,
-                            defaults={
-                                'yes_pricing_type': pricing_type,
-                                'yes_value': value,
-                                'value_type': value_type
-                            }
-                        )
-                        
-                        if not created:
-                            pricing.yes_pricing_type = pricing_type
-                            pricing.yes_value = value
-                            pricing.value_type = value_type  # ✅ added
-                            pricing.save()
+        question = get_object_or_404(Question, id=serializer.validated_data['question_id'])
+        try:
+            rows = validate_pricing_rules(
+                QuestionPricing, serializer.validated_data['pricing_rules'], question.service_id
+            )
+        except BulkPricingValidationError as e:
+            return Response({'pricing_rules': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        upsert_pricing_rules(QuestionPricing, question, rows, question.service_id)
+        return Response({'message': 'Question pricing rules updated successfully'})
 
-                return Response({'message': 'Question pricing rules updated successfully'})
-                
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class BulkSubQuestionPricingView(APIView):
     """Bulk update sub-question pricing rules for all packages"""
@@ -642,42 +626,23 @@ class BulkSubQuestionPricingView(APIView):
 
     def post(self, request):
         serializer = BulkSubQuestionPricingSerializer(data=request.data)
-        if serializer.is_valid():
-            sub_question_id = serializer.validated_data['sub_question_id']
-            pricing_rules = serializer.validated_data['pricing_rules']
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                with transaction.atomic():
-                    sub_question = get_object_or_404(SubQuestion, id=sub_question_id)
-                    
-                    for rule in pricing_rules:
-                        package_id = rule['package_id']
-                        pricing_type = rule['pricing_type']
-                        value = Decimal(str(rule['value']))
-                        value_type = rule['value_type']
-                        
-                        pricing, created = SubQuestionPricing.objects.get_or_create(
-                            sub_question=sub_question,
-                            package_id=package_id,
-                            defaults={
-                                'yes_pricing_type': pricing_type,
-                                'yes_value': value,
-                                'value_type': value_type
-                            }
-                        )
-                        
-                        if not created:
-                            pricing.yes_pricing_type = pricing_type
-                            pricing.yes_value = value
-                            pricing.value_type = value_type   # ✅ added update for value_type
-                            pricing.save()
+        sub_question = get_object_or_404(
+            SubQuestion.objects.select_related('parent_question'),
+            id=serializer.validated_data['sub_question_id'],
+        )
+        service_id = sub_question.parent_question.service_id
+        try:
+            rows = validate_pricing_rules(
+                SubQuestionPricing, serializer.validated_data['pricing_rules'], service_id
+            )
+        except BulkPricingValidationError as e:
+            return Response({'pricing_rules': e.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-                return Response({'message': 'Sub-question pricing rules updated successfully'})
-                
-            except Exception as e:
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        upsert_pricing_rules(SubQuestionPricing, sub_question, rows, service_id)
+        return Response({'message': 'Sub-question pricing rules updated successfully'})
 
 
 class BulkOptionPricingView(APIView):
@@ -693,37 +658,65 @@ class BulkOptionPricingView(APIView):
                 {'error': 'option_id and pricing_rules are required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not isinstance(pricing_rules, list):
+            return Response(
+                {'error': 'pricing_rules must be a list'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         try:
-            with transaction.atomic():
-                option = get_object_or_404(QuestionOption, id=option_id)
-                
-                for rule in pricing_rules:
-                    package_id = rule['package_id']
-                    pricing_type = rule['pricing_type']
-                    value = Decimal(str(rule['value']))
-                    value_type = rule['value_type']
-                    
-                    pricing, created = OptionPricing.objects.get_or_create(
-                        option=option,
-                        package_id=package_id,
-                        defaults={
-                            'pricing_type': pricing_type,
-                            'value': value,
-                            'value_type': value_type
-                        }
-                    )
-                    
-                    if not created:
-                        pricing.pricing_type = pricing_type
-                        pricing.value = value
-                        pricing.value_type = value_type  # ✅ added
-                        pricing.save()
+            uuid.UUID(str(option_id))
+        except ValueError:
+            return Response({'error': 'option_id must be a valid UUID'}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response({'message': 'Option pricing rules updated successfully'})
-            
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        option = get_object_or_404(QuestionOption.objects.select_related('question'), id=option_id)
+        service_id = option.question.service_id
+        try:
+            rows = validate_pricing_rules(OptionPricing, pricing_rules, service_id)
+        except BulkPricingValidationError as e:
+            return Response({'pricing_rules': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        upsert_pricing_rules(OptionPricing, option, rows, service_id)
+        return Response({'message': 'Option pricing rules updated successfully'})
+
+
+class ServiceCatalogView(APIView):
+    """
+    GET  — The whole catalog of a service as one JSON document (service_app.catalog_io).
+    POST — Apply a catalog document to this service; only differences are written.
+           ?dry_run=true reports the changes without keeping them.
+    """
+    permission_classes = [IsAdminPermission]
+
+    def get(self, request, service_id):
+        service = get_object_or_404(Service, id=service_id)
+        return Response(export_catalog(service))
+
+    def post(self, request, service_id):
+        service = get_object_or_404(Service, id=service_id)
+        dry_run = (request.query_params.get('dry_run') or '').lower() == 'true'
+        try:
+            result = import_catalog(request.data, service, dry_run=dry_run)
+        except CatalogImportError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+
+class ServiceCatalogImportView(APIView):
+    """
+    POST — Create a new service from a catalog document (clone, e.g. for a new market).
+           Optional ?name= overrides the service name in the document.
+    """
+    permission_classes = [IsAdminPermission]
+
+    def post(self, request):
+        overrides = {'name': request.query_params['name']} if request.query_params.get('name') else None
+        dry_run = (request.query_params.get('dry_run') or '').lower() == 'true'
+        try:
+            result = import_catalog(request.data, overrides=overrides, dry_run=dry_run)
+        except CatalogImportError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
 
 
 class QuestionTreeView(APIView):
@@ -830,7 +823,7 @@ class QuestionResponseListCreateView(generics.ListCreateAPIView):
 
 
 # Analytics Views
-class ServiceAnalyticsView(APIView):
+class ServiceAnalyticsView(ReplicaReadMixin, APIView):
     """Get analytics data for services"""
     permission_classes = [IsAdminPermission]
 
@@ -1205,25 +1198,34 @@ class AutoMapGlobalToServicePackages(APIView):
         if property_type_id:
             global_sizes_query = global_sizes_query.filter(property_type_id=property_type_id)
         
-        global_sizes = global_sizes_query
+        global_sizes = global_sizes_query.select_related('property_type')
         service_packages = list(service.packages.filter(is_active=True).order_by('order'))
 
         if not service_packages:
             return Response({'detail': 'No service-level packages found.'}, status=400)
 
-        created_mappings = []
+        existing = set(
+            ServicePackageSizeMapping.objects.filter(
+                service_package__in=service_packages
+            ).values_list('service_package_id', 'global_size_id')
+        )
+
+        to_create = []
         for global_size in global_sizes:
-            templates = list(global_size.template_prices.order_by('order'))
-            for idx, template in enumerate(templates):
-                if idx < len(service_packages):
-                    service_package = service_packages[idx]
-                    mapping, created = ServicePackageSizeMapping.objects.get_or_create(
-                        service_package=service_package,
-                        global_size=global_size,
-                        defaults={'price': template.price}
-                    )
-                    if created:
-                        created_mappings.append(mapping)
+            templates = sorted(global_size.template_prices.all(), key=lambda t: t.order)
+            for service_package, template in zip(service_packages, templates):
+                if (service_package.id, global_size.id) in existing:
+                    continue
+                to_create.append(ServicePackageSizeMapping(
+                    service_package=service_package,
+                    global_size=global_size,
+                    price=template.price,
+                ))
+
+        with transaction.atomic():
+            created_mappings = ServicePackageSizeMapping.objects.bulk_create(to_create)
+            if created_mappings:
+                invalidate_catalog_cache(service.id)
 
         return Response(ServicePackageSizeMappingSerializer(created_mappings, many=True).data, status=201)
 
@@ -1360,25 +1362,50 @@ class ServicePackageSizeMappingBulkUpdateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        updated_objects = []
-
-        with transaction.atomic():
-            for item in data:
-                try:
-                    instance = ServicePackageSizeMapping.objects.get(id=item.get("id"))
-                except ServicePackageSizeMapping.DoesNotExist:
-                    return Response(
-                        {"detail": f"Object with id {item.get('id')} not found."},
-                        status=status.HTTP_404_NOT_FOUND,
-                    )
+        if any(not isinstance(item, dict) for item in data):
+            return Response(
+                {"detail": "Each item must be an object with an id."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                serializer = ServicePackageSizeMappingNewSerializer(
-                    instance, data=item, partial=True
+        instances = {
+            str(pk): obj
+            for pk, obj in ServicePackageSizeMapping.objects.select_related("service_package")
+            .in_bulk([item.get("id") for item in data if item.get("id") is not None])
+            .items()
+        }
+        for item in data:
+            if str(item.get("id")) not in instances:
+                return Response(
+                    {"detail": f"Object with id {item.get('id')} not found."},
+                    status=status.HTTP_404_NOT_FOUND,
                 )
-                serializer.is_valid(raise_exception=True)
-                serializer.save()
-                updated_objects.append(serializer.data)
 
+        # Validate the whole batch before touching the database.
+        item_serializers = [
+            ServicePackageSizeMappingNewSerializer(instances[str(item["id"])], data=item, partial=True)
+            for item in data
+        ]
+        errors = [ser.errors if not ser.is_valid() else {} for ser in item_serializers]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changed_fields = set()
+        for ser in item_serializers:
+            for attr, value in ser.validated_data.items():
+                setattr(ser.instance, attr, value)
+                changed_fields.add(attr)
+            if ser.instance.pricing_type == "bid_in_person":
+                ser.instance.price = 0
+                changed_fields.add("price")
+
+        updated = list({id(ser.instance): ser.instance for ser in item_serializers}.values())
+        with transaction.atomic():
+            if changed_fields:
+                ServicePackageSizeMapping.objects.bulk_update(updated, sorted(changed_fields))
+            invalidate_catalog_cache(*(obj.service_package.service_id for obj in updated))
+
+        updated_objects = [ServicePackageSizeMappingNewSerializer(ser.instance).data for ser in item_serializers]
         return Response(updated_objects, status=status.HTTP_200_OK)
 
 
@@ -1477,8 +1504,10 @@ from django.db.models import Count, Sum, Q, F
 from django.db.models.functions import TruncMonth, TruncDate
 from decimal import Decimal
 from datetime import datetime, timedelta
+from .pagination import KeysetPagination
 from .serializers import CustomerSubmissionListSerializer
 from quote_app.models import CustomerSubmission
+from django.utils import timezone
 
 class SubmissionPagination(PageNumberPagination):
     page_size = 10
@@ -1486,7 +1515,14 @@ class SubmissionPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class DashboardAPIView(APIView):
+def submission_paginator(request, time_field="created_at", tiebreak_field="id"):
+    """SubmissionPagination, or keyset pagination when the client passes ?cursor=."""
+    if KeysetPagination.requested(request):
+        return KeysetPagination(time_field, tiebreak_field)
+    return SubmissionPagination()
+
+
+class DashboardAPIView(ReplicaReadMixin, APIView):
     """
     Comprehensive dashboard endpoint that returns:
     - Overall statistics
@@ -1697,6 +1733,7 @@ class PaginatedSubmissionsList(APIView):
     Query Params:
         ?page=1
         ?page_size=20
+        ?cursor=<next_cursor>   (keyset mode; ?cursor= for the first page, ?count=estimate|exact)
         ?status=approved
         ?search=John
     """
@@ -1720,7 +1757,7 @@ class PaginatedSubmissionsList(APIView):
                 Q(first_name__icontains=search) | Q(last_name__icontains=search)
             )
         # Pagination
-        paginator = SubmissionPagination()
+        paginator = submission_paginator(request)
         paginated_qs = paginator.paginate_queryset(queryset, request)
         serializer = CustomerSubmissionListSerializer(paginated_qs, many=True)
 
@@ -1846,6 +1883,55 @@ class LeadSourceAnalyticsAPIView(APIView):
 
 
 
+class SubmissionFunnelAPIView(ReplicaReadMixin, APIView):
+    """
+    Submission funnel from the status transition log (quote_app.status_log):
+    - Submissions reaching each stage (draft → submitted → packages_selected → approved)
+    - Step-to-step conversion rates
+    - Time in each stage and time to approval (p50 / p90 hours)
+    - Declined / expired exits
+
+    Query params: start_date, end_date (YYYY-MM-DD, by created_at; default last 90 days),
+    service_id, location_id, heard_about_us, group_by (service | location | heard_about_us).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        from quote_app.status_log import GROUP_BY_CHOICES, funnel
+
+        params = request.query_params
+        group_by = params.get('group_by') or None
+        if group_by and group_by not in GROUP_BY_CHOICES:
+            return Response(
+                {'error': f"group_by must be one of: {', '.join(GROUP_BY_CHOICES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start = params.get('start_date')
+            end = params.get('end_date')
+            start = timezone.make_aware(datetime.strptime(start, '%Y-%m-%d')) if start else None
+            # end_date is inclusive.
+            end = timezone.make_aware(datetime.strptime(end, '%Y-%m-%d')) + timedelta(days=1) if end else None
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        ids = {}
+        for name in ('service_id', 'location_id'):
+            try:
+                ids[name] = uuid.UUID(params[name]) if params.get(name) else None
+            except ValueError:
+                return Response({'error': f'{name} must be a valid UUID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = funnel(
+            start=start,
+            end=end,
+            service_id=ids['service_id'],
+            location_id=ids['location_id'],
+            heard_about_us=params.get('heard_about_us') or None,
+            group_by=group_by,
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+
 # New view for Monthly Analytics by Year
 class MonthlyAnalyticsAPIView(APIView):
     """
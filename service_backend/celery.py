@@ -12,6 +12,16 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Load task modules from all registered Django app configs
 app.autodiscover_tasks()
 
+# Task durations for service_backend.metrics (exported when CELERY_METRICS_PORT is set)
+from service_backend.metrics import install_celery_instrumentation  # noqa: E402
+
+install_celery_instrumentation()
+
+# Task id as correlation id for the outbound call ledger (jobber_app.call_ledger)
+from service_backend.correlation import install_celery_correlation  # noqa: E402
+
+install_celery_correlation()
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -0,0 +1,188 @@
+"""
+Circuit breakers for outbound GHL / Jobber / Hub calls, one per vendor + endpoint family
+(service_backend.metrics.classify_url, e.g. "ghl:contacts/{id}").
+
+Installed at the ``requests`` transport adapter, so every call is covered without touching
+call sites:
+  - closed: calls go through; CIRCUIT_FAILURE_THRESHOLD consecutive failures (connection
+    errors, timeouts, HTTP 5xx / 429) within CIRCUIT_FAILURE_WINDOW_SECONDS open the circuit;
+  - open: calls fail immediately with CircuitOpenError for CIRCUIT_OPEN_SECONDS;
+  - half-open: afterwards exactly one worker (cache.add claim) sends a probe; success closes
+    the circuit, failure re-opens it for another period.
+
+State lives in the Django cache, so it is shared across gunicorn / Celery workers when a shared
+cache is configured (REDIS_CACHE_URL); with the default local-memory cache it is per process.
+Cache errors never block a call (the breaker fails open).
+
+Calls without an explicit timeout get OUTBOUND_DEFAULT_TIMEOUT_SECONDS.
+"""
+import functools
+import logging
+import time
+
+import requests
+from decouple import config
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+GUARDED_VENDORS = ("ghl", "jobber", "hub")
+KEY_PREFIX = "circuit"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a vendor whose circuit is open."""
+
+    def __init__(self, name, retry_in=None):
+        self.circuit = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {name}; failing fast")
+
+
+def failure_threshold():
+    return max(1, config("CIRCUIT_FAILURE_THRESHOLD", default=5, cast=int))
+
+
+def failure_window_seconds():
+    return config("CIRCUIT_FAILURE_WINDOW_SECONDS", default=60, cast=int)
+
+
+def open_seconds():
+    return config("CIRCUIT_OPEN_SECONDS", default=30, cast=int)
+
+
+def default_timeout_seconds():
+    return config("OUTBOUND_DEFAULT_TIMEOUT_SECONDS", default=20, cast=float)
+
+
+def _keys(name):
+    base = f"{KEY_PREFIX}:{name}"
+    return f"{base}:open_until", f"{base}:failures", f"{base}:probe"
+
+
+def is_failure(status_code):
+    return status_code >= 500 or status_code == 429
+
+
+def is_open(vendor, endpoint):
+    """True while calls to vendor/endpoint would fail fast (the half-open probe slot aside)."""
+    open_key, _, _ = _keys(f"{vendor}:{endpoint}")
+    try:
+        open_until = cache.get(open_key)
+    except Exception:
+        return False
+    return open_until is not None and time.time() < open_until
+
+
+def before_call(name):
+    """
+    Returns (probe, had_failures) for a call that may proceed, or raises CircuitOpenError.
+    """
+    open_key, failures_key, probe_key = _keys(name)
+    try:
+        state = cache.get_many([open_key, failures_key])
+        open_until = state.get(open_key)
+        if open_until is None:
+            return False, bool(state.get(failures_key))
+        now = time.time()
+        if now < open_until:
+            raise CircuitOpenError(name, retry_in=open_until - now)
+        # Half-open: one probe at a time across all workers.
+        if not cache.add(probe_key, 1, timeout=max(int(default_timeout_seconds()) * 3, 30)):
+            raise CircuitOpenError(name)
+        logger.info("Circuit %s half-open: probing", name)
+        return True, True
+    except CircuitOpenError:
+        raise
+    except Exception as exc:
+        logger.warning("Circuit state unavailable for %s: %s", name, exc)
+        return False, False
+
+
+def _open(name, open_key):
+    seconds = open_seconds()
+    # The key outlives the open period so the next call after it becomes the probe.
+    cache.set(open_key, time.time() + seconds, timeout=seconds * 20)
+    logger.warning("Circuit %s opened for %ss", name, seconds)
+
+
+def record_success(name, probe, had_failures):
+    if not (probe or had_failures):
+        return
+    try:
+        cache.delete_many(list(_keys(name)))
+        if probe:
+            logger.info("Circuit %s closed after a successful probe", name)
+    except Exception as exc:
+        logger.warning("Circuit state unavailable for %s: %s", name, exc)
+
+
+def record_failure(name, probe):
+    open_key, failures_key, probe_key = _keys(name)
+    try:
+        if probe:
+            _open(name, open_key)
+            cache.delete(probe_key)
+            return
+        cache.add(failures_key, 0, timeout=failure_window_seconds())
+        try:
+            failures = cache.incr(failures_key)
+        except ValueError:
+            # Expired between add and incr.
+            cache.set(failures_key, 1, timeout=failure_window_seconds())
+            failures = 1
+        if failures >= failure_threshold():
+            _open(name, open_key)
+    except Exception as exc:
+        logger.warning("Circuit state unavailable for %s: %s", name, exc)
+
+
+def install_circuit_breakers():
+    """Guard every ``requests`` call to a guarded vendor (idempotent; install before metrics)."""
+    from requests.adapters import HTTPAdapter
+
+    from .metrics import classify_url
+
+    if getattr(HTTPAdapter.send, "_circuit_breaker", False):
+        return
+    original_send = HTTPAdapter.send
+
+    @functools.wraps(original_send)
+    def send(self, request, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = default_timeout_seconds()
+        vendor, endpoint = classify_url(request.url)
+        if vendor not in GUARDED_VENDORS:
+            return original_send(self, request, *args, **kwargs)
+        name = f"{vendor}:{endpoint}"
+        probe, had_failures = before_call(name)
+        try:
+            response = original_send(self, request, *args, **kwargs)
+        except requests.RequestException:
+            record_failure(name, probe)
+            raise
+        except BaseException:
+            if probe:
+                cache.delete(_keys(name)[2])
+            raise
+        if is_failure(response.status_code):
+            record_failure(name, probe)
+        else:
+            record_success(name, probe, had_failures)
+        return response
+
+    send._circuit_breaker = True
+    HTTPAdapter.send = send
+
+
+def error_when_open(func):
+    """For (data, error) API helpers: a CircuitOpenError becomes (None, message) instead of raising."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except CircuitOpenError as exc:
+            return None, str(exc)
+
+    return wrapper
@@ -0,0 +1,73 @@
+"""
+Correlation ids tying outbound vendor calls (jobber_app.call_ledger) to what triggered them.
+
+CorrelationIdMiddleware uses the caller's X-Request-ID (or a new id) for the whole request and
+echoes it on the response; Celery tasks use their task id. Thread pools started through
+jobber_app.lock_in.fanout keep the id of the request that started them.
+"""
+import contextvars
+import re
+import uuid
+
+HEADER = "X-Request-ID"
+_VALID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# {"id": str, "attempts": {call signature: count}} for the current request / task.
+_current = contextvars.ContextVar("correlation", default=None)
+
+
+def current():
+    """The active correlation dict, or None outside a request / task."""
+    return _current.get()
+
+
+def current_id():
+    state = _current.get()
+    return state["id"] if state else ""
+
+
+def begin(correlation_id=None):
+    """Start a correlation scope; returns the token for end()."""
+    value = str(correlation_id or "")
+    if not _VALID.match(value):
+        value = uuid.uuid4().hex
+    return _current.set({"id": value, "attempts": {}})
+
+
+def end(token):
+    _current.reset(token)
+
+
+class CorrelationIdMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin(request.headers.get(HEADER))
+        try:
+            request.correlation_id = current_id()
+            response = self.get_response(request)
+            response[HEADER] = request.correlation_id
+            return response
+        finally:
+            end(token)
+
+
+def install_celery_correlation():
+    from celery.signals import task_postrun, task_prerun
+
+    tokens = {}
+
+    @task_prerun.connect(weak=False)
+    def _task_started(task_id=None, **kwargs):
+        tokens[task_id] = begin(task_id)
+
+    @task_postrun.connect(weak=False)
+    def _task_finished(task_id=None, **kwargs):
+        token = tokens.pop(task_id, None)
+        if token is not None:
+            try:
+                end(token)
+            except ValueError:
+                # Reset from a different context (thread pools); the next task overwrites it.
+                pass
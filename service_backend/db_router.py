@@ -0,0 +1,151 @@
+"""
+Optional read-replica routing.
+
+Configure a replica with DATABASE_REPLICA_HOST (see settings); without it every query stays on
+``default`` and everything here is a no-op. Reads only go to the replica inside an opt-in scope:
+
+    class DashboardAPIView(ReplicaReadMixin, APIView): ...     # class-based views
+    @replica_reads                                              # function views
+    with use_replica(): ...                                     # anything else
+    qs.using(read_alias(request))                               # lazy reads (streamed responses)
+
+Read-your-writes:
+  - inside a scope, the first write pins the rest of that scope to the primary;
+  - ReplicaStickinessMiddleware sets a short-lived cookie after any successful mutating request,
+    and opted-in views keep reading the primary for that client until it expires. Its SameSite
+    attribute is DATABASE_REPLICA_PIN_COOKIE_SAMESITE, else SESSION_COOKIE_SAMESITE, so it is
+    also sent by cross-site frontends that write through this API;
+  - views polled right after a write (e.g. the submission detail) should not opt in at all.
+
+Writes always go to the primary, including saves of objects that were loaded from the replica.
+"""
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = "replica"
+PIN_COOKIE = "db_primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# None outside a replica scope; else {"wrote": bool} for the current scope.
+_scope = contextvars.ContextVar("replica_scope", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def sticky_seconds():
+    return getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 10)
+
+
+def pin_cookie_samesite():
+    samesite = getattr(settings, "DATABASE_REPLICA_PIN_COOKIE_SAMESITE", None)
+    return samesite or settings.SESSION_COOKIE_SAMESITE
+
+
+@contextmanager
+def use_replica():
+    """Route reads in this block to the replica (until the block writes)."""
+    token = _scope.set({"wrote": False})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def is_pinned(request):
+    """True while the client's read-your-writes cookie is still valid."""
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE) or 0) > time.time()
+    except ValueError:
+        return False
+
+
+def _wants_replica(request):
+    return replica_configured() and request.method in SAFE_METHODS and not is_pinned(request)
+
+
+def read_alias(request):
+    """
+    Alias for explicit ``.using()`` on reads that run after the view returns (e.g. a
+    StreamingHttpResponse body), where a use_replica() scope has already ended.
+    """
+    return REPLICA_ALIAS if _wants_replica(request) else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Primary for writes; replica for reads inside use_replica() when configured."""
+
+    def db_for_read(self, model, **hints):
+        if not replica_configured():
+            return None
+        scope = _scope.get()
+        if scope is not None and not scope["wrote"]:
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve safe (GET/HEAD/OPTIONS) requests of a view from the replica, unless the client is pinned."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not _wants_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def replica_reads(view_func):
+    """Function-view equivalent of ReplicaReadMixin (apply outermost, above @api_view)."""
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _wants_replica(request):
+            return view_func(request, *args, **kwargs)
+        with use_replica():
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaStickinessMiddleware:
+    """After a successful mutating request, pin the client to the primary for a few seconds."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if replica_configured() and request.method not in SAFE_METHODS and response.status_code < 400:
+            seconds = sticky_seconds()
+            samesite = pin_cookie_samesite()
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + seconds),
+                max_age=seconds,
+                httponly=True,
+                samesite=samesite,
+                # Browsers drop SameSite=None cookies that are not Secure.
+                secure=settings.SESSION_COOKIE_SECURE or str(samesite).lower() == "none",
+            )
+        return response
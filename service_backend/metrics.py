@@ -0,0 +1,423 @@
+"""
+In-process metrics in the Prometheus text format (no prometheus_client dependency).
+
+    GET /metrics    (Authorization: Bearer $METRICS_TOKEN, or a client in METRICS_ALLOWED_IPS;
+                     denied when neither is configured)
+
+Collected:
+  - http_request_duration_seconds / http_request_db_queries — per resolved view (MetricsMiddleware)
+  - outbound_requests_total / outbound_request_duration_seconds — every ``requests`` call, by
+    vendor (ghl / jobber / hub / google / other), endpoint family and status code
+  - webhook_events_total / webhook_duration_seconds — observe_webhook on the webhook views
+  - celery_task_duration_seconds — task_prerun / task_postrun signals
+  - oauth_token_refreshes_total — vendor refresh-token exchanges (accounts.token_manager)
+
+Values live in the process that recorded them: each gunicorn worker serves its own /metrics,
+and Celery workers export theirs on CELERY_METRICS_PORT (first free port from there, one per
+worker process) when that is set, bound to CELERY_METRICS_BIND (127.0.0.1 by default) and
+behind the same bearer token when METRICS_TOKEN is set.
+"""
+import functools
+import hmac
+import http.server
+import ipaddress
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from decouple import config
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+TASK_BUCKETS = (0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 1800.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self, items):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_number(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state["count"] if state else 0
+
+    def _samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, state["buckets"]):
+                cumulative += hits
+                labels = _label_text(self.labelnames, key, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_number(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "Request latency by view.", ("view", "method", "status")
+)
+HTTP_REQUEST_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "SQL queries executed per request.", ("view", "method"), buckets=QUERY_BUCKETS
+)
+OUTBOUND_REQUESTS = REGISTRY.counter(
+    "outbound_requests_total", "Outbound HTTP calls by vendor, endpoint family and status.", ("vendor", "endpoint", "status")
+)
+OUTBOUND_DURATION = REGISTRY.histogram(
+    "outbound_request_duration_seconds", "Outbound HTTP call latency.", ("vendor", "endpoint")
+)
+WEBHOOK_EVENTS = REGISTRY.counter(
+    "webhook_events_total", "Webhook deliveries by source, topic and response status.", ("source", "topic", "status")
+)
+WEBHOOK_DURATION = REGISTRY.histogram(
+    "webhook_duration_seconds", "Webhook processing time.", ("source", "topic")
+)
+CELERY_TASK_DURATION = REGISTRY.histogram(
+    "celery_task_duration_seconds", "Celery task run time by final state.", ("task", "state"), buckets=TASK_BUCKETS
+)
+TOKEN_REFRESHES = REGISTRY.counter(
+    "oauth_token_refreshes_total", "OAuth refresh-token exchanges by provider and outcome.", ("provider", "outcome")
+)
+
+
+# -- HTTP requests ----------------------------------------------------------------------------
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """Latency and SQL query count per resolved view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        response = None
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+            return response
+        finally:
+            view = _view_name(request)
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                view=view,
+                method=request.method,
+                status=response.status_code if response is not None else "exception",
+            )
+            HTTP_REQUEST_QUERIES.observe(counter.count, view=view, method=request.method)
+
+
+def _token_ok(authorization):
+    token = config("METRICS_TOKEN", default="")
+    return bool(token) and hmac.compare_digest(authorization or "", f"Bearer {token}")
+
+
+def _allowed_networks():
+    networks = []
+    for part in config("METRICS_ALLOWED_IPS", default="").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(part, strict=False))
+        except ValueError:
+            logger.warning("METRICS_ALLOWED_IPS: ignoring invalid entry %r", part)
+    return networks
+
+
+def _allowed(request):
+    """
+    Bearer METRICS_TOKEN, or REMOTE_ADDR inside METRICS_ALLOWED_IPS (IPs / CIDRs). Nothing is
+    allowed by default: behind the reverse proxy every client arrives from a private address.
+    """
+    if _token_ok(request.META.get("HTTP_AUTHORIZATION", "")):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks())
+
+
+def metrics_view(request):
+    if not _allowed(request):
+        return HttpResponseForbidden("Forbidden")
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+# -- Outbound calls ---------------------------------------------------------------------------
+
+_VENDOR_HOSTS = (
+    ("leadconnectorhq.com", "ghl"),
+    ("gohighlevel.com", "ghl"),
+    ("getjobber.com", "jobber"),
+    ("googleapis.com", "google"),
+    ("google.com", "google"),
+)
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[0-9A-Za-z_=-]{12,}$|^\d+$")
+_installed = False
+
+
+def _hub_host():
+    return urlsplit(config("HUB_BASE_URL", default="") or "").hostname or ""
+
+
+def classify_url(url):
+    """Returns (vendor, endpoint family) for an outbound URL; ids are collapsed to {id}."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    vendor = "other"
+    hub = _hub_host()
+    if hub and host == hub:
+        vendor = "hub"
+    else:
+        for suffix, name in _VENDOR_HOSTS:
+            if host == suffix or host.endswith("." + suffix):
+                vendor = name
+                break
+    segments = [s for s in parts.path.split("/") if s][:3]
+    endpoint = "/".join("{id}" if _ID_SEGMENT.match(s) else s for s in segments) or "/"
+    return vendor, (endpoint if vendor != "other" else host or "unknown")
+
+
+def install_outbound_instrumentation():
+    """Time every ``requests`` call at the transport adapter (idempotent)."""
+    global _installed
+    if _installed:
+        return
+    from requests.adapters import HTTPAdapter
+
+    original_send = HTTPAdapter.send
+
+    @functools.wraps(original_send)
+    def send(self, request, *args, **kwargs):
+        vendor, endpoint = classify_url(request.url)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            response = original_send(self, request, *args, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            OUTBOUND_DURATION.observe(time.perf_counter() - start, vendor=vendor, endpoint=endpoint)
+            OUTBOUND_REQUESTS.inc(vendor=vendor, endpoint=endpoint, status=status)
+
+    HTTPAdapter.send = send
+    _installed = True
+
+
+# -- Webhooks ---------------------------------------------------------------------------------
+
+
+def observe_webhook(source, topic):
+    """
+    Decorate a webhook view method. ``topic`` is a fixed label or a callable(request) -> label;
+    callables must map untrusted input to a bounded set of values.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            try:
+                label = topic(request) if callable(topic) else topic
+            except Exception:
+                label = "unknown"
+            start = time.perf_counter()
+            status = "exception"
+            try:
+                response = method(view, request, *args, **kwargs)
+                status = response.status_code
+                return response
+            finally:
+                WEBHOOK_DURATION.observe(time.perf_counter() - start, source=source, topic=label)
+                WEBHOOK_EVENTS.inc(source=source, topic=label, status=status)
+
+        return wrapper
+
+    return decorator
+
+
+# -- Celery -----------------------------------------------------------------------------------
+
+_task_starts = {}
+_task_lock = threading.Lock()
+_exporter_started = False
+
+
+class _ExporterHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if config("METRICS_TOKEN", default="") and not _token_ok(self.headers.get("Authorization")):
+            self.send_response(403)
+            self.end_headers()
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_worker_exporter():
+    """Serve this worker process's metrics on the first free port from CELERY_METRICS_PORT."""
+    global _exporter_started
+    base = config("CELERY_METRICS_PORT", default=0, cast=int)
+    if _exporter_started or not base:
+        return
+    _exporter_started = True
+    host = config("CELERY_METRICS_BIND", default="127.0.0.1")
+    for port in range(base, base + 32):
+        try:
+            server = http.server.ThreadingHTTPServer((host, port), _ExporterHandler)
+        except OSError:
+            continue
+        threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+        logger.info("Celery metrics exporter listening on %s:%s", host, port)
+        return
+    logger.warning("Celery metrics exporter: no free port in %s-%s", base, base + 31)
+
+
+def install_celery_instrumentation():
+    from celery.signals import task_postrun, task_prerun
+
+    @task_prerun.connect(weak=False)
+    def _task_started(task_id=None, **kwargs):
+        with _task_lock:
+            if not _exporter_started:
+                _start_worker_exporter()
+            _task_starts[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _task_finished(task_id=None, task=None, state=None, **kwargs):
+        with _task_lock:
+            start = _task_starts.pop(task_id, None)
+        if start is not None:
+            CELERY_TASK_DURATION.observe(
+                time.perf_counter() - start, task=getattr(task, "name", "unknown"), state=state or "UNKNOWN"
+            )
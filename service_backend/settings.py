@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
+from celery.schedules import crontab
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +58,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'service_backend.metrics.MetricsMiddleware',
+    'service_backend.correlation.CorrelationIdMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,6 +68,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'service_backend.db_router.ReplicaStickinessMiddleware',
 ]
 
 AUTH_USER_MODEL = 'service_app.User'
@@ -104,6 +108,33 @@ DATABASES = {
     }
 }
 
+# Optional streaming replica for heavy read-only admin / reporting views (service_backend.db_router).
+# Tests mirror it onto the default test database, so it is a second connection to the same data.
+if config("DATABASE_REPLICA_HOST", default=""):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': config("DATABASE_REPLICA_NAME", default=DATABASES['default']['NAME']),
+        'HOST': config("DATABASE_REPLICA_HOST"),
+        'PORT': config("DATABASE_REPLICA_PORT", default='5432'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['service_backend.db_router.ReplicaRouter']
+
+# Shared cache (circuit breaker state, catalog versions, Jobber tag ids) across gunicorn / Celery
+# workers; without REDIS_CACHE_URL Django's per-process local-memory cache is used.
+if config("REDIS_CACHE_URL", default=""):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config("REDIS_CACHE_URL"),
+        }
+    }
+# Seconds a client keeps reading the primary after one of its writes (read-your-writes).
+DATABASE_REPLICA_STICKY_SECONDS = config("DATABASE_REPLICA_STICKY_SECONDS", default=10, cast=int)
+# SameSite of that pin cookie; empty follows SESSION_COOKIE_SAMESITE ("None" for cross-site frontends).
+DATABASE_REPLICA_PIN_COOKIE_SAMESITE = config("DATABASE_REPLICA_PIN_COOKIE_SAMESITE", default="") or None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -230,4 +261,40 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'accounts.tasks.make_api_call',
         'schedule': timedelta(hours=10),
     },
+    'refresh-expiring-oauth-tokens': {
+        'task': 'accounts.tasks.refresh_expiring_oauth_tokens',
+        'schedule': timedelta(minutes=5),
+    },
+    'import-ghl-contacts-to-mirror': {
+        'task': 'jobber_app.tasks.import_ghl_contacts_to_mirror',
+        'schedule': timedelta(hours=6),
+    },
+    'flush-hub-outbox': {
+        'task': 'jobber_app.tasks.flush_hub_outbox',
+        'schedule': timedelta(minutes=1),
+    },
+    'sync-due-jobber-webhooks': {
+        'task': 'jobber_app.tasks.sync_due_jobber_webhooks',
+        'schedule': timedelta(minutes=1),
+    },
+    'retry-stalled-submission-images': {
+        'task': 'quote_app.tasks.retry_stalled_submission_images',
+        'schedule': timedelta(minutes=10),
+    },
+    'reconcile-jobber-ghl-tags-nightly': {
+        'task': 'jobber_app.tasks.reconcile_jobber_ghl_tags_nightly',
+        'schedule': crontab(hour=7, minute=30),  # 03:30 Eastern
+    },
+    'run-submission-lifecycle': {
+        'task': 'quote_app.tasks.run_submission_lifecycle',
+        'schedule': crontab(hour=8, minute=45),
+    },
+    'archive-closed-submissions': {
+        'task': 'quote_app.tasks.archive_closed_submissions',
+        'schedule': crontab(hour=9, minute=15),
+    },
+    'prune-outbound-call-log': {
+        'task': 'jobber_app.tasks.prune_outbound_call_log',
+        'schedule': crontab(hour=8, minute=15),
+    },
 }
\ No newline at end of file
@@ -19,6 +19,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path('api/admin/', admin.site.urls),
     path('api/service/', include("service_app.urls")),
@@ -26,6 +28,7 @@ urlpatterns = [
     path('api/user/', include("user_app.urls")),
     path('api/quote/', include("quote_app.urls")),
     path('api/jobber/', include("jobber_app.urls")),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:  # Only serve media in dev
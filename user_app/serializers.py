@@ -9,6 +9,8 @@ from service_app.models import Feature, Package, PackageFeature, OptionPricing,
 from decimal import Decimal
 from geopy.distance import geodesic
 
+from .utils import _uuid_or_none, load_answer_catalog
+
 
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
@@ -157,20 +159,17 @@ class QuoteCreateSerializer(serializers.Serializer):
         except Package.DoesNotExist:
             raise serializers.ValidationError("Package not found or doesn't belong to service")
         
-        # Validate answers format if provided
+        # Validate answers format if provided (questions / options fetched in two queries)
         if 'answers' in data:
             for answer in data['answers']:
                 if 'question_id' not in answer:
                     raise serializers.ValidationError("Each answer must have question_id")
-                
+
+            questions, options = load_answer_catalog(service, data['answers'])
+            for answer in data['answers']:
                 # Check if question belongs to service
-                try:
-                    question = Question.objects.get(
-                        id=answer['question_id'], 
-                        service=service, 
-                        is_active=True
-                    )
-                except Question.DoesNotExist:
+                question = questions.get(_uuid_or_none(answer['question_id']))
+                if question is None:
                     raise serializers.ValidationError(f"Question {answer['question_id']} not found or doesn't belong to service")
                 
                 # Validate answer format based on question type
@@ -182,14 +181,12 @@ class QuoteCreateSerializer(serializers.Serializer):
                         raise serializers.ValidationError(f"Question {question.id} requires selected_option_id")
                     
                     # Validate option belongs to question
-                    try:
-                        QuestionOption.objects.get(
-                            id=answer['selected_option_id'],
-                            question=question,
-                            is_active=True
-                        )
-                    except QuestionOption.DoesNotExist:
+                    option = options.get(_uuid_or_none(answer['selected_option_id']))
+                    if option is None or option.question_id != question.id:
                         raise serializers.ValidationError(f"Option {answer['selected_option_id']} not found or doesn't belong to question")
+
+            # Reused by calculate_total_quote_price so pricing does not fetch them again.
+            data['answer_catalog'] = (questions, options)
         
         data['contact'] = contact
         data['service'] = service
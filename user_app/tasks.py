@@ -0,0 +1,32 @@
+"""
+Celery jobs for user_app.
+
+create_ghl_quote_note creates / finds the GHL contact and posts the quote summary note for a
+legacy widget quote (QuoteCreateView) after the request has returned.
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def create_ghl_quote_note(quote_id):
+    from .models import Quote
+    from .utils import create_ghl_contact_and_note
+
+    quote = Quote.objects.select_related('contact', 'service', 'package').filter(id=quote_id).first()
+    if quote is None:
+        return {"ok": True, "skipped": True, "reason": "quote_not_found"}
+    create_ghl_contact_and_note(quote.contact, quote)
+    return {"ok": True}
+
+
+def queue_ghl_quote_note(quote_id):
+    try:
+        create_ghl_quote_note.delay(str(quote_id))
+    except Exception as exc:
+        # Broker down: fall back to the old inline call rather than losing the note.
+        logger.warning("GHL quote note for %s not queued (%s); creating inline", quote_id, exc)
+        create_ghl_quote_note(str(quote_id))
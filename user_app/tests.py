@@ -1,3 +1,111 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from service_app.models import (
+    OptionPricing,
+    Package,
+    QuantityDiscount,
+    Question,
+    QuestionOption,
+    QuestionPricing,
+    Service,
+)
+from user_app.utils import (
+    calculate_option_price_adjustment,
+    calculate_question_price_adjustment,
+    load_answer_catalog,
+    price_quote_answers,
+)
+
+
+def _per_answer_pricing(package, answers_data):
+    """The per-answer lookups QuoteCreateView and calculate_total_quote_price used before price_quote_answers."""
+    adjustments = []
+    for answer_data in answers_data:
+        try:
+            question = package.service.questions.get(id=answer_data['question_id'], is_active=True)
+        except Question.DoesNotExist:
+            continue
+        adjustment = Decimal('0.00')
+        if question.question_type == 'yes_no':
+            adjustment = calculate_question_price_adjustment(question, answer_data.get('yes_no_answer', False), package)
+        elif question.question_type == 'options':
+            option_id = answer_data.get('selected_option_id')
+            if option_id:
+                try:
+                    option = question.options.get(id=option_id, is_active=True)
+                except QuestionOption.DoesNotExist:
+                    continue
+                adjustment = calculate_option_price_adjustment(option, package)
+        adjustments.append((question.id, adjustment))
+    return adjustments
+
+
+class PriceQuoteAnswersParityTests(TestCase):
+    """price_quote_answers must price widget answers exactly like the per-answer lookups it replaced."""
+
+    def setUp(self):
+        self.service = Service.objects.create(name='Windows')
+        self.package = Package.objects.create(service=self.service, name='Basic', base_price=Decimal('200.00'))
+
+        self.yes_no = Question.objects.create(service=self.service, question_text='Screens?', question_type='yes_no')
+        QuestionPricing.objects.create(
+            question=self.yes_no, package=self.package, yes_pricing_type='upcharge_percent', yes_value=Decimal('25.00')
+        )
+
+        self.options = Question.objects.create(service=self.service, question_text='Storeys?', question_type='options')
+        self.one = QuestionOption.objects.create(question=self.options, option_text='One')
+        self.two = QuestionOption.objects.create(question=self.options, option_text='Two')
+        OptionPricing.objects.create(
+            option=self.one, package=self.package, pricing_type='discount_percent', value=Decimal('10.00')
+        )
+        OptionPricing.objects.create(option=self.two, package=self.package, pricing_type='fixed_price', value=Decimal('40.00'))
+
+        self.quantity = Question.objects.create(service=self.service, question_text='Panes?', question_type='quantity')
+        self.pane = QuestionOption.objects.create(question=self.quantity, option_text='Pane', allow_quantity=True, max_quantity=50)
+        OptionPricing.objects.create(option=self.pane, package=self.package, pricing_type='upcharge_percent', value=Decimal('3.00'))
+        QuantityDiscount.objects.create(
+            question=self.quantity, scope='question', discount_type='percent', value=Decimal('10.00'), min_quantity=5
+        )
+
+        self.measurement = Question.objects.create(
+            service=self.service, question_text='Skylights?', question_type='measurement', measurement_unit='feet'
+        )
+
+    def _assert_parity(self, answers_data):
+        expected = _per_answer_pricing(self.package, answers_data)
+        priced = price_quote_answers(
+            self.package, answers_data, load_answer_catalog(self.service, answers_data)
+        )
+        self.assertEqual([(a['question'].id, a['price_adjustment']) for a in priced], expected)
+        return priced
+
+    def test_yes_no(self):
+        self._assert_parity([{'question_id': str(self.yes_no.id), 'yes_no_answer': True}])
+        self._assert_parity([{'question_id': str(self.yes_no.id), 'yes_no_answer': False}])
+
+    def test_options(self):
+        for option in (self.one, self.two):
+            self._assert_parity([{'question_id': str(self.options.id), 'selected_option_id': str(option.id)}])
+
+    def test_quantity_with_discount(self):
+        priced = self._assert_parity([
+            {'question_id': str(self.quantity.id), 'selected_option_id': str(self.pane.id), 'quantity': 8},
+        ])
+        self.assertEqual(priced[0]['price_adjustment'], Decimal('0.00'))
+
+    def test_measurement(self):
+        self._assert_parity([
+            {'question_id': str(self.measurement.id), 'measurements': [{'length': 4, 'width': 3, 'quantity': 2}]},
+        ])
+
+    def test_mixed_answers_total(self):
+        answers_data = [
+            {'question_id': str(self.yes_no.id), 'yes_no_answer': True},
+            {'question_id': str(self.options.id), 'selected_option_id': str(self.one.id)},
+            {'question_id': str(self.quantity.id), 'selected_option_id': str(self.pane.id), 'quantity': 8},
+            {'question_id': str(self.measurement.id)},
+        ]
+        priced = self._assert_parity(answers_data)
+        self.assertEqual(sum(a['price_adjustment'] for a in priced), Decimal('15.00'))
@@ -1,8 +1,9 @@
 # utils.py
+import uuid
 from decimal import Decimal
 from geopy.distance import geodesic
-from service_app.models import Location, QuestionPricing, OptionPricing
-from accounts.models import GHLAuthCredentials
+from service_app.models import Location, Question, QuestionOption, QuestionPricing, OptionPricing
+from accounts.token_manager import ghl_tokens
 import requests
 from django.conf import settings
 
@@ -87,14 +88,89 @@ def apply_pricing_logic(pricing_type, value, base_price):
         return Decimal('0.00')
 
 
-def calculate_total_quote_price(contact, package, answers_data):
+def _uuid_or_none(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def load_answer_catalog(service, answers_data):
+    """
+    Fetch the active questions and options referenced by ``answers_data`` in two queries.
+    Returns (questions by id, options by id); ids are UUIDs.
+    """
+    question_ids = {_uuid_or_none(a.get('question_id')) for a in answers_data} - {None}
+    option_ids = {_uuid_or_none(a.get('selected_option_id')) for a in answers_data} - {None}
+    questions = {
+        q.id: q for q in Question.objects.filter(service=service, id__in=question_ids, is_active=True)
+    } if question_ids else {}
+    options = {
+        o.id: o for o in QuestionOption.objects.filter(id__in=option_ids, question_id__in=questions, is_active=True)
+    } if option_ids and questions else {}
+    return questions, options
+
+
+def price_quote_answers(package, answers_data, catalog=None):
+    """
+    Price every answer in one pass (two pricing queries in total).
+    Returns a list of dicts: { question, yes_no_answer, selected_option, price_adjustment } for
+    answers that become QuoteQuestionAnswer rows. Unknown questions, unknown options and repeated
+    questions (first answer wins) are skipped.
+    """
+    questions, options = catalog or load_answer_catalog(package.service, answers_data)
+    question_rules = {
+        rule.question_id: rule
+        for rule in QuestionPricing.objects.filter(package=package, question_id__in=questions)
+    } if questions else {}
+    option_rules = {
+        rule.option_id: rule
+        for rule in OptionPricing.objects.filter(package=package, option_id__in=options)
+    } if options else {}
+
+    priced = []
+    seen = set()
+    for answer_data in answers_data:
+        question = questions.get(_uuid_or_none(answer_data.get('question_id')))
+        if question is None or question.id in seen:
+            continue
+
+        price_adjustment = Decimal('0.00')
+        selected_option = None
+        yes_no_answer = None
+        if question.question_type == 'yes_no':
+            yes_no_answer = answer_data.get('yes_no_answer', False)
+            rule = question_rules.get(question.id)
+            if rule and yes_no_answer and rule.yes_pricing_type != 'ignore':
+                price_adjustment = apply_pricing_logic(rule.yes_pricing_type, rule.yes_value, package.base_price)
+        elif question.question_type == 'options':
+            option_id = answer_data.get('selected_option_id')
+            if option_id:
+                selected_option = options.get(_uuid_or_none(option_id))
+                if selected_option is None or selected_option.question_id != question.id:
+                    continue
+                rule = option_rules.get(selected_option.id)
+                if rule and rule.pricing_type != 'ignore':
+                    price_adjustment = apply_pricing_logic(rule.pricing_type, rule.value, package.base_price)
+
+        seen.add(question.id)
+        priced.append({
+            'question': question,
+            'yes_no_answer': yes_no_answer,
+            'selected_option': selected_option,
+            'price_adjustment': price_adjustment,
+        })
+    return priced
+
+
+def calculate_total_quote_price(contact, package, answers_data, catalog=None):
     """
     Calculate total price for a quote including all adjustments
-    Returns dict with price breakdown
+    Returns dict with price breakdown; 'answers' holds the per-answer adjustments
+    (see price_quote_answers) so callers can persist them without re-pricing.
     """
     base_price = package.base_price
     trip_surcharge = Decimal('0.00')
-    question_adjustments = Decimal('0.00')
     
     # Find nearest location and apply trip surcharge
     nearest_location, distance = find_nearest_location(
@@ -105,31 +181,8 @@ def calculate_total_quote_price(contact, package, answers_data):
     if nearest_location:
         trip_surcharge = nearest_location.trip_surcharge
     
-    # Calculate question adjustments
-    for answer_data in answers_data:
-        question_id = answer_data['question_id']
-        
-        try:
-            question = package.service.questions.get(id=question_id, is_active=True)
-        except:
-            continue
-        
-        if question.question_type == 'yes_no':
-            yes_no_answer = answer_data.get('yes_no_answer', False)
-            adjustment = calculate_question_price_adjustment(
-                question, yes_no_answer, package
-            )
-            question_adjustments += adjustment
-            
-        elif question.question_type == 'options':
-            option_id = answer_data.get('selected_option_id')
-            if option_id:
-                try:
-                    option = question.options.get(id=option_id, is_active=True)
-                    adjustment = calculate_option_price_adjustment(option, package)
-                    question_adjustments += adjustment
-                except:
-                    continue
+    answers = price_quote_answers(package, answers_data, catalog)
+    question_adjustments = sum((a['price_adjustment'] for a in answers), Decimal('0.00'))
     
     total_price = base_price + trip_surcharge + question_adjustments
     
@@ -139,7 +192,8 @@ def calculate_total_quote_price(contact, package, answers_data):
         'question_adjustments': question_adjustments,
         'total_price': total_price,
         'nearest_location': nearest_location,
-        'distance_to_location': distance
+        'distance_to_location': distance,
+        'answers': answers,
     }
 
 
@@ -152,7 +206,7 @@ import requests
 def create_ghl_contact_and_note(contact, quote):
     try:
         # Get token from the database
-        credentials = GHLAuthCredentials.objects.first()
+        credentials = ghl_tokens.get_credentials()
         token = credentials.access_token
         headers = {
             "Accept": "application/json",
@@ -248,7 +302,7 @@ def create_ghl_contact_and_note(contact, quote):
             # note_sections.append(f"  Base Price: ${quote.package.base_price}")
         
         # Question Answers
-        question_answers = quote.question_answers.all()
+        question_answers = quote.question_answers.select_related('question', 'selected_option')
         if question_answers.exists():
             note_sections.append(f"\n❓ CUSTOMER ANSWERS:")
             for qa in question_answers:
@@ -3,9 +3,12 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from decimal import Decimal
 
+from service_backend.db_router import ReplicaReadMixin
+
 from .models import (
     Contact, Service, Package, Question, Quote, 
     QuoteQuestionAnswer, QuestionOption,
@@ -16,7 +19,7 @@ from .serializers import (
 )
 from .utils import calculate_total_quote_price
 from service_app.serializers import PackageSerializer
-from .utils import create_ghl_contact_and_note
+from .tasks import queue_ghl_quote_note
 from service_app.models import QuestionPricing, OptionPricing
 from rest_framework.views import APIView
 
@@ -41,7 +44,7 @@ class ContactCreateUpdateView(generics.RetrieveUpdateAPIView):
 
 
 # Step 2: List All Services
-class ServiceListView(generics.ListAPIView):
+class ServiceListView(ReplicaReadMixin, generics.ListAPIView):
     """List all active services"""
     serializer_class = ServiceListSerializer
     permission_classes = [AllowAny]
@@ -62,7 +65,7 @@ class ServiceListView(generics.ListAPIView):
         return queryset.order_by("order", "name")
 
 # Step 3: Get Service Details with Packages
-class ServiceDetailView(generics.RetrieveAPIView):
+class ServiceDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
     """Get service details with all packages and features"""
     queryset = Service.objects.filter(is_active=True)
     serializer_class = ServiceSerializer
@@ -71,7 +74,7 @@ class ServiceDetailView(generics.RetrieveAPIView):
 
 
 # Step 4: Get Package Details (Optional - if you need individual package info)
-class PackageDetailView(generics.RetrieveAPIView):
+class PackageDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
     """Get package details"""
     queryset = Package.objects.filter(is_active=True)
     serializer_class = PackageSerializer
@@ -80,7 +83,7 @@ class PackageDetailView(generics.RetrieveAPIView):
 
 
 # Step 5: Get Questions for a Service
-class ServiceQuestionsView(generics.ListAPIView):
+class ServiceQuestionsView(ReplicaReadMixin, generics.ListAPIView):
     """Get all questions for a specific service with package-specific pricing"""
     serializer_class = QuestionWithPricingSerializer
     permission_classes = [AllowAny]
@@ -196,67 +199,33 @@ class QuoteCreateView(generics.CreateAPIView):
         package = validated_data['package']
         answers_data = validated_data.get('answers', [])
         
-        # Calculate pricing
+        # Single pricing pass: totals plus the per-answer adjustments persisted below
         price_breakdown = calculate_total_quote_price(
-            contact, package, answers_data
-        )
-        
-        # Create quote
-        quote = Quote.objects.create(
-            contact=contact,
-            service=service,
-            package=package,
-            nearest_location=price_breakdown['nearest_location'],
-            distance_to_location=price_breakdown['distance_to_location'],
-            base_price=price_breakdown['base_price'],
-            trip_surcharge=price_breakdown['trip_surcharge'],
-            question_adjustments=price_breakdown['question_adjustments'],
-            total_price=price_breakdown['total_price'],
-            status='draft'
+            contact, package, answers_data, validated_data.get('answer_catalog')
         )
         
-        # Create question answers
-        for answer_data in answers_data:
-            question_id = answer_data['question_id']
-            
-            try:
-                question = service.questions.get(id=question_id, is_active=True)
-            except Question.DoesNotExist:
-                continue
+        with transaction.atomic():
+            # Create quote
+            quote = Quote.objects.create(
+                contact=contact,
+                service=service,
+                package=package,
+                nearest_location=price_breakdown['nearest_location'],
+                distance_to_location=price_breakdown['distance_to_location'],
+                base_price=price_breakdown['base_price'],
+                trip_surcharge=price_breakdown['trip_surcharge'],
+                question_adjustments=price_breakdown['question_adjustments'],
+                total_price=price_breakdown['total_price'],
+                status='draft'
+            )
             
-            # Calculate individual price adjustment for this answer
-            price_adjustment = Decimal('0.00')
-            selected_option = None
-            yes_no_answer = None
+            # Create question answers
+            QuoteQuestionAnswer.objects.bulk_create([
+                QuoteQuestionAnswer(quote=quote, **answer) for answer in price_breakdown['answers']
+            ])
             
-            if question.question_type == 'yes_no':
-                yes_no_answer = answer_data.get('yes_no_answer', False)
-                from .utils import calculate_question_price_adjustment
-                price_adjustment = calculate_question_price_adjustment(
-                    question, yes_no_answer, package
-                )
-                
-            elif question.question_type == 'options':
-                option_id = answer_data.get('selected_option_id')
-                if option_id:
-                    try:
-                        selected_option = question.options.get(id=option_id, is_active=True)
-                        from .utils import calculate_option_price_adjustment
-                        price_adjustment = calculate_option_price_adjustment(
-                            selected_option, package
-                        )
-                    except QuestionOption.DoesNotExist:
-                        continue
-            
-            QuoteQuestionAnswer.objects.create(
-                quote=quote,
-                question=question,
-                yes_no_answer=yes_no_answer,
-                selected_option=selected_option,
-                price_adjustment=price_adjustment
-            )
-        
-        create_ghl_contact_and_note(contact, quote)
+            # GHL contact + note after commit, off the request path
+            transaction.on_commit(lambda: queue_ghl_quote_note(quote.id))
 
         # Return quote details
         quote_serializer = QuoteSerializer(quote)
@@ -307,7 +276,7 @@ def calculate_price(request):
     answers_data = validated_data.get('answers', [])
     
     price_breakdown = calculate_total_quote_price(
-        contact, package, answers_data
+        contact, package, answers_data, validated_data.get('answer_catalog')
     )
     
     return Response({
@@ -332,7 +301,7 @@ class ContactQuotesView(generics.ListAPIView):
     
 
 
-class QuestionTreeView(APIView):
+class QuestionTreeView(ReplicaReadMixin, APIView):
     """Get the complete question tree for a service"""
     permission_classes = [AllowAny]
 